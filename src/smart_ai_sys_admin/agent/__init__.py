@@ -1,23 +1,43 @@
 """Utilidades para inicializar el agente Strands en Shell Sentinel."""
 
+from .compaction import SpillStore, ToolResultCompactionManager
 from .config import (
     AgentConfig,
     AgentConfigError,
     AgentOptions,
     BedrockProviderConfig,
+    ExecutorPoolsConfig,
+    FailoverConfig,
     LocalProviderConfig,
     MCPConfig,
     MCPTransportConfig,
+    MetricsConfig,
+    ModelPrice,
+    ModelRoutingConfig,
     OpenAIProviderConfig,
+    OutputBudgetConfig,
+    PrefetchConfig,
+    PromptCacheConfig,
     ProviderBaseConfig,
     ProviderLiteral,
     RemoteCommandConfig,
+    RunbooksConfig,
+    SessionsConfig,
+    ToolRoutingConfig,
     ToolsConfig,
     load_agent_config,
 )
-from .factory import AgentBuildResult, AgentFactory
+from .factory import AgentBuildResult, AgentFactory, ModelClientCache
+from .failover import FailoverModel
+from .mcp import MCPManager, MCPToolCatalog
+from .metrics import TurnMetrics, TurnMetricsRecorder
+from .model_router import RoutedModel, TurnClassifier
 from .permissions import ToolPermissionManager
-from .runtime import AgentRuntime
+from .prefetch import HostCache, HostPrefetcher
+from .reload import ConfigChanges, ConfigFileWatcher, diff_configs
+from .runbooks import Runbook, RunbookError, RunbookRunner, RunbookStore
+from .runtime import AgentRuntime, AgentStreamEvent
+from .sessions import SessionRecorder, SessionStore
 
 __all__ = [
     "AgentBuildResult",
@@ -25,16 +45,49 @@ __all__ = [
     "AgentConfigError",
     "AgentFactory",
     "AgentRuntime",
+    "AgentStreamEvent",
     "AgentOptions",
     "BedrockProviderConfig",
+    "ConfigChanges",
+    "ConfigFileWatcher",
+    "ExecutorPoolsConfig",
+    "FailoverConfig",
+    "FailoverModel",
+    "HostCache",
+    "HostPrefetcher",
     "LocalProviderConfig",
     "MCPConfig",
+    "MCPManager",
+    "MCPToolCatalog",
     "MCPTransportConfig",
+    "MetricsConfig",
+    "ModelClientCache",
+    "ModelPrice",
+    "ModelRoutingConfig",
     "OpenAIProviderConfig",
+    "OutputBudgetConfig",
+    "PrefetchConfig",
+    "PromptCacheConfig",
     "ProviderBaseConfig",
     "ProviderLiteral",
     "RemoteCommandConfig",
+    "RoutedModel",
+    "Runbook",
+    "RunbookError",
+    "RunbookRunner",
+    "RunbookStore",
+    "RunbooksConfig",
+    "SessionRecorder",
+    "SessionStore",
+    "SessionsConfig",
+    "SpillStore",
     "ToolPermissionManager",
+    "ToolResultCompactionManager",
+    "ToolRoutingConfig",
     "ToolsConfig",
+    "TurnClassifier",
+    "TurnMetrics",
+    "TurnMetricsRecorder",
+    "diff_configs",
     "load_agent_config",
 ]
@@ -0,0 +1,241 @@
+"""Estimación local de tokens y presupuesto de salida de herramientas por turno."""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from strands.hooks import AfterToolCallEvent, BeforeInvocationEvent, HookProvider, HookRegistry
+
+from ..localization import _
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.budget")
+
+# Divide el texto en fragmentos con un coste aproximado estable: palabras ASCII,
+# grupos de dígitos, saltos de línea/indentación, símbolos sueltos y caracteres
+# no ASCII. Los espacios simples se funden con la palabra siguiente, como en BPE.
+_PIECE_RE = re.compile(
+    r"[A-Za-z]+|\d{1,3}|\n[ \t]*|[ \t]{2,}|[ \t]|[^\x00-\x7f]+|.", re.DOTALL
+)
+
+# Cantidad mínima de tokens que se concede a una herramienta aunque el presupuesto
+# del turno esté agotado, para que el modelo vea al menos el código de salida.
+MIN_CALL_TOKENS = 256
+# Reserva para el marcador de líneas omitidas que inserta ``TokenEstimator.fit``.
+_MARKER_TOKENS = 16
+
+
+@dataclass(frozen=True)
+class _FamilyProfile:
+    letters_per_token: float
+    symbol_weight: float
+    non_ascii_per_token: float
+
+
+_FAMILY_PROFILES: dict[str, _FamilyProfile] = {
+    "openai": _FamilyProfile(letters_per_token=4.2, symbol_weight=0.8, non_ascii_per_token=1.5),
+    "claude": _FamilyProfile(letters_per_token=3.8, symbol_weight=0.9, non_ascii_per_token=1.3),
+    "llama": _FamilyProfile(letters_per_token=4.0, symbol_weight=0.8, non_ascii_per_token=1.4),
+    "qwen": _FamilyProfile(letters_per_token=3.9, symbol_weight=0.8, non_ascii_per_token=1.8),
+    "mistral": _FamilyProfile(letters_per_token=3.6, symbol_weight=0.9, non_ascii_per_token=1.2),
+    # Perfil conservador: sobreestima ligeramente para no desbordar el contexto.
+    "default": _FamilyProfile(letters_per_token=3.5, symbol_weight=1.0, non_ascii_per_token=1.0),
+}
+
+_FAMILY_MARKERS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("claude", ("claude", "anthropic")),
+    ("openai", ("gpt", "o1", "o3", "o4", "openai")),
+    ("qwen", ("qwen",)),
+    ("llama", ("llama",)),
+    ("mistral", ("mistral", "mixtral", "codestral")),
+)
+
+
+def model_family(model_id: str | None) -> str:
+    """Deduce la familia de tokenizador a partir del identificador del modelo."""
+
+    normalized = (model_id or "").lower()
+    for family, markers in _FAMILY_MARKERS:
+        if any(marker in normalized for marker in markers):
+            return family
+    return "default"
+
+
+class TokenEstimator:
+    """Estimador rápido de tokens sin dependencias externas.
+
+    No replica ningún tokenizador concreto; aproxima su comportamiento por
+    familia para que el texto denso (rutas, hashes, tablas) cueste más que la
+    prosa del mismo tamaño.
+    """
+
+    def __init__(self, family: str) -> None:
+        self.family = family if family in _FAMILY_PROFILES else "default"
+        self._profile = _FAMILY_PROFILES[self.family]
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return int(round(sum(piece[2] for piece in self._pieces(text))))
+
+    def head(self, text: str, max_tokens: int) -> str:
+        """Devuelve el prefijo más largo de ``text`` que cabe en ``max_tokens``."""
+
+        return text[: self._prefix_end(self._pieces(text), max_tokens)]
+
+    def fit(self, text: str, max_tokens: int) -> str:
+        """Recorta ``text`` conservando principio y final dentro de ``max_tokens``."""
+
+        if max_tokens <= 0:
+            return ""
+        pieces = self._pieces(text)
+        if sum(piece[2] for piece in pieces) <= max_tokens:
+            return text
+        max_tokens = max(max_tokens - _MARKER_TOKENS, 0)
+        head_budget = max_tokens * 2 // 3
+        head_end = self._prefix_end(pieces, head_budget)
+        tail_start = len(text)
+        spent = 0.0
+        for start, _end, cost in reversed(pieces):
+            if spent + cost > max_tokens - head_budget:
+                break
+            spent += cost
+            tail_start = start
+        # Ajustamos ambos cortes a límites de línea cuando es posible.
+        line_end = text.rfind("\n", 0, head_end)
+        if line_end > 0:
+            head_end = line_end
+        line_start = text.find("\n", tail_start)
+        if 0 <= line_start < len(text) - 1:
+            tail_start = line_start + 1
+        if tail_start <= head_end:
+            return text[:head_end]
+        omitted = text[head_end:tail_start].count("\n")
+        marker = _("agent.tools.summary.omitted_lines", lines=omitted) if omitted else "[…]"
+        return f"{text[:head_end].rstrip()}\n{marker}\n{text[tail_start:].lstrip()}"
+
+    # ------------------------------------------------------------------
+    # Utilidades internas
+    # ------------------------------------------------------------------
+
+    def _pieces(self, text: str) -> list[tuple[int, int, float]]:
+        profile = self._profile
+        pieces: list[tuple[int, int, float]] = []
+        for match in _PIECE_RE.finditer(text):
+            piece = match.group()
+            first = piece[0]
+            if first.isascii() and first.isalpha():
+                cost = max(1.0, len(piece) / profile.letters_per_token)
+            elif first.isdigit() or first == "\n":
+                cost = 1.0
+            elif first in " \t":
+                cost = 0.0 if piece == " " else 1.0
+            elif not first.isascii():
+                cost = max(1.0, len(piece) / profile.non_ascii_per_token)
+            else:
+                cost = profile.symbol_weight
+            pieces.append((match.start(), match.end(), cost))
+        return pieces
+
+    @staticmethod
+    def _prefix_end(pieces: list[tuple[int, int, float]], max_tokens: float) -> int:
+        spent = 0.0
+        end = 0
+        for _start, piece_end, cost in pieces:
+            if spent + cost > max_tokens:
+                break
+            spent += cost
+            end = piece_end
+        return end
+
+
+@lru_cache(maxsize=None)
+def _estimator_for_family(family: str) -> TokenEstimator:
+    return TokenEstimator(family)
+
+
+def estimator_for(model_id: str | None) -> TokenEstimator:
+    """Devuelve el estimador compartido para la familia del modelo indicado."""
+
+    return _estimator_for_family(model_family(model_id))
+
+
+class ToolOutputBudget(HookProvider):
+    """Presupuesto de tokens para resultados de herramientas dentro de un turno.
+
+    Se reinicia al comenzar cada invocación del agente y descuenta el tamaño
+    estimado de cada resultado. Las herramientas propias consultan
+    :meth:`allowance` para ajustar su salida; el resto se recorta en el hook
+    posterior a la llamada.
+    """
+
+    def __init__(
+        self,
+        estimator: TokenEstimator,
+        *,
+        turn_tokens: int,
+        per_call_tokens: int,
+    ) -> None:
+        self.estimator = estimator
+        self.turn_tokens = max(turn_tokens, MIN_CALL_TOKENS)
+        self.per_call_tokens = max(per_call_tokens, MIN_CALL_TOKENS)
+        self._spent = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(self.turn_tokens - self._spent, 0)
+
+    def reset(self) -> None:
+        self._spent = 0
+
+    def allowance(self) -> int:
+        """Tokens disponibles para el resultado de la próxima herramienta."""
+
+        return max(min(self.per_call_tokens, self.remaining), MIN_CALL_TOKENS)
+
+    def consume(self, tokens: int) -> None:
+        self._spent += max(tokens, 0)
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._on_before_invocation)
+        registry.add_callback(AfterToolCallEvent, self._on_after_tool_call)
+
+    def _on_before_invocation(self, event: BeforeInvocationEvent) -> None:
+        self.reset()
+
+    def _on_after_tool_call(self, event: AfterToolCallEvent) -> None:
+        result = event.result
+        blocks = result.get("content") or []
+        allowance = self.allowance()
+        used = 0
+        clipped = False
+        for block in blocks:
+            text = block.get("text") if isinstance(block, dict) else None
+            if not isinstance(text, str):
+                continue
+            tokens = self.estimator.count(text)
+            available = max(allowance - used, 0)
+            if tokens > available:
+                block["text"] = self.estimator.fit(text, available)
+                tokens = self.estimator.count(block["text"])
+                clipped = True
+            used += tokens
+        if clipped:
+            logger.warning(
+                "Resultado de '%s' recortado al presupuesto de tokens (%d tokens)",
+                event.tool_use.get("name"),
+                allowance,
+            )
+        self.consume(used)
+
+
+__all__ = [
+    "MIN_CALL_TOKENS",
+    "TokenEstimator",
+    "ToolOutputBudget",
+    "estimator_for",
+    "model_family",
+]
@@ -0,0 +1,243 @@
+"""Compactación del historial guiada por el tamaño de los resultados de herramientas.
+
+En las sesiones de administración la mayor parte del contexto son salidas de
+comandos antiguas que se reenvían en cada llamada. :class:`ToolResultCompactionManager`
+vigila un presupuesto de tokens estimados y, cuando se supera, sustituye los
+resultados de herramientas más antiguos y voluminosos por un resumen de una
+línea. El texto original se guarda en un :class:`SpillStore` y el modelo puede
+recuperarlo con la herramienta ``recall_tool_output``. Los mensajes del usuario
+y el razonamiento del asistente no se tocan; solo si aun así no se respeta el
+presupuesto se recurre al recorte por ventana de Strands.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Any
+
+from strands.agent.conversation_manager import SlidingWindowConversationManager
+from strands.types.content import Message, Messages
+
+from ..localization import _
+from .budget import TokenEstimator
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.compaction")
+
+# Tras compactar se apunta por debajo del presupuesto para no reescribir el
+# historial (e invalidar la caché de prompts) en cada llamada al modelo.
+_TARGET_RATIO = 0.75
+_FIRST_LINE_CHARS = 120
+_HANDLE_RE = re.compile(r"^(\d+)\.txt$")
+
+
+class SpillStore:
+    """Guarda en disco las salidas compactadas bajo identificadores numéricos."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._next: int | None = None
+
+    def put(self, text: str) -> int:
+        while True:
+            handle = self._reserve()
+            # Otro almacén (otro agente o proceso) puede compartir el directorio:
+            # la creación exclusiva garantiza que ningún identificador se pise.
+            try:
+                with (self.directory / f"{handle}.txt").open("x", encoding="utf-8") as file:
+                    file.write(text)
+            except FileExistsError:
+                continue
+            return handle
+
+    def _reserve(self) -> int:
+        with self._lock:
+            if self._next is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                # Los identificadores siguen creciendo entre ejecuciones para que los
+                # resúmenes de sesiones reanudadas sigan apuntando a su salida.
+                existing = (
+                    int(match.group(1))
+                    for path in self.directory.iterdir()
+                    if (match := _HANDLE_RE.match(path.name))
+                )
+                self._next = max(existing, default=0) + 1
+            handle = self._next
+            self._next += 1
+            return handle
+
+    def get(self, handle: int) -> str | None:
+        try:
+            return (self.directory / f"{int(handle)}.txt").read_text(encoding="utf-8")
+        except (OSError, ValueError):
+            return None
+
+
+def _result_text(result: dict[str, Any]) -> str:
+    parts: list[str] = []
+    for block in result.get("content", []):
+        if isinstance(block.get("text"), str):
+            parts.append(block["text"])
+        elif "json" in block:
+            parts.append(json.dumps(block["json"], ensure_ascii=False))
+    return "\n".join(parts)
+
+
+def _is_user_prompt(message: Message) -> bool:
+    return message.get("role") == "user" and any(
+        isinstance(block.get("text"), str) for block in message.get("content", [])
+    )
+
+
+class ToolResultCompactionManager(SlidingWindowConversationManager):
+    """Compacta primero los resultados de herramientas antiguos y grandes.
+
+    Se evalúa antes de cada llamada al modelo. Los resultados de los últimos
+    ``preserve_recent_turns`` prompts del usuario y los menores de
+    ``min_result_tokens`` se conservan íntegros. ``window_size`` queda como
+    límite duro de mensajes y como último recurso ante un desbordamiento.
+    """
+
+    def __init__(
+        self,
+        estimator: TokenEstimator,
+        *,
+        token_budget: int,
+        preserve_recent_turns: int = 2,
+        min_result_tokens: int = 200,
+        window_size: int = 200,
+        spill: SpillStore | None = None,
+    ) -> None:
+        super().__init__(window_size=window_size, should_truncate_results=True, per_turn=True)
+        self.estimator = estimator
+        self.token_budget = token_budget
+        self.preserve_recent_turns = preserve_recent_turns
+        self.min_result_tokens = min_result_tokens
+        self.spill = spill
+        self.compacted_results = 0
+        self.compacted_tokens = 0
+        self._compacted_ids: set[str] = set()
+        # Tokens estimados por bloque; se guarda el bloque para que su id no se reutilice.
+        self._token_cache: dict[int, tuple[Any, int]] = {}
+
+    def apply_management(self, agent: Any, **kwargs: Any) -> None:
+        self.compact(agent.messages, self.preserve_recent_turns)
+        super().apply_management(agent, **kwargs)
+
+    def reduce_context(self, agent: Any, e: Exception | None = None, **kwargs: Any) -> None:
+        # Ante un desbordamiento se compacta todo salvo el turno en curso antes de
+        # descartar mensajes completos.
+        if e is not None and self.compact(agent.messages, 1, force=True):
+            return
+        super().reduce_context(agent, e, **kwargs)
+
+    def estimate(self, messages: Messages) -> int:
+        seen: dict[int, tuple[Any, int]] = {}
+        total = 0
+        for message in messages:
+            for block in message.get("content", []):
+                key = id(block)
+                cached = self._token_cache.get(key)
+                if cached is None or cached[0] is not block:
+                    cached = (block, self._block_tokens(block))
+                seen[key] = cached
+                total += cached[1]
+        self._token_cache = seen
+        return total
+
+    def compact(self, messages: Messages, preserve_turns: int, force: bool = False) -> int:
+        """Compacta resultados antiguos hasta volver bajo el presupuesto.
+
+        Devuelve cuántos resultados se han sustituido.
+        """
+
+        total = self.estimate(messages)
+        if total <= self.token_budget and not force:
+            return 0
+        target = int(self.token_budget * _TARGET_RATIO)
+        boundary = self._preserve_boundary(messages, preserve_turns)
+        tool_names: dict[str, str] = {}
+        compacted = 0
+        for message in messages[:boundary]:
+            for block in message.get("content", []):
+                if "toolUse" in block:
+                    tool_use = block["toolUse"]
+                    tool_names[tool_use.get("toolUseId", "")] = tool_use.get("name", "")
+                    continue
+                result = block.get("toolResult")
+                if not result or result.get("toolUseId") in self._compacted_ids:
+                    continue
+                tokens = self._token_cache.get(id(block), (None, 0))[1]
+                if tokens < self.min_result_tokens:
+                    continue
+                stub = self._stub(result, tool_names.get(result.get("toolUseId", ""), ""), tokens)
+                result["content"] = [{"text": stub}]
+                self._compacted_ids.add(result.get("toolUseId", ""))
+                saved = tokens - self._block_tokens(block)
+                self._token_cache[id(block)] = (block, tokens - saved)
+                total -= saved
+                compacted += 1
+                self.compacted_results += 1
+                self.compacted_tokens += saved
+                if total <= target:
+                    break
+            if total <= target:
+                break
+        if compacted:
+            logger.info(
+                "Historial compactado: %d resultados de herramientas sustituidos, ~%d tokens",
+                compacted,
+                total,
+            )
+        return compacted
+
+    def _stub(self, result: dict[str, Any], tool_name: str, tokens: int) -> str:
+        text = _result_text(result)
+        lines = text.splitlines()
+        first_line = next((line.strip() for line in lines if line.strip()), "")
+        handle: int | None = None
+        if self.spill is not None and text:
+            try:
+                handle = self.spill.put(text)
+            except OSError as exc:
+                logger.warning("No se pudo guardar la salida compactada: %s", exc)
+        values = {
+            "tool": tool_name or "?",
+            "status": result.get("status", "success"),
+            "lines": f"{len(lines):,}",
+            "tokens": f"{tokens:,}",
+            "first": first_line[:_FIRST_LINE_CHARS],
+        }
+        if handle is None:
+            return _("agent.compaction.stub", **values)
+        return _("agent.compaction.stub_spilled", handle=handle, **values)
+
+    def _block_tokens(self, block: dict[str, Any]) -> int:
+        if isinstance(block.get("text"), str):
+            return self.estimator.count(block["text"])
+        if "toolResult" in block:
+            return self.estimator.count(_result_text(block["toolResult"]))
+        if "toolUse" in block:
+            return self.estimator.count(json.dumps(block["toolUse"].get("input"), default=str))
+        return 0
+
+    @staticmethod
+    def _preserve_boundary(messages: Messages, turns: int) -> int:
+        """Índice del primer mensaje de los ``turns`` últimos turnos del usuario."""
+
+        if turns <= 0:
+            return len(messages)
+        seen = 0
+        for position in range(len(messages) - 1, -1, -1):
+            if _is_user_prompt(messages[position]):
+                seen += 1
+                if seen >= turns:
+                    return position
+        return 0
+
+
+__all__ = ["SpillStore", "ToolResultCompactionManager"]
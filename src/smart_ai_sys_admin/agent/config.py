@@ -12,8 +12,9 @@ from typing import Any, Literal
 
 from ..localization import get_localizer
 
-ProviderLiteral = Literal["bedrock", "openai", "local", "lmstudio", "cerebras"]
-ConversationStrategyLiteral = Literal["sliding_window", "summarizing", "none"]
+ProviderLiteral = Literal["bedrock", "openai", "local", "lmstudio", "cerebras", "cassette"]
+CassetteModeLiteral = Literal["record", "replay"]
+ConversationStrategyLiteral = Literal["sliding_window", "summarizing", "compacting", "none"]
 MCPTransportLiteral = Literal["stdio", "sse", "streamable_http"]
 
 
@@ -69,17 +70,55 @@ class CerebrasProviderConfig(ProviderBaseConfig):
     api_key_env: str | None
 
 
+@dataclass(frozen=True)
+class CassetteProviderConfig(ProviderBaseConfig):
+    model_id: str
+    mode: CassetteModeLiteral
+    path: Path
+    record_provider: ProviderLiteral | None
+    speed: float
+    loop: bool
+
+
 @dataclass(frozen=True)
 class ConversationConfig:
     strategy: ConversationStrategyLiteral
     options: Mapping[str, Any]
 
 
+@dataclass(frozen=True)
+class PromptCacheConfig:
+    enabled: bool = True
+    ttl: str | None = None
+    cache_key: str | None = "shell-sentinel"
+
+
+@dataclass(frozen=True)
+class FailoverConfig:
+    providers: tuple[ProviderLiteral, ...] = ()
+    hedge_after_ms: int | None = None
+    first_token_timeout_ms: int | None = None
+
+
+@dataclass(frozen=True)
+class ModelRoutingConfig:
+    enabled: bool = False
+    fast_provider: ProviderLiteral | None = None
+    fast_max_chars: int = 400
+    escalate_after_steps: int = 4
+    strong_keywords: tuple[str, ...] = ()
+
+
 @dataclass(frozen=True)
 class AgentOptions:
     streaming: bool
     conversation: ConversationConfig
     trace_attributes: Mapping[str, Any]
+    parallel_tools: bool = True
+    prompt_cache: PromptCacheConfig = field(default_factory=PromptCacheConfig)
+    failover: FailoverConfig = field(default_factory=FailoverConfig)
+    model_routing: ModelRoutingConfig = field(default_factory=ModelRoutingConfig)
+    watch_config: bool = False
 
 
 @dataclass(frozen=True)
@@ -87,15 +126,53 @@ class RemoteCommandConfig:
     name: str
     timeout_seconds: int | None
     max_output_chars: int | None
+    structured_output: bool = True
+
+
+@dataclass(frozen=True)
+class OutputBudgetConfig:
+    enabled: bool
+    turn_tokens: int
+    per_call_tokens: int
+
+
+@dataclass(frozen=True)
+class ExecutorPoolsConfig:
+    ssh_workers: int
+    sftp_workers: int
+    local_workers: int
+    queue_limit: int
+    queue_timeout_seconds: float
+
+
+@dataclass(frozen=True)
+class ToolRoutingConfig:
+    enabled: bool
+    top_k: int
+    history_messages: int
+    always_include: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class PrefetchConfig:
+    enabled: bool
+    ttl_seconds: float
+    debounce_ms: int
+    # Vacío: se usan los comandos por defecto de ``prefetch.DEFAULT_PREFETCH_COMMANDS``.
+    commands: tuple[str, ...] = ()
 
 
 @dataclass(frozen=True)
 class ToolsConfig:
     default_tools: tuple[str, ...]
     remote_command: RemoteCommandConfig
+    output_budget: OutputBudgetConfig
+    executors: ExecutorPoolsConfig
+    routing: ToolRoutingConfig
     sftp_transfer_name: str
     load_directory: bool
     consent_bypass: bool
+    prefetch: PrefetchConfig
 
 
 @dataclass(frozen=True)
@@ -117,6 +194,39 @@ class MCPConfig:
     enabled: bool
     load_server_tools: bool
     transports: tuple[MCPTransportConfig, ...]
+    lazy_connect: bool = False
+    catalog_cache: Path | None = None
+
+
+@dataclass(frozen=True)
+class SessionsConfig:
+    enabled: bool
+    directory: Path
+    segment_records: int
+    resume_messages: int
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """Precio en USD por millón de tokens de un modelo."""
+
+    input: float
+    output: float
+    cache_read: float | None = None
+    cache_write: float | None = None
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    enabled: bool
+    log_file: Path | None
+    prices: Mapping[str, ModelPrice]
+
+
+@dataclass(frozen=True)
+class RunbooksConfig:
+    directory: Path
+    max_parallel_hosts: int
 
 
 @dataclass(frozen=True)
@@ -126,6 +236,9 @@ class AgentConfig:
     options: AgentOptions
     tools: ToolsConfig
     mcp: MCPConfig
+    sessions: SessionsConfig
+    metrics: MetricsConfig
+    runbooks: RunbooksConfig
     config_path: Path
 
     def provider_config(self) -> ProviderBaseConfig:
@@ -139,6 +252,10 @@ class AgentConfig:
 
 AGENT_CONFIG_FILE_ENV = "SMART_AI_SYS_ADMIN_AGENT_CONFIG_FILE"
 CONFIG_DIR_ENV = "SMART_AI_SYS_ADMIN_CONFIG_DIR"
+DEFAULT_MCP_CATALOG_CACHE = "~/.cache/shell-sentinel/mcp_tools.json"
+DEFAULT_SESSIONS_DIR = "~/.local/share/shell-sentinel/sessions"
+DEFAULT_METRICS_LOG = "~/.local/share/shell-sentinel/metrics.jsonl"
+DEFAULT_RUNBOOKS_DIR = "~/.local/share/shell-sentinel/runbooks"
 DEFAULT_FILENAME = "agent.conf"
 
 
@@ -298,12 +415,54 @@ def _build_provider_configs(
             api_key_env=data.get("api_key_env"),
         )
 
+    if "cassette" in payload:
+        providers["cassette"] = _build_cassette_config(payload["cassette"], config_dir, providers)
+
     return MappingProxyType(providers)
 
 
+def _build_cassette_config(
+    data: Mapping[str, Any],
+    config_dir: Path,
+    providers: Mapping[ProviderLiteral, ProviderBaseConfig],
+) -> CassetteProviderConfig:
+    system_prompt, prompt_path = _load_system_prompt(config_dir, data["system_prompt"])
+    mode = data.get("mode", "replay")
+    if mode not in {"record", "replay"}:
+        raise AgentConfigError(f"Modo de cassette desconocido: {mode}")
+    if not data.get("path"):
+        raise AgentConfigError("La configuración de 'cassette' requiere la clave 'path'.")
+    path = Path(data["path"]).expanduser()
+    record_provider = data.get("record_provider")
+    if mode == "record" and (
+        record_provider == "cassette" or record_provider not in providers
+    ):
+        raise AgentConfigError(
+            f"'providers.cassette.record_provider' ('{record_provider}') debe ser otro "
+            "proveedor configurado para grabar."
+        )
+    try:
+        speed = float(data.get("speed", 1.0))
+    except (TypeError, ValueError) as exc:
+        raise AgentConfigError(f"Valor inválido en 'providers.cassette.speed': {exc}") from exc
+    if speed < 0:
+        raise AgentConfigError("'providers.cassette.speed' no puede ser negativo.")
+    return CassetteProviderConfig(
+        system_prompt_path=prompt_path,
+        system_prompt=system_prompt,
+        show_thinking=bool(data.get("show_thinking", False)),
+        model_id=str(data.get("model_id", "cassette")),
+        mode=mode,
+        path=path if path.is_absolute() else config_dir / path,
+        record_provider=record_provider,
+        speed=speed,
+        loop=bool(data.get("loop", False)),
+    )
+
+
 def _build_conversation_config(payload: Mapping[str, Any]) -> ConversationConfig:
     strategy = payload.get("strategy", "sliding_window")
-    if strategy not in {"sliding_window", "summarizing", "none"}:
+    if strategy not in {"sliding_window", "summarizing", "compacting", "none"}:
         raise AgentConfigError(f"Estrategia de conversación desconocida: {strategy}")
     options = _mapping_proxy({k: v for k, v in payload.items() if k != "strategy"})
     return ConversationConfig(strategy=strategy, options=options)
@@ -313,11 +472,68 @@ def _build_agent_options(payload: Mapping[str, Any]) -> AgentOptions:
     streaming = bool(payload.get("streaming", True))
     conversation_cfg = _build_conversation_config(payload.get("conversation", {}))
     trace_attributes = _mapping_proxy(payload.get("trace_attributes"))
+    parallel_tools = bool(payload.get("parallel_tools", True))
+    cache_cfg = payload.get("prompt_cache", {})
+    if not isinstance(cache_cfg, Mapping):
+        raise AgentConfigError("'agent.prompt_cache' debe ser un objeto.")
+    for key in ("ttl", "cache_key"):
+        if cache_cfg.get(key) is not None and not isinstance(cache_cfg[key], str):
+            raise AgentConfigError(f"'agent.prompt_cache.{key}' debe ser una cadena o null.")
+    prompt_cache = PromptCacheConfig(
+        enabled=bool(cache_cfg.get("enabled", True)),
+        ttl=cache_cfg.get("ttl"),
+        cache_key=cache_cfg.get("cache_key", PromptCacheConfig.cache_key),
+    )
     return AgentOptions(
-        streaming=streaming, conversation=conversation_cfg, trace_attributes=trace_attributes
+        streaming=streaming,
+        conversation=conversation_cfg,
+        trace_attributes=trace_attributes,
+        parallel_tools=parallel_tools,
+        prompt_cache=prompt_cache,
+        failover=_build_failover_config(payload.get("failover", {})),
+        model_routing=_build_model_routing_config(payload.get("model_routing", {})),
+        watch_config=bool(payload.get("watch_config", False)),
     )
 
 
+def _build_failover_config(payload: Any) -> FailoverConfig:
+    if not isinstance(payload, Mapping):
+        raise AgentConfigError("'agent.failover' debe ser un objeto.")
+    providers = _tuple_from_sequence(payload.get("providers", []))
+    timings: dict[str, int | None] = {}
+    for key in ("hedge_after_ms", "first_token_timeout_ms"):
+        value = payload.get(key)
+        if value is None:
+            timings[key] = None
+            continue
+        if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            raise AgentConfigError(f"'agent.failover.{key}' debe ser un entero positivo o null.")
+        timings[key] = value
+    return FailoverConfig(providers=providers, **timings)  # type: ignore[arg-type]
+
+
+def _build_model_routing_config(payload: Any) -> ModelRoutingConfig:
+    if not isinstance(payload, Mapping):
+        raise AgentConfigError("'agent.model_routing' debe ser un objeto.")
+    try:
+        routing = ModelRoutingConfig(
+            enabled=bool(payload.get("enabled", False)),
+            fast_provider=payload.get("fast_provider"),
+            fast_max_chars=int(payload.get("fast_max_chars", 400)),
+            escalate_after_steps=int(payload.get("escalate_after_steps", 4)),
+            strong_keywords=_tuple_from_sequence(payload.get("strong_keywords", [])),
+        )
+    except (TypeError, ValueError) as exc:
+        raise AgentConfigError(f"Valores inválidos en 'agent.model_routing': {exc}") from exc
+    if routing.enabled and not routing.fast_provider:
+        raise AgentConfigError("'agent.model_routing.fast_provider' es obligatorio si está activo.")
+    if routing.fast_max_chars <= 0 or routing.escalate_after_steps <= 0:
+        raise AgentConfigError(
+            "'agent.model_routing.fast_max_chars' y 'escalate_after_steps' deben ser positivos."
+        )
+    return routing
+
+
 def _build_tools_config(payload: Mapping[str, Any]) -> ToolsConfig:
     default_tools = _tuple_from_sequence(payload.get("default", []))
     remote_cfg = payload.get("remote_command", {})
@@ -329,16 +545,78 @@ def _build_tools_config(payload: Mapping[str, Any]) -> ToolsConfig:
             if "max_output_chars" in remote_cfg and remote_cfg["max_output_chars"] is not None
             else None
         ),
+        structured_output=bool(remote_cfg.get("structured_output", True)),
+    )
+    budget_cfg = payload.get("output_budget", {})
+    output_budget = OutputBudgetConfig(
+        enabled=bool(budget_cfg.get("enabled", True)),
+        turn_tokens=int(budget_cfg.get("turn_tokens", 48000)),
+        per_call_tokens=int(budget_cfg.get("per_call_tokens", 12000)),
     )
+    if output_budget.turn_tokens <= 0 or output_budget.per_call_tokens <= 0:
+        raise AgentConfigError(
+            "Los valores de 'tools.output_budget' deben ser enteros positivos."
+        )
+    executors_cfg = payload.get("executors", {})
+    try:
+        executors = ExecutorPoolsConfig(
+            ssh_workers=int(executors_cfg.get("ssh", 4)),
+            sftp_workers=int(executors_cfg.get("sftp", 2)),
+            local_workers=int(executors_cfg.get("local", 2)),
+            queue_limit=int(executors_cfg.get("queue_limit", 16)),
+            queue_timeout_seconds=float(executors_cfg.get("queue_timeout_seconds", 30)),
+        )
+    except (TypeError, ValueError) as exc:
+        raise AgentConfigError(f"Valores inválidos en 'tools.executors': {exc}") from exc
+    if min(executors.ssh_workers, executors.sftp_workers, executors.local_workers) <= 0:
+        raise AgentConfigError(
+            "Los grupos de 'tools.executors' necesitan al menos un hilo cada uno."
+        )
+    if executors.queue_limit < 0 or executors.queue_timeout_seconds < 0:
+        raise AgentConfigError(
+            "'tools.executors.queue_limit' y 'queue_timeout_seconds' no pueden ser negativos."
+        )
+    routing_cfg = payload.get("routing", {})
+    try:
+        routing = ToolRoutingConfig(
+            enabled=bool(routing_cfg.get("enabled", True)),
+            top_k=int(routing_cfg.get("top_k", 8)),
+            history_messages=int(routing_cfg.get("history_messages", 4)),
+            always_include=_tuple_from_sequence(routing_cfg.get("always_include")),
+        )
+    except (TypeError, ValueError) as exc:
+        raise AgentConfigError(f"Valores inválidos en 'tools.routing': {exc}") from exc
+    if routing.top_k <= 0 or routing.history_messages < 0:
+        raise AgentConfigError(
+            "'tools.routing.top_k' debe ser positivo y 'history_messages' no negativo."
+        )
+    prefetch_cfg = payload.get("prefetch", {})
+    try:
+        prefetch = PrefetchConfig(
+            enabled=bool(prefetch_cfg.get("enabled", True)),
+            ttl_seconds=float(prefetch_cfg.get("ttl_seconds", 120)),
+            debounce_ms=int(prefetch_cfg.get("debounce_ms", 600)),
+            commands=_tuple_from_sequence(prefetch_cfg.get("commands")),
+        )
+    except (TypeError, ValueError) as exc:
+        raise AgentConfigError(f"Valores inválidos en 'tools.prefetch': {exc}") from exc
+    if prefetch.ttl_seconds <= 0 or prefetch.debounce_ms < 0:
+        raise AgentConfigError(
+            "'tools.prefetch.ttl_seconds' debe ser positivo y 'debounce_ms' no negativo."
+        )
     sftp_name = payload.get("sftp_transfer", {}).get("name", "remote_sftp_transfer")
     load_directory = bool(payload.get("load_directory", False))
     consent = bool(payload.get("consent", {}).get("bypass", False))
     return ToolsConfig(
         default_tools=default_tools,
         remote_command=remote,
+        output_budget=output_budget,
+        executors=executors,
+        routing=routing,
         sftp_transfer_name=sftp_name,
         load_directory=load_directory,
         consent_bypass=consent,
+        prefetch=prefetch,
     )
 
 
@@ -367,7 +645,90 @@ def _build_mcp_config(payload: Mapping[str, Any]) -> MCPConfig:
     enabled = bool(payload.get("enabled", False))
     load_server_tools = bool(payload.get("load_server_tools", True))
     transports = tuple(_build_transport(item) for item in payload.get("transports", []))
-    return MCPConfig(enabled=enabled, load_server_tools=load_server_tools, transports=transports)
+    lazy_connect = bool(payload.get("lazy_connect", False))
+    cache_value = payload.get("catalog_cache", DEFAULT_MCP_CATALOG_CACHE)
+    if cache_value is not None and not isinstance(cache_value, str):
+        raise AgentConfigError("'mcp.catalog_cache' debe ser una ruta o null.")
+    catalog_cache = Path(cache_value).expanduser() if cache_value else None
+    return MCPConfig(
+        enabled=enabled,
+        load_server_tools=load_server_tools,
+        transports=transports,
+        lazy_connect=lazy_connect,
+        catalog_cache=catalog_cache,
+    )
+
+
+def _build_sessions_config(payload: Mapping[str, Any]) -> SessionsConfig:
+    directory = payload.get("directory") or DEFAULT_SESSIONS_DIR
+    if not isinstance(directory, str):
+        raise AgentConfigError("'sessions.directory' debe ser una ruta.")
+    try:
+        sessions = SessionsConfig(
+            enabled=bool(payload.get("enabled", True)),
+            directory=Path(directory).expanduser(),
+            segment_records=int(payload.get("segment_records", 500)),
+            resume_messages=int(payload.get("resume_messages", 200)),
+        )
+    except (TypeError, ValueError) as exc:
+        raise AgentConfigError(f"Valores inválidos en 'sessions': {exc}") from exc
+    if sessions.segment_records <= 0 or sessions.resume_messages <= 0:
+        raise AgentConfigError(
+            "'sessions.segment_records' y 'sessions.resume_messages' deben ser positivos."
+        )
+    return sessions
+
+
+def _build_metrics_config(payload: Mapping[str, Any]) -> MetricsConfig:
+    log_value = payload.get("log_file", DEFAULT_METRICS_LOG)
+    if log_value is not None and not isinstance(log_value, str):
+        raise AgentConfigError("'metrics.log_file' debe ser una ruta o null.")
+    prices_section = payload.get("prices", {})
+    if not isinstance(prices_section, Mapping):
+        raise AgentConfigError("'metrics.prices' debe ser un objeto indexado por modelo.")
+    prices: dict[str, ModelPrice] = {}
+    for model_id, entry in prices_section.items():
+        if not isinstance(entry, Mapping):
+            raise AgentConfigError(f"El precio de '{model_id}' debe ser un objeto.")
+        try:
+            price = ModelPrice(
+                input=float(entry["input"]),
+                output=float(entry["output"]),
+                cache_read=(
+                    float(entry["cache_read"]) if entry.get("cache_read") is not None else None
+                ),
+                cache_write=(
+                    float(entry["cache_write"]) if entry.get("cache_write") is not None else None
+                ),
+            )
+        except KeyError as exc:
+            raise AgentConfigError(
+                f"El precio de '{model_id}' requiere el campo {exc.args[0]!r}."
+            ) from exc
+        except (TypeError, ValueError) as exc:
+            raise AgentConfigError(f"Precio inválido para '{model_id}': {exc}") from exc
+        prices[str(model_id)] = price
+    return MetricsConfig(
+        enabled=bool(payload.get("enabled", True)),
+        log_file=Path(log_value).expanduser() if log_value else None,
+        prices=MappingProxyType(prices),
+    )
+
+
+def _build_runbooks_config(payload: Mapping[str, Any]) -> RunbooksConfig:
+    directory = payload.get("directory") or DEFAULT_RUNBOOKS_DIR
+    if not isinstance(directory, str):
+        raise AgentConfigError("'runbooks.directory' debe ser una ruta.")
+    try:
+        max_parallel_hosts = int(payload.get("max_parallel_hosts", 4))
+    except (TypeError, ValueError) as exc:
+        raise AgentConfigError(f"Valores inválidos en 'runbooks': {exc}") from exc
+    if max_parallel_hosts <= 0:
+        raise AgentConfigError("'runbooks.max_parallel_hosts' debe ser positivo.")
+    return RunbooksConfig(
+        directory=Path(directory).expanduser(),
+        max_parallel_hosts=max_parallel_hosts,
+    )
 
 
 def load_agent_config(path: str | Path | None = None) -> AgentConfig:
@@ -391,7 +752,7 @@ def load_agent_config(path: str | Path | None = None) -> AgentConfig:
         raise AgentConfigError(f"Versión de configuración no soportada: {version}")
 
     provider = raw.get("provider")
-    if provider not in {"bedrock", "openai", "local", "lmstudio", "cerebras"}:
+    if provider not in {"bedrock", "openai", "local", "lmstudio", "cerebras", "cassette"}:
         raise AgentConfigError("Debes especificar un proveedor válido en 'provider'.")
 
     providers_section = raw.get("providers")
@@ -406,8 +767,25 @@ def load_agent_config(path: str | Path | None = None) -> AgentConfig:
         )
 
     agent_options = _build_agent_options(raw.get("agent", {}))
+    routing = agent_options.model_routing
+    if routing.enabled and (
+        routing.fast_provider == provider or routing.fast_provider not in providers
+    ):
+        raise AgentConfigError(
+            f"'agent.model_routing.fast_provider' ('{routing.fast_provider}') debe ser un "
+            "proveedor configurado distinto del principal."
+        )
+    for fallback in agent_options.failover.providers:
+        if fallback == provider or fallback not in providers:
+            raise AgentConfigError(
+                f"'agent.failover.providers' incluye '{fallback}', que no es un proveedor "
+                "configurado distinto del principal."
+            )
     tools = _build_tools_config(raw.get("tools", {}))
     mcp = _build_mcp_config(raw.get("mcp", {}))
+    sessions = _build_sessions_config(raw.get("sessions", {}))
+    metrics = _build_metrics_config(raw.get("metrics", {}))
+    runbooks = _build_runbooks_config(raw.get("runbooks", {}))
 
     return AgentConfig(
         provider=provider,
@@ -415,6 +793,9 @@ def load_agent_config(path: str | Path | None = None) -> AgentConfig:
         options=agent_options,
         tools=tools,
         mcp=mcp,
+        sessions=sessions,
+        metrics=metrics,
+        runbooks=runbooks,
         config_path=config_path,
     )
 
@@ -424,16 +805,28 @@ __all__ = [
     "AgentConfigError",
     "AgentOptions",
     "BedrockProviderConfig",
+    "CassetteProviderConfig",
     "ConversationConfig",
+    "ExecutorPoolsConfig",
+    "FailoverConfig",
     "LocalProviderConfig",
     "CerebrasProviderConfig",
     "LMStudioProviderConfig",
     "MCPConfig",
     "MCPTransportConfig",
+    "MetricsConfig",
+    "ModelPrice",
+    "ModelRoutingConfig",
     "OpenAIProviderConfig",
+    "OutputBudgetConfig",
+    "PrefetchConfig",
     "ProviderBaseConfig",
+    "PromptCacheConfig",
     "ProviderLiteral",
     "RemoteCommandConfig",
+    "RunbooksConfig",
+    "SessionsConfig",
+    "ToolRoutingConfig",
     "ToolsConfig",
     "load_agent_config",
 ]
@@ -0,0 +1,229 @@
+"""Grupos de hilos dedicados para la E/S bloqueante de las herramientas.
+
+Cada familia de herramientas (SSH, SFTP y operaciones locales) dispone de su
+propio ``ThreadPoolExecutor`` con tamaño configurable. Así una ráfaga de
+transferencias lentas no deja sin hilos a los comandos rápidos de diagnóstico.
+Cada grupo limita además la cola de espera: cuando está llena, la tool espera
+hasta ``queue_timeout`` segundos y después rechaza la llamada con
+:class:`PoolSaturated` para que el modelo reintente más tarde.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Literal, TypeVar
+
+from .config import ExecutorPoolsConfig
+
+PoolNameLiteral = Literal["ssh", "sftp", "local"]
+POOL_NAMES: tuple[PoolNameLiteral, ...] = ("ssh", "sftp", "local")
+
+_T = TypeVar("_T")
+# Intervalo de sondeo mientras se espera un hueco en un grupo saturado.
+_ADMISSION_POLL_SECONDS = 0.05
+
+
+class ToolRejected(RuntimeError):
+    """La llamada no llegó a ejecutarse en el grupo."""
+
+    def __init__(self, pool: str) -> None:
+        super().__init__(pool)
+        self.pool = pool
+
+
+class PoolSaturated(ToolRejected):
+    """La cola del grupo está llena y la llamada no pudo admitirse a tiempo."""
+
+    def __init__(self, pool: str, capacity: int) -> None:
+        super().__init__(pool)
+        self.capacity = capacity
+
+
+class ToolCancelled(ToolRejected):
+    """El turno se canceló mientras la llamada esperaba en la cola."""
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    name: str
+    workers: int
+    queue_limit: int
+    active: int
+    queued: int
+    peak_queued: int
+    completed: int
+    rejected: int
+
+
+class ToolPool:
+    """Grupo de hilos con cola acotada y contadores de uso."""
+
+    def __init__(self, name: str, workers: int, queue_limit: int) -> None:
+        self.name = name
+        self.workers = max(workers, 1)
+        self.queue_limit = max(queue_limit, 0)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix=f"tool-{name}"
+        )
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._active = 0
+        self._peak_queued = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_limit
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                name=self.name,
+                workers=self.workers,
+                queue_limit=self.queue_limit,
+                active=self._active,
+                queued=self._admitted - self._active,
+                peak_queued=self._peak_queued,
+                completed=self._completed,
+                rejected=self._rejected,
+            )
+
+    async def run(
+        self,
+        func: Callable[..., _T],
+        *args: Any,
+        queue_timeout: float = 0.0,
+        cancel_event: threading.Event | None = None,
+    ) -> _T:
+        """Ejecuta ``func`` en el grupo respetando el límite de cola."""
+
+        deadline = time.monotonic() + max(queue_timeout, 0.0)
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ToolCancelled(self.name)
+            if self._try_admit():
+                break
+            if time.monotonic() >= deadline:
+                with self._lock:
+                    self._rejected += 1
+                raise PoolSaturated(self.name, self.capacity)
+            await asyncio.sleep(_ADMISSION_POLL_SECONDS)
+        try:
+            future = self._executor.submit(self._call, func, args)
+        except RuntimeError:
+            self._release(None)
+            raise
+        # La plaza se libera cuando termina el hilo, no cuando deja de esperarse:
+        # si el turno se cancela, la llamada sigue ocupando el grupo hasta acabar.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, future: Future[Any] | None) -> None:
+        with self._lock:
+            self._admitted -= 1
+            if future is not None and not future.cancelled():
+                self._completed += 1
+
+    def _try_admit(self) -> bool:
+        with self._lock:
+            if self._admitted >= self.capacity:
+                return False
+            self._admitted += 1
+            self._peak_queued = max(self._peak_queued, self._admitted - self._active)
+            return True
+
+    def _call(self, func: Callable[..., _T], args: tuple[Any, ...]) -> _T:
+        with self._lock:
+            self._active += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+class KeyedLocks:
+    """Cerrojos por clave para serializar solo las operaciones que colisionan.
+
+    Las tools se ejecutan en paralelo dentro de un turno; dos escrituras sobre la
+    misma ruta deben ir en serie, pero rutas distintas no se bloquean entre sí.
+    Los cerrojos sin usuarios se eliminan para no crecer indefinidamente.
+    """
+
+    def __init__(self) -> None:
+        self._guard = threading.Lock()
+        self._locks: dict[Hashable, tuple[threading.Lock, int]] = {}
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        with self._guard:
+            lock, users = self._locks.get(key, (threading.Lock(), 0))
+            self._locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._guard:
+                _lock, users = self._locks[key]
+                if users <= 1:
+                    del self._locks[key]
+                else:
+                    self._locks[key] = (lock, users - 1)
+
+
+class ToolExecutors:
+    """Conjunto de grupos con nombre compartido por las tools de un agente."""
+
+    def __init__(self, pools: Mapping[str, ToolPool], queue_timeout: float) -> None:
+        self._pools = dict(pools)
+        self.queue_timeout = queue_timeout
+        self.path_locks = KeyedLocks()
+
+    @classmethod
+    def from_config(cls, config: ExecutorPoolsConfig) -> ToolExecutors:
+        sizes = {"ssh": config.ssh_workers, "sftp": config.sftp_workers, "local": config.local_workers}
+        pools = {name: ToolPool(name, sizes[name], config.queue_limit) for name in POOL_NAMES}
+        return cls(pools, config.queue_timeout_seconds)
+
+    def pool(self, name: PoolNameLiteral) -> ToolPool:
+        return self._pools[name]
+
+    async def run(
+        self,
+        name: PoolNameLiteral,
+        func: Callable[..., _T],
+        *args: Any,
+        cancel_event: threading.Event | None = None,
+    ) -> _T:
+        return await self._pools[name].run(
+            func, *args, queue_timeout=self.queue_timeout, cancel_event=cancel_event
+        )
+
+    def stats(self) -> tuple[PoolStats, ...]:
+        return tuple(pool.stats() for pool in self._pools.values())
+
+    def shutdown(self) -> None:
+        for pool in self._pools.values():
+            pool.shutdown()
+
+
+__all__ = [
+    "KeyedLocks",
+    "POOL_NAMES",
+    "PoolSaturated",
+    "PoolStats",
+    "ToolCancelled",
+    "ToolExecutors",
+    "ToolPool",
+    "ToolRejected",
+]
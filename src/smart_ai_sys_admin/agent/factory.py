@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import logging
 import os
-from collections.abc import Sequence
+import threading
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
 from strands import Agent
@@ -17,12 +19,16 @@ from strands.agent.conversation_manager import (
 from strands.models import BedrockModel
 from strands.models.ollama import OllamaModel
 from strands.models.openai import OpenAIModel
+from strands.tools.executors import ConcurrentToolExecutor, SequentialToolExecutor
 
+from .budget import ToolOutputBudget, estimator_for
+from .compaction import SpillStore, ToolResultCompactionManager
 from .config import (
     AgentConfig,
     AgentConfigError,
     AgentOptions,
     BedrockProviderConfig,
+    CassetteProviderConfig,
     CerebrasProviderConfig,
     LMStudioProviderConfig,
     LocalProviderConfig,
@@ -31,10 +37,18 @@ from .config import (
     ProviderBaseConfig,
     RemoteCommandConfig,
 )
-from .providers import CerebrasModel
+from .failover import FailoverModel
+from .metrics import TurnMetricsRecorder
+from .model_router import DEFAULT_STRONG_KEYWORDS, RoutedModel, TurnClassifier
+from .prompt_cache import PromptCacheStats, cache_config_for
+from .providers import CassetteModel, CerebrasModel
+from .tool_router import ToolLayoutModel, ToolRouter
+from .tools import builtin_tool_names
 
 logger = logging.getLogger("smart_ai_sys_admin.agent.factory")
 
+DEFAULT_SPILL_DIR = "~/.cache/shell-sentinel/spill"
+
 
 @dataclass(frozen=True)
 class AgentBuildResult:
@@ -44,17 +58,72 @@ class AgentBuildResult:
     mcp_config: MCPConfig
 
 
+class ModelClientCache:
+    """Modelos de proveedor ya construidos, compartidos entre varios agentes.
+
+    En el modo servidor cada sesión tiene su agente; con una caché común todas
+    usan el mismo cliente del proveedor (sesión de boto3, pool de conexiones)
+    en lugar de crear uno por sesión. Solo se comparten los modelos finales: los
+    envoltorios con estado por agente (enrutado, respaldo) se crean para cada uno.
+    """
+
+    def __init__(self) -> None:
+        self._models: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._models[key] = build()
+            return model
+
+
 class AgentFactory:
     """Construye instancias de `Agent` de Strands a partir de la configuración declarativa."""
 
-    def __init__(self, config: AgentConfig) -> None:
+    def __init__(self, config: AgentConfig, model_cache: ModelClientCache | None = None) -> None:
         self._config = config
+        self._model_cache = model_cache
+
+    def build_agent(
+        self,
+        tools: Sequence[Any] | None = None,
+        previous: Agent | None = None,
+        *,
+        reuse_model: bool = False,
+        reuse_conversation: bool = False,
+    ) -> AgentBuildResult:
+        """Construye el agente; con ``previous`` puede reutilizar sus componentes.
+
+        En una recarga de la configuración, ``reuse_model`` conserva el cliente
+        del modelo (o la cadena de proveedores) y ``reuse_conversation`` el
+        gestor de conversación, con su estado, del agente anterior.
+        """
 
-    def build_agent(self, tools: Sequence[Any] | None = None) -> AgentBuildResult:
         provider_cfg = self._config.provider_config()
-        model = self._build_model(provider_cfg)
-        conversation_manager = self._build_conversation_manager(self._config.options)
+        tool_router = self._build_tool_router()
+        if previous is not None and reuse_model:
+            routed_model = previous.model.model
+        else:
+            routed_model = self._build_routed_model(provider_cfg)
+        # Herramientas ordenadas (y filtradas, si hay router) para un prefijo estable.
+        model = ToolLayoutModel(routed_model, tool_router)
+        if previous is not None and reuse_conversation:
+            conversation_manager = previous.conversation_manager
+        else:
+            conversation_manager = self._build_conversation_manager(
+                self._config.options, provider_cfg
+            )
         system_prompt = provider_cfg.system_prompt
+        output_budget = self._build_output_budget(provider_cfg)
+        cache_stats = PromptCacheStats()
+        hooks: list[Any] = [cache_stats]
+        turn_metrics = self._build_turn_metrics(provider_cfg)
+        if turn_metrics:
+            hooks.append(turn_metrics)
+        if output_budget:
+            hooks.append(output_budget)
 
         # Copiamos las herramientas para no mutar la lista externa
         tools_list = list(tools or [])
@@ -65,15 +134,118 @@ class AgentFactory:
             conversation_manager=conversation_manager,
             trace_attributes=dict(self._config.options.trace_attributes),
             load_tools_from_directory=self._config.tools.load_directory,
+            hooks=hooks,
+            tool_executor=self._build_tool_executor(self._config.options),
         )
         agent.show_thinking = getattr(provider_cfg, "show_thinking", False)  # type: ignore[attr-defined]
+        agent.tool_output_budget = output_budget  # type: ignore[attr-defined]
+        agent.tool_router = tool_router  # type: ignore[attr-defined]
+        agent.prompt_cache_stats = cache_stats  # type: ignore[attr-defined]
+        agent.turn_metrics = turn_metrics  # type: ignore[attr-defined]
+        agent.spill_store = getattr(conversation_manager, "spill", None)  # type: ignore[attr-defined]
         return AgentBuildResult(agent=agent, mcp_config=self._config.mcp)
 
     # ------------------------------------------------------------------
     # Construcción de componentes auxiliares
     # ------------------------------------------------------------------
 
+    def _build_tool_executor(self, options: AgentOptions) -> Any:
+        # El ejecutor concurrente lanza a la vez todas las tool uses de un mismo
+        # mensaje y entrega los resultados en el orden original.
+        if options.parallel_tools:
+            return ConcurrentToolExecutor()
+        return SequentialToolExecutor()
+
+    def _build_turn_metrics(
+        self, provider_cfg: ProviderBaseConfig
+    ) -> TurnMetricsRecorder | None:
+        metrics = self._config.metrics
+        if not metrics.enabled:
+            return None
+        model_id = str(getattr(provider_cfg, "model_id", "") or "")
+        if metrics.prices and model_id not in metrics.prices:
+            logger.info("No hay precio configurado para '%s'; no se estimará el coste", model_id)
+        # Cada llamada se tasa con el modelo que la sirvió (enrutado o respaldo).
+        return TurnMetricsRecorder(
+            model_id=model_id,
+            provider=self._config.provider,
+            prices=metrics.prices,
+            log_file=metrics.log_file,
+        )
+
+    def _build_tool_router(self) -> ToolRouter | None:
+        routing = self._config.tools.routing
+        if not routing.enabled:
+            return None
+        # Las herramientas propias se exponen siempre, sea cual sea el prompt: el
+        # router solo recorta las de los servidores MCP y las cargadas de plugins.
+        core_tools = (
+            *builtin_tool_names(self._config.tools.remote_command.name),
+            self._config.tools.sftp_transfer_name,
+            *routing.always_include,
+        )
+        return ToolRouter(
+            top_k=routing.top_k,
+            history_messages=routing.history_messages,
+            core_tools=core_tools,
+        )
+
+    def _build_routed_model(self, provider_cfg: ProviderBaseConfig) -> Any:
+        """Cadena principal o, con ``model_routing``, un :class:`RoutedModel` rápido/potente."""
+
+        strong = self._build_provider_chain(provider_cfg)
+        routing = self._config.options.model_routing
+        if not routing.enabled or routing.fast_provider is None:
+            return strong
+        try:
+            fast = self._build_model(self._config.providers[routing.fast_provider])
+        except Exception as exc:  # pragma: no cover - depende del entorno
+            logger.warning(
+                "No se pudo preparar el proveedor rápido '%s'; se usa solo el principal: %s",
+                routing.fast_provider,
+                exc,
+            )
+            return strong
+        classifier = TurnClassifier(
+            fast_max_chars=routing.fast_max_chars,
+            escalate_after_steps=routing.escalate_after_steps,
+            strong_keywords=(*DEFAULT_STRONG_KEYWORDS, *routing.strong_keywords),
+        )
+        return RoutedModel(
+            (routing.fast_provider, fast), (self._config.provider, strong), classifier
+        )
+
+    def _build_provider_chain(self, provider_cfg: ProviderBaseConfig) -> Any:
+        """Modelo principal o, si hay proveedores de respaldo, un :class:`FailoverModel`."""
+
+        primary = self._build_model(provider_cfg)
+        failover = self._config.options.failover
+        if not failover.providers:
+            return primary
+        models: list[tuple[str, Any]] = [(self._config.provider, primary)]
+        for name in failover.providers:
+            try:
+                models.append((name, self._build_model(self._config.providers[name])))
+            except Exception as exc:  # pragma: no cover - depende del entorno
+                logger.warning("No se pudo preparar el proveedor de respaldo '%s': %s", name, exc)
+        if len(models) == 1:
+            return primary
+        logger.info("Cadena de proveedores: %s", " → ".join(name for name, _ in models))
+        return FailoverModel(
+            models,
+            hedge_after_ms=failover.hedge_after_ms,
+            first_token_timeout_ms=failover.first_token_timeout_ms,
+        )
+
     def _build_model(self, provider_cfg: ProviderBaseConfig) -> Any:
+        if self._model_cache is None:
+            return self._create_model(provider_cfg)
+        # La clave incluye las opciones globales que leen los constructores.
+        options = self._config.options
+        key = repr((provider_cfg, options.streaming, options.prompt_cache))
+        return self._model_cache.get(key, lambda: self._create_model(provider_cfg))
+
+    def _create_model(self, provider_cfg: ProviderBaseConfig) -> Any:
         if isinstance(provider_cfg, BedrockProviderConfig):
             return self._build_bedrock_model(provider_cfg)
         if isinstance(provider_cfg, OpenAIProviderConfig):
@@ -84,6 +256,8 @@ class AgentFactory:
             return self._build_lmstudio_model(provider_cfg)
         if isinstance(provider_cfg, CerebrasProviderConfig):
             return self._build_cerebras_model(provider_cfg)
+        if isinstance(provider_cfg, CassetteProviderConfig):
+            return self._build_cassette_model(provider_cfg)
         raise AgentConfigError("Tipo de proveedor no soportado")
 
     def _build_bedrock_model(self, cfg: BedrockProviderConfig) -> BedrockModel:
@@ -135,6 +309,10 @@ class AgentFactory:
                 "Se indicó endpoint_url para Bedrock; se usará la configuración estándar de boto3"
             )
 
+        cache_config = cache_config_for(cfg, self._config.options.prompt_cache)
+        if cache_config and "cache_config" not in params:
+            params["cache_config"] = cache_config
+
         logger.debug("Instanciando BedrockModel con parámetros: %s", params.keys())
         return BedrockModel(model_id=cfg.model_id, **params)
 
@@ -151,8 +329,15 @@ class AgentFactory:
             client_args["api_key"] = api_key
         logger.debug("Instanciando OpenAIModel con argumentos del cliente: %s", client_args.keys())
         params = dict(cfg.params)
+        model_config: dict[str, Any] = {}
+        cache_config = cache_config_for(cfg, self._config.options.prompt_cache)
+        if cache_config:
+            model_config["cache_config"] = cache_config
         return OpenAIModel(
-            client_args=client_args or None, model_id=cfg.model_id, params=params or None
+            client_args=client_args or None,
+            model_id=cfg.model_id,
+            params=params or None,
+            **model_config,
         )
 
     def _build_local_model(self, cfg: LocalProviderConfig) -> OllamaModel:
@@ -208,8 +393,34 @@ class AgentFactory:
             api_key_env=cfg.api_key_env,
         )
 
-    def _build_conversation_manager(self, options: AgentOptions):
+    def _build_cassette_model(self, cfg: CassetteProviderConfig) -> CassetteModel:
+        inner = None
+        if cfg.mode == "record" and cfg.record_provider:
+            inner = self._build_model(self._config.providers[cfg.record_provider])
+        logger.debug("Instanciando CassetteModel en modo %s sobre %s", cfg.mode, cfg.path)
+        return CassetteModel(
+            inner,
+            model_id=cfg.model_id,
+            mode=cfg.mode,
+            path=str(cfg.path),
+            speed=cfg.speed,
+            loop=cfg.loop,
+        )
+
+    def _build_conversation_manager(
+        self, options: AgentOptions, provider_cfg: ProviderBaseConfig
+    ):
         conversation = options.conversation
+        if conversation.strategy == "compacting":
+            spill_dir = conversation.options.get("spill_directory", DEFAULT_SPILL_DIR)
+            return ToolResultCompactionManager(
+                estimator_for(getattr(provider_cfg, "model_id", None)),
+                token_budget=int(conversation.options.get("token_budget", 32000)),
+                preserve_recent_turns=int(conversation.options.get("preserve_recent_turns", 2)),
+                min_result_tokens=int(conversation.options.get("min_result_tokens", 200)),
+                window_size=int(conversation.options.get("window_size", 200)),
+                spill=SpillStore(Path(spill_dir).expanduser()) if spill_dir else None,
+            )
         if conversation.strategy == "sliding_window":
             window_size = int(conversation.options.get("window_size", 40))
             truncate = bool(conversation.options.get("truncate_tool_results", True))
@@ -226,6 +437,23 @@ class AgentFactory:
             )
         return NullConversationManager()
 
+    def _build_output_budget(self, provider_cfg: ProviderBaseConfig) -> ToolOutputBudget | None:
+        budget_cfg = self._config.tools.output_budget
+        if not budget_cfg.enabled:
+            return None
+        estimator = estimator_for(getattr(provider_cfg, "model_id", None))
+        logger.debug(
+            "Presupuesto de salida de tools: %d tokens/turno, %d tokens/llamada (familia %s)",
+            budget_cfg.turn_tokens,
+            budget_cfg.per_call_tokens,
+            estimator.family,
+        )
+        return ToolOutputBudget(
+            estimator,
+            turn_tokens=budget_cfg.turn_tokens,
+            per_call_tokens=budget_cfg.per_call_tokens,
+        )
+
     # ------------------------------------------------------------------
     # Accesores convenientes
     # ------------------------------------------------------------------
@@ -254,4 +482,5 @@ class AgentFactory:
 __all__ = [
     "AgentBuildResult",
     "AgentFactory",
+    "ModelClientCache",
 ]
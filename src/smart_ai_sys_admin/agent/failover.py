@@ -0,0 +1,232 @@
+"""Modelo compuesto con conmutación por error y peticiones cubiertas entre proveedores.
+
+:class:`FailoverModel` envuelve una lista ordenada de modelos de Strands. Cada
+llamada empieza por el primero; si falla (error, limitación de ritmo o falta
+del primer token dentro de ``first_token_timeout_ms``) se pasa al siguiente.
+Con ``hedge_after_ms`` además se lanza el siguiente proveedor en paralelo
+cuando el actual no ha producido nada en ese tiempo, y se queda el que responda
+antes. La conmutación solo es posible hasta el primer token: a partir de ahí
+los eventos ya se han entregado y un error se propaga tal cual.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from typing import Any
+
+from strands.models.model import Model
+from strands.types.content import Messages
+from strands.types.exceptions import ContextWindowOverflowException
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.failover")
+
+_END = object()
+
+
+class _StreamFailure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def _is_output(event: StreamEvent) -> bool:
+    """Un evento cuenta como primer token cuando ya aporta contenido o cierra el mensaje."""
+
+    return any(key in event for key in ("contentBlockStart", "contentBlockDelta", "messageStop"))
+
+
+class _Attempt:
+    """Consume en segundo plano el stream de un proveedor y señala su primer token."""
+
+    def __init__(self, name: str, stream: AsyncIterable[StreamEvent], started: float) -> None:
+        self.name = name
+        self.started = started
+        self.ready: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._stream = stream
+        self._queue: asyncio.Queue[Any] = asyncio.Queue()
+        self._task = asyncio.create_task(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            async for event in self._stream:
+                if not self.ready.done() and _is_output(event):
+                    self.ready.set_result(None)
+                self._queue.put_nowait(event)
+            if not self.ready.done():
+                self.ready.set_result(None)
+            self._queue.put_nowait(_END)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            if not self.ready.done():
+                self.ready.set_exception(exc)
+            else:
+                self._queue.put_nowait(_StreamFailure(exc))
+        finally:
+            aclose = getattr(self._stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def events(self) -> AsyncIterator[StreamEvent]:
+        while (item := await self._queue.get()) is not _END:
+            if isinstance(item, _StreamFailure):
+                raise item.error
+            yield item
+
+    def cancel(self) -> None:
+        self._task.cancel()
+        if not self.ready.done():
+            self.ready.cancel()
+
+
+class FailoverModel(Model):
+    """Encadena varios proveedores; el primero de ``models`` es el principal."""
+
+    def __init__(
+        self,
+        models: Sequence[tuple[str, Model]],
+        *,
+        hedge_after_ms: int | None = None,
+        first_token_timeout_ms: int | None = None,
+    ) -> None:
+        if not models:
+            raise ValueError("FailoverModel necesita al menos un modelo")
+        self.models = list(models)
+        self.hedge_after = hedge_after_ms / 1000 if hedge_after_ms else None
+        self.first_token_timeout = first_token_timeout_ms / 1000 if first_token_timeout_ms else None
+        self.last_provider: str | None = None
+
+    @property
+    def primary(self) -> Model:
+        return self.models[0][1]
+
+    def __getattr__(self, name: str) -> Any:
+        # ``config``, ``client``... del proveedor principal.
+        if name == "models":
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+
+    @property
+    def stateful(self) -> bool:
+        return self.primary.stateful
+
+    def update_config(self, **model_config: Any) -> None:
+        self.primary.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.primary.get_config()
+
+    async def structured_output(  # type: ignore[override]
+        self, output_model: Any, prompt: Messages, system_prompt: str | None = None, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        # Sin stream de tokens no hay nada que cubrir: solo se conmuta ante errores.
+        for position, (name, model) in enumerate(self.models):
+            try:
+                events = [
+                    event
+                    async for event in model.structured_output(
+                        output_model, prompt, system_prompt=system_prompt, **kwargs
+                    )
+                ]
+            except ContextWindowOverflowException:
+                raise
+            except Exception as exc:
+                if position == len(self.models) - 1:
+                    raise
+                logger.warning("Proveedor '%s' falló (%s); se prueba el siguiente", name, exc)
+                continue
+            self.last_provider = name
+            for event in events:
+                yield event
+            return
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None = None,
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[StreamEvent]:
+        winner = await self._race(messages, tool_specs, system_prompt, kwargs)
+        try:
+            async for event in winner.events():
+                yield event
+        finally:
+            winner.cancel()
+
+    async def _race(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None,
+        system_prompt: str | None,
+        kwargs: dict[str, Any],
+    ) -> _Attempt:
+        loop = asyncio.get_running_loop()
+        pending = list(self.models)
+        live: list[_Attempt] = []
+        last_error: BaseException | None = None
+
+        def launch() -> None:
+            name, model = pending.pop(0)
+            if live:
+                logger.info("Sin respuesta de '%s'; se lanza en paralelo '%s'", live[-1].name, name)
+            stream = model.stream(messages, tool_specs, system_prompt, **kwargs)
+            live.append(_Attempt(name, stream, loop.time()))
+
+        launch()
+        try:
+            while live:
+                deadlines = []
+                if self.first_token_timeout:
+                    deadlines.extend(attempt.started + self.first_token_timeout for attempt in live)
+                if self.hedge_after and pending:
+                    deadlines.append(live[-1].started + self.hedge_after)
+                timeout = max(min(deadlines) - loop.time(), 0) if deadlines else None
+                done, _ = await asyncio.wait(
+                    [attempt.ready for attempt in live],
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for attempt in [attempt for attempt in live if attempt.ready in done]:
+                    error = attempt.ready.exception()
+                    if error is None:
+                        live.remove(attempt)
+                        self.last_provider = attempt.name
+                        if attempt.name != self.models[0][0]:
+                            logger.warning("Respuesta servida por el proveedor '%s'", attempt.name)
+                        return attempt
+                    if isinstance(error, ContextWindowOverflowException):
+                        # Otro proveedor recibiría el mismo historial: lo resuelve el gestor.
+                        raise error
+                    logger.warning("Proveedor '%s' falló: %s", attempt.name, error)
+                    live.remove(attempt)
+                    last_error = error
+                now = loop.time()
+                if self.first_token_timeout:
+                    for attempt in [a for a in live if now - a.started >= self.first_token_timeout]:
+                        logger.warning(
+                            "Proveedor '%s' sin primer token tras %.1fs",
+                            attempt.name,
+                            self.first_token_timeout,
+                        )
+                        attempt.cancel()
+                        live.remove(attempt)
+                        last_error = TimeoutError(
+                            f"'{attempt.name}' no respondió en {self.first_token_timeout:.1f}s"
+                        )
+                if pending and (
+                    not live
+                    or (self.hedge_after and now - live[-1].started >= self.hedge_after)
+                ):
+                    launch()
+        finally:
+            for attempt in live:
+                attempt.cancel()
+        assert last_error is not None
+        raise last_error
+
+
+__all__ = ["FailoverModel"]
@@ -0,0 +1,258 @@
+"""Trabajos remotos en segundo plano sobre la sesión SSH activa.
+
+Cada trabajo se lanza desacoplado (`nohup`/`setsid`) con su salida redirigida a
+un fichero en el host remoto. El agente recibe un identificador y puede
+consultar el estado, leer solo la salida nueva desde el último desplazamiento o
+cancelar el proceso sin mantener el turno bloqueado.
+"""
+
+from __future__ import annotations
+
+import logging
+import shlex
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Literal
+
+from ..connection import ConnectionDetails, ConnectionError, SSHConnectionManager
+from ..localization import _
+
+JobStateLiteral = Literal["running", "finished", "cancelled", "lost"]
+
+# Directorio remoto donde se guardan `pid`, `exit` y `output.log` de cada trabajo.
+REMOTE_JOBS_DIR = "$HOME/.cache/shell-sentinel/jobs"
+DEFAULT_OUTPUT_CHUNK_BYTES = 16000
+_SIZE_MARKER = "__SHELL_SENTINEL_SIZE__="
+_STATE_MARKER = "__SHELL_SENTINEL_STATE__="
+
+
+@dataclass
+class RemoteJob:
+    """Trabajo lanzado en un host remoto."""
+
+    job_id: str
+    command: str
+    host: str
+    remote_dir: str
+    pid: int
+    started_at: float = field(default_factory=time.time)
+    offset: int = 0
+    cancelled: bool = False
+    # ``usuario@host:puerto`` de la conexión en la que se lanzó.
+    endpoint: str | None = None
+
+
+@dataclass(frozen=True)
+class RemoteJobStatus:
+    job: RemoteJob
+    state: JobStateLiteral
+    exit_code: int | None
+    output_size: int
+
+    @property
+    def elapsed_seconds(self) -> int:
+        return int(time.time() - self.job.started_at)
+
+
+@dataclass(frozen=True)
+class RemoteJobOutput:
+    status: RemoteJobStatus
+    start: int
+    end: int
+    text: str
+
+    @property
+    def pending(self) -> bool:
+        return self.end < self.status.output_size
+
+
+class UnknownJob(ConnectionError):
+    """El identificador no corresponde a ningún trabajo registrado."""
+
+
+class JobHostMismatch(ConnectionError):
+    """El trabajo se lanzó en un host distinto del de la conexión activa."""
+
+
+def _endpoint(details: ConnectionDetails | None) -> str | None:
+    if details is None:
+        return None
+    return f"{details.username}@{details.host}:{details.port}"
+
+
+class RemoteJobManager:
+    """Registra y consulta trabajos remotos lanzados por el agente."""
+
+    def __init__(self, connection_manager: SSHConnectionManager, logger: logging.Logger) -> None:
+        self._connection_manager = connection_manager
+        self._logger = logger
+        self._jobs: dict[str, RemoteJob] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def jobs(self) -> tuple[RemoteJob, ...]:
+        with self._lock:
+            return tuple(self._jobs.values())
+
+    @property
+    def current_jobs(self) -> tuple[RemoteJob, ...]:
+        """Trabajos lanzados en el host de la conexión activa."""
+
+        current = _endpoint(self._connection_manager.details)
+        return tuple(job for job in self.jobs if job.endpoint == current)
+
+    def start(self, command: str) -> RemoteJob:
+        details = self._connection_manager.details
+        job_id = uuid.uuid4().hex[:8]
+        remote_dir = f"{REMOTE_JOBS_DIR}/{job_id}"
+        # La subshell evita que un `exit` del comando impida registrar su código.
+        inner = f"(\n{command}\n)\necho $? > {remote_dir}/exit"
+        script = (
+            f'mkdir -p "{remote_dir}" && cd "{remote_dir}" && '
+            "if command -v setsid >/dev/null 2>&1; then launcher=setsid; else launcher=; fi; "
+            f"nohup $launcher sh -c {shlex.quote(inner)} > output.log 2>&1 < /dev/null & "
+            "echo $! > pid; echo $!"
+        )
+        code, stdout, stderr = self._connection_manager.run_command(script, timeout=30)
+        try:
+            pid = int(stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            pid = 0
+        if code != 0 or pid <= 0:
+            raise ConnectionError(stderr.strip() or stdout.strip() or f"exit {code}")
+        job = RemoteJob(
+            job_id=job_id,
+            command=command,
+            host=details.host if details else "?",
+            remote_dir=remote_dir,
+            pid=pid,
+            endpoint=_endpoint(details),
+        )
+        with self._lock:
+            self._jobs[job_id] = job
+        self._logger.info("Trabajo remoto %s iniciado (pid=%s): %s", job_id, pid, command)
+        return job
+
+    def status(self, job_id: str) -> RemoteJobStatus:
+        job = self._get(job_id)
+        script = self._probe_script(job) + f"; printf '\\n{_SIZE_MARKER}%s' \"$size\""
+        _, stdout, _ = self._connection_manager.run_command(script, timeout=30)
+        state, exit_code, size, _ = self._parse_probe(job, stdout)
+        return RemoteJobStatus(job=job, state=state, exit_code=exit_code, output_size=size)
+
+    def read_output(
+        self,
+        job_id: str,
+        *,
+        offset: int | None = None,
+        max_bytes: int = DEFAULT_OUTPUT_CHUNK_BYTES,
+    ) -> RemoteJobOutput:
+        job = self._get(job_id)
+        start = job.offset if offset is None else max(offset, 0)
+        script = (
+            self._probe_script(job)
+            + f'; chunk="{job.remote_dir}/chunk.$$"'
+            + f'; tail -c +{start + 1} "{job.remote_dir}/output.log" 2>/dev/null'
+            + f' | head -c {max(max_bytes, 1)} > "$chunk"; cat "$chunk"'
+            # Los bytes leídos se cuentan en el host: el texto llega ya decodificado
+            # y volver a codificarlo no da la longitud original si no era UTF-8.
+            + f"; printf '\\n{_SIZE_MARKER}%s:%s' \"$size\" \"$(wc -c < \"$chunk\")\""
+            + '; rm -f "$chunk"'
+        )
+        _, stdout, _ = self._connection_manager.run_command(script, timeout=60)
+        state, exit_code, size, text = self._parse_probe(job, stdout)
+        read = self._read_count(stdout)
+        if read is None:
+            read = len(text.encode("utf-8", errors="surrogateescape"))
+        # El fichero puede crecer entre `wc` y `tail`; avanzamos según lo leído.
+        end = start + read
+        size = max(size, end)
+        job.offset = end
+        status = RemoteJobStatus(job=job, state=state, exit_code=exit_code, output_size=size)
+        return RemoteJobOutput(status=status, start=start, end=end, text=text)
+
+    def cancel(self, job_id: str) -> RemoteJob:
+        job = self._get(job_id)
+        # Con `setsid` el PID lidera su propio grupo y matamos también a los hijos.
+        script = (
+            f"kill -TERM -- -{job.pid} 2>/dev/null || kill -TERM {job.pid} 2>/dev/null; "
+            f'[ -f "{job.remote_dir}/exit" ] || echo 143 > "{job.remote_dir}/exit"'
+        )
+        self._connection_manager.run_command(script, timeout=30)
+        job.cancelled = True
+        self._logger.info("Trabajo remoto %s cancelado (pid=%s)", job_id, job.pid)
+        return job
+
+    # ------------------------------------------------------------------
+    # Utilidades internas
+    # ------------------------------------------------------------------
+
+    def _get(self, job_id: str) -> RemoteJob:
+        with self._lock:
+            job = self._jobs.get(job_id.strip())
+        if job is None:
+            raise UnknownJob(job_id)
+        # Los trabajos sobreviven a recargas y reconexiones: nunca se consultan ni se
+        # matan PIDs en un host distinto del que los lanzó.
+        if job.endpoint != _endpoint(self._connection_manager.details):
+            raise JobHostMismatch(
+                _("agent.tools.jobs.other_host", job_id=job.job_id, host=job.host)
+            )
+        return job
+
+    @staticmethod
+    def _probe_script(job: RemoteJob) -> str:
+        directory = job.remote_dir
+        return (
+            f'size=$(wc -c < "{directory}/output.log" 2>/dev/null || echo 0); '
+            f'if kill -0 {job.pid} 2>/dev/null; then state=running; '
+            f'elif [ -f "{directory}/exit" ]; then state="exit:$(cat "{directory}/exit")"; '
+            "else state=lost; fi; "
+            f"printf '{_STATE_MARKER}%s\\n' \"$state\""
+        )
+
+    @staticmethod
+    def _parse_probe(
+        job: RemoteJob, stdout: str
+    ) -> tuple[JobStateLiteral, int | None, int, str]:
+        head, _, rest = stdout.partition("\n")
+        body, _, size_text = rest.rpartition(f"\n{_SIZE_MARKER}")
+        raw_state = head.removeprefix(_STATE_MARKER).strip()
+        try:
+            size = int(size_text.partition(":")[0].strip() or 0)
+        except ValueError:
+            size = 0
+        exit_code: int | None = None
+        state: JobStateLiteral
+        if raw_state == "running":
+            state = "running"
+        elif raw_state.startswith("exit:"):
+            try:
+                exit_code = int(raw_state.removeprefix("exit:"))
+            except ValueError:
+                exit_code = None
+            state = "cancelled" if job.cancelled else "finished"
+        else:
+            state = "cancelled" if job.cancelled else "lost"
+        return state, exit_code, size, body
+
+    @staticmethod
+    def _read_count(stdout: str) -> int | None:
+        _body, _sep, size_text = stdout.rpartition(f"\n{_SIZE_MARKER}")
+        try:
+            return int(size_text.partition(":")[2].strip())
+        except ValueError:
+            return None
+
+
+__all__ = [
+    "DEFAULT_OUTPUT_CHUNK_BYTES",
+    "JobHostMismatch",
+    "RemoteJob",
+    "RemoteJobManager",
+    "RemoteJobOutput",
+    "RemoteJobStatus",
+    "UnknownJob",
+]
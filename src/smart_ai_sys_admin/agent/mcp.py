@@ -0,0 +1,505 @@
+"""Activación de transportes MCP y herramientas perezosas basadas en catálogo.
+
+Los transportes se arrancan en paralelo, cada uno con su propio límite de
+tiempo, de modo que un servidor lento o caído no retrasa al resto. Cuando el
+catálogo de herramientas de un transporte ya se conoce (caché en disco), sus
+herramientas se registran al instante con las especificaciones guardadas y el
+listado se revalida en segundo plano en cuanto el servidor conecta; si ha
+cambiado, el gestor avisa para que el agente sustituya esas herramientas. En modo
+perezoso (`mcp.lazy_connect`) el servidor ni siquiera se lanza al iniciar: se
+conecta la primera vez que se invoca una de sus herramientas.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import Any
+
+from mcp import StdioServerParameters, stdio_client
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.types import Tool as MCPTool
+from strands.tools.mcp import MCPAgentTool, MCPClient
+from strands.types.tools import AgentTool, ToolGenerator, ToolSpec, ToolUse
+
+from .config import MCPConfig, MCPTransportConfig
+
+# Límite de arranque y descubrimiento cuando el transporte no define `timeout_seconds`.
+DEFAULT_STARTUP_TIMEOUT = 30
+CATALOG_FORMAT_VERSION = 1
+
+_SHARED_CATALOGS: dict[Path | None, MCPToolCatalog] = {}
+_SHARED_CATALOGS_LOCK = threading.Lock()
+
+
+def _dump_tools(tools: Iterable[MCPTool]) -> list[dict[str, Any]]:
+    return [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools]
+
+
+class MCPToolCatalog:
+    """Catálogo de las herramientas anunciadas por cada transporte.
+
+    Las entradas se indexan por una huella de la configuración del transporte
+    (tipo, comando, argumentos, URL y nombres de variables), de modo que cambiar
+    cualquiera de ellos invalida la caché. Si se indica ``path`` el catálogo se
+    persiste en disco como JSON y sobrevive entre ejecuciones.
+    """
+
+    def __init__(self, path: Path | None = None, logger: logging.Logger | None = None) -> None:
+        self.path = path
+        self._logger = logger or logging.getLogger("smart_ai_sys_admin.agent.mcp")
+        self._entries: dict[str, dict[str, Any]] | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, path: Path | None, logger: logging.Logger | None = None) -> MCPToolCatalog:
+        """Catálogo único por archivo, compartido por todos los agentes del proceso."""
+
+        with _SHARED_CATALOGS_LOCK:
+            catalog = _SHARED_CATALOGS.get(path)
+            if catalog is None:
+                catalog = _SHARED_CATALOGS[path] = cls(path, logger)
+            return catalog
+
+    @staticmethod
+    def key(transport: MCPTransportConfig) -> str:
+        material = {
+            "type": transport.transport_type,
+            "command": transport.command,
+            "args": list(transport.args),
+            "url": transport.url,
+            "cwd": transport.cwd,
+            "env": sorted(transport.env),
+            "env_passthrough": sorted(transport.env_passthrough),
+            "headers": sorted(transport.headers),
+        }
+        encoded = json.dumps(material, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, transport: MCPTransportConfig) -> tuple[MCPTool, ...] | None:
+        with self._lock:
+            entry = self._load().get(self.key(transport))
+        if entry is None:
+            return None
+        try:
+            return tuple(MCPTool.model_validate(item) for item in entry["tools"])
+        except (KeyError, TypeError, ValueError) as exc:
+            self._logger.warning(
+                "Entrada de caché MCP inválida para '%s': %s", transport.identifier, exc
+            )
+            return None
+
+    def put(self, transport: MCPTransportConfig, tools: list[MCPTool]) -> bool:
+        """Guarda el listado y devuelve ``True`` si difiere del almacenado."""
+
+        serialized = _dump_tools(tools)
+        fingerprint = hashlib.sha256(
+            json.dumps(serialized, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        key = self.key(transport)
+        with self._lock:
+            entries = self._load()
+            previous = entries.get(key)
+            if previous is not None and previous.get("fingerprint") == fingerprint:
+                return False
+            entries[key] = {
+                "transport": transport.identifier,
+                "fingerprint": fingerprint,
+                "updated_at": int(time.time()),
+                "tools": serialized,
+            }
+            self._save(entries)
+        return previous is not None
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._entries is not None:
+            return self._entries
+        self._entries = {}
+        if self.path is None or not self.path.is_file():
+            return self._entries
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            self._logger.warning("No se pudo leer la caché MCP '%s': %s", self.path, exc)
+            return self._entries
+        if isinstance(payload, dict) and payload.get("version") == CATALOG_FORMAT_VERSION:
+            entries = payload.get("entries")
+            if isinstance(entries, dict):
+                self._entries = {
+                    key: value for key, value in entries.items() if isinstance(value, dict)
+                }
+        return self._entries
+
+    def _save(self, entries: dict[str, dict[str, Any]]) -> None:
+        if self.path is None:
+            return
+        payload = {"version": CATALOG_FORMAT_VERSION, "entries": entries}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_name(f"{self.path.name}.tmp")
+            temporary.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(temporary, self.path)
+        except OSError as exc:
+            self._logger.warning("No se pudo escribir la caché MCP '%s': %s", self.path, exc)
+
+
+class LazyMCPTool(AgentTool):
+    """Proxy de una herramienta MCP que conecta el servidor en la primera llamada."""
+
+    def __init__(
+        self,
+        mcp_tool: MCPTool,
+        transport_id: str,
+        connect: Callable[[str], MCPClient],
+    ) -> None:
+        super().__init__()
+        self._mcp_tool = mcp_tool
+        self._transport_id = transport_id
+        self._connect = connect
+        # La especificación se calcula igual que en Strands sin necesitar cliente.
+        self._spec = MCPAgentTool(mcp_tool, None).tool_spec  # type: ignore[arg-type]
+
+    @property
+    def tool_name(self) -> str:
+        return self._mcp_tool.name
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        return self._spec
+
+    @property
+    def tool_type(self) -> str:
+        return "python"
+
+    async def stream(
+        self, tool_use: ToolUse, invocation_state: dict[str, Any], **kwargs: Any
+    ) -> ToolGenerator:
+        client = await asyncio.to_thread(self._connect, self._transport_id)
+        delegate = MCPAgentTool(self._mcp_tool, client)
+        async for event in delegate.stream(tool_use, invocation_state, **kwargs):
+            yield event
+
+
+class MCPManager:
+    """Gestiona la conexión con servidores MCP según la configuración."""
+
+    def __init__(
+        self,
+        config: MCPConfig,
+        logger: logging.Logger,
+        catalog: MCPToolCatalog | None = None,
+        on_catalog_change: Callable[[list[str], list[MCPAgentTool]], None] | None = None,
+    ) -> None:
+        self._config = config
+        self._logger = logger
+        self._catalog = catalog or MCPToolCatalog()
+        # Recibe los nombres retirados y las herramientas vivas de un transporte
+        # cuyo listado real no coincide con el registrado desde la caché.
+        self.on_catalog_change = on_catalog_change
+        # Especificaciones registradas desde la caché, por transporte.
+        self._registered: dict[str, tuple[MCPTool, ...]] = {}
+        self._transports = {item.identifier: item for item in config.transports}
+        self._clients: dict[str, MCPClient] = {}
+        self._connect_locks = {identifier: threading.Lock() for identifier in self._transports}
+        self._lock = threading.Lock()
+        self._closed = False
+        # Configuración y clientes sustituidos por ``reconfigure`` a la espera de
+        # ``commit`` o ``rollback``.
+        self._retired: tuple[MCPConfig, list[tuple[str, MCPClient]]] | None = None
+
+    @property
+    def catalog(self) -> MCPToolCatalog:
+        return self._catalog
+
+    def activate(self) -> list[Any]:
+        if not self._config.enabled or not self._config.transports:
+            return []
+        self._closed = False
+        tools: list[Any] = []
+        pending: list[MCPTransportConfig] = []
+        for transport in self._config.transports:
+            cached = self._catalog.get(transport)
+            if cached is None:
+                pending.append(transport)
+                continue
+            self._logger.info(
+                "Transporte MCP '%s' registrado desde la caché (%d herramientas)",
+                transport.identifier,
+                len(cached),
+            )
+            tools.extend(self._lazy_tools(transport, cached))
+            if not self._config.lazy_connect:
+                self._connect_in_background(transport.identifier)
+        if pending:
+            tools.extend(self._discover(pending))
+        return tools
+
+    def reconfigure(self, config: MCPConfig) -> list[Any]:
+        """Aplica una nueva configuración y devuelve las herramientas resultantes.
+
+        Solo se sustituyen los transportes eliminados o modificados; los que no
+        cambian conservan su cliente y sus herramientas se registran desde el
+        catálogo. Los clientes sustituidos siguen vivos hasta :meth:`commit`;
+        :meth:`rollback` vuelve a la configuración anterior si el agente que iba
+        a usar las herramientas nuevas no llega a construirse.
+        """
+
+        self.commit()
+
+        targets = {item.identifier: item for item in config.transports} if config.enabled else {}
+        stale = [
+            identifier
+            for identifier, transport in self._transports.items()
+            if targets.get(identifier) != transport
+        ]
+        with self._lock:
+            stopped = [
+                (identifier, self._clients.pop(identifier))
+                for identifier in stale
+                if identifier in self._clients
+            ]
+        self._retired = (self._config, stopped)
+        self._use(config)
+        return self.activate()
+
+    def commit(self) -> None:
+        """Detiene los clientes sustituidos por el último :meth:`reconfigure`."""
+
+        retired, self._retired = self._retired, None
+        for identifier, client in retired[1] if retired else ():
+            self._logger.info(
+                "Deteniendo el servidor MCP '%s' por cambio de configuración", identifier
+            )
+            self._stop_client(identifier, client)
+
+    def rollback(self) -> None:
+        """Deshace el último :meth:`reconfigure` y recupera sus clientes."""
+
+        retired, self._retired = self._retired, None
+        if retired is None:
+            return
+        previous, clients = retired
+        restored = {item.identifier: item for item in previous.transports}
+        with self._lock:
+            started = [
+                (identifier, self._clients.pop(identifier))
+                for identifier in list(self._clients)
+                if restored.get(identifier) != self._transports.get(identifier)
+            ]
+            self._clients.update(clients)
+        for identifier, client in started:
+            self._stop_client(identifier, client)
+        self._use(previous)
+        self._logger.info("Configuración MCP anterior restaurada")
+
+    def close(self) -> None:
+        self.commit()
+        with self._lock:
+            self._closed = True
+            clients = list(self._clients.items())
+            self._clients.clear()
+        for identifier, client in clients:
+            self._stop_client(identifier, client)
+
+    # ------------------------------------------------------------------
+    # Utilidades internas
+    # ------------------------------------------------------------------
+
+    def _use(self, config: MCPConfig) -> None:
+        self._config = config
+        self._transports = {item.identifier: item for item in config.transports}
+        self._connect_locks = {
+            identifier: self._connect_locks.get(identifier) or threading.Lock()
+            for identifier in self._transports
+        }
+
+    def _discover(self, transports: list[MCPTransportConfig]) -> list[Any]:
+        """Arranca los transportes en paralelo y reúne sus herramientas."""
+
+        tools: list[Any] = []
+        executor = ThreadPoolExecutor(
+            max_workers=len(transports), thread_name_prefix="mcp-activate"
+        )
+        started = time.monotonic()
+        futures: list[tuple[MCPTransportConfig, Future[list[MCPAgentTool]]]] = [
+            (transport, executor.submit(self._start_and_list, transport))
+            for transport in transports
+        ]
+        executor.shutdown(wait=False)
+        for transport, future in futures:
+            remaining = started + self._timeout(transport) - time.monotonic()
+            try:
+                tools.extend(future.result(timeout=max(remaining, 0)))
+            except FutureTimeoutError:
+                self._logger.warning(
+                    "El servidor MCP '%s' no respondió en %ss; se continúa sin sus herramientas",
+                    transport.identifier,
+                    self._timeout(transport),
+                )
+                # Si termina de arrancar más tarde, lo detenemos para no dejarlo huérfano.
+                future.add_done_callback(
+                    lambda _done, identifier=transport.identifier: self._discard(identifier)
+                )
+            except Exception as exc:  # pragma: no cover - depende del servidor MCP
+                self._logger.warning(
+                    "No se pudo activar el servidor MCP '%s': %s", transport.identifier, exc
+                )
+        return tools
+
+    def _start_and_list(self, transport: MCPTransportConfig) -> list[MCPAgentTool]:
+        client = self._create_client(transport)
+        client.start()
+        with self._lock:
+            self._clients[transport.identifier] = client
+        tools = self._list_all(client)
+        self._catalog.put(transport, [tool.mcp_tool for tool in tools])
+        self._logger.info(
+            "Servidor MCP '%s' activo con %d herramientas", transport.identifier, len(tools)
+        )
+        return tools
+
+    @staticmethod
+    def _list_all(client: MCPClient) -> list[MCPAgentTool]:
+        tools: list[MCPAgentTool] = []
+        token: str | None = None
+        while True:
+            page = client.list_tools_sync(pagination_token=token)
+            tools.extend(page)
+            token = page.pagination_token
+            if not token:
+                return tools
+
+    def _lazy_tools(
+        self, transport: MCPTransportConfig, specs: tuple[MCPTool, ...]
+    ) -> list[LazyMCPTool]:
+        self._registered[transport.identifier] = specs
+        return [LazyMCPTool(spec, transport.identifier, self._ensure_client) for spec in specs]
+
+    def _ensure_client(self, identifier: str) -> MCPClient:
+        """Devuelve el cliente del transporte, arrancándolo si aún no lo está."""
+
+        with self._connect_locks[identifier]:
+            with self._lock:
+                client = self._clients.get(identifier)
+            if client is not None:
+                return client
+            transport = self._transports[identifier]
+            self._logger.info("Conectando bajo demanda el servidor MCP '%s'", identifier)
+            client = self._create_client(transport)
+            client.start()
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._clients[identifier] = client
+            if closed:
+                self._stop_client(identifier, client)
+                raise RuntimeError(f"El gestor MCP está cerrado ('{identifier}').")
+            threading.Thread(
+                target=self._revalidate,
+                args=(transport, client),
+                name=f"mcp-revalidate-{identifier}",
+                daemon=True,
+            ).start()
+            return client
+
+    def _connect_in_background(self, identifier: str) -> None:
+        def connect() -> None:
+            try:
+                self._ensure_client(identifier)
+            except Exception as exc:  # pragma: no cover - depende del servidor MCP
+                self._logger.warning(
+                    "No se pudo conectar el servidor MCP '%s': %s", identifier, exc
+                )
+
+        threading.Thread(target=connect, name=f"mcp-connect-{identifier}", daemon=True).start()
+
+    def _revalidate(self, transport: MCPTransportConfig, client: MCPClient) -> None:
+        """Compara el listado real del servidor con el registrado desde la caché."""
+
+        try:
+            tools = self._list_all(client)
+        except Exception as exc:  # pragma: no cover - depende del servidor MCP
+            self._logger.debug(
+                "No se pudo revalidar el catálogo MCP '%s': %s", transport.identifier, exc
+            )
+            return
+        live = [tool.mcp_tool for tool in tools]
+        self._catalog.put(transport, live)
+        # Se compara con lo registrado por este gestor: el catálogo es compartido y
+        # otra pestaña puede haberlo actualizado ya.
+        registered = self._registered.get(transport.identifier)
+        if registered is None or _dump_tools(registered) == _dump_tools(live):
+            return
+        self._registered[transport.identifier] = tuple(live)
+        removed = sorted({spec.name for spec in registered} - {tool.name for tool in live})
+        self._logger.info(
+            "El catálogo del servidor MCP '%s' cambió (%d herramientas, %d retiradas)",
+            transport.identifier,
+            len(tools),
+            len(removed),
+        )
+        if self.on_catalog_change is not None:
+            self.on_catalog_change(removed, tools)
+
+    def _discard(self, identifier: str) -> None:
+        with self._lock:
+            client = self._clients.pop(identifier, None)
+        if client is not None:
+            self._stop_client(identifier, client)
+
+    def _stop_client(self, identifier: str, client: MCPClient) -> None:
+        try:
+            client.stop(None, None, None)
+        except Exception as exc:  # pragma: no cover - depende del servidor MCP
+            self._logger.debug("Error deteniendo el cliente MCP '%s': %s", identifier, exc)
+
+    @staticmethod
+    def _timeout(transport: MCPTransportConfig) -> int:
+        return transport.timeout_seconds or DEFAULT_STARTUP_TIMEOUT
+
+    def _create_client(self, cfg: MCPTransportConfig) -> MCPClient:
+        timeout = self._timeout(cfg)
+        if cfg.transport_type == "stdio":
+            if not cfg.command:
+                raise ValueError("El transporte MCP 'stdio' requiere el campo 'command'.")
+            env = {name: os.environ[name] for name in cfg.env_passthrough if name in os.environ}
+            env.update(cfg.env)
+            params = StdioServerParameters(
+                command=cfg.command,
+                args=list(cfg.args),
+                env=env,
+                cwd=cfg.cwd,
+            )
+            return MCPClient(lambda: stdio_client(params), startup_timeout=timeout)
+        if cfg.transport_type == "sse":
+            if not cfg.url:
+                raise ValueError("El transporte MCP 'sse' requiere el campo 'url'.")
+            return MCPClient(
+                lambda: sse_client(cfg.url, headers=dict(cfg.headers)),
+                startup_timeout=timeout,
+            )
+        if cfg.transport_type == "streamable_http":
+            if not cfg.url:
+                raise ValueError("El transporte MCP 'streamable_http' requiere el campo 'url'.")
+            return MCPClient(
+                lambda: streamablehttp_client(
+                    cfg.url,
+                    headers=dict(cfg.headers),
+                    timeout=cfg.timeout_seconds,
+                ),
+                startup_timeout=timeout,
+            )
+        raise ValueError(f"Tipo de transporte MCP no soportado: {cfg.transport_type}")
+
+
+__all__ = ["LazyMCPTool", "MCPManager", "MCPToolCatalog"]
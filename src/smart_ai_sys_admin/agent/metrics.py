@@ -0,0 +1,279 @@
+"""Contabilidad de tokens, tiempos y coste por turno del agente.
+
+:class:`TurnMetricsRecorder` toma una instantánea de las métricas acumuladas
+de Strands al empezar cada invocación y calcula la diferencia al terminar:
+tokens de entrada (separando los servidos desde la caché), tokens de salida,
+tiempo de modelo frente a tiempo de herramientas, número de llamadas y coste
+estimado según la tabla ``metrics.prices``. Cada turno se suma al total de la
+sesión y, si hay fichero configurado, se anexa como una línea JSON.
+
+El coste se calcula por llamada con el precio del modelo que la sirvió: con
+enrutado rápido/potente o conmutación por error no siempre es el principal.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from strands.hooks import (
+    AfterInvocationEvent,
+    AfterModelCallEvent,
+    BeforeInvocationEvent,
+    BeforeModelCallEvent,
+    HookProvider,
+    HookRegistry,
+)
+
+from .config import ModelPrice
+from .failover import FailoverModel
+from .model_router import RoutedModel
+from .prompt_cache import CacheUsage
+from .tool_router import ToolLayoutModel
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.metrics")
+
+_PER_MILLION = 1_000_000
+
+
+def estimate_cost(price: ModelPrice, usage: CacheUsage, output_tokens: int) -> float:
+    """Coste en USD; la caché usa el precio de entrada si no tiene uno propio."""
+
+    cache_read = price.input if price.cache_read is None else price.cache_read
+    cache_write = price.input if price.cache_write is None else price.cache_write
+    return (
+        usage.uncached * price.input
+        + usage.read * cache_read
+        + usage.written * cache_write
+        + output_tokens * price.output
+    ) / _PER_MILLION
+
+
+def served_model_id(model: Any) -> str | None:
+    """``model_id`` del proveedor que atendió la última llamada de ``model``."""
+
+    while True:
+        if isinstance(model, ToolLayoutModel):
+            model = model.model
+        elif isinstance(model, RoutedModel):
+            route = model.last_route or "strong"
+            model = model.routes[route][1]
+        elif isinstance(model, FailoverModel):
+            model = dict(model.models).get(model.last_provider or "", model.primary)
+        else:
+            break
+    try:
+        config = model.get_config()
+    except Exception:  # pragma: no cover - depende del proveedor
+        return None
+    model_id = config.get("model_id") if isinstance(config, Mapping) else None
+    return str(model_id) if model_id else None
+
+
+@dataclass(frozen=True)
+class TurnMetrics:
+    """Métricas de uno o varios turnos (``turns`` indica cuántos se suman)."""
+
+    turns: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    model_calls: int = 0
+    model_seconds: float = 0.0
+    provider_latency_ms: int = 0
+    tool_calls: int = 0
+    tool_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    cost: float | None = None
+
+    @property
+    def total_input_tokens(self) -> int:
+        return self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+
+    def __add__(self, other: TurnMetrics) -> TurnMetrics:
+        if self.cost is None and other.cost is None:
+            cost = None
+        else:
+            cost = (self.cost or 0.0) + (other.cost or 0.0)
+        return TurnMetrics(
+            turns=self.turns + other.turns,
+            input_tokens=self.input_tokens + other.input_tokens,
+            output_tokens=self.output_tokens + other.output_tokens,
+            cache_read_tokens=self.cache_read_tokens + other.cache_read_tokens,
+            cache_write_tokens=self.cache_write_tokens + other.cache_write_tokens,
+            model_calls=self.model_calls + other.model_calls,
+            model_seconds=self.model_seconds + other.model_seconds,
+            provider_latency_ms=self.provider_latency_ms + other.provider_latency_ms,
+            tool_calls=self.tool_calls + other.tool_calls,
+            tool_seconds=self.tool_seconds + other.tool_seconds,
+            wall_seconds=self.wall_seconds + other.wall_seconds,
+            cost=cost,
+        )
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    usage: CacheUsage
+    output_tokens: int
+    latency_ms: int
+    tool_calls: int
+    tool_seconds: float
+
+    @classmethod
+    def of(cls, agent: Any) -> _Snapshot:
+        metrics = getattr(agent, "event_loop_metrics", None)
+        usage = getattr(metrics, "accumulated_usage", None) or {}
+        tool_metrics = getattr(metrics, "tool_metrics", None) or {}
+        latency = getattr(metrics, "accumulated_metrics", None) or {}
+        return cls(
+            usage=CacheUsage.from_usage(usage),
+            output_tokens=int(usage.get("outputTokens", 0)),
+            latency_ms=int(latency.get("latencyMs", 0)),
+            tool_calls=sum(item.call_count for item in tool_metrics.values()),
+            tool_seconds=sum(item.total_time for item in tool_metrics.values()),
+        )
+
+
+class TurnMetricsRecorder(HookProvider):
+    """Acumula las métricas del último turno y de la sesión."""
+
+    def __init__(
+        self,
+        *,
+        model_id: str,
+        provider: str,
+        prices: Mapping[str, ModelPrice] | None = None,
+        log_file: Path | None = None,
+    ) -> None:
+        self.model_id = model_id
+        self.provider = provider
+        self.prices = dict(prices or {})
+        self.log_file = log_file
+        self.last = TurnMetrics()
+        self.session = TurnMetrics()
+        # Etiquetas adicionales del registro (p. ej. la sesión de conversación).
+        self.context: Callable[[], Mapping[str, Any]] | None = None
+        self._lock = threading.Lock()
+        self._baseline: _Snapshot | None = None
+        self._started = 0.0
+        self._model_started: float | None = None
+        self._model_calls = 0
+        self._model_seconds = 0.0
+        # Uso de cada llamada del turno con el modelo que la sirvió.
+        self._served: list[tuple[str, CacheUsage, int]] = []
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._on_before_invocation)
+        registry.add_callback(BeforeModelCallEvent, self._on_before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._on_after_model_call)
+        registry.add_callback(AfterInvocationEvent, self._on_after_invocation)
+
+    def _on_before_invocation(self, event: BeforeInvocationEvent) -> None:
+        self._baseline = _Snapshot.of(event.agent)
+        self._started = time.perf_counter()
+        self._model_calls = 0
+        self._model_seconds = 0.0
+        self._served = []
+
+    def _on_before_model_call(self, event: BeforeModelCallEvent) -> None:
+        self._model_started = time.perf_counter()
+
+    def _on_after_model_call(self, event: AfterModelCallEvent) -> None:
+        if self._model_started is None:
+            return
+        self._model_seconds += time.perf_counter() - self._model_started
+        self._model_calls += 1
+        self._model_started = None
+        stop = getattr(event, "stop_response", None)
+        usage = (stop.message.get("metadata") or {}).get("usage") if stop else None
+        if usage:
+            model_id = served_model_id(getattr(event.agent, "model", None)) or self.model_id
+            self._served.append(
+                (model_id, CacheUsage.from_usage(usage), int(usage.get("outputTokens", 0)))
+            )
+
+    def _on_after_invocation(self, event: AfterInvocationEvent) -> None:
+        if self._baseline is None:
+            return
+        before, after = self._baseline, _Snapshot.of(event.agent)
+        self._baseline = None
+        usage = CacheUsage(
+            read=max(after.usage.read - before.usage.read, 0),
+            written=max(after.usage.written - before.usage.written, 0),
+            uncached=max(after.usage.uncached - before.usage.uncached, 0),
+        )
+        output_tokens = max(after.output_tokens - before.output_tokens, 0)
+        turn = TurnMetrics(
+            turns=1,
+            input_tokens=usage.uncached,
+            output_tokens=output_tokens,
+            cache_read_tokens=usage.read,
+            cache_write_tokens=usage.written,
+            model_calls=self._model_calls,
+            model_seconds=self._model_seconds,
+            provider_latency_ms=max(after.latency_ms - before.latency_ms, 0),
+            tool_calls=max(after.tool_calls - before.tool_calls, 0),
+            tool_seconds=max(after.tool_seconds - before.tool_seconds, 0.0),
+            wall_seconds=time.perf_counter() - self._started,
+            cost=self._turn_cost(usage, output_tokens),
+        )
+        with self._lock:
+            self.last = turn
+            self.session = self.session + turn
+        logger.info(
+            "Turno: %d tokens de entrada (%d en caché), %d de salida; modelo %.2fs en %d "
+            "llamadas, herramientas %.2fs en %d llamadas",
+            turn.total_input_tokens,
+            turn.cache_read_tokens,
+            turn.output_tokens,
+            turn.model_seconds,
+            turn.model_calls,
+            turn.tool_seconds,
+            turn.tool_calls,
+        )
+        self._write_log(turn)
+
+    def _turn_cost(self, usage: CacheUsage, output_tokens: int) -> float | None:
+        """Suma el coste de cada llamada; ``None`` si algún modelo no tiene precio."""
+
+        calls = self._served or [(self.model_id, usage, output_tokens)]
+        cost = 0.0
+        for model_id, call_usage, call_output in calls:
+            price = self.prices.get(model_id)
+            if price is None:
+                return None
+            cost += estimate_cost(price, call_usage, call_output)
+        return cost
+
+    def _write_log(self, turn: TurnMetrics) -> None:
+        if self.log_file is None:
+            return
+        record: dict[str, Any] = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "provider": self.provider,
+            "model": self.model_id,
+        }
+        served = sorted({model_id for model_id, _usage, _output in self._served})
+        if served and served != [self.model_id]:
+            record["served_models"] = served
+        if self.context is not None:
+            record.update(self.context())
+        record.update(asdict(turn))
+        record.pop("turns", None)
+        try:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.log_file.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as exc:
+            logger.warning("No se pudo escribir el registro de métricas: %s", exc)
+
+
+__all__ = ["TurnMetrics", "TurnMetricsRecorder", "estimate_cost", "served_model_id"]
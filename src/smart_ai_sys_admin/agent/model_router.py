@@ -0,0 +1,158 @@
+"""Enrutado de cada llamada al modelo entre un proveedor rápido y uno potente.
+
+La mayoría de los turnos son consultas sencillas («muestra el uso de disco»,
+«resume esta salida») que no necesitan el modelo grande. :class:`TurnClassifier`
+decide con una heurística local y sin coste, a partir del último prompt y del
+estado del bucle de herramientas, si la llamada es ``fast`` o ``strong``, y
+:class:`RoutedModel` la envía al modelo correspondiente. El historial vive en
+el agente de Strands, así que ambos modelos ven la misma conversación.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from collections.abc import AsyncIterable, Iterable
+from typing import Any, Literal
+
+from strands.models.model import Model
+from strands.types.content import Message, Messages
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+from .tool_router import tokenize
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.model_router")
+
+RouteLiteral = Literal["fast", "strong"]
+
+# Raíces (ya normalizadas por ``tokenize``) que delatan un turno de razonamiento:
+# planificar, diagnosticar, diseñar, comparar, migrar, endurecer, automatizar...
+DEFAULT_STRONG_KEYWORDS: tuple[str, ...] = (
+    "plan", "migra", "design", "disen", "entw", "architect", "arquitect", "refactor",
+    "diagnos", "investig", "causa", "cause", "ursach", "why", "warum", "compar", "vergleich",
+    "optimi", "secur", "segurid", "sicherheit", "harden", "audit", "automat", "strateg",
+    "estrateg", "troubleshoot", "debug", "depura",
+)
+
+
+def _message_text(message: Message) -> str:
+    return " ".join(
+        block["text"] for block in message.get("content", []) if isinstance(block.get("text"), str)
+    )
+
+
+class TurnClassifier:
+    """Clasifica cada llamada al modelo como ``fast`` o ``strong``.
+
+    Un prompt es ``strong`` si contiene alguna de ``strong_keywords``, supera
+    ``fast_max_chars`` o incluye bloques de código o varias líneas. En el bucle
+    de herramientas se mantiene la clase del prompt, salvo que una herramienta
+    haya fallado o se superen ``escalate_after_steps`` pasos, en cuyo caso se
+    escala al modelo potente.
+    """
+
+    def __init__(
+        self,
+        *,
+        fast_max_chars: int = 400,
+        escalate_after_steps: int = 4,
+        strong_keywords: Iterable[str] = DEFAULT_STRONG_KEYWORDS,
+    ) -> None:
+        self.fast_max_chars = fast_max_chars
+        self.escalate_after_steps = escalate_after_steps
+        # Se normalizan igual que el prompt (minúsculas, sin acentos ni plurales).
+        self.strong_keywords = tuple(
+            term for keyword in strong_keywords for term in tokenize(keyword)
+        )
+
+    def classify(self, messages: Messages) -> RouteLiteral:
+        prompt_index = None
+        for position in range(len(messages) - 1, -1, -1):
+            message = messages[position]
+            if message.get("role") == "user" and _message_text(message).strip():
+                prompt_index = position
+                break
+        if prompt_index is None:
+            return "strong"
+        if self.classify_prompt(_message_text(messages[prompt_index])) == "strong":
+            return "strong"
+        loop = messages[prompt_index + 1 :]
+        steps = sum(1 for message in loop if message.get("role") == "assistant")
+        if steps >= self.escalate_after_steps:
+            return "strong"
+        for message in loop:
+            for block in message.get("content", []):
+                result = block.get("toolResult")
+                if result and result.get("status") == "error":
+                    return "strong"
+        return "fast"
+
+    def classify_prompt(self, text: str) -> RouteLiteral:
+        stripped = text.strip()
+        if len(stripped) > self.fast_max_chars or "```" in stripped or stripped.count("\n") >= 3:
+            return "strong"
+        for term in tokenize(stripped):
+            if term.startswith(self.strong_keywords):
+                return "strong"
+        return "fast"
+
+
+class RoutedModel(Model):
+    """Despacha cada llamada al modelo rápido o al potente según el clasificador."""
+
+    def __init__(
+        self,
+        fast: tuple[str, Model],
+        strong: tuple[str, Model],
+        classifier: TurnClassifier,
+    ) -> None:
+        self.routes: dict[RouteLiteral, tuple[str, Model]] = {"fast": fast, "strong": strong}
+        self.classifier = classifier
+        self.last_route: RouteLiteral | None = None
+        self.calls: Counter[str] = Counter()
+
+    @property
+    def strong(self) -> Model:
+        return self.routes["strong"][1]
+
+    def __getattr__(self, name: str) -> Any:
+        # La configuración visible es la del modelo potente (el proveedor principal).
+        if name == "routes":
+            raise AttributeError(name)
+        return getattr(self.strong, name)
+
+    @property
+    def stateful(self) -> bool:
+        return self.strong.stateful
+
+    def update_config(self, **model_config: Any) -> None:
+        self.strong.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.strong.get_config()
+
+    def structured_output(
+        self, output_model: Any, prompt: Messages, system_prompt: str | None = None, **kwargs: Any
+    ) -> Any:
+        return self.strong.structured_output(
+            output_model, prompt, system_prompt=system_prompt, **kwargs
+        )
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None = None,
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[StreamEvent]:
+        route = self.classifier.classify(messages)
+        name, model = self.routes[route]
+        self.last_route = route
+        self.calls[route] += 1
+        logger.debug("Llamada enrutada al modelo %s (%s)", route, name)
+        async for event in model.stream(messages, tool_specs, system_prompt, **kwargs):
+            yield event
+
+
+__all__ = ["DEFAULT_STRONG_KEYWORDS", "RoutedModel", "TurnClassifier"]
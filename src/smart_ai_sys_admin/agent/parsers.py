@@ -0,0 +1,484 @@
+"""Analizadores estructurados para salidas habituales de comandos de administración.
+
+`remote_ssh_command` consulta este registro antes de ejecutar un comando. Si lo
+reconoce, puede reescribirlo a su modo JSON (`ip -j`, `lsblk -J`) y, al terminar,
+sustituir la tabla de texto alineada por una tabla compacta separada por
+tabuladores con solo las columnas relevantes.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import shlex
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.parsers")
+
+ParseHandler = Callable[[Sequence[str], str], str | None]
+RewriteHandler = Callable[[Sequence[str]], list[str] | None]
+AcceptHandler = Callable[[Sequence[str]], bool]
+
+# Cualquier construcción de shell que altere la salida del programa descarta el
+# análisis: tuberías, redirecciones, listas de comandos o sustituciones.
+_SHELL_METACHARS = re.compile(r"[|;&<>`]|\$\(")
+
+# Mensajes con los que iproute2 y util-linux rechazan una opción que no conocen.
+_UNKNOWN_OPTION = re.compile(r"unknown|unrecognized option|invalid option", re.IGNORECASE)
+
+_PSEUDO_FILESYSTEMS = frozenset({"tmpfs", "devtmpfs", "squashfs", "overlay", "efivarfs", "none"})
+
+
+@dataclass(frozen=True)
+class CommandParser:
+    """Describe cómo reconocer, reescribir y resumir la salida de un programa."""
+
+    name: str
+    programs: tuple[str, ...]
+    parse: ParseHandler
+    rewrite: RewriteHandler | None = None
+    accepts: AcceptHandler | None = None
+
+
+@dataclass(frozen=True)
+class ParsePlan:
+    """Resultado de emparejar un comando con un analizador."""
+
+    parser: CommandParser
+    original: str
+    command: str
+    args: tuple[str, ...]
+
+    @property
+    def rewritten(self) -> bool:
+        return self.command != self.original
+
+    def rewrite_unsupported(self, stderr: str) -> bool:
+        """Indica si ``stderr`` rechaza alguna de las opciones añadidas al reescribir.
+
+        Así se distingue un host sin modo JSON (``Option "-j" is unknown``,
+        ``invalid option -- 'J'``) de un fallo legítimo del propio comando.
+        """
+
+        if not self.rewritten or not _UNKNOWN_OPTION.search(stderr):
+            return False
+        added = set(self.args) - set(shlex.split(self.original))
+        return any(flag in stderr or f"'{flag.lstrip('-')}'" in stderr for flag in added)
+
+    def parse(self, stdout: str) -> str | None:
+        try:
+            return self.parser.parse(self.args, stdout)
+        except Exception as exc:  # pragma: no cover - salidas inesperadas
+            logger.debug("El analizador '%s' no pudo procesar la salida: %s", self.parser.name, exc)
+            return None
+
+
+class ParserRegistry:
+    """Registro de analizadores indexados por nombre de programa."""
+
+    def __init__(self, parsers: Iterable[CommandParser] = ()) -> None:
+        self._parsers: dict[str, CommandParser] = {}
+        # (host, analizador) cuyas opciones de reescritura no admite ese host.
+        self._unsupported: set[tuple[str, str]] = set()
+        for parser in parsers:
+            self.register(parser)
+
+    def register(self, parser: CommandParser) -> None:
+        for program in parser.programs:
+            self._parsers[program] = parser
+
+    @property
+    def parsers(self) -> tuple[CommandParser, ...]:
+        return tuple(dict.fromkeys(self._parsers.values()))
+
+    def disable_rewrite(self, host: str, parser: CommandParser) -> None:
+        """Recuerda que ``host`` no admite la reescritura de ``parser``."""
+
+        self._unsupported.add((host, parser.name))
+
+    def match(self, command: str, *, host: str | None = None) -> ParsePlan | None:
+        if _SHELL_METACHARS.search(command):
+            return None
+        try:
+            tokens = shlex.split(command)
+        except ValueError:
+            return None
+        prefix, tokens = _split_sudo(tokens)
+        if not tokens:
+            return None
+        parser = self._parsers.get(tokens[0].rsplit("/", 1)[-1])
+        if parser is None:
+            return None
+        args = tuple(tokens[1:])
+        if parser.accepts and not parser.accepts(args):
+            return None
+        if parser.rewrite and (host, parser.name) in self._unsupported:
+            # Sin modo estructurado la salida de texto se devuelve tal cual.
+            return None
+        effective = command
+        if parser.rewrite:
+            rewritten_args = parser.rewrite(args)
+            if rewritten_args is not None:
+                args = tuple(rewritten_args)
+                effective = shlex.join([*prefix, tokens[0], *args])
+        return ParsePlan(parser=parser, original=command, command=effective, args=args)
+
+
+# ----------------------------------------------------------------------
+# Utilidades comunes
+# ----------------------------------------------------------------------
+
+
+def _split_sudo(tokens: list[str]) -> tuple[list[str], list[str]]:
+    if not tokens or tokens[0] != "sudo":
+        return [], tokens
+    index = 1
+    while index < len(tokens) and tokens[index].startswith("-"):
+        index += 1
+    return tokens[:index], tokens[index:]
+
+
+def _table(headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> str:
+    lines = ["\t".join(headers)]
+    for row in rows:
+        lines.append("\t".join("" if value is None else str(value) for value in row))
+    return "\n".join(lines)
+
+
+def _has_flag(args: Sequence[str], *flags: str) -> bool:
+    return any(arg in flags for arg in args)
+
+
+def _insert_flag(args: Sequence[str], flag: str) -> list[str]:
+    return [flag, *args]
+
+
+def _data_lines(stdout: str) -> list[str]:
+    return [line for line in stdout.splitlines() if line.strip()]
+
+
+# ----------------------------------------------------------------------
+# ps
+# ----------------------------------------------------------------------
+
+_PS_COLUMNS = ("PID", "USER", "%CPU", "%MEM", "RSS", "STAT", "COMMAND")
+
+
+def _accept_ps(args: Sequence[str]) -> bool:
+    # Con `-o`/`o` el operador ya eligió columnas; respetamos su formato.
+    return not any(arg in {"-o", "o", "--format"} or arg.startswith("-o") for arg in args)
+
+
+def _parse_ps(args: Sequence[str], stdout: str) -> str | None:
+    lines = _data_lines(stdout)
+    if len(lines) < 2:
+        return None
+    headers = lines[0].split()
+    if "PID" not in headers:
+        return None
+    last = headers[-1]
+    if last not in {"COMMAND", "CMD"}:
+        return None
+    rows = []
+    for line in lines[1:]:
+        fields = line.split(None, len(headers) - 1)
+        if len(fields) < len(headers):
+            continue
+        record = dict(zip(headers, fields))
+        record["COMMAND"] = record.pop(last)[:200]
+        if "UID" in record and "USER" not in record:
+            record["USER"] = record["UID"]
+        if "C" in record and "%CPU" not in record:
+            record["%CPU"] = record["C"]
+        rows.append(record)
+    columns = [column for column in _PS_COLUMNS if any(column in row for row in rows)]
+    return _table(columns, ([row.get(column) for column in columns] for row in rows))
+
+
+# ----------------------------------------------------------------------
+# df
+# ----------------------------------------------------------------------
+
+
+def _accept_df(args: Sequence[str]) -> bool:
+    return not any(arg.startswith("--output") for arg in args)
+
+
+def _parse_df(args: Sequence[str], stdout: str) -> str | None:
+    lines = _data_lines(stdout)
+    if len(lines) < 2 or not lines[0].startswith("Filesystem"):
+        return None
+    header = lines[0].replace("Mounted on", "Mounted_on")
+    headers = header.split()
+    rows = []
+    omitted = 0
+    for line in lines[1:]:
+        fields = line.split(None, len(headers) - 1)
+        if len(fields) < len(headers):
+            continue
+        record = dict(zip(headers, fields))
+        filesystem = record["Filesystem"]
+        fs_type = record.get("Type", filesystem)
+        if fs_type in _PSEUDO_FILESYSTEMS or filesystem.startswith("/dev/loop"):
+            omitted += 1
+            continue
+        rows.append([record.get(column) for column in headers])
+    result = _table([column.replace("_", " ") for column in headers], rows)
+    if omitted:
+        result += f"\n# {omitted} pseudo/loop filesystems omitted"
+    return result
+
+
+# ----------------------------------------------------------------------
+# free
+# ----------------------------------------------------------------------
+
+
+def _parse_free(args: Sequence[str], stdout: str) -> str | None:
+    lines = _data_lines(stdout)
+    if len(lines) < 2:
+        return None
+    headers = lines[0].split()
+    rows = []
+    for line in lines[1:]:
+        label, _, values = line.partition(":")
+        if not values:
+            continue
+        fields = values.split()
+        rows.append([label.strip(), *fields, *([""] * (len(headers) - len(fields)))])
+    if not rows:
+        return None
+    return _table(["kind", *headers], rows)
+
+
+# ----------------------------------------------------------------------
+# ss
+# ----------------------------------------------------------------------
+
+_SS_PROCESS_RE = re.compile(r'\("([^"]+)",pid=(\d+)')
+
+
+def _parse_ss(args: Sequence[str], stdout: str) -> str | None:
+    lines = _data_lines(stdout)
+    if len(lines) < 1:
+        return None
+    header = lines[0]
+    if "Local Address" not in header:
+        return None
+    has_netid = header.startswith("Netid")
+    rows = []
+    for line in lines[1:]:
+        fields = line.split()
+        base = 6 if has_netid else 5
+        if len(fields) < base:
+            continue
+        netid = fields[0] if has_netid else ""
+        state, local, peer = fields[base - 5], fields[base - 2], fields[base - 1]
+        process = " ".join(fields[base:])
+        procs = ",".join(f"{name}/{pid}" for name, pid in _SS_PROCESS_RE.findall(process))
+        row = [state, local, peer, procs]
+        rows.append([netid, *row] if has_netid else row)
+    headers = ["netid", "state", "local", "peer", "process"]
+    return _table(headers if has_netid else headers[1:], rows)
+
+
+# ----------------------------------------------------------------------
+# ip
+# ----------------------------------------------------------------------
+
+_IP_OBJECTS = {
+    "a": "addr",
+    "addr": "addr",
+    "address": "addr",
+    "l": "link",
+    "link": "link",
+    "r": "route",
+    "ro": "route",
+    "route": "route",
+}
+
+
+def _ip_object(args: Sequence[str]) -> str | None:
+    for arg in args:
+        if arg.startswith("-"):
+            continue
+        return _IP_OBJECTS.get(arg)
+    return None
+
+
+def _accept_ip(args: Sequence[str]) -> bool:
+    if _has_flag(args, "-br", "-brief", "-o", "-oneline"):
+        return False
+    if _ip_object(args) is None:
+        return False
+    # Solo lecturas: `ip addr add`, `ip route del`, etc. no se tocan.
+    writes = {"add", "del", "delete", "change", "replace", "set", "flush"}
+    return not any(arg in writes for arg in args)
+
+
+def _rewrite_ip(args: Sequence[str]) -> list[str] | None:
+    if _has_flag(args, "-j", "-json"):
+        return None
+    return _insert_flag(args, "-j")
+
+
+def _parse_ip(args: Sequence[str], stdout: str) -> str | None:
+    try:
+        payload = json.loads(stdout or "[]")
+    except json.JSONDecodeError:
+        return None
+    kind = _ip_object(args)
+    if kind == "addr":
+        rows = []
+        for entry in payload:
+            addresses = ",".join(
+                f"{info.get('local')}/{info.get('prefixlen')}"
+                for info in entry.get("addr_info", [])
+                if info.get("local")
+            )
+            rows.append(
+                [entry.get("ifname"), entry.get("operstate"), entry.get("address"), addresses]
+            )
+        return _table(["ifname", "state", "mac", "addresses"], rows)
+    if kind == "link":
+        rows = [
+            [entry.get("ifname"), entry.get("operstate"), entry.get("mtu"), entry.get("address")]
+            for entry in payload
+        ]
+        return _table(["ifname", "state", "mtu", "mac"], rows)
+    if kind == "route":
+        rows = [
+            [
+                entry.get("dst"),
+                entry.get("gateway", ""),
+                entry.get("dev"),
+                entry.get("protocol", ""),
+                entry.get("metric", ""),
+            ]
+            for entry in payload
+        ]
+        return _table(["dst", "gateway", "dev", "proto", "metric"], rows)
+    return None
+
+
+# ----------------------------------------------------------------------
+# lsblk
+# ----------------------------------------------------------------------
+
+
+def _rewrite_lsblk(args: Sequence[str]) -> list[str] | None:
+    if _has_flag(args, "-J", "--json"):
+        return None
+    return _insert_flag(args, "-J")
+
+
+def _accept_lsblk(args: Sequence[str]) -> bool:
+    return not _has_flag(args, "-P", "--pairs", "-r", "--raw", "-l", "--list")
+
+
+def _flatten_devices(devices: Iterable[Mapping[str, Any]], depth: int = 0) -> list[dict[str, Any]]:
+    flattened: list[dict[str, Any]] = []
+    for device in devices:
+        record = {key: value for key, value in device.items() if key != "children"}
+        record["name"] = f"{'-' * depth}{record.get('name', '')}"
+        flattened.append(record)
+        flattened.extend(_flatten_devices(device.get("children", []), depth + 1))
+    return flattened
+
+
+def _parse_lsblk(args: Sequence[str], stdout: str) -> str | None:
+    try:
+        payload = json.loads(stdout or "{}")
+    except json.JSONDecodeError:
+        return None
+    records = _flatten_devices(payload.get("blockdevices", []))
+    if not records:
+        return None
+    columns: list[str] = []
+    for record in records:
+        for key, value in record.items():
+            if key not in columns and value not in (None, "", [], [None]):
+                columns.append(key)
+
+    def _cell(value: Any) -> Any:
+        if isinstance(value, list):
+            return ",".join(str(item) for item in value if item)
+        return value
+
+    rows = ([_cell(record.get(column)) for column in columns] for record in records)
+    return _table(columns, rows)
+
+
+# ----------------------------------------------------------------------
+# systemctl list-units
+# ----------------------------------------------------------------------
+
+
+def _accept_systemctl(args: Sequence[str]) -> bool:
+    positional = [arg for arg in args if not arg.startswith("-")]
+    if not positional:
+        return True
+    return positional[0] == "list-units"
+
+
+def _rewrite_systemctl(args: Sequence[str]) -> list[str] | None:
+    extra = [flag for flag in ("--no-pager", "--plain", "--no-legend") if flag not in args]
+    if not extra:
+        return None
+    return [*args, *extra]
+
+
+def _parse_systemctl(args: Sequence[str], stdout: str) -> str | None:
+    rows = []
+    for line in _data_lines(stdout):
+        stripped = line.lstrip("●* ").rstrip()
+        if stripped.startswith("UNIT ") or stripped.endswith("listed."):
+            continue
+        fields = stripped.split(None, 4)
+        if len(fields) < 4:
+            continue
+        rows.append([*fields[:4], fields[4] if len(fields) > 4 else ""])
+    return _table(["unit", "load", "active", "sub", "description"], rows)
+
+
+DEFAULT_PARSERS: tuple[CommandParser, ...] = (
+    CommandParser(name="ps", programs=("ps",), parse=_parse_ps, accepts=_accept_ps),
+    CommandParser(name="df", programs=("df",), parse=_parse_df, accepts=_accept_df),
+    CommandParser(name="free", programs=("free",), parse=_parse_free),
+    CommandParser(name="ss", programs=("ss",), parse=_parse_ss),
+    CommandParser(
+        name="ip", programs=("ip",), parse=_parse_ip, rewrite=_rewrite_ip, accepts=_accept_ip
+    ),
+    CommandParser(
+        name="lsblk",
+        programs=("lsblk",),
+        parse=_parse_lsblk,
+        rewrite=_rewrite_lsblk,
+        accepts=_accept_lsblk,
+    ),
+    CommandParser(
+        name="systemctl",
+        programs=("systemctl",),
+        parse=_parse_systemctl,
+        rewrite=_rewrite_systemctl,
+        accepts=_accept_systemctl,
+    ),
+)
+
+
+def default_parser_registry() -> ParserRegistry:
+    """Crea un registro con los analizadores incluidos de serie."""
+
+    return ParserRegistry(DEFAULT_PARSERS)
+
+
+__all__ = [
+    "CommandParser",
+    "DEFAULT_PARSERS",
+    "ParsePlan",
+    "ParserRegistry",
+    "default_parser_registry",
+]
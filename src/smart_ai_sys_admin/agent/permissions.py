@@ -35,6 +35,7 @@ class ToolPermissionManager:
         self._logger = logger
         self._previous: dict[str, str | None] = {}
         self._active = False
+        self._holders: set[int] = set()
 
     def set_logger(self, logger: logging.Logger | None) -> None:
         """Actualiza el logger utilizado para mensajes de depuración."""
@@ -78,6 +79,23 @@ class ToolPermissionManager:
         self._previous.clear()
         self._active = False
 
+    def acquire(self, holder: object) -> None:
+        """Activa los permisos en nombre de ``holder``.
+
+        Varios agentes comparten las mismas variables de entorno: los permisos
+        se mantienen mientras quede alguno que los haya pedido.
+        """
+
+        self._holders.add(id(holder))
+        self.activate()
+
+    def release(self, holder: object) -> None:
+        """Retira la petición de ``holder`` y restaura el entorno si era la última."""
+
+        self._holders.discard(id(holder))
+        if not self._holders:
+            self.restore()
+
     @property
     def active(self) -> bool:
         """Indica si los permisos están actualmente activados."""
@@ -0,0 +1,215 @@
+"""Precarga especulativa de datos del host mientras el operador escribe.
+
+Tras un ``/connect``, la interfaz llama a :meth:`HostPrefetcher.warm` (con
+antirrebote) cuando el operador empieza a escribir un prompt. Se ejecutan en
+segundo plano comandos baratos y casi siempre útiles (datos del sistema,
+``systemctl --failed``, disco y memoria) y sus resultados se guardan en un
+:class:`HostCache` con TTL. ``remote_ssh_command`` consulta esa caché antes de
+ir a la red, así que las primeras llamadas de un turno suelen resolverse al
+instante.
+
+Cualquier comando que no sale de la caché puede modificar el host, de modo que
+invalida las entradas de ese host; una precarga en curso descarta entonces lo
+que obtenga.
+"""
+
+from __future__ import annotations
+
+import logging
+import shlex
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+from ..connection import ConnectionDetails, ConnectionError, SSHConnectionManager
+from .parsers import ParserRegistry
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.prefetch")
+
+DEFAULT_PREFETCH_COMMANDS: tuple[str, ...] = (
+    "uname -a",
+    "cat /etc/os-release",
+    "uptime",
+    "df -h",
+    "free -h",
+    "systemctl --failed",
+)
+# Límite de cada comando de precarga; son consultas rápidas.
+PREFETCH_TIMEOUT_SECONDS = 20
+
+
+def host_key(details: ConnectionDetails) -> str:
+    return f"{details.username}@{details.host}:{details.port}"
+
+
+def normalize_command(command: str) -> str:
+    """Forma canónica de un comando para usarla como clave de la caché."""
+
+    try:
+        return shlex.join(shlex.split(command))
+    except ValueError:
+        return " ".join(command.split())
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    exit_code: int
+    stdout: str
+    stderr: str
+    fetched_at: float
+
+
+class HostCache:
+    """Resultados de comandos por host con caducidad; segura entre hilos."""
+
+    def __init__(self, ttl_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: dict[tuple[str, str], CachedResult] = {}
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, host: str) -> int:
+        with self._lock:
+            return self._generations.get(host, 0)
+
+    def get(self, host: str, command: str) -> CachedResult | None:
+        key = (host, normalize_command(command))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry.fetched_at > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def fresh(self, host: str, command: str) -> bool:
+        key = (host, normalize_command(command))
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and self._clock() - entry.fetched_at <= self.ttl_seconds
+
+    def put(
+        self,
+        host: str,
+        command: str,
+        result: tuple[int, str, str],
+        generation: int | None = None,
+    ) -> bool:
+        """Guarda ``result``; si se indica ``generation`` y el host se invalidó
+        desde entonces, el resultado ya no es fiable y se descarta."""
+
+        with self._lock:
+            if generation is not None and generation != self._generations.get(host, 0):
+                return False
+            code, stdout, stderr = result
+            self._entries[(host, normalize_command(command))] = CachedResult(
+                code, stdout, stderr, self._clock()
+            )
+            return True
+
+    def invalidate(self, host: str) -> None:
+        with self._lock:
+            self._generations[host] = self._generations.get(host, 0) + 1
+            for key in [key for key in self._entries if key[0] == host]:
+                del self._entries[key]
+
+    def age(self, entry: CachedResult) -> float:
+        return self._clock() - entry.fetched_at
+
+
+class HostPrefetcher:
+    """Ejecuta la lista de comandos de precarga y llena la caché del host activo."""
+
+    def __init__(
+        self,
+        manager: SSHConnectionManager,
+        cache: HostCache,
+        commands: Sequence[str] = DEFAULT_PREFETCH_COMMANDS,
+        *,
+        registry: ParserRegistry | None = None,
+        debounce_seconds: float = 0.6,
+    ) -> None:
+        self._manager = manager
+        self.cache = cache
+        self.debounce_seconds = debounce_seconds
+        self._commands = tuple(commands)
+        self._registry = registry
+        self._running = threading.Lock()
+
+    def _effective(self, command: str) -> str:
+        # La tool ejecuta la versión reescrita por el analizador; se precarga esa.
+        plan = self._registry.match(command) if self._registry else None
+        return plan.command if plan else command
+
+    def pending(self) -> bool:
+        """Indica si hay algo que precargar en el host actual."""
+
+        details = self._manager.details
+        if details is None:
+            return False
+        host = host_key(details)
+        return any(not self.cache.fresh(host, self._effective(c)) for c in self._commands)
+
+    def warm(self) -> int:
+        """Precarga lo que falte o haya caducado; devuelve cuántos comandos se guardaron.
+
+        Bloqueante: se llama desde un hilo. Si ya hay una precarga en curso no
+        hace nada.
+        """
+
+        if not self._running.acquire(blocking=False):
+            return 0
+        try:
+            details = self._manager.details
+            if details is None:
+                return 0
+            host = host_key(details)
+            generation = self.cache.generation(host)
+            stored = 0
+            started = time.monotonic()
+            for command in self._commands:
+                effective = self._effective(command)
+                if self.cache.fresh(host, effective):
+                    continue
+                try:
+                    result = self._manager.run_command(effective, timeout=PREFETCH_TIMEOUT_SECONDS)
+                except ConnectionError as exc:
+                    logger.debug("Precarga de '%s' interrumpida: %s", effective, exc)
+                    break
+                # Un `/connect` a otro host durante la precarga: el resultado puede
+                # venir de la conexión nueva y no debe guardarse con la clave antigua.
+                current = self._manager.details
+                if current is None or host_key(current) != host:
+                    logger.debug("Precarga abandonada: la conexión cambió de %s", host)
+                    break
+                if not self.cache.put(host, effective, result, generation):
+                    logger.debug("Precarga descartada: el host %s cambió entretanto", host)
+                    break
+                stored += 1
+            if stored:
+                logger.info(
+                    "Precargados %d comandos de %s en %.1fs",
+                    stored,
+                    host,
+                    time.monotonic() - started,
+                )
+            return stored
+        finally:
+            self._running.release()
+
+
+__all__ = [
+    "DEFAULT_PREFETCH_COMMANDS",
+    "CachedResult",
+    "HostCache",
+    "HostPrefetcher",
+    "host_key",
+    "normalize_command",
+]
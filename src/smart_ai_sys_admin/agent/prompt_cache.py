@@ -0,0 +1,130 @@
+"""Caché de prompts de los proveedores y contadores de aciertos.
+
+El prefijo de cada petición (herramientas ordenadas por nombre, prompt de
+sistema e historial previo) es estable entre llamadas; aquí se traduce la
+configuración ``agent.prompt_cache`` a la ``CacheConfig`` de Strands de cada
+proveedor y se lleva la cuenta de los tokens servidos desde la caché.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from strands.hooks import AfterInvocationEvent, BeforeInvocationEvent, HookProvider, HookRegistry
+from strands.models.model import CacheConfig
+
+from .config import (
+    BedrockProviderConfig,
+    OpenAIProviderConfig,
+    PromptCacheConfig,
+    ProviderBaseConfig,
+)
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.prompt_cache")
+
+
+def cache_config_for(
+    provider_cfg: ProviderBaseConfig, options: PromptCacheConfig
+) -> CacheConfig | None:
+    """Devuelve la ``CacheConfig`` adecuada al proveedor o ``None`` si no aplica.
+
+    Bedrock necesita puntos de caché explícitos (herramientas, sistema y el
+    último mensaje del usuario). OpenAI cachea prefijos automáticamente y solo
+    recibe una clave de enrutado estable. LM Studio, Ollama y Cerebras
+    reutilizan el prefijo por su cuenta, así que la petición no se toca.
+    """
+
+    if not options.enabled:
+        return None
+    if isinstance(provider_cfg, BedrockProviderConfig):
+        return CacheConfig(strategy="auto", ttl=options.ttl, tools_ttl=True)
+    if isinstance(provider_cfg, OpenAIProviderConfig) and options.cache_key:
+        return CacheConfig(cache_key=options.cache_key)
+    return None
+
+
+@dataclass(frozen=True)
+class CacheUsage:
+    """Tokens de entrada de una o varias llamadas, separados por su origen."""
+
+    read: int = 0
+    written: int = 0
+    uncached: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.read + self.written + self.uncached
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.read / self.total if self.total else 0.0
+
+    def __add__(self, other: CacheUsage) -> CacheUsage:
+        return CacheUsage(
+            read=self.read + other.read,
+            written=self.written + other.written,
+            uncached=self.uncached + other.uncached,
+        )
+
+    @classmethod
+    def from_usage(cls, usage: Any) -> CacheUsage:
+        """Interpreta el ``Usage`` acumulado de Strands.
+
+        Bedrock excluye de ``inputTokens`` los tokens leídos o escritos en
+        caché; OpenAI los incluye. Se distingue igual que la telemetría de
+        Strands: si entrada + salida cuadra con el total, la entrada ya los
+        contiene.
+        """
+
+        usage = usage or {}
+        input_tokens = int(usage.get("inputTokens", 0))
+        read = int(usage.get("cacheReadInputTokens", 0))
+        written = int(usage.get("cacheWriteInputTokens", 0))
+        if input_tokens + int(usage.get("outputTokens", 0)) == int(usage.get("totalTokens", 0)):
+            uncached = max(input_tokens - read - written, 0)
+        else:
+            uncached = input_tokens
+        return cls(read=read, written=written, uncached=uncached)
+
+
+class PromptCacheStats(HookProvider):
+    """Acumula por turno y por sesión los tokens servidos desde la caché."""
+
+    def __init__(self) -> None:
+        self.last = CacheUsage()
+        self.session = CacheUsage()
+        self._baseline = CacheUsage()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._on_before_invocation)
+        registry.add_callback(AfterInvocationEvent, self._on_after_invocation)
+
+    def _on_before_invocation(self, event: BeforeInvocationEvent) -> None:
+        self._baseline = self._snapshot(event.agent)
+
+    def _on_after_invocation(self, event: AfterInvocationEvent) -> None:
+        current = self._snapshot(event.agent)
+        self.last = CacheUsage(
+            read=max(current.read - self._baseline.read, 0),
+            written=max(current.written - self._baseline.written, 0),
+            uncached=max(current.uncached - self._baseline.uncached, 0),
+        )
+        self.session = self.session + self.last
+        if self.last.total:
+            logger.info(
+                "Caché de prompt: %d tokens leídos, %d escritos, %d sin caché (%.0f%% aciertos)",
+                self.last.read,
+                self.last.written,
+                self.last.uncached,
+                self.last.hit_ratio * 100,
+            )
+
+    @staticmethod
+    def _snapshot(agent: Any) -> CacheUsage:
+        metrics = getattr(agent, "event_loop_metrics", None)
+        return CacheUsage.from_usage(getattr(metrics, "accumulated_usage", None))
+
+
+__all__ = ["CacheUsage", "PromptCacheStats", "cache_config_for"]
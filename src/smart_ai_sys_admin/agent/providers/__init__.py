@@ -1,5 +1,6 @@
 """Proveedores personalizados para Shell Sentinel."""
 
+from .cassette import CassetteError, CassetteModel
 from .cerebras import CerebrasModel
 
-__all__ = ["CerebrasModel"]
+__all__ = ["CassetteError", "CassetteModel", "CerebrasModel"]
@@ -0,0 +1,272 @@
+"""Proveedor de grabación y reproducción ("cassettes") para pruebas sin red.
+
+En modo ``record`` envuelve un proveedor real: le pasa cada petición y guarda
+en el cassette los eventos del stream con el tiempo transcurrido entre ellos.
+En modo ``replay`` no usa la red: responde a cada llamada con la siguiente
+entrada del cassette, respetando los tiempos originales o escalados con
+``speed`` (``2.0`` reproduce al doble de velocidad; ``0`` sin esperas).
+
+El cassette es un archivo JSON Lines con una entrada por llamada al modelo.
+Las entradas grabadas tienen la forma ``{"events": [[ms, evento], …]}``. Las
+entradas guionizadas se escriben a mano para generar respuestas y llamadas a
+herramientas predefinidas::
+
+    {"text": "Reviso el disco.", "tool_calls": [{"name": "remote_ssh_command",
+     "input": {"command": "df -h"}}], "chunk_chars": 12, "delay_ms": 20}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any, TypedDict, TypeVar, cast
+
+from strands.models import Model
+from strands.models._validation import validate_config_keys
+from strands.types.content import Messages
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolChoice, ToolSpec
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.providers.cassette")
+
+T = TypeVar("T")
+
+DEFAULT_CHUNK_CHARS = 16
+DEFAULT_CHUNK_DELAY_MS = 15
+
+
+class CassetteError(RuntimeError):
+    """Cassette ausente, mal formado o agotado."""
+
+
+class CassetteModelConfig(TypedDict, total=False):
+    """Opciones soportadas por el proveedor de cassettes."""
+
+    model_id: str
+    mode: str
+    path: str
+    speed: float
+    loop: bool
+
+
+class CassetteModel(Model):
+    """Graba los streams de otro proveedor o los reproduce desde un cassette."""
+
+    def __init__(self, inner: Model | None = None, **model_config: Any) -> None:
+        validate_config_keys(model_config, CassetteModelConfig)
+        self._config: CassetteModelConfig = cast(CassetteModelConfig, dict(model_config))
+        self._config.setdefault("model_id", "cassette")
+        self._config.setdefault("speed", 1.0)
+        self._config.setdefault("loop", False)
+        mode = self._config.get("mode", "replay")
+        if mode not in {"record", "replay"}:
+            raise ValueError(f"Modo de cassette desconocido: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("El modo 'record' necesita un proveedor real que grabar.")
+        self._inner = inner
+        self._path = Path(self._config.get("path", "")).expanduser()
+        self._lock = threading.Lock()
+        self._entries: list[dict[str, Any]] = []
+        self._cursor = 0
+        if mode == "replay":
+            self._entries = self._load(self._path)
+        logger.debug(
+            "Inicializado CassetteModel en modo %s (%s, %d entradas)",
+            mode,
+            self._path,
+            len(self._entries),
+        )
+
+    @property
+    def mode(self) -> str:
+        return self._config.get("mode", "replay")
+
+    @property
+    def cursor(self) -> int:
+        """Índice de la siguiente entrada que se reproducirá."""
+
+        return self._cursor
+
+    # ------------------------------------------------------------------
+    # Configuración dinámica
+    # ------------------------------------------------------------------
+
+    def update_config(self, **model_config: Any) -> None:  # type: ignore[override]
+        validate_config_keys(model_config, CassetteModelConfig)
+        for key in ("speed", "loop"):
+            if key in model_config:
+                self._config[key] = model_config[key]  # type: ignore[literal-required]
+
+    def get_config(self) -> CassetteModelConfig:  # type: ignore[override]
+        return CassetteModelConfig(**self._config)
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None = None,
+        system_prompt: str | None = None,
+        *,
+        tool_choice: ToolChoice | None = None,
+        cancel_signal: threading.Event | None = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        if self.mode == "record":
+            assert self._inner is not None
+            source = self._inner.stream(
+                messages,
+                tool_specs,
+                system_prompt,
+                tool_choice=tool_choice,
+                cancel_signal=cancel_signal,
+                **kwargs,
+            )
+            async for event in self._record(source, messages, tool_specs):
+                yield event
+            return
+        entry = self._next_entry()
+        events = entry["events"] if "events" in entry else self._script_events(entry)
+        speed = float(self._config.get("speed", 1.0))
+        for delay_ms, event in events:
+            if speed > 0 and delay_ms > 0:
+                await asyncio.sleep(delay_ms / 1000 / speed)
+            if cancel_signal is not None and cancel_signal.is_set():
+                # Igual que con un proveedor real: sin `messageStop` el turno queda cancelado.
+                logger.info("Reproducción del cassette interrumpida por cancelación")
+                return
+            yield cast(StreamEvent, event)
+
+    async def _record(
+        self,
+        source: Any,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        events: list[tuple[int, StreamEvent]] = []
+        last = time.perf_counter()
+        try:
+            async for event in source:
+                now = time.perf_counter()
+                events.append((round((now - last) * 1000), event))
+                last = now
+                yield event
+        finally:
+            # Las llamadas interrumpidas (sin `messageStop`) no se graban.
+            if any("messageStop" in event for _delay, event in events):
+                self._append(
+                    {
+                        "request": {
+                            "messages": len(messages),
+                            "tools": [spec["name"] for spec in tool_specs or []],
+                        },
+                        "events": events,
+                    }
+                )
+
+    # ------------------------------------------------------------------
+    # Salidas estructuradas
+    # ------------------------------------------------------------------
+
+    async def structured_output(
+        self,
+        output_model: type[T],
+        prompt: Messages,
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        if self._inner is None:
+            raise CassetteError("El modo 'replay' no admite salidas estructuradas.")
+        async for event in self._inner.structured_output(
+            output_model, prompt, system_prompt, **kwargs
+        ):
+            yield event
+
+    # ------------------------------------------------------------------
+    # Utilidades internas
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _load(path: Path) -> list[dict[str, Any]]:
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except OSError as exc:
+            raise CassetteError(f"No se pudo leer el cassette '{path}': {exc}") from exc
+        entries: list[dict[str, Any]] = []
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise CassetteError(f"Línea {number} de '{path}' no es JSON válido: {exc}") from exc
+            if not isinstance(entry, dict) or not (
+                "events" in entry or "text" in entry or "tool_calls" in entry
+            ):
+                raise CassetteError(f"Línea {number} de '{path}' no es una entrada de cassette")
+            entries.append(entry)
+        if not entries:
+            raise CassetteError(f"El cassette '{path}' está vacío")
+        return entries
+
+    def _next_entry(self) -> dict[str, Any]:
+        with self._lock:
+            if self._cursor >= len(self._entries):
+                if not self._config.get("loop"):
+                    raise CassetteError(
+                        f"Cassette '{self._path}' agotado tras {len(self._entries)} llamadas"
+                    )
+                self._cursor = 0
+            entry = self._entries[self._cursor]
+            self._cursor += 1
+            return entry
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    @staticmethod
+    def _script_events(entry: dict[str, Any]) -> list[tuple[int, dict[str, Any]]]:
+        """Convierte una entrada guionizada en eventos de stream de Strands."""
+
+        size = max(int(entry.get("chunk_chars", DEFAULT_CHUNK_CHARS)), 1)
+        delay = int(entry.get("delay_ms", DEFAULT_CHUNK_DELAY_MS))
+        text = str(entry.get("text") or "")
+        tool_calls = list(entry.get("tool_calls") or [])
+        events: list[tuple[int, dict[str, Any]]] = [
+            (delay, {"messageStart": {"role": "assistant"}})
+        ]
+        if text:
+            events.append((0, {"contentBlockStart": {"start": {}}}))
+            events.extend(
+                (delay, {"contentBlockDelta": {"delta": {"text": text[index : index + size]}}})
+                for index in range(0, len(text), size)
+            )
+            events.append((0, {"contentBlockStop": {}}))
+        for number, call in enumerate(tool_calls):
+            tool_use = {"name": call["name"], "toolUseId": call.get("id") or f"cassette-{number}"}
+            arguments = json.dumps(call.get("input") or {}, ensure_ascii=False)
+            events.append((delay, {"contentBlockStart": {"start": {"toolUse": tool_use}}}))
+            events.append((delay, {"contentBlockDelta": {"delta": {"toolUse": {"input": arguments}}}}))
+            events.append((0, {"contentBlockStop": {}}))
+        stop_reason = "tool_use" if tool_calls else "end_turn"
+        events.append((0, {"messageStop": {"stopReason": stop_reason}}))
+        usage = entry.get("usage") or {
+            "inputTokens": 0,
+            "outputTokens": max(len(text) // 4, 1),
+        }
+        usage.setdefault("totalTokens", usage.get("inputTokens", 0) + usage.get("outputTokens", 0))
+        events.append((0, {"metadata": {"usage": usage, "metrics": {"latencyMs": 0}}}))
+        return events
+
+
+__all__ = ["CassetteError", "CassetteModel"]
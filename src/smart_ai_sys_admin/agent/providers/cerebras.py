@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
+import threading
 from collections.abc import AsyncGenerator
 from typing import Any, TypedDict, TypeVar, cast
 
@@ -36,6 +38,9 @@ class CerebrasModelConfig(TypedDict, total=False):
 
 T = TypeVar("T")
 
+# Frecuencia con la que se comprueba la señal de cancelación durante el stream.
+_CANCEL_POLL_SECONDS = 0.1
+
 
 class CerebrasModel(Model):
     """Implementación de proveedor Strands sobre el SDK oficial de Cerebras."""
@@ -109,6 +114,7 @@ class CerebrasModel(Model):
         system_prompt: str | None = None,
         *,
         tool_choice: ToolChoice | None = None,
+        cancel_signal: threading.Event | None = None,
         **kwargs: Any,
     ) -> AsyncGenerator[StreamEvent, None]:
         request = self._build_request(messages, tool_specs, system_prompt, tool_choice)
@@ -116,94 +122,122 @@ class CerebrasModel(Model):
 
         logger.debug("Invocando modelo Cerebras con stream")
         response_stream = await self._client.chat.completions.create(**request)
+        watcher = self._close_on_cancel(response_stream, cancel_signal)
+        try:
+            yield {"messageStart": {"role": "assistant"}}
+
+            text_block_started = False
+            tool_chunks: dict[int, list[ChatChunkResponseChoiceDeltaToolCall]] = {}
+            last_usage = None
+            last_time_info = None
+            finish_reason: str | None = None
+
+            async for chunk in response_stream:
+                if not isinstance(chunk, ChatChunkResponse) or not chunk.choices:
+                    continue
 
-        yield {"messageStart": {"role": "assistant"}}
-
-        text_block_started = False
-        tool_chunks: dict[int, list[ChatChunkResponseChoiceDeltaToolCall]] = {}
-        last_usage = None
-        last_time_info = None
-        finish_reason: str | None = None
-
-        async for chunk in response_stream:
-            if not isinstance(chunk, ChatChunkResponse) or not chunk.choices:
-                continue
-
-            choice = chunk.choices[0]
-            delta = choice.delta
-
-            if delta.content:
-                if not text_block_started:
-                    yield {"contentBlockStart": {"start": {}}}
-                    text_block_started = True
-                yield {"contentBlockDelta": {"delta": {"text": delta.content}}}
-
-            if delta.reasoning:
-                if not text_block_started:
-                    yield {"contentBlockStart": {"start": {}}}
-                    text_block_started = True
-                yield {
-                    "contentBlockDelta": {
-                        "delta": {"reasoningContent": {"text": delta.reasoning}}
+                choice = chunk.choices[0]
+                delta = choice.delta
+
+                if delta.content:
+                    if not text_block_started:
+                        yield {"contentBlockStart": {"start": {}}}
+                        text_block_started = True
+                    yield {"contentBlockDelta": {"delta": {"text": delta.content}}}
+
+                if delta.reasoning:
+                    if not text_block_started:
+                        yield {"contentBlockStart": {"start": {}}}
+                        text_block_started = True
+                    yield {
+                        "contentBlockDelta": {
+                            "delta": {"reasoningContent": {"text": delta.reasoning}}
+                        }
                     }
-                }
 
-            for tool_call in delta.tool_calls or []:
-                idx = tool_call.index or 0
-                tool_chunks.setdefault(idx, []).append(tool_call)
+                for tool_call in delta.tool_calls or []:
+                    idx = tool_call.index or 0
+                    tool_chunks.setdefault(idx, []).append(tool_call)
 
-            last_usage = chunk.usage or last_usage
-            last_time_info = chunk.time_info or last_time_info
-
-            if choice.finish_reason:
-                finish_reason = choice.finish_reason
-                break
-
-        async for chunk in response_stream:
-            if isinstance(chunk, ChatChunkResponse):
                 last_usage = chunk.usage or last_usage
                 last_time_info = chunk.time_info or last_time_info
 
-        if text_block_started:
-            yield {"contentBlockStop": {}}
-
-        for idx, calls in tool_chunks.items():
-            first_call = calls[0]
-            tool_name = first_call.function.name or ""
-            tool_use_id = first_call.id or f"cerebras-tool-{idx}"
-            yield {
-                "contentBlockStart": {
-                    "start": {
-                        "toolUse": {
-                            "name": tool_name,
-                            "toolUseId": tool_use_id,
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                    break
+
+            async for chunk in response_stream:
+                if isinstance(chunk, ChatChunkResponse):
+                    last_usage = chunk.usage or last_usage
+                    last_time_info = chunk.time_info or last_time_info
+
+            if text_block_started:
+                yield {"contentBlockStop": {}}
+
+            for idx, calls in tool_chunks.items():
+                first_call = calls[0]
+                tool_name = first_call.function.name or ""
+                tool_use_id = first_call.id or f"cerebras-tool-{idx}"
+                yield {
+                    "contentBlockStart": {
+                        "start": {
+                            "toolUse": {
+                                "name": tool_name,
+                                "toolUseId": tool_use_id,
+                            }
                         }
                     }
                 }
-            }
-            for call in calls:
-                yield {
-                    "contentBlockDelta": {
-                        "delta": {
-                            "toolUse": {"input": call.function.arguments or ""}
+                for call in calls:
+                    yield {
+                        "contentBlockDelta": {
+                            "delta": {
+                                "toolUse": {"input": call.function.arguments or ""}
+                            }
                         }
                     }
-                }
-            yield {"contentBlockStop": {}}
+                yield {"contentBlockStop": {}}
 
-        yield {"messageStop": {"stopReason": self._map_stop_reason(finish_reason)}}
+            yield {"messageStop": {"stopReason": self._map_stop_reason(finish_reason)}}
 
-        if last_usage:
-            metadata: dict[str, Any] = {
-                "usage": {
-                    "inputTokens": last_usage.prompt_tokens or 0,
-                    "outputTokens": last_usage.completion_tokens or 0,
-                    "totalTokens": last_usage.total_tokens or 0,
+            if last_usage:
+                metadata: dict[str, Any] = {
+                    "usage": {
+                        "inputTokens": last_usage.prompt_tokens or 0,
+                        "outputTokens": last_usage.completion_tokens or 0,
+                        "totalTokens": last_usage.total_tokens or 0,
+                    }
                 }
-            }
-            if last_time_info and last_time_info.total_time is not None:
-                metadata["metrics"] = {"latencyMs": int(last_time_info.total_time * 1000)}
-            yield {"metadata": metadata}
+                if last_time_info and last_time_info.total_time is not None:
+                    metadata["metrics"] = {"latencyMs": int(last_time_info.total_time * 1000)}
+                yield {"metadata": metadata}
+        except Exception:
+            if cancel_signal is not None and cancel_signal.is_set():
+                # El cierre del stream interrumpe la lectura; Strands marca el
+                # turno como cancelado al no recibir `messageStop`.
+                logger.info("Stream de Cerebras interrumpido por cancelación")
+                return
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    @staticmethod
+    def _close_on_cancel(
+        response_stream: Any, cancel_signal: threading.Event | None
+    ) -> asyncio.Task[None] | None:
+        """Cierra la conexión HTTP en cuanto se solicita cancelar el turno."""
+
+        if cancel_signal is None:
+            return None
+
+        async def _watch() -> None:
+            while not cancel_signal.is_set():
+                await asyncio.sleep(_CANCEL_POLL_SECONDS)
+            logger.debug("Cancelación solicitada; cerrando stream de Cerebras")
+            await response_stream.close()
+
+        return asyncio.create_task(_watch())
 
     # ------------------------------------------------------------------
     # Salidas estructuradas
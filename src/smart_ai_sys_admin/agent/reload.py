@@ -0,0 +1,108 @@
+"""Recarga en caliente de ``agent.conf``.
+
+:func:`diff_configs` compara dos :class:`~.config.AgentConfig` y devuelve qué
+componentes hay que reconstruir; :meth:`AgentRuntime.reload` usa el resultado
+para conservar todo lo demás (cliente del modelo, gestor de conversación,
+transportes MCP sin cambios, grupos de hilos, sesión) junto con el historial
+y la conexión SSH. :class:`ConfigFileWatcher` detecta cambios en el archivo
+por sondeo de ``mtime`` y tamaño, sin dependencias adicionales.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+from .config import AgentConfig
+
+# Opciones de ``agent`` que intervienen en la construcción del cliente del modelo.
+_MODEL_OPTIONS = ("streaming", "prompt_cache", "failover", "model_routing")
+
+
+@dataclass(frozen=True)
+class ConfigChanges:
+    """Componentes afectados por una nueva configuración."""
+
+    model: bool = False
+    conversation: bool = False
+    tools: bool = False
+    executors: bool = False
+    mcp: bool = False
+    mcp_transports: tuple[str, ...] = ()
+    sessions: bool = False
+    metrics: bool = False
+    runbooks: bool = False
+    agent: bool = False
+
+    @property
+    def changed(self) -> tuple[str, ...]:
+        """Nombres de los componentes con cambios, en orden de declaración."""
+
+        return tuple(item.name for item in fields(self) if getattr(self, item.name) is True)
+
+    def __bool__(self) -> bool:
+        return bool(self.changed)
+
+
+def diff_configs(old: AgentConfig, new: AgentConfig) -> ConfigChanges:
+    """Compara dos configuraciones; ``mcp_transports`` lista los transportes afectados."""
+
+    old_options, new_options = old.options, new.options
+    old_transports = {item.identifier: item for item in old.mcp.transports}
+    new_transports = {item.identifier: item for item in new.mcp.transports}
+    transports = tuple(
+        sorted(
+            identifier
+            for identifier in old_transports.keys() | new_transports.keys()
+            if old_transports.get(identifier) != new_transports.get(identifier)
+        )
+    )
+    return ConfigChanges(
+        model=(
+            old.provider != new.provider
+            or old.providers != new.providers
+            or any(
+                getattr(old_options, name) != getattr(new_options, name)
+                for name in _MODEL_OPTIONS
+            )
+        ),
+        conversation=old_options.conversation != new_options.conversation,
+        tools=old.tools != new.tools,
+        executors=old.tools.executors != new.tools.executors,
+        mcp=old.mcp != new.mcp,
+        mcp_transports=transports,
+        sessions=old.sessions != new.sessions,
+        metrics=old.metrics != new.metrics,
+        runbooks=old.runbooks != new.runbooks,
+        agent=(
+            old_options.parallel_tools != new_options.parallel_tools
+            or old_options.trace_attributes != new_options.trace_attributes
+        ),
+    )
+
+
+class ConfigFileWatcher:
+    """Detecta modificaciones de un archivo comparando ``mtime`` y tamaño."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._stamp = self._read()
+
+    def _read(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self) -> bool:
+        """``True`` una sola vez por cada cambio; un archivo ausente no cuenta."""
+
+        stamp = self._read()
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return True
+
+
+__all__ = ["ConfigChanges", "ConfigFileWatcher", "diff_configs"]
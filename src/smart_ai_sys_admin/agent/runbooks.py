@@ -0,0 +1,443 @@
+"""Runbooks: secuencias de llamadas a herramientas grabadas y reproducibles sin modelo.
+
+Tras un turno del agente, :func:`extract_steps` recoge del historial los
+comandos remotos y las transferencias SFTP que terminaron bien y los guarda
+como un :class:`Runbook` con nombre. :class:`RunbookRunner` los reproduce
+directamente sobre :class:`~smart_ai_sys_admin.connection.SSHConnectionManager`,
+sin pasar por el modelo, en el host actual o en varios hosts en paralelo.
+
+Los pasos admiten marcadores ``{{nombre}}`` que se sustituyen al reproducir;
+``{{host}}`` siempre está disponible. Las llaves simples se respetan tal cual,
+de modo que ``awk '{print $1}'`` no necesita escaparse.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from collections.abc import Iterable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Literal
+
+from strands.types.content import Messages
+
+from ..connection import ConnectionError, SSHConnectionManager
+from ..localization import _
+from .prefetch import HostCache, host_key
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.runbooks")
+
+StepKindLiteral = Literal["command", "upload", "download"]
+
+RUNBOOK_VERSION = 1
+_NAME_RE = re.compile(r"^[\w.-]{1,64}$")
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_HOST_PARAM = "host"
+
+
+class RunbookError(RuntimeError):
+    """El runbook no existe, no es válido o le faltan parámetros."""
+
+
+@dataclass(frozen=True)
+class RunbookStep:
+    kind: StepKindLiteral
+    command: str = ""
+    local_path: str = ""
+    remote_path: str = ""
+    overwrite: bool = False
+    timeout_seconds: int | None = None
+    # Si el paso terminó con código 0 al grabarlo; solo entonces un fallo detiene la reproducción.
+    check: bool = True
+
+    def render(self, values: Mapping[str, str]) -> RunbookStep:
+        def fill(text: str) -> str:
+            return _PLACEHOLDER_RE.sub(lambda match: values[match.group(1)], text)
+
+        return replace(
+            self,
+            command=fill(self.command),
+            local_path=fill(self.local_path),
+            remote_path=fill(self.remote_path),
+        )
+
+    def placeholders(self) -> set[str]:
+        return {
+            match.group(1)
+            for text in (self.command, self.local_path, self.remote_path)
+            for match in _PLACEHOLDER_RE.finditer(text)
+        }
+
+    def describe(self) -> str:
+        if self.kind == "command":
+            return f"$ {self.command}"
+        arrow = "→" if self.kind == "upload" else "←"
+        return f"{self.kind} {self.local_path} {arrow} {self.remote_path}"
+
+
+@dataclass(frozen=True)
+class Runbook:
+    name: str
+    steps: tuple[RunbookStep, ...]
+    params: Mapping[str, str] = field(default_factory=dict)
+    description: str = ""
+    created_at: str = ""
+
+    def resolve(self, host: str, overrides: Mapping[str, str]) -> tuple[RunbookStep, ...]:
+        """Sustituye los marcadores con los valores por defecto y ``overrides``."""
+
+        unknown = set(overrides) - set(self.params)
+        if unknown:
+            raise RunbookError(
+                _("agent.runbooks.unknown_params", names=", ".join(sorted(unknown)))
+            )
+        values = {**self.params, **overrides, _HOST_PARAM: host}
+        missing = {name for step in self.steps for name in step.placeholders()} - set(values)
+        if missing:
+            raise RunbookError(
+                _("agent.runbooks.missing_params", names=", ".join(sorted(missing)))
+            )
+        return tuple(step.render(values) for step in self.steps)
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "version": RUNBOOK_VERSION,
+            "name": self.name,
+            "description": self.description,
+            "created_at": self.created_at,
+            "params": dict(self.params),
+            "steps": [asdict(step) for step in self.steps],
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> Runbook:
+        if payload.get("version") != RUNBOOK_VERSION:
+            raise RunbookError(f"Versión de runbook no soportada: {payload.get('version')}")
+        try:
+            steps = tuple(RunbookStep(**entry) for entry in payload["steps"])
+            return cls(
+                name=str(payload["name"]),
+                steps=steps,
+                params={str(key): str(value) for key, value in payload.get("params", {}).items()},
+                description=str(payload.get("description", "")),
+                created_at=str(payload.get("created_at", "")),
+            )
+        except (KeyError, TypeError) as exc:
+            raise RunbookError(f"Runbook mal formado: {exc}") from exc
+
+
+def _result_text(result: Mapping[str, Any]) -> str:
+    return "\n".join(
+        block["text"] for block in result.get("content", []) if isinstance(block.get("text"), str)
+    )
+
+
+def _truthy(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in {"true", "1", "yes", "si", "sí", "ja", "wahr"}
+    return bool(value)
+
+
+def extract_steps(
+    messages: Messages,
+    *,
+    command_tool: str = "remote_ssh_command",
+    transfer_tool: str = "remote_sftp_transfer",
+) -> list[RunbookStep]:
+    """Pasos remotos del último turno del usuario cuyo resultado fue correcto."""
+
+    prompt_index = None
+    for position in range(len(messages) - 1, -1, -1):
+        message = messages[position]
+        if message.get("role") == "user" and any(
+            isinstance(block.get("text"), str) and block["text"].strip()
+            for block in message.get("content", [])
+        ):
+            prompt_index = position
+            break
+    if prompt_index is None:
+        return []
+    turn = messages[prompt_index + 1 :]
+    results = {
+        block["toolResult"]["toolUseId"]: block["toolResult"]
+        for message in turn
+        for block in message.get("content", [])
+        if "toolResult" in block
+    }
+    # Las tools devuelven los fallos (sin conexión, cancelación...) como texto con
+    # estado correcto; solo cuentan los comandos que llegaron a ejecutarse.
+    exit_prefix = _("agent.tools.summary.exit_code", code="")
+    success_line = _("agent.tools.summary.exit_code", code=0)
+    steps: list[RunbookStep] = []
+    for message in turn:
+        if message.get("role") != "assistant":
+            continue
+        for block in message.get("content", []):
+            tool_use = block.get("toolUse")
+            if not tool_use:
+                continue
+            result = results.get(tool_use.get("toolUseId"))
+            if result is None or result.get("status") != "success":
+                continue
+            text = _result_text(result)
+            arguments = tool_use.get("input") or {}
+            if tool_use.get("name") == command_tool and arguments.get("command"):
+                if not text.startswith(exit_prefix):
+                    continue
+                timeout = arguments.get("timeout_seconds")
+                try:
+                    timeout_value = int(float(timeout)) if timeout not in (None, "") else None
+                except (TypeError, ValueError):
+                    timeout_value = None
+                steps.append(
+                    RunbookStep(
+                        kind="command",
+                        command=str(arguments["command"]),
+                        timeout_seconds=timeout_value,
+                        check=text.startswith(success_line),
+                    )
+                )
+            elif tool_use.get("name") == transfer_tool:
+                action = str(arguments.get("action", "")).strip().lower()
+                kind: StepKindLiteral | None = {
+                    "upload": "upload", "put": "upload", "download": "download", "get": "download"
+                }.get(action)  # type: ignore[assignment]
+                if kind is None or not text.startswith("✅"):
+                    continue
+                steps.append(
+                    RunbookStep(
+                        kind=kind,
+                        local_path=str(arguments.get("local_path", "")),
+                        remote_path=str(arguments.get("remote_path", "")),
+                        overwrite=_truthy(arguments.get("overwrite", False)),
+                    )
+                )
+    return steps
+
+
+def parameterize(
+    steps: Sequence[RunbookStep], params: Mapping[str, str]
+) -> tuple[RunbookStep, ...]:
+    """Sustituye cada valor literal de ``params`` por su marcador ``{{nombre}}``.
+
+    Los valores más largos se sustituyen primero para que ``/var/log/nginx`` no
+    quede partido por un parámetro ``/var/log``.
+    """
+
+    if _HOST_PARAM in params:
+        raise RunbookError(_("agent.runbooks.reserved_param", name=_HOST_PARAM))
+    ordered = sorted(params.items(), key=lambda item: len(item[1]), reverse=True)
+
+    def mark(text: str) -> str:
+        for name, value in ordered:
+            if value:
+                text = text.replace(value, "{{" + name + "}}")
+        return text
+
+    return tuple(
+        replace(
+            step,
+            command=mark(step.command),
+            local_path=mark(step.local_path),
+            remote_path=mark(step.remote_path),
+        )
+        for step in steps
+    )
+
+
+class RunbookStore:
+    """Runbooks guardados como un archivo JSON por nombre."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _path(self, name: str) -> Path:
+        if not _NAME_RE.match(name):
+            raise RunbookError(_("agent.runbooks.invalid_name", name=name))
+        return self.directory / f"{name}.json"
+
+    def save(self, runbook: Runbook) -> Path:
+        path = self._path(runbook.name)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(
+            json.dumps(runbook.to_payload(), ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        tmp_path.replace(path)
+        logger.info("Runbook '%s' guardado con %d pasos", runbook.name, len(runbook.steps))
+        return path
+
+    def load(self, name: str) -> Runbook:
+        path = self._path(name)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError as exc:
+            raise RunbookError(_("agent.runbooks.not_found", name=name)) from exc
+        except (OSError, json.JSONDecodeError) as exc:
+            raise RunbookError(f"No se pudo leer '{path}': {exc}") from exc
+        return Runbook.from_payload(payload)
+
+    def delete(self, name: str) -> None:
+        try:
+            self._path(name).unlink()
+        except FileNotFoundError as exc:
+            raise RunbookError(_("agent.runbooks.not_found", name=name)) from exc
+
+    def names(self) -> list[str]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(path.stem for path in self.directory.glob("*.json"))
+
+
+def new_runbook(
+    name: str,
+    steps: Sequence[RunbookStep],
+    params: Mapping[str, str] | None = None,
+    description: str = "",
+) -> Runbook:
+    if not steps:
+        raise RunbookError(_("agent.runbooks.no_steps"))
+    params = dict(params or {})
+    return Runbook(
+        name=name,
+        steps=parameterize(steps, params),
+        params=params,
+        description=description,
+        created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    )
+
+
+@dataclass(frozen=True)
+class StepReport:
+    step: RunbookStep
+    ok: bool
+    exit_code: int | None = None
+    output: str = ""
+
+
+@dataclass(frozen=True)
+class HostReport:
+    host: str
+    steps: tuple[StepReport, ...]
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and all(
+            report.ok or not report.step.check for report in self.steps
+        )
+
+
+class RunbookRunner:
+    """Reproduce runbooks sobre la conexión actual o abriendo una por host."""
+
+    def __init__(
+        self,
+        manager: SSHConnectionManager,
+        *,
+        default_timeout: int,
+        max_parallel_hosts: int = 4,
+        host_cache: HostCache | None = None,
+    ) -> None:
+        self._manager = manager
+        self._default_timeout = default_timeout
+        self._max_parallel_hosts = max(max_parallel_hosts, 1)
+        self._host_cache = host_cache
+
+    def run(
+        self,
+        runbook: Runbook,
+        hosts: Iterable[str] = (),
+        params: Mapping[str, str] | None = None,
+    ) -> list[HostReport]:
+        params = dict(params or {})
+        targets = list(dict.fromkeys(hosts))
+        if not targets:
+            details = self._manager.details
+            if details is None:
+                raise RunbookError(_("connection.errors.no_active_ssh"))
+            steps = runbook.resolve(details.host, params)
+            return [self._run_steps(self._manager, details.host, steps)]
+        # Se validan los parámetros antes de abrir ninguna conexión.
+        plans = [(host, runbook.resolve(host, params)) for host in targets]
+        if len(plans) > 1:
+            plans = [(host, self._separate_downloads(host, steps)) for host, steps in plans]
+        workers = min(len(plans), self._max_parallel_hosts)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="runbook") as pool:
+            return list(pool.map(lambda plan: self._run_on_host(*plan), plans))
+
+    @staticmethod
+    def _separate_downloads(host: str, steps: tuple[RunbookStep, ...]) -> tuple[RunbookStep, ...]:
+        # Con varios hosts, cada descarga va a su propio archivo local.
+        return tuple(
+            replace(step, local_path=f"{step.local_path}.{host}")
+            if step.kind == "download" and host not in step.local_path
+            else step
+            for step in steps
+        )
+
+    def _run_on_host(self, target: str, steps: tuple[RunbookStep, ...]) -> HostReport:
+        try:
+            manager = self._manager.open_sibling(target)
+        except ConnectionError as exc:
+            logger.warning("Runbook sin conexión con '%s': %s", target, exc)
+            return HostReport(target, (), str(exc))
+        try:
+            return self._run_steps(manager, target, steps)
+        finally:
+            try:
+                manager.disconnect()
+            except ConnectionError:  # pragma: no cover - depende del host remoto
+                logger.debug("La conexión con '%s' ya estaba cerrada", target)
+
+    def _run_steps(
+        self, manager: SSHConnectionManager, host: str, steps: tuple[RunbookStep, ...]
+    ) -> HostReport:
+        reports: list[StepReport] = []
+        for step in steps:
+            report = self._run_step(manager, step)
+            reports.append(report)
+            if not report.ok and step.check:
+                logger.warning("Runbook detenido en '%s': %s", host, step.describe())
+                break
+        return HostReport(host, tuple(reports))
+
+    def _run_step(self, manager: SSHConnectionManager, step: RunbookStep) -> StepReport:
+        # Como las tools, cada paso puede cambiar el host: su precarga deja de valer.
+        details = manager.details
+        if self._host_cache is not None and details is not None:
+            self._host_cache.invalidate(host_key(details))
+        try:
+            if step.kind == "command":
+                code, out, err = manager.run_command(
+                    step.command, timeout=step.timeout_seconds or self._default_timeout
+                )
+                output = "\n".join(part.strip() for part in (out, err) if part.strip())
+                return StepReport(step, code == 0, code, output)
+            if step.kind == "upload":
+                manager.upload_file(step.local_path, step.remote_path, overwrite=step.overwrite)
+                return StepReport(step, True)
+            local = manager.download_file(
+                step.remote_path, step.local_path, overwrite=step.overwrite
+            )
+            return StepReport(step, True, output=str(local))
+        except ConnectionError as exc:
+            return StepReport(step, False, output=str(exc))
+
+
+__all__ = [
+    "HostReport",
+    "Runbook",
+    "RunbookError",
+    "RunbookRunner",
+    "RunbookStep",
+    "RunbookStore",
+    "StepReport",
+    "extract_steps",
+    "new_runbook",
+    "parameterize",
+]
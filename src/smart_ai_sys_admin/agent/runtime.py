@@ -2,104 +2,99 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import re
-from contextlib import ExitStack
-from typing import Any
+import threading
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Literal
 
-from mcp import StdioServerParameters, stdio_client
-from mcp.client.sse import sse_client
-from mcp.client.streamable_http import streamablehttp_client
 from strands.agent.agent_result import AgentResult
-from strands.tools.mcp import MCPClient
 
 from ..connection import SSHConnectionManager
 from ..localization import _
 from .config import (
     AgentConfig,
     AgentConfigError,
-    MCPConfig,
-    MCPTransportConfig,
     ProviderBaseConfig,
     load_agent_config,
 )
-from .factory import AgentFactory
+from .executors import ToolExecutors
+from .factory import AgentFactory, ModelClientCache
+from .failover import FailoverModel
+from .jobs import RemoteJobManager
+from .mcp import MCPManager, MCPToolCatalog
+from .metrics import TurnMetrics
+from .model_router import RoutedModel
+from .parsers import default_parser_registry
 from .permissions import ToolPermissionManager
-from .tools import remote_ssh_command, resolve_tools
+from .prefetch import DEFAULT_PREFETCH_COMMANDS, HostCache, HostPrefetcher
+from .reload import ConfigChanges, diff_configs
+from .runbooks import Runbook, RunbookRunner, RunbookStore, extract_steps, new_runbook
+from .sessions import SessionRecorder, SessionStore, SessionStoreError
+from .tools import DEFAULT_REMOTE_TIMEOUT, resolve_tools
 
 
-class MCPManager:
-    """Gestiona la conexión con servidores MCP según la configuración."""
+StreamEventKind = Literal["text", "tool", "done", "error"]
+_THINK_BLOCK_RE = re.compile(r"<think>.*?</think>\s*", re.DOTALL | re.IGNORECASE)
 
-    def __init__(self, config: MCPConfig, logger: logging.Logger) -> None:
-        self._config = config
-        self._logger = logger
-        self._clients: list[MCPClient] = []
-        self._stack: ExitStack | None = None
 
-    def activate(self) -> list[Any]:
-        if not self._config.enabled or not self._config.transports:
-            return []
-        tools: list[Any] = []
-        self._stack = ExitStack()
-        for transport in self._config.transports:
-            try:
-                client = self._create_client(transport)
-            except Exception as exc:  # pragma: no cover - defensivo
-                self._logger.warning(
-                    "No se pudo crear el cliente MCP '%s': %s", transport.identifier, exc
-                )
-                continue
-            try:
-                self._stack.enter_context(client)
-            except Exception as exc:  # pragma: no cover - depende del entorno
-                self._logger.warning(
-                    "No se pudo iniciar el cliente MCP '%s': %s", transport.identifier, exc
-                )
+def _compact_count(value: int) -> str:
+    return f"{value / 1000:.1f}k" if value >= 1000 else str(value)
+
+
+@dataclass(frozen=True)
+class AgentStreamEvent:
+    """Evento emitido por :meth:`AgentRuntime.stream` hacia la interfaz."""
+
+    kind: StreamEventKind
+    text: str = ""
+
+
+class _ThinkingFilter:
+    """Elimina bloques ``<think>…</think>`` de un flujo de texto incremental."""
+
+    _OPEN = "<think>"
+    _CLOSE = "</think>"
+
+    def __init__(self, enabled: bool) -> None:
+        self._enabled = enabled
+        self._pending = ""
+        self._inside = False
+
+    def feed(self, chunk: str) -> str:
+        if not self._enabled:
+            return chunk
+        data = self._pending + chunk
+        self._pending = ""
+        visible: list[str] = []
+        while data:
+            tag = self._CLOSE if self._inside else self._OPEN
+            index = data.lower().find(tag)
+            if index >= 0:
+                if not self._inside:
+                    visible.append(data[:index])
+                data = data[index + len(tag) :]
+                self._inside = not self._inside
                 continue
-            self._clients.append(client)
-            try:
-                tools.extend(client.list_tools_sync())
-            except Exception as exc:  # pragma: no cover - depende del servidor MCP
-                self._logger.warning(
-                    "Error obteniendo herramientas del servidor MCP '%s': %s",
-                    transport.identifier,
-                    exc,
-                )
-        return tools
-
-    def close(self) -> None:
-        if self._stack:
-            self._stack.close()
-        self._stack = None
-        self._clients.clear()
-
-    def _create_client(self, cfg: MCPTransportConfig) -> MCPClient:
-        if cfg.transport_type == "stdio":
-            if not cfg.command:
-                raise ValueError("El transporte MCP 'stdio' requiere el campo 'command'.")
-            params = StdioServerParameters(
-                command=cfg.command,
-                args=list(cfg.args),
-                env=dict(cfg.env),
-                cwd=cfg.cwd,
-            )
-            return MCPClient(lambda: stdio_client(params))
-        if cfg.transport_type == "sse":
-            if not cfg.url:
-                raise ValueError("El transporte MCP 'sse' requiere el campo 'url'.")
-            return MCPClient(lambda: sse_client(cfg.url, headers=dict(cfg.headers)))
-        if cfg.transport_type == "streamable_http":
-            if not cfg.url:
-                raise ValueError("El transporte MCP 'streamable_http' requiere el campo 'url'.")
-            return MCPClient(
-                lambda: streamablehttp_client(
-                    cfg.url,
-                    headers=dict(cfg.headers),
-                    timeout=cfg.timeout_seconds,
-                )
-            )
-        raise ValueError(f"Tipo de transporte MCP no soportado: {cfg.transport_type}")
+            # Guardamos un posible prefijo de etiqueta partido entre fragmentos.
+            keep = self._partial_tag_length(data, tag)
+            if not self._inside:
+                visible.append(data[: len(data) - keep])
+            self._pending = data[len(data) - keep :] if keep else ""
+            break
+        return "".join(visible)
+
+    @staticmethod
+    def _partial_tag_length(data: str, tag: str) -> int:
+        lowered = data.lower()
+        for size in range(min(len(tag) - 1, len(data)), 0, -1):
+            if tag.startswith(lowered[-size:]):
+                return size
+        return 0
 
 
 class AgentRuntime:
@@ -109,31 +104,132 @@ class AgentRuntime:
         self,
         connection_manager: SSHConnectionManager,
         logger: logging.Logger | None = None,
+        resume_session: str | None = None,
+        permission_manager: ToolPermissionManager | None = None,
+        model_cache: ModelClientCache | None = None,
     ) -> None:
         self._connection_manager = connection_manager
+        # Con una caché común (modo servidor) los agentes comparten el cliente del modelo.
+        self._model_cache = model_cache
         self._logger = logger or logging.getLogger("smart_ai_sys_admin.agent.runtime")
         self._config: AgentConfig | None = None
         self._factory: AgentFactory | None = None
         self._mcp_manager: MCPManager | None = None
+        self._mcp_catalog: MCPToolCatalog | None = None
+        # Gestor MCP (nuevo o reconfigurado) pendiente de que el agente se construya.
+        self._mcp_pending: tuple[MCPManager, MCPToolCatalog] | None = None
+        # Cambios de catálogo detectados en segundo plano; se aplican antes del turno.
+        self._mcp_updates: list[tuple[MCPManager, list[str], list[Any]]] = []
+        self._mcp_updates_lock = threading.Lock()
+        self._executors: ToolExecutors | None = None
         self._agent = None
         self._status_message: str | None = None
         self._error_message: str | None = None
         self._ready = False
+        self._turn_active = False
         self._hide_thinking = False
-        self._permission_manager = ToolPermissionManager(logger=self._logger)
+        # Las pestañas comparten el gestor: los permisos son variables de entorno del proceso.
+        self._permission_manager = permission_manager or ToolPermissionManager(
+            logger=self._logger
+        )
+        self._resume_session = resume_session
+        self._session_recorder: SessionRecorder | None = None
+        self._session_notice: str | None = None
+        self._resumed_messages: list[dict[str, Any]] = []
+        self._runbook_store: RunbookStore | None = None
+        self._runbook_runner: RunbookRunner | None = None
+        self._prefetcher: HostPrefetcher | None = None
+        self._mcp_tools: list[Any] = []
 
     @property
     def ready(self) -> bool:
         return self._ready and self._agent is not None
 
+    @property
+    def busy(self) -> bool:
+        """Indica si hay un turno del agente en curso."""
+
+        return self._turn_active
+
     @property
     def status_message(self) -> str | None:
         return self._status_message
 
+    @property
+    def session_id(self) -> str | None:
+        return self._session_recorder.session_id if self._session_recorder else None
+
+    @property
+    def session_notice(self) -> str | None:
+        """Aviso sobre la reanudación de la sesión (restaurada o no encontrada)."""
+
+        return self._session_notice
+
+    def resumed_transcript(self, limit: int) -> list[tuple[str, str]]:
+        """Últimos ``limit`` mensajes con texto de la sesión reanudada, para el panel."""
+
+        entries: list[tuple[str, str]] = []
+        for message in self._resumed_messages:
+            text = "\n".join(
+                block["text"]
+                for block in message.get("content", [])
+                if isinstance(block.get("text"), str)
+            )
+            if message.get("role") == "assistant" and self._hide_thinking:
+                text = _THINK_BLOCK_RE.sub("", text)
+            if text.strip():
+                entries.append((message.get("role", "user"), text.strip()))
+        return entries[-limit:] if limit > 0 else []
+
     @property
     def error_message(self) -> str | None:
         return self._error_message
 
+    @property
+    def prefetcher(self) -> HostPrefetcher | None:
+        """Precarga de datos del host; ``None`` si está desactivada o no hay agente."""
+
+        return self._prefetcher if self.ready else None
+
+    @property
+    def runbook_store(self) -> RunbookStore | None:
+        return self._runbook_store
+
+    @property
+    def runbook_runner(self) -> RunbookRunner | None:
+        return self._runbook_runner
+
+    def record_runbook(self, name: str, params: dict[str, str]) -> Runbook:
+        """Guarda como runbook los pasos remotos del último turno del agente.
+
+        Lanza :class:`~.runbooks.RunbookError` si no hay almacén, si el turno no
+        ejecutó ningún paso remoto correcto o si el nombre no es válido.
+        """
+
+        if self._runbook_store is None or self._factory is None or self._agent is None:
+            raise RuntimeError("El agente no está disponible.")
+        if self._turn_active:
+            raise RuntimeError(_("agent.runbooks.turn_active"))
+        messages = self._agent.messages
+        steps = extract_steps(
+            messages,
+            command_tool=self._factory.remote_command.name or "remote_ssh_command",
+            transfer_tool=self._factory.sftp_transfer_name,
+        )
+        prompt = next(
+            (
+                block["text"].strip()
+                for message in reversed(messages)
+                if message.get("role") == "user"
+                for block in message.get("content", [])
+                if isinstance(block.get("text"), str) and block["text"].strip()
+            ),
+            "",
+        )
+        runbook = new_runbook(name, steps, params, description=prompt)
+        self._runbook_store.save(runbook)
+        return runbook
+
     # ------------------------------------------------------------------
     # Información de soporte para la interfaz
     # ------------------------------------------------------------------
@@ -165,6 +261,68 @@ class AgentRuntime:
             return f"{provider_label} · {model}"
         return summary
 
+    def metrics_footer_summary(self) -> str:
+        """Resumen compacto del último turno y del coste acumulado para el footer."""
+
+        recorder = getattr(self._agent, "turn_metrics", None)
+        if recorder is None or not recorder.last.turns:
+            return ""
+        last, session = recorder.last, recorder.session
+        cost = "" if session.cost is None else f" · ${session.cost:.4f}"
+        return _(
+            "connection.status.metrics",
+            input=_compact_count(last.total_input_tokens),
+            output=_compact_count(last.output_tokens),
+            seconds=f"{last.wall_seconds:.1f}",
+            cost=cost,
+        )
+
+    def agent_summary(self) -> dict[str, Any]:
+        """Resume el estado del agente para el comando `/status`."""
+
+        summary: dict[str, Any] = {
+            "ready": self.ready,
+            "streaming": bool(self._config and self._config.options.streaming),
+            "status": self._status_message,
+            "error": self._error_message,
+        }
+        if self._config:
+            summary["config_path"] = str(self._config.config_path)
+            try:
+                provider_cfg = self._config.provider_config()
+            except AgentConfigError:
+                summary["provider"] = self._config.provider
+            else:
+                summary["provider"] = self._format_provider_label(provider_cfg)
+                summary["model"] = getattr(provider_cfg, "model_id", None)
+        if self._executors:
+            summary["executors"] = self._executors.stats()
+        if self.session_id:
+            summary["session"] = self.session_id
+        cache_stats = getattr(self._agent, "prompt_cache_stats", None)
+        if cache_stats is not None and cache_stats.session.total:
+            summary["prompt_cache"] = cache_stats
+        chain = getattr(getattr(self._agent, "model", None), "model", None)
+        if isinstance(chain, RoutedModel):
+            summary["model_routing"] = {
+                "fast": chain.routes["fast"][0],
+                "strong": chain.routes["strong"][0],
+                "calls": dict(chain.calls),
+                "last": chain.last_route,
+            }
+            chain = chain.strong
+        if isinstance(chain, FailoverModel):
+            summary["failover"] = (
+                [name for name, _model in chain.models],
+                chain.last_provider,
+            )
+        turn_metrics = getattr(self._agent, "turn_metrics", None)
+        if turn_metrics is not None and turn_metrics.last.turns:
+            summary["metrics"] = turn_metrics
+        if self._prefetcher is not None:
+            summary["prefetch"] = self._prefetcher.cache
+        return summary
+
     def initialize(self) -> None:
         try:
             config = load_agent_config()
@@ -175,102 +333,514 @@ class AgentRuntime:
             )
             self._logger.error("Error cargando la configuración del agente: %s", exc)
             return
+        self._apply_config(config)
 
-        self._config = config
-        self._factory = AgentFactory(config)
+    @property
+    def watch_config(self) -> bool:
+        """Indica si la interfaz debe vigilar ``agent.conf`` y recargarlo al cambiar."""
+
+        return bool(self._config and self._config.options.watch_config)
+
+    @property
+    def config_path(self) -> Path | None:
+        return self._config.config_path if self._config else None
+
+    def reload(self) -> ConfigChanges | None:
+        """Vuelve a leer ``agent.conf`` y reconstruye solo lo que ha cambiado.
+
+        El historial, la conexión SSH, la sesión y los trabajos remotos se
+        conservan. Devuelve los cambios aplicados, o ``None`` si el agente no
+        estaba disponible y se ha inicializado desde cero. Lanza
+        :class:`AgentConfigError` si la configuración nueva no es válida (la
+        actual sigue en uso) y ``RuntimeError`` si hay un turno en curso o si
+        el agente no puede construirse.
+        """
+
+        if self._turn_active:
+            raise RuntimeError(_("agent.reload.turn_active"))
+        config = load_agent_config(self.config_path)
+        if self._config is None or self._agent is None:
+            self._error_message = None
+            self._apply_config(config)
+            if not self.ready:
+                raise RuntimeError(self._error_message or _("agent.reload.failed"))
+            return None
+        changes = diff_configs(self._config, config)
+        if changes:
+            self._apply_config(config, changes)
+            self._logger.info("Configuración recargada: %s", ", ".join(changes.changed))
+        else:
+            self._config = config
+        return changes
+
+    def new_conversation(self, *, keep_jobs: bool = True) -> None:
+        """Descarta el historial y empieza una conversación nueva.
+
+        Se conservan el cliente del modelo, las herramientas, los grupos de
+        hilos y la conexión; el gestor de conversación, las métricas y la
+        sesión se crean de nuevo. Lo usa el modo batch entre trabajos. Con
+        ``keep_jobs=False`` también se olvidan los trabajos remotos registrados,
+        p. ej. al pasar a otro host.
+        """
+
+        if self._turn_active:
+            raise RuntimeError(_("agent.reload.turn_active"))
+        if self._config is None or self._agent is None:
+            raise RuntimeError("El agente no está disponible.")
+        self._apply_config(
+            self._config, ConfigChanges(conversation=True, sessions=True), carry_history=False
+        )
+        if not keep_jobs:
+            self._agent.remote_jobs = RemoteJobManager(  # type: ignore[attr-defined]
+                self._connection_manager, self._logger
+            )
+
+    def _apply_config(
+        self,
+        config: AgentConfig,
+        changes: ConfigChanges | None = None,
+        *,
+        carry_history: bool = True,
+    ) -> None:
+        """Construye el agente para ``config``.
+
+        Sin ``changes`` es una inicialización completa. En una recarga se
+        reutiliza el agente actual como base: solo se reconstruyen los
+        componentes marcados en ``changes`` y, si la construcción falla, el
+        agente anterior sigue activo. Con ``carry_history`` el agente nuevo
+        hereda los mensajes y los acumulados de métricas del anterior.
+        """
+
+        previous = self._agent if changes is not None else None
+        factory = AgentFactory(config, self._model_cache)
         self._permission_manager.set_logger(self._logger)
         provider_cfg = config.provider_config()
-        self._hide_thinking = not provider_cfg.show_thinking
-
-        tool_name = self._factory.remote_command.name
-        if tool_name:
-            current_name: str | None = None
-            if hasattr(remote_ssh_command, "tool_name"):
-                try:
-                    current_name = remote_ssh_command.tool_name  # type: ignore[attr-defined]
-                except Exception:  # pragma: no cover - defensivo
-                    current_name = None
-            if current_name != tool_name:
-                if hasattr(remote_ssh_command, "tool_spec"):
-                    try:
-                        spec = remote_ssh_command.tool_spec  # type: ignore[attr-defined]
-                    except Exception:  # pragma: no cover - defensivo
-                        spec = None
-                    if isinstance(spec, dict):
-                        spec["name"] = tool_name
-                if hasattr(remote_ssh_command, "_tool_name"):
-                    remote_ssh_command._tool_name = tool_name  # type: ignore[attr-defined]
-
-        base_tools = list(resolve_tools())
-        self._mcp_manager = MCPManager(config.mcp, self._logger)
-        try:
-            mcp_tools = self._mcp_manager.activate()
-        except Exception as exc:  # pragma: no cover - defensivo
-            self._logger.error("Error activando transporte MCP: %s", exc)
-            mcp_tools = []
+        base_tools = resolve_tools(remote_command_name=factory.remote_command.name)
+        mcp_tools = self._activate_mcp(config, changes)
         all_tools = [*base_tools, *mcp_tools]
 
         try:
-            build = self._factory.build_agent(all_tools)
+            build = factory.build_agent(
+                all_tools,
+                previous,
+                reuse_model=changes is not None and not changes.model,
+                reuse_conversation=changes is not None
+                and not (changes.model or changes.conversation),
+            )
         except Exception as exc:  # pragma: no cover - depende del entorno
             self._logger.error("Error inicializando el agente Strands: %s", exc)
+            self._settle_mcp(mcp_tools, success=False)
+            if previous is not None:
+                raise RuntimeError(_("agent.reload.failed")) from exc
             self._error_message = (
                 "⚠️ No fue posible inicializar el agente Strands. Revisa los registros "
                 "para más detalles."
             )
             if self._mcp_manager:
                 self._mcp_manager.close()
-            self._permission_manager.restore()
+            self._permission_manager.release(self)
             return
 
-        self._agent = build.agent
+        self._settle_mcp(mcp_tools, success=True)
+        self._config = config
+        self._factory = factory
+        self._hide_thinking = not provider_cfg.show_thinking
+        # Los runbooks se reproducen sin modelo: disponibles aunque el proveedor falle.
+        self._runbook_store = RunbookStore(config.runbooks.directory)
+
+        agent = build.agent
+        if previous is not None and carry_history:
+            agent.messages[:] = previous.messages
+            self._carry_over_stats(previous, agent)
+        self._agent = agent
         # Compartimos la conexión SSH con la tool personalizada
-        self._agent.ssh_manager = self._connection_manager  # type: ignore[attr-defined]
-        timeout = self._factory.remote_command.timeout_seconds
+        agent.ssh_manager = self._connection_manager  # type: ignore[attr-defined]
+        if self._executors is None or changes is None or changes.executors:
+            if self._executors is not None:
+                self._executors.shutdown()
+            self._executors = ToolExecutors.from_config(config.tools.executors)
+        agent.tool_executors = self._executors  # type: ignore[attr-defined]
+        remote_jobs = getattr(previous, "remote_jobs", None)
+        agent.remote_jobs = remote_jobs or RemoteJobManager(  # type: ignore[attr-defined]
+            self._connection_manager, self._logger
+        )
+        timeout = factory.remote_command.timeout_seconds
         if timeout is not None:
-            self._agent.remote_command_timeout = timeout  # type: ignore[attr-defined]
-        max_output_chars = self._factory.remote_command.max_output_chars
+            agent.remote_command_timeout = timeout  # type: ignore[attr-defined]
+        max_output_chars = factory.remote_command.max_output_chars
         if max_output_chars is not None:
-            self._agent.remote_command_max_output_chars = max_output_chars  # type: ignore[attr-defined]
-        if self._factory.consent_bypass:
-            self._permission_manager.activate()
+            agent.remote_command_max_output_chars = max_output_chars  # type: ignore[attr-defined]
+        registry = None
+        if factory.remote_command.structured_output:
+            registry = default_parser_registry()
+            agent.remote_command_parsers = registry  # type: ignore[attr-defined]
+        prefetch = config.tools.prefetch
+        if changes is None or changes.tools:
+            self._prefetcher = None
+            if prefetch.enabled:
+                self._prefetcher = HostPrefetcher(
+                    self._connection_manager,
+                    HostCache(prefetch.ttl_seconds),
+                    prefetch.commands or DEFAULT_PREFETCH_COMMANDS,
+                    registry=registry,
+                    debounce_seconds=prefetch.debounce_ms / 1000,
+                )
+        if self._prefetcher is not None:
+            agent.host_cache = self._prefetcher.cache  # type: ignore[attr-defined]
+        self._runbook_runner = RunbookRunner(
+            self._connection_manager,
+            default_timeout=factory.remote_command.timeout_seconds or DEFAULT_REMOTE_TIMEOUT,
+            max_parallel_hosts=config.runbooks.max_parallel_hosts,
+            host_cache=self._prefetcher.cache if self._prefetcher is not None else None,
+        )
+        if factory.consent_bypass:
+            self._permission_manager.acquire(self)
         else:
-            self._permission_manager.restore()
+            self._permission_manager.release(self)
+        if changes is None or changes.sessions or self._session_recorder is None:
+            if self._session_recorder is not None:
+                self._session_recorder.close()
+                self._session_recorder = None
+            self._attach_session(config, provider_cfg)
+            if previous is not None and self._session_recorder is not None:
+                # La sesión nueva arranca con el historial que ya tenía el agente.
+                for message in agent.messages:
+                    self._session_recorder.record(message)
+        else:
+            agent.hooks.add_hook(self._session_recorder)
+        turn_metrics = getattr(agent, "turn_metrics", None)
+        if turn_metrics is not None:
+            turn_metrics.context = lambda: {"session": self.session_id}
+        self._error_message = None
         self._ready = True
         config_path = config.config_path
         self._status_message = f"✅ Agente Strands inicializado (configuración: `{config_path}`)"
 
-    def invoke(self, prompt: str) -> str:
+    def _activate_mcp(self, config: AgentConfig, changes: ConfigChanges | None) -> list[Any]:
+        """Devuelve las herramientas MCP, reutilizando los transportes sin cambios.
+
+        Los transportes activos no se retiran aquí: el cambio queda pendiente
+        hasta :meth:`_settle_mcp`, de modo que si el agente nuevo no se construye
+        el anterior conserva sus herramientas MCP funcionando.
+        """
+
+        self._mcp_pending = None
+        try:
+            # El catálogo se conserva entre reinicializaciones mientras no cambie su ruta.
+            catalog = self._mcp_catalog
+            if catalog is None or catalog.path != config.mcp.catalog_cache:
+                catalog = MCPToolCatalog.shared(config.mcp.catalog_cache, self._logger)
+            if self._mcp_manager is None or changes is None or catalog is not self._mcp_catalog:
+                manager = MCPManager(config.mcp, self._logger, catalog)
+                manager.on_catalog_change = partial(self._queue_mcp_update, manager)
+                self._mcp_pending = (manager, catalog)
+                return manager.activate()
+            if changes.mcp:
+                self._mcp_pending = (self._mcp_manager, catalog)
+                return self._mcp_manager.reconfigure(config.mcp)
+        except Exception as exc:  # pragma: no cover - defensivo
+            self._logger.error("Error activando transporte MCP: %s", exc)
+            return []
+        return self._mcp_tools
+
+    def _settle_mcp(self, tools: list[Any], *, success: bool) -> None:
+        """Confirma o deshace el cambio de MCP preparado por :meth:`_activate_mcp`."""
+
+        pending, self._mcp_pending = self._mcp_pending, None
+        if pending is not None:
+            manager, catalog = pending
+            if manager is self._mcp_manager:
+                if success:
+                    manager.commit()
+                else:
+                    manager.rollback()
+            elif success:
+                if self._mcp_manager is not None:
+                    self._mcp_manager.close()
+                self._mcp_manager, self._mcp_catalog = manager, catalog
+            else:
+                manager.close()
+        if success:
+            self._mcp_tools = tools
+
+    def _queue_mcp_update(self, manager: MCPManager, removed: list[str], tools: list[Any]) -> None:
+        with self._mcp_updates_lock:
+            self._mcp_updates.append((manager, removed, tools))
+
+    def _apply_mcp_updates(self) -> None:
+        """Sustituye en el agente las herramientas MCP cuyo catálogo cambió.
+
+        Se llama al empezar cada turno, cuando nadie lee el registro de
+        herramientas: se retiran los proxies obsoletos y se registran las
+        herramientas vivas del servidor.
+        """
+
+        with self._mcp_updates_lock:
+            updates, self._mcp_updates = self._mcp_updates, []
+        if self._agent is None:
+            return
+        registry = self._agent.tool_registry
+        for manager, removed, tools in updates:
+            if manager is not self._mcp_manager:
+                continue
+            replaced = set(removed) | {tool.tool_name for tool in tools}
+            for name in removed:
+                registry.registry.pop(name, None)
+                registry.dynamic_tools.pop(name, None)
+            for tool in tools:
+                if tool.tool_name in registry.registry:
+                    registry.replace(tool)
+                else:
+                    registry.register_tool(tool)
+            self._mcp_tools = [
+                *(tool for tool in self._mcp_tools if tool.tool_name not in replaced),
+                *tools,
+            ]
+            self._logger.info(
+                "Herramientas MCP actualizadas en el agente: %d registradas, %d retiradas",
+                len(tools),
+                len(removed),
+            )
+
+    @staticmethod
+    def _carry_over_stats(previous: Any, agent: Any) -> None:
+        """Mantiene los acumulados de métricas y caché del agente sustituido."""
+
+        for name in ("turn_metrics", "prompt_cache_stats"):
+            old, new = getattr(previous, name, None), getattr(agent, name, None)
+            if old is not None and new is not None:
+                new.last, new.session = old.last, old.session
+
+    @property
+    def last_turn_metrics(self) -> TurnMetrics | None:
+        """Métricas del último turno completado, o ``None`` si aún no hay ninguno."""
+
+        recorder = getattr(self._agent, "turn_metrics", None)
+        if recorder is None or not recorder.last.turns:
+            return None
+        return recorder.last
+
+    @property
+    def session_metrics(self) -> TurnMetrics | None:
+        """Acumulado de métricas de todos los turnos de la sesión."""
+
+        recorder = getattr(self._agent, "turn_metrics", None)
+        if recorder is None or not recorder.session.turns:
+            return None
+        return recorder.session
+
+    def invoke(self, prompt: str, *, raise_errors: bool = False) -> str:
+        """Ejecuta un turno completo; con ``raise_errors`` los fallos del agente se propagan."""
+
         if not self.ready:
             raise RuntimeError("El agente no está disponible.")
         assert self._agent is not None
+        self._turn_active = True
+        self._apply_mcp_updates()
         try:
             result = self._agent(prompt)
         except Exception as exc:  # pragma: no cover - depende del proveedor
             self._logger.exception("Error ejecutando el agente")
+            if raise_errors:
+                raise
             return f"❌ El agente falló al procesar la instrucción: {exc}"
+        finally:
+            self._turn_active = False
         if isinstance(result, AgentResult):
+            if result.stop_reason == "cancelled":
+                return self._finish_cancelled_turn()
             text = self._render_agent_result(result)
             return text or "(sin respuesta)"
         return str(result)
 
+    def cancel(self) -> bool:
+        """Cancela el turno en curso: stream del modelo, tools pendientes y comandos remotos."""
+
+        if not self._turn_active or self._agent is None:
+            return False
+        self._logger.info("Cancelación del turno solicitada por el usuario")
+        self._agent.cancel()
+        self._connection_manager.cancel_running_commands(self._agent)
+        return True
+
+    async def stream(self, prompt: str) -> AsyncIterator[AgentStreamEvent]:
+        """Ejecuta el agente y emite los fragmentos de texto según llegan.
+
+        El bucle de Strands se ejecuta en un hilo propio para que los proveedores
+        con clientes bloqueantes no congelen el bucle de eventos de la TUI. El
+        último evento es siempre ``done`` (respuesta final) o ``error``.
+        """
+
+        if not self.ready:
+            raise RuntimeError("El agente no está disponible.")
+        if not (self._config and self._config.options.streaming):
+            yield AgentStreamEvent("done", await asyncio.to_thread(self.invoke, prompt))
+            return
+        # Marcamos el turno antes de lanzar el hilo para que una cancelación
+        # inmediata no se pierda.
+        self._turn_active = True
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[AgentStreamEvent | None] = asyncio.Queue()
+
+        def emit(event: AgentStreamEvent | None) -> None:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+        def worker() -> None:
+            try:
+                asyncio.run(self._pump_stream(prompt, emit))
+            finally:
+                emit(None)
+
+        producer = asyncio.ensure_future(asyncio.to_thread(worker))
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            await producer
+
+    async def _pump_stream(
+        self, prompt: str, emit: Callable[[AgentStreamEvent | None], None]
+    ) -> None:
+        assert self._agent is not None
+        thinking = _ThinkingFilter(self._hide_thinking)
+        current_tool: str | None = None
+        result: Any = None
+        self._turn_active = True
+        self._apply_mcp_updates()
+        try:
+            async for event in self._agent.stream_async(prompt):
+                if "data" in event:
+                    visible = thinking.feed(str(event["data"]))
+                    if visible:
+                        emit(AgentStreamEvent("text", visible))
+                elif "current_tool_use" in event:
+                    tool_use = event["current_tool_use"] or {}
+                    tool_id = tool_use.get("toolUseId")
+                    if tool_id and tool_id != current_tool:
+                        current_tool = tool_id
+                        emit(AgentStreamEvent("tool", str(tool_use.get("name") or "")))
+                elif "result" in event:
+                    result = event["result"]
+        except Exception as exc:  # pragma: no cover - depende del proveedor
+            self._logger.exception("Error ejecutando el agente en modo streaming")
+            emit(AgentStreamEvent("error", f"❌ El agente falló al procesar la instrucción: {exc}"))
+            return
+        finally:
+            self._turn_active = False
+        if isinstance(result, AgentResult) and result.stop_reason == "cancelled":
+            emit(AgentStreamEvent("done", self._finish_cancelled_turn()))
+            return
+        text = self._render_agent_result(result) if isinstance(result, AgentResult) else ""
+        emit(AgentStreamEvent("done", text or "(sin respuesta)"))
+
+    def _finish_cancelled_turn(self) -> str:
+        self._repair_dangling_tool_uses()
+        return _("agent.runtime.cancelled")
+
+    def _repair_dangling_tool_uses(self) -> None:
+        """Cierra las `toolUse` sin resultado para que el historial siga siendo válido.
+
+        Los proveedores rechazan una conversación cuyo último mensaje del
+        asistente pide herramientas sin su `toolResult` correspondiente.
+        """
+
+        assert self._agent is not None
+        messages = self._agent.messages
+        if not messages or messages[-1].get("role") != "assistant":
+            return
+        pending = [
+            block["toolUse"]["toolUseId"]
+            for block in messages[-1].get("content", [])
+            if "toolUse" in block
+        ]
+        if not pending:
+            return
+        self._logger.info("Cerrando %d llamadas a herramientas interrumpidas", len(pending))
+        repair = {
+            "role": "user",
+            "content": [
+                {
+                    "toolResult": {
+                        "toolUseId": tool_use_id,
+                        "status": "error",
+                        "content": [{"text": "Cancelled by user"}],
+                    }
+                }
+                for tool_use_id in pending
+            ],
+        }
+        messages.append(repair)
+        if self._session_recorder:
+            self._session_recorder.record(repair)
+
     def _render_agent_result(self, result: AgentResult) -> str:
         text = str(result)
         if self._hide_thinking:
-            text = re.sub(r"<think>.*?</think>\s*", "", text, flags=re.DOTALL | re.IGNORECASE)
+            text = _THINK_BLOCK_RE.sub("", text)
         return text.strip()
 
     def shutdown(self) -> None:
+        self.cancel()
+        if self._session_recorder:
+            self._session_recorder.close()
         if self._mcp_manager:
             self._mcp_manager.close()
         self._mcp_manager = None
+        if self._executors:
+            self._executors.shutdown()
+        self._executors = None
         self._ready = False
-        self._permission_manager.restore()
+        self._permission_manager.release(self)
 
     # ------------------------------------------------------------------
     # Utilidades internas
     # ------------------------------------------------------------------
 
+    def _attach_session(self, config: AgentConfig, provider_cfg: ProviderBaseConfig) -> None:
+        """Conecta el registro de la conversación y restaura la sesión pedida."""
+
+        assert self._agent is not None
+        sessions = config.sessions
+        if not sessions.enabled:
+            if self._resume_session:
+                self._session_notice = _("agent.sessions.disabled")
+            self._resume_session = None
+            return
+        store = SessionStore(sessions.directory, sessions.segment_records)
+        session = None
+        if self._resume_session:
+            try:
+                session = store.open(self._resume_session)
+            except SessionStoreError as exc:
+                self._logger.warning("No se pudo reanudar la sesión: %s", exc)
+                self._session_notice = _(
+                    "agent.sessions.not_found", session=self._resume_session
+                )
+            else:
+                self._resumed_messages = session.tail_messages(sessions.resume_messages)
+                self._agent.messages[:] = self._resumed_messages
+                self._session_notice = _(
+                    "agent.sessions.resumed",
+                    session=session.session_id,
+                    count=len(self._resumed_messages),
+                    total=session.message_count,
+                )
+                self._logger.info(
+                    "Sesión %s reanudada con %d mensajes",
+                    session.session_id,
+                    len(self._resumed_messages),
+                )
+            # Solo se reanuda una vez; las reinicializaciones abren una sesión nueva.
+            self._resume_session = None
+        metadata = {
+            "provider": config.provider,
+            "model": getattr(provider_cfg, "model_id", None),
+        }
+        self._session_recorder = SessionRecorder(store, session, metadata)
+        self._agent.hooks.add_hook(self._session_recorder)
+        if session is not None:
+            self._repair_dangling_tool_uses()
+
     def _format_provider_label(self, provider_cfg: ProviderBaseConfig) -> str:
         mapping = {
             "bedrock": "Amazon Bedrock",
@@ -278,6 +848,7 @@ class AgentRuntime:
             "local": "Ollama",
             "lmstudio": "LM Studio",
             "cerebras": "Cerebras",
+            "cassette": "Cassette",
         }
 
         provider_key = self._config.provider if self._config else None
@@ -295,4 +866,4 @@ class AgentRuntime:
         return label or (provider_key or "")
 
 
-__all__ = ["AgentRuntime"]
+__all__ = ["AgentRuntime", "AgentStreamEvent"]
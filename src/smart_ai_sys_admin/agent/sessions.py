@@ -0,0 +1,303 @@
+"""Almacén persistente de conversaciones del agente.
+
+Cada sesión es un directorio con segmentos JSONL de solo anexado y un índice
+pequeño (``index.json``). Añadir un mensaje escribe una línea en el segmento
+activo, así que el coste no crece con la longitud de la sesión; al reanudar
+solo se leen los últimos segmentos necesarios para reconstruir la cola del
+historial. El índice se reescribe al crear la sesión y al rotar de segmento;
+si el proceso termina de forma abrupta, al abrirla se recuenta únicamente el
+último segmento.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import secrets
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any
+
+from strands.hooks import HookProvider, HookRegistry, MessageAddedEvent
+from strands.types.content import Message
+from strands.types.session import decode_bytes_values, encode_bytes_values
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.sessions")
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+LATEST_SESSION = "latest"
+_SESSION_ID_RE = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{4}$")
+_TITLE_CHARS = 80
+
+
+class SessionStoreError(RuntimeError):
+    """La sesión solicitada no existe o su índice no se puede leer."""
+
+
+@dataclass(frozen=True)
+class SessionInfo:
+    session_id: str
+    created_at: str
+    updated_at: str
+    title: str
+    messages: int
+    path: Path
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _message_text(message: Message) -> str:
+    return " ".join(
+        block["text"] for block in message.get("content", []) if isinstance(block.get("text"), str)
+    ).strip()
+
+
+class SessionLog:
+    """Sesión abierta: anexa registros y lee la cola del historial."""
+
+    def __init__(self, path: Path, index: dict[str, Any], segment_records: int) -> None:
+        self.path = path
+        self._index = index
+        self._segment_records = max(segment_records, 1)
+        self._lock = threading.Lock()
+        self._handle: IO[str] | None = None
+
+    @property
+    def session_id(self) -> str:
+        return self._index["id"]
+
+    @property
+    def message_count(self) -> int:
+        return sum(segment["messages"] for segment in self._index["segments"])
+
+    def info(self) -> SessionInfo:
+        return SessionInfo(
+            session_id=self.session_id,
+            created_at=self._index["created_at"],
+            updated_at=self._index["updated_at"],
+            title=self._index.get("title", ""),
+            messages=self.message_count,
+            path=self.path,
+        )
+
+    def append_message(self, message: Message) -> None:
+        title = _message_text(message) if message.get("role") == "user" else ""
+        self._append({"kind": "message", "message": encode_bytes_values(message)}, title)
+
+    def tail_messages(self, limit: int) -> list[Message]:
+        """Últimos ``limit`` mensajes, empezando en un prompt del usuario."""
+
+        collected: list[Message] = []
+        for segment in reversed(self._index["segments"]):
+            if len(collected) >= limit:
+                break
+            chunk = [
+                decode_bytes_values(record["message"])
+                for record in self._read_segment(segment["name"])
+                if record.get("kind") == "message"
+            ]
+            collected = chunk + collected
+        tail = collected[-limit:] if limit > 0 else []
+        # Un historial válido no puede empezar con resultados de herramientas huérfanos.
+        while tail and not (tail[0].get("role") == "user" and _message_text(tail[0])):
+            tail.pop(0)
+        return tail
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            self._write_index()
+
+    # ------------------------------------------------------------------
+    # Utilidades internas
+    # ------------------------------------------------------------------
+
+    def _append(self, record: dict[str, Any], title: str = "") -> None:
+        record["ts"] = _now()
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            if title and not self._index.get("title"):
+                # El primer prompt da título a la sesión en los listados.
+                self._index["title"] = title[:_TITLE_CHARS]
+                self._write_index()
+            segment = self._index["segments"][-1]
+            if segment["records"] >= self._segment_records:
+                segment = self._rotate()
+            if self._handle is None:
+                self._handle = (self.path / segment["name"]).open("a", encoding="utf-8")
+            self._handle.write(line + "\n")
+            self._handle.flush()
+            segment["records"] += 1
+            segment["messages"] += 1
+            self._index["updated_at"] = record["ts"]
+
+    def _rotate(self) -> dict[str, Any]:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        number = len(self._index["segments"]) + 1
+        segment = {"name": f"segment-{number:06d}.jsonl", "records": 0, "messages": 0}
+        self._index["segments"].append(segment)
+        self._write_index()
+        return segment
+
+    def _read_segment(self, name: str) -> list[dict[str, Any]]:
+        records: list[dict[str, Any]] = []
+        try:
+            with (self.path / name).open(encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Línea truncada por un cierre abrupto: se descarta.
+                        continue
+        except FileNotFoundError:
+            return []
+        return records
+
+    def _recount_last_segment(self) -> None:
+        segment = self._index["segments"][-1]
+        path = self.path / segment["name"]
+        if path.exists() and path.stat().st_size:
+            with path.open("rb+") as handle:
+                handle.seek(-1, 2)
+                if handle.read(1) != b"\n":
+                    # Cierra la línea truncada para que el siguiente registro no se pegue a ella.
+                    handle.write(b"\n")
+        records = self._read_segment(segment["name"])
+        segment["records"] = len(records)
+        segment["messages"] = sum(1 for record in records if record.get("kind") == "message")
+
+    def _write_index(self) -> None:
+        temporary = self.path / f"{INDEX_FILE}.tmp"
+        temporary.write_text(json.dumps(self._index, ensure_ascii=False), encoding="utf-8")
+        temporary.replace(self.path / INDEX_FILE)
+
+
+class SessionStore:
+    """Directorio raíz de las sesiones guardadas."""
+
+    def __init__(self, root: Path, segment_records: int = 500) -> None:
+        self.root = root
+        self.segment_records = segment_records
+
+    def create(self, metadata: dict[str, Any] | None = None) -> SessionLog:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        session_id = f"{stamp}-{secrets.token_hex(2)}"
+        path = self.root / session_id
+        path.mkdir(parents=True, exist_ok=False)
+        created = _now()
+        index = {
+            "version": INDEX_VERSION,
+            "id": session_id,
+            "created_at": created,
+            "updated_at": created,
+            "title": "",
+            "metadata": dict(metadata or {}),
+            "segments": [{"name": "segment-000001.jsonl", "records": 0, "messages": 0}],
+        }
+        log = SessionLog(path, index, self.segment_records)
+        log._write_index()
+        return log
+
+    def open(self, session_id: str) -> SessionLog:
+        if session_id == LATEST_SESSION:
+            sessions = self.list()
+            if not sessions:
+                raise SessionStoreError("No hay sesiones guardadas.")
+            session_id = sessions[0].session_id
+        if not _SESSION_ID_RE.match(session_id):
+            raise SessionStoreError(f"Identificador de sesión inválido: {session_id}")
+        path = self.root / session_id
+        index = self._read_index(path)
+        if index is None:
+            raise SessionStoreError(f"No existe la sesión '{session_id}'.")
+        log = SessionLog(path, index, self.segment_records)
+        log._recount_last_segment()
+        return log
+
+    def list(self) -> list[SessionInfo]:
+        if not self.root.is_dir():
+            return []
+        sessions: list[SessionInfo] = []
+        for path in self.root.iterdir():
+            if not _SESSION_ID_RE.match(path.name):
+                continue
+            index = self._read_index(path)
+            if index is not None:
+                sessions.append(SessionLog(path, index, self.segment_records).info())
+        return sorted(sessions, key=lambda info: info.updated_at, reverse=True)
+
+    @staticmethod
+    def _read_index(path: Path) -> dict[str, Any] | None:
+        try:
+            index = json.loads((path / INDEX_FILE).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        if index.get("version") != INDEX_VERSION or not index.get("segments"):
+            return None
+        return index
+
+
+class SessionRecorder(HookProvider):
+    """Registra en el almacén cada mensaje que Strands añade a la conversación.
+
+    La sesión se crea con el primer mensaje, para no dejar sesiones vacías al
+    abrir y cerrar la aplicación.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        session: SessionLog | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        self.store = store
+        self.session = session
+        self._metadata = dict(metadata or {})
+        self._lock = threading.Lock()
+
+    @property
+    def session_id(self) -> str | None:
+        return self.session.session_id if self.session else None
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(MessageAddedEvent, self._on_message_added)
+
+    def record(self, message: Message) -> None:
+        try:
+            with self._lock:
+                if self.session is None:
+                    self.session = self.store.create(self._metadata)
+                    logger.info("Sesión de conversación creada: %s", self.session.session_id)
+            self.session.append_message(message)
+        except OSError as exc:
+            logger.warning("No se pudo guardar el mensaje en la sesión: %s", exc)
+
+    def close(self) -> None:
+        if self.session is not None:
+            try:
+                self.session.close()
+            except OSError as exc:  # pragma: no cover - depende del sistema de ficheros
+                logger.warning("No se pudo cerrar la sesión: %s", exc)
+
+    def _on_message_added(self, event: MessageAddedEvent) -> None:
+        self.record(event.message)
+
+
+__all__ = [
+    "LATEST_SESSION",
+    "SessionInfo",
+    "SessionLog",
+    "SessionRecorder",
+    "SessionStore",
+    "SessionStoreError",
+]
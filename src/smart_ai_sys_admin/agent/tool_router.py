@@ -0,0 +1,287 @@
+"""Selección por relevancia de las herramientas que se envían al modelo.
+
+Con varios servidores MCP la lista completa de especificaciones ocupa decenas
+de KB en cada llamada. :class:`ToolRouter` mantiene un índice BM25 local sobre
+el nombre, la descripción y los parámetros de cada herramienta y, en cada
+llamada, expone solo las ``top_k`` más relevantes para el prompt y los
+mensajes recientes, además de las herramientas fijas (las SSH/SFTP propias y
+las que ya se usaron en el turno en curso).
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import AsyncIterable, Iterable, Sequence
+from typing import Any
+
+from strands.models.model import Model
+from strands.types.content import Message, Messages
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+logger = logging.getLogger("smart_ai_sys_admin.agent.tool_router")
+
+_WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+# Palabras vacías frecuentes en los prompts (es/en) que solo añaden ruido.
+_STOPWORDS = frozenset(
+    "the and for with from this that are can you to of in on is it "
+    "una uno los las del para por con que como esta este mas sus hay el la de en es se lo al un"
+    .split()
+)
+# Peso del nombre frente a la descripción: un acierto en el nombre es más fiable.
+_NAME_WEIGHT = 3
+
+
+def tokenize(text: str) -> list[str]:
+    """Normaliza ``text`` en términos: sin acentos, en minúsculas y sin plurales simples."""
+
+    folded = unicodedata.normalize("NFKD", text)
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    terms: list[str] = []
+    for word in _WORD_RE.findall(folded):
+        term = word.lower()
+        if len(term) < 2 or term in _STOPWORDS:
+            continue
+        if len(term) > 4 and term.endswith("s"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+class BM25Index:
+    """Índice BM25 en memoria sobre una lista fija de documentos tokenizados."""
+
+    def __init__(
+        self, documents: Sequence[Sequence[str]], k1: float = 1.5, b: float = 0.75
+    ) -> None:
+        self.k1 = k1
+        self.b = b
+        self._frequencies = [Counter(document) for document in documents]
+        self._lengths = [len(document) for document in documents]
+        total = sum(self._lengths)
+        self._average_length = total / len(documents) if documents else 0.0
+        document_frequency: Counter[str] = Counter()
+        for frequencies in self._frequencies:
+            document_frequency.update(frequencies.keys())
+        count = len(documents)
+        self._idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: Iterable[str]) -> list[float]:
+        terms = [term for term in set(query) if term in self._idf]
+        results: list[float] = []
+        for frequencies, length in zip(self._frequencies, self._lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self._average_length or 1.0))
+            score = 0.0
+            for term in terms:
+                tf = frequencies.get(term, 0)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+def _spec_document(spec: ToolSpec) -> list[str]:
+    terms = tokenize(spec.get("name", "")) * _NAME_WEIGHT
+    terms.extend(tokenize(spec.get("description", "") or ""))
+    schema = (spec.get("inputSchema") or {}).get("json") or {}
+    for name, prop in (schema.get("properties") or {}).items():
+        terms.extend(tokenize(name))
+        if isinstance(prop, dict) and isinstance(prop.get("description"), str):
+            terms.extend(tokenize(prop["description"]))
+    return terms
+
+
+def _message_text(message: Message) -> str:
+    return " ".join(
+        block["text"] for block in message.get("content", []) if isinstance(block.get("text"), str)
+    )
+
+
+class ToolRouter:
+    """Elige en cada llamada el subconjunto de herramientas que verá el modelo."""
+
+    def __init__(
+        self,
+        *,
+        top_k: int,
+        history_messages: int,
+        core_tools: Iterable[str],
+    ) -> None:
+        self.top_k = top_k
+        self.history_messages = history_messages
+        self.core_tools = frozenset(core_tools)
+        self.last_selection: tuple[str, ...] = ()
+        self.last_total = 0
+        self._index_key: tuple[str, ...] = ()
+        self._index: BM25Index | None = None
+        self._turn: tuple[int, str] | None = None
+        self._turn_choice: frozenset[str] = frozenset()
+
+    def select(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None,
+        tool_choice: Any = None,
+    ) -> list[ToolSpec] | None:
+        if not tool_specs:
+            return tool_specs
+        names = [spec["name"] for spec in tool_specs]
+        pinned = {name for name in names if name in self.core_tools}
+        pinned.update(self._tools_used_in_turn(messages))
+        if isinstance(tool_choice, dict) and "tool" in tool_choice:
+            pinned.add(tool_choice["tool"].get("name", ""))
+        if len(tool_specs) <= len(pinned) + self.top_k:
+            self._remember(names, len(names))
+            return tool_specs
+
+        # La selección se fija al empezar el turno: los ciclos siguientes (tras cada
+        # resultado de herramienta) reutilizan el mismo prefijo y aprovechan la caché.
+        turn = self._turn_marker(messages)
+        if turn is None or turn != self._turn or self._index_key != tuple(names):
+            scores = self._index_for(tool_specs, names).scores(self._query_terms(messages))
+            candidates = [
+                index
+                for index, score in enumerate(scores)
+                if score > 0 and names[index] not in pinned
+            ]
+            ranked = sorted(candidates, key=lambda index: -scores[index])
+            self._turn = turn
+            self._turn_choice = frozenset(names[index] for index in ranked[: self.top_k])
+        chosen = pinned | self._turn_choice
+        selected = [spec for spec in tool_specs if spec["name"] in chosen]
+        self._remember([spec["name"] for spec in selected], len(names))
+        logger.debug(
+            "Herramientas expuestas al modelo: %d de %d (%s)",
+            len(selected),
+            len(names),
+            ", ".join(self.last_selection),
+        )
+        return selected
+
+    def _remember(self, names: list[str], total: int) -> None:
+        self.last_selection = tuple(names)
+        self.last_total = total
+
+    def _index_for(self, tool_specs: list[ToolSpec], names: list[str]) -> BM25Index:
+        key = tuple(names)
+        if self._index is None or key != self._index_key:
+            self._index = BM25Index([_spec_document(spec) for spec in tool_specs])
+            self._index_key = key
+        return self._index
+
+    def _query_terms(self, messages: Messages) -> list[str]:
+        """Términos del último prompt y de los ``history_messages`` mensajes con texto previos."""
+
+        texts: list[str] = []
+        for message in reversed(messages):
+            text = _message_text(message)
+            if not text:
+                continue
+            texts.append(text)
+            if len(texts) > self.history_messages:
+                break
+        return tokenize(" ".join(texts))
+
+    @staticmethod
+    def _turn_marker(messages: Messages) -> tuple[int, str] | None:
+        """Posición y texto del último prompt del usuario, que identifican el turno."""
+
+        for position in range(len(messages) - 1, -1, -1):
+            message = messages[position]
+            if message.get("role") == "user":
+                text = _message_text(message)
+                if text:
+                    return position, text
+        return None
+
+    @staticmethod
+    def _tools_used_in_turn(messages: Messages) -> set[str]:
+        """Herramientas invocadas desde el último prompt del usuario."""
+
+        used: set[str] = set()
+        for message in reversed(messages):
+            for block in message.get("content", []):
+                tool_use = block.get("toolUse")
+                if tool_use:
+                    used.add(tool_use.get("name", ""))
+            if message.get("role") == "user" and _message_text(message):
+                break
+        return used
+
+
+class ToolLayoutModel(Model):
+    """Envuelve un modelo de Strands y fija cómo se le presentan las herramientas.
+
+    Las especificaciones se ordenan por nombre para que el prefijo de la petición
+    (herramientas y prompt de sistema) sea idéntico entre llamadas y reinicios,
+    requisito de la caché de prompts de los proveedores. Si hay un
+    :class:`ToolRouter`, además se filtran por relevancia.
+    """
+
+    def __init__(self, model: Model, router: ToolRouter | None = None) -> None:
+        self.model = model
+        self.router = router
+
+    def layout(
+        self, messages: Messages, tool_specs: list[ToolSpec] | None, tool_choice: Any = None
+    ) -> list[ToolSpec] | None:
+        if not tool_specs:
+            return tool_specs
+        ordered = sorted(tool_specs, key=lambda spec: spec["name"])
+        if self.router is None:
+            return ordered
+        return self.router.select(messages, ordered, tool_choice)
+
+    def __getattr__(self, name: str) -> Any:
+        # Atributos propios del proveedor (``config``, ``client``...) se delegan.
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    @property
+    def stateful(self) -> bool:
+        return self.model.stateful
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def structured_output(
+        self, output_model: Any, prompt: Messages, system_prompt: str | None = None, **kwargs: Any
+    ) -> Any:
+        return self.model.structured_output(
+            output_model, prompt, system_prompt=system_prompt, **kwargs
+        )
+
+    async def count_tokens(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> int:
+        selected = self.layout(messages, tool_specs)
+        return await self.model.count_tokens(messages, selected, *args, **kwargs)
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None = None,
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[StreamEvent]:
+        selected = self.layout(messages, tool_specs, kwargs.get("tool_choice"))
+        async for event in self.model.stream(messages, selected, system_prompt, **kwargs):
+            yield event
+
+
+__all__ = ["BM25Index", "ToolRouter", "ToolLayoutModel", "tokenize"]
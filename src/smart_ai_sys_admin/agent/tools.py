@@ -3,23 +3,69 @@
 from __future__ import annotations
 
 import asyncio
+import copy
 import logging
+import posixpath
 from collections.abc import Callable, Sequence
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Any
+from pathlib import Path
+from typing import Any, TypeVar
 
 from strands import tool
+from strands.tools.decorator import DecoratedFunctionTool
 from strands_tools import file_read, file_write, sleep
 from strands_tools import shell as shell_tool
 
 from ..connection import ConnectionError, NoActiveConnection, SSHConnectionManager
 from ..localization import _
+from .budget import TokenEstimator, ToolOutputBudget
+from .compaction import SpillStore
+from .executors import PoolNameLiteral, PoolSaturated, ToolExecutors, ToolRejected
+from .jobs import DEFAULT_OUTPUT_CHUNK_BYTES, RemoteJobManager, RemoteJobStatus, UnknownJob
+from .parsers import ParsePlan, ParserRegistry
+from .prefetch import CachedResult, HostCache, host_key
 
 ToolCallable = Callable[..., Any]
+_T = TypeVar("_T")
 
 
 DEFAULT_REMOTE_TIMEOUT = 900
 DEFAULT_MAX_PREVIEW_CHARS = 2000
+DEFAULT_RECALL_LINES = 200
+# Tokens reservados para las líneas fijas del resumen (código de salida, avisos).
+SUMMARY_OVERHEAD_TOKENS = 96
+# Caracteres aproximados por token al ajustar la lectura de trabajos al presupuesto.
+_CHARS_PER_TOKEN = 3
+
+
+async def _run_blocking(
+    agent: Any, pool: PoolNameLiteral, func: Callable[..., _T], *args: Any
+) -> _T:
+    """Ejecuta E/S bloqueante en el grupo de hilos dedicado de la tool."""
+
+    executors = getattr(agent, "tool_executors", None)
+    if isinstance(executors, ToolExecutors):
+        cancel_event = getattr(agent, "cancel_signal", None)
+        return await executors.run(pool, func, *args, cancel_event=cancel_event)
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def _invalidate_host_cache(agent: Any, manager: SSHConnectionManager) -> None:
+    """Descarta la precarga del host: la operación puede haber cambiado su estado."""
+
+    cache = getattr(agent, "host_cache", None)
+    details = manager.details
+    if isinstance(cache, HostCache) and details is not None:
+        cache.invalidate(host_key(details))
+
+
+def _rejected_message(exc: ToolRejected) -> str:
+    if isinstance(exc, PoolSaturated):
+        logger.warning("Grupo de hilos '%s' saturado (capacidad=%d)", exc.pool, exc.capacity)
+        return _("agent.tools.pool_saturated", pool=exc.pool, capacity=exc.capacity)
+    logger.info("Llamada descartada en el grupo '%s' por cancelación del turno", exc.pool)
+    return _("agent.tools.cancelled")
 
 
 @tool
@@ -62,84 +108,101 @@ async def remote_ssh_command(
 
     timeout_seconds = timeout_int
 
-    loop = asyncio.get_running_loop()
-
     logger.debug("remote_ssh_command ejecutando: '%s' (timeout=%ss)", command, timeout_seconds)
 
-    def _run() -> tuple[int, str, str]:
-        return manager.run_command(command, timeout=timeout_seconds)
+    details = manager.details
+    host = host_key(details) if details else None
+    registry = getattr(agent, "remote_command_parsers", None)
+    if not isinstance(registry, ParserRegistry):
+        registry = None
+    plan = registry.match(command, host=host) if registry else None
+
+    cache = getattr(agent, "host_cache", None)
+    cache_host = host if isinstance(cache, HostCache) else None
+    served: list[CachedResult] = []
+
+    def _execute(remote_command: str) -> tuple[int, str, str]:
+        if cache_host is not None:
+            entry = cache.get(cache_host, remote_command)
+            if entry is not None:
+                served.append(entry)
+                return entry.exit_code, entry.stdout, entry.stderr
+            cache.invalidate(cache_host)
+        # El agente es el propietario: cancelar su turno solo corta estos comandos.
+        return manager.run_command(remote_command, timeout=timeout_seconds, owner=agent)
+
+    def _run() -> tuple[int, str, str, ParsePlan | None]:
+        if plan is None:
+            return (*_execute(command), None)
+        code, out, err = _execute(plan.command)
+        if code != 0 and plan.rewrite_unsupported(err):
+            # El host no admite el modo JSON (versiones antiguas de iproute2 o
+            # util-linux): repetimos el comando tal como lo pidió el modelo y no
+            # volvemos a reescribirlo en este host.
+            logger.debug("Modo estructurado no disponible para '%s'; se reintenta", command)
+            if registry and host:
+                registry.disable_rewrite(host, plan.parser)
+            return (*_execute(command), None)
+        return code, out, err, plan
 
     try:
-        code, stdout, stderr = await loop.run_in_executor(None, _run)
+        code, stdout, stderr, applied_plan = await _run_blocking(agent, "ssh", _run)
+    except ToolRejected as exc:
+        return _rejected_message(exc)
     except NoActiveConnection as exc:
         logger.warning("remote_ssh_command sin conexión activa: %s", exc)
         return f"❌ {exc}"
     except ConnectionError as exc:
         logger.error("remote_ssh_command falló: %s", exc)
         return f"❌ {exc}"
+    summary: list[str] = [
+        _("agent.tools.summary.exit_code", code=code)
+    ]
+    if served and cache_host is not None:
+        logger.debug("remote_ssh_command servido desde la precarga: '%s'", command)
+        summary.append(_("agent.tools.summary.cached", age=round(cache.age(served[-1]))))
+    if applied_plan is not None and code == 0 and stdout.strip():
+        condensed = applied_plan.parse(stdout)
+        if condensed:
+            logger.debug(
+                "remote_ssh_command salida condensada por '%s': %d -> %d caracteres",
+                applied_plan.parser.name,
+                len(stdout),
+                len(condensed),
+            )
+            summary.append(
+                _("agent.tools.summary.structured", parser=applied_plan.parser.name)
+            )
+            stdout = condensed
     raw_stdout = stdout or ""
     raw_stderr = stderr or ""
     output = raw_stdout.strip()
     error = raw_stderr.strip()
-    summary: list[str] = [
-        _("agent.tools.summary.exit_code", code=code)
-    ]
     max_output_chars = getattr(agent, "remote_command_max_output_chars", None)
     try:
         limit = int(max_output_chars) if max_output_chars is not None else None
     except (TypeError, ValueError):
         limit = None
 
-    def _preview_length(max_chars: int) -> int:
-        if max_chars <= 0:
-            return 0
-        calculated = max_chars // 50
-        if calculated <= 0:
-            calculated = max_chars if max_chars < DEFAULT_MAX_PREVIEW_CHARS else DEFAULT_MAX_PREVIEW_CHARS
-        return min(DEFAULT_MAX_PREVIEW_CHARS, max(calculated, 200))
-
-    if output:
-        if limit is not None and limit > 0 and len(raw_stdout) > limit:
-            logger.warning(
-                "remote_ssh_command salida truncada: tamaño=%d, límite=%d",
-                len(raw_stdout),
-                limit,
-            )
-            summary.append(
-                _("agent.tools.summary.stdout_truncated", limit=limit)
-            )
-            preview_len = _preview_length(limit)
-            if preview_len > 0:
-                preview = raw_stdout[:preview_len].strip()
-                if preview:
-                    summary.append(
-                        _("agent.tools.summary.stdout_preview") + "\n" + preview
-                    )
-        else:
-            summary.append(
-                _("agent.tools.summary.stdout") + "\n" + output
-            )
-    if error:
-        if limit is not None and limit > 0 and len(raw_stderr) > limit:
-            logger.warning(
-                "remote_ssh_command stderr truncado: tamaño=%d, límite=%d",
-                len(raw_stderr),
-                limit,
-            )
-            summary.append(
-                _("agent.tools.summary.stderr_truncated", limit=limit)
-            )
-            preview_len = _preview_length(limit)
-            if preview_len > 0:
-                preview = raw_stderr[:preview_len].strip()
-                if preview:
-                    summary.append(
-                        _("agent.tools.summary.stderr_preview") + "\n" + preview
-                    )
-        else:
-            summary.append(
-                _("agent.tools.summary.stderr") + "\n" + error
-            )
+    budget = getattr(agent, "tool_output_budget", None)
+    estimator: TokenEstimator | None = None
+    stdout_tokens: int | None = None
+    stderr_tokens: int | None = None
+    if isinstance(budget, ToolOutputBudget):
+        # Reservamos como máximo un tercio del presupuesto para stderr cuando
+        # ambos flujos tienen contenido; el resto queda para stdout.
+        estimator = budget.estimator
+        allowance = max(budget.allowance() - SUMMARY_OVERHEAD_TOKENS, 0)
+        error_need = estimator.count(error)
+        stderr_tokens = min(error_need, allowance // 3) if output else allowance
+        stdout_tokens = allowance - stderr_tokens if error else allowance
+
+    summary.extend(
+        _summarize_stream("stdout", raw_stdout, limit, estimator, stdout_tokens)
+    )
+    summary.extend(
+        _summarize_stream("stderr", raw_stderr, limit, estimator, stderr_tokens)
+    )
     if not output and not error:
         summary.append(_("agent.tools.summary.empty"))
     stdout_preview = stdout.strip()
@@ -157,6 +220,60 @@ async def remote_ssh_command(
     return "\n\n".join(summary)
 
 
+def _preview_length(max_chars: int) -> int:
+    if max_chars <= 0:
+        return 0
+    calculated = max_chars // 50
+    if calculated <= 0:
+        calculated = min(max_chars, DEFAULT_MAX_PREVIEW_CHARS)
+    return min(DEFAULT_MAX_PREVIEW_CHARS, max(calculated, 200))
+
+
+def _summarize_stream(
+    kind: str,
+    raw: str,
+    limit: int | None,
+    estimator: TokenEstimator | None,
+    max_tokens: int | None,
+) -> list[str]:
+    """Formatea stdout/stderr respetando el límite de caracteres y de tokens."""
+
+    text = raw.strip()
+    if not text:
+        return []
+    if limit is not None and limit > 0 and len(raw) > limit:
+        logger.warning(
+            "remote_ssh_command %s truncado: tamaño=%d, límite=%d",
+            kind,
+            len(raw),
+            limit,
+        )
+        lines = [_(f"agent.tools.summary.{kind}_truncated", limit=limit)]
+        # La vista previa respeta el límite de caracteres y, además, el de tokens.
+        preview = raw[: _preview_length(limit)]
+        if estimator is not None and max_tokens is not None:
+            preview = estimator.head(preview, max_tokens)
+        preview = preview.strip()
+        if preview:
+            lines.append(_(f"agent.tools.summary.{kind}_preview") + "\n" + preview)
+        return lines
+    if estimator is not None and max_tokens is not None:
+        total = estimator.count(text)
+        if total > max_tokens:
+            fitted = estimator.fit(text, max_tokens)
+            shown = estimator.count(fitted)
+            logger.warning(
+                "remote_ssh_command %s ajustado al presupuesto: %d de %d tokens",
+                kind,
+                shown,
+                total,
+            )
+            return [
+                _(f"agent.tools.summary.{kind}_budget", shown=shown, total=total) + "\n" + fitted
+            ]
+    return [_(f"agent.tools.summary.{kind}") + "\n" + text]
+
+
 @tool
 async def remote_sftp_transfer(
     action: str,
@@ -197,8 +314,6 @@ async def remote_sftp_transfer(
         else str(overwrite).lower() in truthy_values
     )
 
-    loop = asyncio.get_running_loop()
-
     logger.debug(
         "remote_sftp_transfer ejecutando acción=%s local='%s' remote='%s' overwrite=%s",
         direction,
@@ -207,15 +322,31 @@ async def remote_sftp_transfer(
         overwrite_flag,
     )
 
+    executors = getattr(agent, "tool_executors", None)
+    # Solo se serializan las transferencias que escriben en el mismo destino.
+    if direction == "upload":
+        lock_key = ("remote", posixpath.normpath(remote_path))
+    else:
+        lock_key = ("local", str(Path(local_path).expanduser().resolve()))
+    write_lock = (
+        executors.path_locks.hold(lock_key)
+        if isinstance(executors, ToolExecutors)
+        else nullcontext()
+    )
+
     def _run() -> str:
-        if direction == "upload":
-            manager.upload_file(local_path, remote_path, overwrite=overwrite_flag)
-            return _(
-                "agent.tools.transfer.upload_success",
-                local=local_path,
-                remote=remote_path,
+        with write_lock:
+            if direction == "upload":
+                _invalidate_host_cache(agent, manager)
+                manager.upload_file(local_path, remote_path, overwrite=overwrite_flag)
+                return _(
+                    "agent.tools.transfer.upload_success",
+                    local=local_path,
+                    remote=remote_path,
+                )
+            local_result = manager.download_file(
+                remote_path, local_path, overwrite=overwrite_flag
             )
-        local_result = manager.download_file(remote_path, local_path, overwrite=overwrite_flag)
         return _(
             "agent.tools.transfer.download_success",
             remote=remote_path,
@@ -223,7 +354,9 @@ async def remote_sftp_transfer(
         )
 
     try:
-        return await loop.run_in_executor(None, _run)
+        return await _run_blocking(agent, "sftp", _run)
+    except ToolRejected as exc:
+        return _rejected_message(exc)
     except NoActiveConnection as exc:
         logger.warning("remote_sftp_transfer sin conexión activa: %s", exc)
         return f"❌ {exc}"
@@ -232,6 +365,228 @@ async def remote_sftp_transfer(
         return f"❌ {exc}"
 
 
+def _job_manager(agent: Any) -> RemoteJobManager | str:
+    """Devuelve el gestor de trabajos o el mensaje de error para el modelo."""
+
+    manager = getattr(agent, "ssh_manager", None)
+    jobs = getattr(agent, "remote_jobs", None)
+    if not isinstance(manager, SSHConnectionManager) or not isinstance(jobs, RemoteJobManager):
+        return _("agent.tools.ssh_unavailable")
+    if not manager.is_connected:
+        return _("agent.tools.ssh_inactive")
+    return jobs
+
+
+def _describe_job(status: RemoteJobStatus) -> str:
+    job = status.job
+    params = {
+        "job_id": job.job_id,
+        "pid": job.pid,
+        "elapsed": status.elapsed_seconds,
+        "size": status.output_size,
+        "code": status.exit_code if status.exit_code is not None else "?",
+    }
+    return _(f"agent.tools.jobs.state_{status.state}", **params)
+
+
+@tool
+async def remote_job_start(command: str, agent: Any) -> str:
+    """Lanza un comando largo en segundo plano en el servidor remoto.
+
+    Úsalo para tareas que pueden tardar minutos (actualizaciones de paquetes,
+    copias de seguridad, compilaciones). Devuelve un identificador de trabajo
+    que se consulta con `remote_job_status` y `remote_job_output`. Solo para
+    hosts POSIX (GNU/Linux, Unix).
+
+    Args:
+        command: instrucción de shell a ejecutar de forma desacoplada.
+        agent: referencia interna del agente Strands (inyectada automáticamente).
+    """
+
+    jobs = _job_manager(agent)
+    if isinstance(jobs, str):
+        return jobs
+    _invalidate_host_cache(agent, agent.ssh_manager)
+    try:
+        job = await _run_blocking(agent, "ssh", jobs.start, command)
+    except ToolRejected as exc:
+        return _rejected_message(exc)
+    except ConnectionError as exc:
+        logger.error("remote_job_start falló: %s", exc)
+        return f"❌ {exc}"
+    return _(
+        "agent.tools.jobs.started",
+        job_id=job.job_id,
+        host=job.host,
+        pid=job.pid,
+        path=f"{job.remote_dir}/output.log",
+    )
+
+
+@tool
+async def remote_job_status(agent: Any, job_id: str | None = None) -> str:
+    """Consulta el estado de un trabajo remoto o lista todos los de la sesión.
+
+    Args:
+        agent: referencia interna del agente Strands (inyectada automáticamente).
+        job_id: identificador devuelto por `remote_job_start`. Si se omite, se
+            listan todos los trabajos lanzados.
+    """
+
+    jobs = _job_manager(agent)
+    if isinstance(jobs, str):
+        return jobs
+    if job_id:
+        targets = [job_id]
+    else:
+        targets = [job.job_id for job in jobs.current_jobs]
+        if not targets:
+            return _("agent.tools.jobs.none")
+    lines: list[str] = []
+    for target in targets:
+        try:
+            status = await _run_blocking(agent, "ssh", jobs.status, target)
+        except ToolRejected as exc:
+            return _rejected_message(exc)
+        except UnknownJob:
+            lines.append(_("agent.tools.jobs.unknown", job_id=target))
+            continue
+        except ConnectionError as exc:
+            logger.error("remote_job_status falló: %s", exc)
+            return f"❌ {exc}"
+        lines.append(_describe_job(status))
+    return "\n".join(lines)
+
+
+@tool
+async def remote_job_output(
+    job_id: str,
+    agent: Any,
+    offset: int | str | None = None,
+    max_bytes: int | str | None = None,
+) -> str:
+    """Lee la salida nueva (stdout y stderr combinados) de un trabajo remoto.
+
+    Cada llamada continúa donde terminó la anterior, de modo que solo se
+    recibe lo producido desde la última consulta.
+
+    Args:
+        job_id: identificador devuelto por `remote_job_start`.
+        agent: referencia interna del agente Strands (inyectada automáticamente).
+        offset: opcional, byte desde el que leer (0 relee desde el principio).
+        max_bytes: opcional, tamaño máximo del fragmento devuelto.
+    """
+
+    jobs = _job_manager(agent)
+    if isinstance(jobs, str):
+        return jobs
+    try:
+        start = int(offset) if offset not in (None, "") else None
+        chunk = int(max_bytes) if max_bytes not in (None, "") else DEFAULT_OUTPUT_CHUNK_BYTES
+    except (TypeError, ValueError):
+        return _("agent.tools.jobs.invalid_number")
+    budget = getattr(agent, "tool_output_budget", None)
+    if isinstance(budget, ToolOutputBudget):
+        # Leemos solo lo que cabe en el presupuesto para no perder bytes al recortar.
+        allowance = max(budget.allowance() - SUMMARY_OVERHEAD_TOKENS, 0)
+        chunk = min(chunk, max(allowance * _CHARS_PER_TOKEN, 1))
+    try:
+        result = await _run_blocking(
+            agent, "ssh", lambda: jobs.read_output(job_id, offset=start, max_bytes=chunk)
+        )
+    except ToolRejected as exc:
+        return _rejected_message(exc)
+    except UnknownJob:
+        return _("agent.tools.jobs.unknown", job_id=job_id)
+    except ConnectionError as exc:
+        logger.error("remote_job_output falló: %s", exc)
+        return f"❌ {exc}"
+    parts = [_describe_job(result.status)]
+    text = result.text.rstrip()
+    if text:
+        parts.append(
+            _(
+                "agent.tools.jobs.output",
+                start=result.start,
+                end=result.end,
+                size=result.status.output_size,
+            )
+            + "\n"
+            + text
+        )
+    else:
+        parts.append(_("agent.tools.jobs.no_output", offset=result.start))
+    if result.pending:
+        parts.append(_("agent.tools.jobs.pending", offset=result.end))
+    return "\n\n".join(parts)
+
+
+@tool
+async def remote_job_cancel(job_id: str, agent: Any) -> str:
+    """Detiene un trabajo remoto lanzado con `remote_job_start`.
+
+    Args:
+        job_id: identificador del trabajo a cancelar.
+        agent: referencia interna del agente Strands (inyectada automáticamente).
+    """
+
+    jobs = _job_manager(agent)
+    if isinstance(jobs, str):
+        return jobs
+    try:
+        job = await _run_blocking(agent, "ssh", jobs.cancel, job_id)
+    except ToolRejected as exc:
+        return _rejected_message(exc)
+    except UnknownJob:
+        return _("agent.tools.jobs.unknown", job_id=job_id)
+    except ConnectionError as exc:
+        logger.error("remote_job_cancel falló: %s", exc)
+        return f"❌ {exc}"
+    return _("agent.tools.jobs.cancelled", job_id=job.job_id, pid=job.pid)
+
+
+@tool
+async def recall_tool_output(
+    handle: int | str,
+    agent: Any,
+    start_line: int | str | None = None,
+    max_lines: int | str | None = None,
+) -> str:
+    """Recupera la salida completa de una herramienta que se compactó en el historial.
+
+    Los resultados antiguos se sustituyen por un resumen con un identificador
+    (`handle`); esta herramienta devuelve el texto original por tramos de líneas.
+
+    Args:
+        handle: identificador indicado en el resumen compactado.
+        agent: referencia interna del agente Strands (inyectada automáticamente).
+        start_line: opcional, primera línea a devolver (1 por defecto).
+        max_lines: opcional, número máximo de líneas (200 por defecto).
+    """
+
+    spill = getattr(agent, "spill_store", None)
+    if not isinstance(spill, SpillStore):
+        return _("agent.tools.recall.unavailable")
+    try:
+        first = max(int(start_line), 1) if start_line not in (None, "") else 1
+        count = int(max_lines) if max_lines not in (None, "") else DEFAULT_RECALL_LINES
+        text = await _run_blocking(agent, "local", spill.get, int(handle))
+    except ToolRejected as exc:
+        return _rejected_message(exc)
+    except (TypeError, ValueError):
+        return _("agent.tools.recall.invalid_number")
+    if text is None:
+        return _("agent.tools.recall.unknown", handle=handle)
+    lines = text.splitlines()
+    chunk = "\n".join(lines[first - 1 : first - 1 + max(count, 1)])
+    budget = getattr(agent, "tool_output_budget", None)
+    if isinstance(budget, ToolOutputBudget):
+        chunk = budget.estimator.fit(chunk, max(budget.allowance() - SUMMARY_OVERHEAD_TOKENS, 0))
+    last = min(first - 1 + max(count, 1), len(lines))
+    header = _("agent.tools.recall.header", handle=handle, start=first, end=last, total=len(lines))
+    return f"{header}\n{chunk}" if chunk else header
+
+
 @tool
 async def local_datetime(agent: Any) -> str:  # noqa: ARG001 - agente inyectado
     """Devuelve la fecha y hora locales de la aplicación en formato ISO 8601."""
@@ -248,11 +603,50 @@ DEFAULT_STRANDS_TOOLS: tuple[ToolCallable, ...] = (
     local_datetime,
     remote_ssh_command,
     remote_sftp_transfer,
+    remote_job_start,
+    remote_job_status,
+    remote_job_output,
+    remote_job_cancel,
+    recall_tool_output,
 )
 
 
-def resolve_tools(custom_tools: Sequence[ToolCallable] | None = None) -> list[ToolCallable]:
+def renamed_tool(tool_obj: DecoratedFunctionTool, name: str) -> DecoratedFunctionTool:
+    """Copia de ``tool_obj`` expuesta con otro nombre.
+
+    La instancia del módulo no se modifica: cada agente puede dar su propio
+    nombre a la misma función sin afectar a los demás.
+    """
+
+    if tool_obj.tool_name == name:
+        return tool_obj
+    spec = copy.deepcopy(tool_obj.tool_spec)
+    spec["name"] = name
+    return DecoratedFunctionTool(name, spec, tool_obj._tool_func, tool_obj._metadata)
+
+
+def builtin_tool_names(remote_command_name: str | None = None) -> tuple[str, ...]:
+    """Nombres con los que Strands registra las herramientas propias."""
+
+    names: list[str] = []
+    for tool_obj in resolve_tools(remote_command_name=remote_command_name):
+        if isinstance(tool_obj, DecoratedFunctionTool):
+            names.append(tool_obj.tool_name)
+        else:
+            # Los módulos de strands_tools se registran con el nombre del módulo.
+            names.append(tool_obj.__name__.rpartition(".")[2])
+    return tuple(names)
+
+
+def resolve_tools(
+    custom_tools: Sequence[ToolCallable] | None = None,
+    *,
+    remote_command_name: str | None = None,
+) -> list[ToolCallable]:
     combined = list(DEFAULT_STRANDS_TOOLS)
+    if remote_command_name:
+        index = combined.index(remote_ssh_command)
+        combined[index] = renamed_tool(remote_ssh_command, remote_command_name)
     if custom_tools:
         combined.extend(custom_tools)
     return combined
@@ -261,9 +655,16 @@ def resolve_tools(custom_tools: Sequence[ToolCallable] | None = None) -> list[To
 __all__ = [
     "DEFAULT_STRANDS_TOOLS",
     "DEFAULT_REMOTE_TIMEOUT",
+    "builtin_tool_names",
     "local_datetime",
+    "recall_tool_output",
+    "remote_job_cancel",
+    "remote_job_output",
+    "remote_job_start",
+    "remote_job_status",
     "remote_ssh_command",
     "remote_sftp_transfer",
+    "renamed_tool",
     "resolve_tools",
 ]
 logger = logging.getLogger("smart_ai_sys_admin.agent.tools")
@@ -0,0 +1,439 @@
+"""Modo batch: ejecuta prompts del agente en muchos hosts sin la interfaz TUI.
+
+Cada trabajo es un par host × prompt y corre en una conversación nueva. Los
+hosts se reparten entre ``concurrency`` trabajadores; cada trabajador tiene su
+propio :class:`~.agent.AgentRuntime` (un cliente del modelo, sus herramientas y
+su conexión SSH), abre una sola conexión por host y ejecuta sus prompts en
+orden. Los resultados se escriben como JSON Lines a medida que terminan,
+con el uso de tokens y los tiempos de cada turno.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, TextIO
+
+from .agent import AgentRuntime, ToolPermissionManager
+from .connection import ConnectionError, SSHConnectionManager
+from .localization import _
+
+logger = logging.getLogger("smart_ai_sys_admin.batch")
+
+DEFAULT_BATCH_CONCURRENCY = 4
+
+
+class BatchError(Exception):
+    """Error en el inventario, los prompts o la preparación del modo batch."""
+
+
+@dataclass(frozen=True)
+class HostTarget:
+    """Host del inventario con los datos necesarios para conectarse."""
+
+    host: str
+    username: str
+    port: int = 22
+    key_path: str | None = None
+    password: str | None = field(default=None, repr=False)
+
+    @property
+    def label(self) -> str:
+        return f"{self.username}@{self.host}:{self.port}"
+
+
+@dataclass(frozen=True)
+class HostDefaults:
+    """Valores que se aplican a los hosts del inventario que no los indican."""
+
+    username: str | None = None
+    port: int = 22
+    key_path: str | None = None
+    password_env: str | None = None
+
+
+def parse_target(text: str, defaults: HostDefaults) -> HostTarget:
+    """Interpreta ``[usuario@]host[:puerto]`` completando con ``defaults``."""
+
+    return target_from_entry({"host": text.strip()}, defaults)
+
+
+def target_from_entry(entry: dict[str, Any], defaults: HostDefaults) -> HostTarget:
+    """Construye un :class:`HostTarget` a partir de una entrada del inventario."""
+
+    raw_host = str(entry.get("host") or "").strip()
+    username, _sep, host = raw_host.rpartition("@")
+    host, _sep, port_text = host.partition(":")
+    if not host:
+        raise BatchError(_("batch.errors.invalid_host", host=raw_host))
+    username = str(entry.get("user") or entry.get("username") or username or "")
+    username = username or defaults.username or ""
+    if not username:
+        raise BatchError(_("batch.errors.missing_user", host=host))
+    try:
+        port = int(entry.get("port") or port_text or defaults.port)
+    except ValueError as exc:
+        raise BatchError(_("batch.errors.invalid_host", host=raw_host)) from exc
+    password_env = entry.get("password_env") or defaults.password_env
+    password = os.environ.get(password_env) if password_env else None
+    key_path = entry.get("key") or entry.get("key_path") or defaults.key_path
+    if not key_path and not password:
+        raise BatchError(_("batch.errors.missing_secret", host=host))
+    return HostTarget(
+        host=host,
+        username=username,
+        port=port,
+        key_path=str(Path(key_path).expanduser()) if key_path else None,
+        password=password,
+    )
+
+
+def load_inventory(path: Path, defaults: HostDefaults) -> list[HostTarget]:
+    """Lee el inventario de hosts.
+
+    Admite texto (un ``[usuario@]host[:puerto]`` por línea, ``#`` para
+    comentarios), JSON y, si PyYAML está instalado, YAML. En JSON y YAML el
+    documento es una lista o un objeto con clave ``hosts``; cada host puede ser
+    una cadena o un objeto con ``host`` y, opcionalmente, ``user``, ``port``,
+    ``key`` y ``password_env``. ``hosts`` también puede ser un mapa
+    ``nombre → opciones``.
+    """
+
+    try:
+        raw = path.read_text(encoding="utf-8")
+    except OSError as exc:
+        raise BatchError(_("batch.errors.read_failed", path=path, error=exc)) from exc
+    suffix = path.suffix.lower()
+    if suffix in {".json", ".yml", ".yaml"}:
+        entries = _structured_entries(_parse_document(raw, suffix, path))
+    else:
+        entries = [{"host": line} for line in _content_lines(raw)]
+    targets = [target_from_entry(entry, defaults) for entry in entries]
+    if not targets:
+        raise BatchError(_("batch.errors.no_hosts", path=path))
+    return targets
+
+
+def _parse_document(raw: str, suffix: str, path: Path) -> Any:
+    if suffix == ".json":
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError as exc:
+            raise BatchError(_("batch.errors.invalid_inventory", path=path, error=exc)) from exc
+    try:
+        import yaml  # type: ignore[import-untyped]
+    except ModuleNotFoundError as exc:  # pragma: no cover - depende del entorno
+        raise BatchError(_("batch.errors.yaml_missing", path=path)) from exc
+    try:
+        return yaml.safe_load(raw)
+    except yaml.YAMLError as exc:
+        raise BatchError(_("batch.errors.invalid_inventory", path=path, error=exc)) from exc
+
+
+def _structured_entries(document: Any) -> list[dict[str, Any]]:
+    hosts = document.get("hosts") if isinstance(document, dict) else document
+    if isinstance(hosts, dict):
+        return [{"host": name, **(options or {})} for name, options in hosts.items()]
+    if not isinstance(hosts, list):
+        raise BatchError(_("batch.errors.inventory_shape"))
+    entries: list[dict[str, Any]] = []
+    for item in hosts:
+        if isinstance(item, str):
+            entries.append({"host": item})
+        elif isinstance(item, dict):
+            entries.append(item)
+        else:
+            raise BatchError(_("batch.errors.inventory_shape"))
+    return entries
+
+
+def _content_lines(raw: str) -> list[str]:
+    return [
+        line.strip()
+        for line in raw.splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    ]
+
+
+def load_prompts(path: Path) -> list[str]:
+    """Un prompt por línea; se ignoran las líneas vacías y las que empiezan por ``#``."""
+
+    try:
+        return _content_lines(path.read_text(encoding="utf-8"))
+    except OSError as exc:
+        raise BatchError(_("batch.errors.read_failed", path=path, error=exc)) from exc
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Resultado de un trabajo host × prompt; una línea del JSON Lines de salida."""
+
+    host: str
+    target: str
+    prompt_index: int
+    prompt: str
+    status: str
+    started_at: str
+    wall_seconds: float
+    output: str = ""
+    error: str | None = None
+    session: str | None = None
+    usage: dict[str, Any] | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+
+RuntimeFactory = Callable[[SSHConnectionManager], AgentRuntime]
+
+
+class BatchRunner:
+    """Reparte los trabajos host × prompt entre trabajadores con su propio agente."""
+
+    def __init__(
+        self,
+        hosts: Sequence[HostTarget],
+        prompts: Sequence[str],
+        *,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        timeout_seconds: float | None = None,
+        runtime_factory: RuntimeFactory | None = None,
+    ) -> None:
+        self._hosts = list(hosts)
+        self._prompts = list(prompts)
+        self._concurrency = max(1, min(concurrency, len(self._hosts) or 1))
+        self._timeout = timeout_seconds
+        # Un gestor de permisos común: son variables de entorno del proceso.
+        permissions = ToolPermissionManager(logger=logger)
+        self._runtime_factory = runtime_factory or (
+            lambda manager: AgentRuntime(manager, permission_manager=permissions)
+        )
+
+    def run(self, emit: Callable[[BatchResult], None]) -> list[BatchResult]:
+        """Ejecuta todos los trabajos y llama a ``emit`` con cada resultado al terminar.
+
+        Lanza :class:`BatchError` si ningún agente puede inicializarse.
+        """
+
+        pending: queue.SimpleQueue[HostTarget] = queue.SimpleQueue()
+        for host in self._hosts:
+            pending.put(host)
+        results: list[BatchResult] = []
+        lock = threading.Lock()
+        init_errors: list[str] = []
+
+        def publish(result: BatchResult) -> None:
+            with lock:
+                results.append(result)
+                emit(result)
+
+        def worker() -> None:
+            manager = SSHConnectionManager(logging.getLogger("smart_ai_sys_admin.connection"))
+            try:
+                runtime = self._runtime_factory(manager)
+                runtime.initialize()
+            except Exception as exc:
+                # Los hosts de este trabajador quedan en la cola para los demás.
+                logger.exception("No se pudo inicializar el agente del trabajador")
+                with lock:
+                    init_errors.append(_("batch.errors.agent_failed", error=str(exc)))
+                return
+            if not runtime.ready:
+                with lock:
+                    init_errors.append(runtime.error_message or _("batch.errors.agent_unavailable"))
+                return
+            try:
+                while True:
+                    try:
+                        host = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    self._run_host(runtime, manager, host, publish)
+            finally:
+                runtime.shutdown()
+
+        threads = [
+            threading.Thread(target=worker, name=f"batch-{index}", daemon=True)
+            for index in range(self._concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if init_errors and len(init_errors) == len(threads):
+            raise BatchError(init_errors[0])
+        return results
+
+    def _run_host(
+        self,
+        runtime: AgentRuntime,
+        manager: SSHConnectionManager,
+        host: HostTarget,
+        publish: Callable[[BatchResult], None],
+    ) -> None:
+        started = time.perf_counter()
+        started_at = _now()
+        try:
+            manager.connect(
+                host.host,
+                host.username,
+                password=host.password,
+                key_path=host.key_path,
+                port=host.port,
+            )
+        except ConnectionError as exc:
+            logger.warning("No se pudo conectar con %s: %s", host.label, exc)
+            for index, prompt in enumerate(self._prompts):
+                publish(
+                    BatchResult(
+                        host=host.host,
+                        target=host.label,
+                        prompt_index=index,
+                        prompt=prompt,
+                        status="unreachable",
+                        started_at=started_at,
+                        wall_seconds=round(time.perf_counter() - started, 3),
+                        error=str(exc),
+                    )
+                )
+            return
+        try:
+            for index, prompt in enumerate(self._prompts):
+                publish(self._run_job(runtime, host, index, prompt))
+        finally:
+            try:
+                manager.disconnect()
+            except ConnectionError as exc:
+                logger.debug("Error cerrando la conexión con %s: %s", host.label, exc)
+
+    def _run_job(
+        self, runtime: AgentRuntime, host: HostTarget, index: int, prompt: str
+    ) -> BatchResult:
+        started = time.perf_counter()
+        started_at = _now()
+        status, output, error = "ok", "", None
+        timed_out = threading.Event()
+        timer = None
+        try:
+            # El agente pasa de un host a otro: sus trabajos remotos no se heredan.
+            runtime.new_conversation(keep_jobs=index > 0)
+            if self._timeout:
+
+                def expire() -> None:
+                    if runtime.cancel():
+                        timed_out.set()
+
+                timer = threading.Timer(self._timeout, expire)
+                timer.start()
+            output = runtime.invoke(prompt, raise_errors=True)
+        except Exception as exc:
+            status, error = "error", str(exc)
+        finally:
+            if timer is not None:
+                timer.cancel()
+                timer.join()
+        if timed_out.is_set():
+            status, error = "timeout", _("batch.errors.timeout", seconds=self._timeout)
+        metrics = runtime.last_turn_metrics
+        usage = None
+        if metrics is not None:
+            usage = asdict(metrics)
+            usage.pop("turns", None)
+        logger.info("Trabajo %s #%d: %s", host.label, index, status)
+        return BatchResult(
+            host=host.host,
+            target=host.label,
+            prompt_index=index,
+            prompt=prompt,
+            status=status,
+            started_at=started_at,
+            wall_seconds=round(time.perf_counter() - started, 3),
+            output=output,
+            error=error,
+            session=runtime.session_id,
+            usage=usage,
+        )
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def run_batch(
+    hosts: Sequence[HostTarget],
+    prompts: Sequence[str],
+    *,
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    timeout_seconds: float | None = None,
+    output: TextIO | None = None,
+    summary: TextIO | None = None,
+) -> int:
+    """Ejecuta el lote escribiendo JSON Lines en ``output``; devuelve el código de salida."""
+
+    stream = output or sys.stdout
+    report = summary or sys.stderr
+
+    def emit(result: BatchResult) -> None:
+        stream.write(result.to_json() + "\n")
+        stream.flush()
+
+    runner = BatchRunner(
+        hosts, prompts, concurrency=concurrency, timeout_seconds=timeout_seconds
+    )
+    try:
+        results = runner.run(emit)
+    except BatchError as exc:
+        report.write(f"{exc}\n")
+        return 2
+    failed = sum(1 for result in results if not result.ok)
+    report.write(_("batch.summary", total=len(results), ok=len(results) - failed, failed=failed))
+    report.write("\n")
+    return 1 if failed else 0
+
+
+def collect_targets(
+    inventory: Path | None, targets: Iterable[str], defaults: HostDefaults
+) -> list[HostTarget]:
+    hosts = load_inventory(inventory, defaults) if inventory else []
+    hosts.extend(parse_target(target, defaults) for target in targets)
+    if not hosts:
+        raise BatchError(_("batch.errors.no_targets"))
+    return hosts
+
+
+def collect_prompts(prompts_file: Path | None, prompts: Iterable[str]) -> list[str]:
+    collected = load_prompts(prompts_file) if prompts_file else []
+    collected.extend(prompt.strip() for prompt in prompts if prompt.strip())
+    if not collected:
+        raise BatchError(_("batch.errors.no_prompts"))
+    return collected
+
+
+__all__ = [
+    "DEFAULT_BATCH_CONCURRENCY",
+    "BatchError",
+    "BatchResult",
+    "BatchRunner",
+    "HostDefaults",
+    "HostTarget",
+    "collect_prompts",
+    "collect_targets",
+    "load_inventory",
+    "load_prompts",
+    "parse_target",
+    "run_batch",
+    "target_from_entry",
+]
@@ -2,10 +2,27 @@
 
 from __future__ import annotations
 
+import argparse
+import sys
 import warnings
+from collections.abc import Sequence
+from pathlib import Path
 
+from .agent.config import AgentConfigError, load_agent_config
+from .agent.sessions import LATEST_SESSION, SessionStore
+from .batch import (
+    DEFAULT_BATCH_CONCURRENCY,
+    BatchError,
+    HostDefaults,
+    collect_prompts,
+    collect_targets,
+    run_batch,
+)
 from .config import CONFIG
+from .localization import _
 from .logging_setup import configure_logging
+from .mcp_server import DEFAULT_MCP_PORT, run_mcp_server
+from .server import DEFAULT_MAX_SESSIONS, DEFAULT_SERVE_HOST, DEFAULT_SERVE_PORT, serve
 from .ui import run_app
 
 try:  # pragma: no cover - depende de cryptography instalada.
@@ -14,13 +31,151 @@ except ModuleNotFoundError:  # pragma: no cover - fallback si falta cryptography
     CryptographyDeprecationWarning = None
 
 
-def main() -> int:
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m smart_ai_sys_admin", description=_("cli.description"))
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const=LATEST_SESSION,
+        metavar="ID",
+        help=_("cli.resume_help"),
+    )
+    parser.add_argument(
+        "--list-sessions", action="store_true", help=_("cli.list_sessions_help")
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    batch = subparsers.add_parser(
+        "batch", help=_("cli.batch.help"), description=_("cli.batch.description")
+    )
+    batch.add_argument("--hosts", type=Path, metavar="FILE", help=_("cli.batch.hosts_help"))
+    batch.add_argument(
+        "--host", action="append", default=[], metavar="[USER@]HOST[:PORT]",
+        help=_("cli.batch.host_help"),
+    )
+    batch.add_argument("--prompts", type=Path, metavar="FILE", help=_("cli.batch.prompts_help"))
+    batch.add_argument(
+        "--prompt", action="append", default=[], metavar="TEXT", help=_("cli.batch.prompt_help")
+    )
+    batch.add_argument(
+        "--concurrency", type=int, default=DEFAULT_BATCH_CONCURRENCY, metavar="N",
+        help=_("cli.batch.concurrency_help"),
+    )
+    batch.add_argument(
+        "--timeout", type=float, metavar="SECONDS", help=_("cli.batch.timeout_help")
+    )
+    batch.add_argument("--output", type=Path, metavar="FILE", help=_("cli.batch.output_help"))
+    batch.add_argument("--user", help=_("cli.batch.user_help"))
+    batch.add_argument("--key", metavar="PATH", help=_("cli.batch.key_help"))
+    batch.add_argument("--port", type=int, default=22, help=_("cli.batch.port_help"))
+    batch.add_argument("--password-env", metavar="VAR", help=_("cli.batch.password_env_help"))
+    server = subparsers.add_parser(
+        "serve", help=_("cli.serve.help"), description=_("cli.serve.description")
+    )
+    server.add_argument(
+        "--bind", default=DEFAULT_SERVE_HOST, metavar="ADDRESS", help=_("cli.serve.bind_help")
+    )
+    server.add_argument(
+        "--port", type=int, default=DEFAULT_SERVE_PORT, help=_("cli.serve.port_help")
+    )
+    server.add_argument("--socket", type=Path, metavar="PATH", help=_("cli.serve.socket_help"))
+    server.add_argument(
+        "--max-sessions", type=int, default=DEFAULT_MAX_SESSIONS, metavar="N",
+        help=_("cli.serve.max_sessions_help"),
+    )
+    server.add_argument("--user", help=_("cli.batch.user_help"))
+    server.add_argument("--key", metavar="PATH", help=_("cli.batch.key_help"))
+    server.add_argument("--password-env", metavar="VAR", help=_("cli.batch.password_env_help"))
+    mcp = subparsers.add_parser(
+        "mcp-server", help=_("cli.mcp_server.help"), description=_("cli.mcp_server.description")
+    )
+    mcp.add_argument(
+        "--transport",
+        choices=("stdio", "streamable-http"),
+        default="stdio",
+        help=_("cli.mcp_server.transport_help"),
+    )
+    mcp.add_argument(
+        "--bind", default=DEFAULT_SERVE_HOST, metavar="ADDRESS", help=_("cli.serve.bind_help")
+    )
+    mcp.add_argument("--port", type=int, default=DEFAULT_MCP_PORT, help=_("cli.serve.port_help"))
+    mcp.add_argument("--user", help=_("cli.batch.user_help"))
+    mcp.add_argument("--key", metavar="PATH", help=_("cli.batch.key_help"))
+    mcp.add_argument("--password-env", metavar="VAR", help=_("cli.batch.password_env_help"))
+    return parser
+
+
+def list_sessions() -> int:
+    """Imprime las sesiones guardadas, de la más reciente a la más antigua."""
+    try:
+        sessions_cfg = load_agent_config().sessions
+    except AgentConfigError as exc:
+        print(_("cli.sessions.unavailable", error=exc))
+        return 1
+    sessions = SessionStore(sessions_cfg.directory).list()
+    if not sessions:
+        print(_("cli.sessions.none"))
+        return 0
+    for info in sessions:
+        print(f"{info.session_id}  {info.updated_at}  {info.messages:>5}  {info.title}")
+    return 0
+
+
+def batch(args: argparse.Namespace) -> int:
+    """Ejecuta el modo batch y escribe los resultados como JSON Lines."""
+    defaults = HostDefaults(
+        username=args.user, port=args.port, key_path=args.key, password_env=args.password_env
+    )
+    try:
+        hosts = collect_targets(args.hosts, args.host, defaults)
+        prompts = collect_prompts(args.prompts, args.prompt)
+    except BatchError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    if args.output is None:
+        return run_batch(
+            hosts, prompts, concurrency=args.concurrency, timeout_seconds=args.timeout
+        )
+    with args.output.open("w", encoding="utf-8") as output:
+        return run_batch(
+            hosts,
+            prompts,
+            concurrency=args.concurrency,
+            timeout_seconds=args.timeout,
+            output=output,
+        )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
     """Ejecuta la interfaz de terminal del administrador inteligente."""
+    args = build_parser().parse_args(argv)
     configure_logging(CONFIG.logging)
     if CryptographyDeprecationWarning:
         warnings.filterwarnings("ignore", category=CryptographyDeprecationWarning)
     warnings.filterwarnings("ignore", module="paramiko")
-    run_app(config=CONFIG)
+    if args.command == "batch":
+        return batch(args)
+    if args.command == "serve":
+        return serve(
+            host=args.bind,
+            port=args.port,
+            socket_path=args.socket,
+            max_sessions=args.max_sessions,
+            defaults=HostDefaults(
+                username=args.user, key_path=args.key, password_env=args.password_env
+            ),
+        )
+    if args.command == "mcp-server":
+        return run_mcp_server(
+            args.transport,
+            host=args.bind,
+            port=args.port,
+            defaults=HostDefaults(
+                username=args.user, key_path=args.key, password_env=args.password_env
+            ),
+        )
+    if args.list_sessions:
+        return list_sessions()
+    run_app(config=CONFIG, resume_session=args.resume)
     return 0
 
 
@@ -81,6 +81,7 @@ class ShortcutConfig:
 @dataclass(frozen=True)
 class ShortcutsConfig:
     exit: ShortcutConfig
+    cancel: ShortcutConfig
 
 
 @dataclass(frozen=True)
@@ -156,7 +157,13 @@ def load_config() -> AppConfig:
         dialogs=dialogs,
     )
     shortcuts_config = payload["shortcuts"]
-    shortcuts = ShortcutsConfig(exit=ShortcutConfig(**shortcuts_config["exit"]))
+    cancel_shortcut = shortcuts_config.get(
+        "cancel", {"binding": "escape", "description": "Cancel"}
+    )
+    shortcuts = ShortcutsConfig(
+        exit=ShortcutConfig(**shortcuts_config["exit"]),
+        cancel=ShortcutConfig(**cancel_shortcut),
+    )
     logging_config_data = payload["logging"]
     logging_config = LoggingConfig(
         level=logging_config_data["level"],
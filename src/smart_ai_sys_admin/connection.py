@@ -3,13 +3,23 @@
 from __future__ import annotations
 
 import logging
+import threading
 from dataclasses import dataclass
 from pathlib import Path, PurePosixPath
 
 import paramiko
+from paramiko.common import cMSG_CHANNEL_REQUEST
+from paramiko.message import Message
 
 from .localization import _
 
+# La petición `signal` se envía con un método interno de paramiko; solo se usa
+# en las versiones en las que se ha comprobado. En el resto basta con cerrar
+# el canal para liberar el hilo que espera la salida.
+_SIGNAL_REQUEST_SUPPORTED = paramiko.__version_info__[0] in (2, 3) and callable(
+    getattr(paramiko.Transport, "_send_user_message", None)
+)
+
 
 class ConnectionError(Exception):
     """Error genérico asociado a la conexión SSH."""
@@ -23,6 +33,10 @@ class NoActiveConnection(ConnectionError):
     """Se intenta operar sin que exista una conexión activa."""
 
 
+class CommandCancelled(ConnectionError):
+    """El comando remoto se interrumpió a petición del usuario."""
+
+
 @dataclass(frozen=True)
 class ConnectionDetails:
     host: str
@@ -39,6 +53,12 @@ class SSHConnectionManager:
         self._ssh_client: paramiko.SSHClient | None = None
         self._sftp_client: paramiko.SFTPClient | None = None
         self._details: ConnectionDetails | None = None
+        # Credenciales de la conexión activa, para abrir conexiones hermanas.
+        self._secret: tuple[str | None, str | None] = (None, None)
+        # Canal en curso -> propietario (p. ej. el agente cuyo turno lo abrió).
+        self._channels: dict[paramiko.Channel, object | None] = {}
+        self._cancelled_channels: set[paramiko.Channel] = set()
+        self._channels_lock = threading.Lock()
 
     def connect(
         self,
@@ -111,6 +131,7 @@ class SSHConnectionManager:
 
         self._ssh_client = ssh_client
         self._sftp_client = sftp_client
+        self._secret = (password if not key_path else None, key_path)
         self._details = ConnectionDetails(
             host=host,
             port=port,
@@ -147,6 +168,7 @@ class SSHConnectionManager:
         self._ssh_client = None
         self._sftp_client = None
         self._details = None
+        self._secret = (None, None)
 
     @property
     def is_connected(self) -> bool:
@@ -161,6 +183,36 @@ class SSHConnectionManager:
             return None
         return self._details
 
+    def open_sibling(self, target: str) -> SSHConnectionManager:
+        """Abre otra conexión a ``target`` reutilizando las credenciales de la activa.
+
+        ``target`` admite la forma ``[usuario@]host[:puerto]``; lo que no se
+        indique se toma de la conexión actual. Solo la clave privada vale para
+        otros hosts: la contraseña nunca se envía a un host distinto del actual.
+        """
+
+        if not self.is_connected or not self._details:
+            raise NoActiveConnection(_("connection.errors.no_active_ssh"))
+        username, _sep, host = target.rpartition("@")
+        host, _sep, port_text = host.partition(":")
+        try:
+            port = int(port_text) if port_text else self._details.port
+        except ValueError as exc:
+            raise ConnectionError(_("connection.errors.invalid_port", port=port_text)) from exc
+        password, key_path = self._secret
+        host = host or self._details.host
+        if password and host.lower() != self._details.host.lower():
+            raise ConnectionError(_("connection.errors.sibling_password", host=host))
+        sibling = SSHConnectionManager(self._logger)
+        sibling.connect(
+            host,
+            username or self._details.username,
+            password=password,
+            key_path=key_path,
+            port=port,
+        )
+        return sibling
+
     def status_summary(self) -> str:
         if not self.is_connected or not self._details:
             return _("connection.status.none")
@@ -182,8 +234,13 @@ class SSHConnectionManager:
         command: str,
         *,
         timeout: int | None = None,
+        owner: object | None = None,
     ) -> tuple[int, str, str]:
-        """Ejecuta un comando remoto y devuelve código de salida, stdout y stderr."""
+        """Ejecuta un comando remoto y devuelve código de salida, stdout y stderr.
+
+        ``owner`` identifica a quien lanza el comando para que
+        :meth:`cancel_running_commands` interrumpa solo los suyos.
+        """
 
         if not self.is_connected or not self._ssh_client:
             raise NoActiveConnection(_("connection.errors.no_active_ssh"))
@@ -198,17 +255,67 @@ class SSHConnectionManager:
                     error=str(exc),
                 )
             ) from exc
+        channel = stdout.channel
+        with self._channels_lock:
+            self._channels[channel] = owner
         try:
             out_text = stdout.read().decode("utf-8", errors="replace")
             err_text = stderr.read().decode("utf-8", errors="replace")
-            exit_status = stdout.channel.recv_exit_status()
+            exit_status = channel.recv_exit_status()
         finally:
             stdin.close()
             stdout.close()
             stderr.close()
+            with self._channels_lock:
+                self._channels.pop(channel, None)
+                cancelled = channel in self._cancelled_channels
+                self._cancelled_channels.discard(channel)
+        if cancelled:
+            self._logger.info("Comando '%s' cancelado", command)
+            raise CommandCancelled(_("connection.errors.command_cancelled", command=command))
         self._logger.debug("Comando '%s' finalizado con código %s", command, exit_status)
         return exit_status, out_text, err_text
 
+    def cancel_running_commands(self, owner: object) -> int:
+        """Interrumpe los comandos en curso de ``owner`` y devuelve cuántos había.
+
+        Envía `SIGTERM` mediante una petición `signal` del canal (OpenSSH 7.9+)
+        y cierra el canal; en servidores que ignoran la señal, el cierre al menos
+        libera el hilo que esperaba la salida. Los comandos de otros usuarios de
+        la conexión (precarga, runbooks, peticiones del servidor) no se tocan.
+        """
+
+        with self._channels_lock:
+            channels = [
+                channel for channel, holder in self._channels.items() if holder is owner
+            ]
+            self._cancelled_channels.update(channels)
+        for channel in channels:
+            self._send_signal(channel, "TERM")
+            try:
+                channel.close()
+            except Exception as exc:  # pragma: no cover - depende del transporte
+                self._logger.debug("Error cerrando canal cancelado: %s", exc)
+        if channels:
+            self._logger.info("Cancelados %d comandos remotos en curso", len(channels))
+        return len(channels)
+
+    def _send_signal(self, channel: paramiko.Channel, signal_name: str) -> None:
+        # Paramiko no expone la petición `signal` (RFC 4254 §6.9); la construimos.
+        transport = channel.get_transport()
+        if not _SIGNAL_REQUEST_SUPPORTED or transport is None or channel.closed:
+            return
+        message = Message()
+        message.add_byte(cMSG_CHANNEL_REQUEST)
+        message.add_int(channel.remote_chanid)
+        message.add_string("signal")
+        message.add_boolean(False)
+        message.add_string(signal_name)
+        try:
+            transport._send_user_message(message)
+        except Exception as exc:  # pragma: no cover - depende del transporte
+            self._logger.debug("No se pudo enviar la señal %s: %s", signal_name, exc)
+
     def upload_file(
         self,
         local_path: str,
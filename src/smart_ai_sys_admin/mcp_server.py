@@ -0,0 +1,411 @@
+"""Modo servidor MCP: publica las herramientas SSH/SFTP para otros agentes.
+
+La aplicación ya consume servidores MCP (:mod:`.agent.mcp`); aquí actúa como
+uno. Las herramientas ``remote_ssh_command``, ``remote_sftp_transfer`` y las de
+trabajos remotos reciben además un ``target`` (``[usuario@]host[:puerto]``) y se
+ejecutan sobre un conjunto de conexiones :class:`~.connection.SSHConnectionManager`
+que se abren la primera vez y se reutilizan después, con su keepalive. Así los
+agentes que se conectan al servidor comparten sesiones ya autenticadas en lugar
+de abrir cada uno las suyas.
+
+Las credenciales nunca viajan por MCP: el usuario, la clave y la variable de
+entorno con la contraseña se fijan al arrancar (``--user``, ``--key``,
+``--password-env``). Los límites de los comandos remotos y los grupos de hilos
+salen de ``agent.conf`` si puede cargarse.
+
+Con ``streamable-http`` cada petición debe llevar ``Authorization: Bearer
+<token>``; el token se toma de ``SMART_AI_SYS_ADMIN_MCP_TOKEN`` o se genera al
+arrancar, igual que en el modo servidor.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import logging
+import os
+import secrets
+import sys
+import threading
+from collections.abc import Callable
+from typing import Any, Literal
+
+from mcp.server.fastmcp import FastMCP
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .agent.config import AgentConfigError, ExecutorPoolsConfig, load_agent_config
+from .agent.executors import KeyedLocks, ToolExecutors
+from .agent.factory import AgentFactory
+from .agent.jobs import RemoteJobManager
+from .agent.parsers import default_parser_registry
+from .agent.tools import (
+    DEFAULT_REMOTE_TIMEOUT,
+    remote_job_cancel,
+    remote_job_output,
+    remote_job_start,
+    remote_job_status,
+    remote_sftp_transfer,
+    remote_ssh_command,
+)
+from .batch import BatchError, HostDefaults, parse_target
+from .connection import ConnectionError, SSHConnectionManager
+from .localization import _
+
+logger = logging.getLogger("smart_ai_sys_admin.mcp_server")
+
+MCPServerTransport = Literal["stdio", "streamable-http"]
+MCP_SERVER_NAME = "shell-sentinel"
+DEFAULT_MCP_PORT = 8766
+MCP_TOKEN_ENV_VAR = "SMART_AI_SYS_ADMIN_MCP_TOKEN"
+
+
+class ToolContext:
+    """Hace las veces del agente Strands para las tools: su conexión y sus recursos."""
+
+    def __init__(
+        self,
+        manager: SSHConnectionManager,
+        executors: ToolExecutors,
+        *,
+        timeout_seconds: int,
+        max_output_chars: int | None,
+        parsers: Any = None,
+    ) -> None:
+        self.ssh_manager = manager
+        self.tool_executors = executors
+        self.remote_jobs = RemoteJobManager(manager, logger)
+        self.remote_command_timeout = timeout_seconds
+        self.remote_command_max_output_chars = max_output_chars
+        self.remote_command_parsers = parsers
+
+
+class SSHSessionPool:
+    """Conexiones SSH abiertas por destino, compartidas entre los clientes MCP."""
+
+    def __init__(
+        self,
+        defaults: HostDefaults,
+        *,
+        executors: ToolExecutors | None = None,
+        timeout_seconds: int = DEFAULT_REMOTE_TIMEOUT,
+        max_output_chars: int | None = None,
+        structured_output: bool = True,
+        connection_factory: Callable[[], SSHConnectionManager] | None = None,
+    ) -> None:
+        self._defaults = defaults
+        self._executors = executors or ToolExecutors.from_config(
+            ExecutorPoolsConfig(
+                ssh_workers=4,
+                sftp_workers=2,
+                local_workers=2,
+                queue_limit=16,
+                queue_timeout_seconds=30.0,
+            )
+        )
+        self._timeout = timeout_seconds
+        self._max_output_chars = max_output_chars
+        self._parsers = default_parser_registry() if structured_output else None
+        self._connection_factory = connection_factory or (
+            lambda: SSHConnectionManager(logging.getLogger("smart_ai_sys_admin.connection"))
+        )
+        self._contexts: dict[str, ToolContext] = {}
+        self._lock = threading.Lock()
+        self._connecting = KeyedLocks()
+
+    @classmethod
+    def from_agent_config(cls, defaults: HostDefaults) -> SSHSessionPool:
+        """Toma los límites de ``agent.conf``; sin configuración usa los valores por defecto."""
+
+        try:
+            config = load_agent_config()
+        except AgentConfigError as exc:
+            logger.warning("Servidor MCP sin agent.conf (%s); se usan valores por defecto", exc)
+            return cls(defaults)
+        remote = AgentFactory(config).remote_command
+        return cls(
+            defaults,
+            executors=ToolExecutors.from_config(config.tools.executors),
+            timeout_seconds=remote.timeout_seconds or DEFAULT_REMOTE_TIMEOUT,
+            max_output_chars=remote.max_output_chars,
+            structured_output=remote.structured_output,
+        )
+
+    def get(self, target: str) -> ToolContext:
+        """Contexto conectado a ``target``; abre o reabre la conexión si hace falta.
+
+        Lanza :class:`~.batch.BatchError` si el destino no es válido y
+        :class:`~.connection.ConnectionError` si no se puede conectar.
+        """
+
+        host = parse_target(target, self._defaults)
+        with self._connecting.hold(host.label):
+            with self._lock:
+                context = self._contexts.get(host.label)
+            if context is not None and context.ssh_manager.is_connected:
+                return context
+            # Al reconectar se reutiliza el contexto: los trabajos remotos lanzados
+            # antes de la caída siguen siendo consultables con su identificador.
+            manager = context.ssh_manager if context is not None else self._connection_factory()
+            manager.connect(
+                host.host,
+                host.username,
+                password=host.password,
+                key_path=host.key_path,
+                port=host.port,
+            )
+            if context is None:
+                context = ToolContext(
+                    manager,
+                    self._executors,
+                    timeout_seconds=self._timeout,
+                    max_output_chars=self._max_output_chars,
+                    parsers=self._parsers,
+                )
+                with self._lock:
+                    self._contexts[host.label] = context
+                logger.info("Sesión SSH del servidor MCP abierta con %s", host.label)
+            else:
+                logger.info("Sesión SSH del servidor MCP reabierta con %s", host.label)
+            return context
+
+    def sessions(self) -> list[str]:
+        with self._lock:
+            return [
+                label
+                for label, context in self._contexts.items()
+                if context.ssh_manager.is_connected
+            ]
+
+    def close(self, target: str) -> bool:
+        label = parse_target(target, self._defaults).label
+        with self._lock:
+            context = self._contexts.pop(label, None)
+        if context is None:
+            return False
+        self._disconnect(context)
+        return True
+
+    def close_all(self) -> None:
+        with self._lock:
+            contexts = list(self._contexts.values())
+            self._contexts.clear()
+        for context in contexts:
+            self._disconnect(context)
+        self._executors.shutdown()
+
+    @staticmethod
+    def _disconnect(context: ToolContext) -> None:
+        if context.ssh_manager.is_connected:
+            try:
+                context.ssh_manager.disconnect()
+            except ConnectionError as exc:
+                logger.debug("Error cerrando la sesión SSH: %s", exc)
+
+
+def build_mcp_server(
+    pool: SSHSessionPool,
+    *,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_MCP_PORT,
+) -> FastMCP:
+    """Crea el servidor FastMCP con las herramientas ligadas a ``pool``."""
+
+    server = FastMCP(MCP_SERVER_NAME, host=host, port=port)
+
+    async def _call(target: str, tool_obj: Any, **kwargs: Any) -> str:
+        try:
+            context = await asyncio.to_thread(pool.get, target)
+        except (BatchError, ConnectionError) as exc:
+            logger.warning("Servidor MCP sin conexión con %s: %s", target, exc)
+            return f"❌ {exc}"
+        # Las tools de Strands se llaman con el contexto en el papel del agente.
+        return await tool_obj._tool_func(agent=context, **kwargs)
+
+    # Las tools se publican con los mismos nombres que usa el agente.
+    @server.tool(name=remote_ssh_command.tool_name)
+    async def ssh_command(target: str, command: str, timeout_seconds: int | None = None) -> str:
+        """Ejecuta un comando en ``target`` por SSH reutilizando la sesión abierta.
+
+        Args:
+            target: destino ``[usuario@]host[:puerto]``.
+            command: instrucción a ejecutar.
+            timeout_seconds: opcional, límite en segundos para la ejecución.
+        """
+
+        return await _call(
+            target, remote_ssh_command, command=command, timeout_seconds=timeout_seconds
+        )
+
+    @server.tool(name=remote_sftp_transfer.tool_name)
+    async def sftp_transfer(
+        target: str, action: str, local_path: str, remote_path: str, overwrite: bool = False
+    ) -> str:
+        """Sube (``upload``) o descarga (``download``) un archivo por SFTP.
+
+        Args:
+            target: destino ``[usuario@]host[:puerto]``.
+            action: ``upload``/``put`` o ``download``/``get``.
+            local_path: ruta en la máquina que ejecuta el servidor MCP.
+            remote_path: ruta remota en formato POSIX.
+            overwrite: permite sobrescribir archivos existentes.
+        """
+
+        return await _call(
+            target,
+            remote_sftp_transfer,
+            action=action,
+            local_path=local_path,
+            remote_path=remote_path,
+            overwrite=overwrite,
+        )
+
+    @server.tool(name=remote_job_start.tool_name)
+    async def job_start(target: str, command: str) -> str:
+        """Lanza un comando largo en segundo plano en ``target`` y devuelve su identificador.
+
+        Args:
+            target: destino ``[usuario@]host[:puerto]`` (solo hosts POSIX).
+            command: instrucción de shell a ejecutar de forma desacoplada.
+        """
+
+        return await _call(target, remote_job_start, command=command)
+
+    @server.tool(name=remote_job_status.tool_name)
+    async def job_status(target: str, job_id: str | None = None) -> str:
+        """Consulta un trabajo remoto o lista los lanzados en ``target``.
+
+        Args:
+            target: destino ``[usuario@]host[:puerto]``.
+            job_id: opcional, identificador devuelto por ``remote_job_start``.
+        """
+
+        return await _call(target, remote_job_status, job_id=job_id)
+
+    @server.tool(name=remote_job_output.tool_name)
+    async def job_output(
+        target: str, job_id: str, offset: int | None = None, max_bytes: int | None = None
+    ) -> str:
+        """Lee la salida nueva de un trabajo remoto desde la última consulta.
+
+        Args:
+            target: destino ``[usuario@]host[:puerto]``.
+            job_id: identificador devuelto por ``remote_job_start``.
+            offset: opcional, byte desde el que leer (0 relee desde el principio).
+            max_bytes: opcional, tamaño máximo del fragmento.
+        """
+
+        return await _call(
+            target, remote_job_output, job_id=job_id, offset=offset, max_bytes=max_bytes
+        )
+
+    @server.tool(name=remote_job_cancel.tool_name)
+    async def job_cancel(target: str, job_id: str) -> str:
+        """Detiene un trabajo remoto lanzado con ``remote_job_start``.
+
+        Args:
+            target: destino ``[usuario@]host[:puerto]``.
+            job_id: identificador del trabajo.
+        """
+
+        return await _call(target, remote_job_cancel, job_id=job_id)
+
+    @server.tool()
+    def ssh_sessions() -> list[str]:
+        """Lista las sesiones SSH abiertas por el servidor (``usuario@host:puerto``)."""
+
+        return pool.sessions()
+
+    @server.tool()
+    async def ssh_disconnect(target: str) -> str:
+        """Cierra la sesión SSH con ``target`` si está abierta.
+
+        Args:
+            target: destino ``[usuario@]host[:puerto]``.
+        """
+
+        try:
+            closed = await asyncio.to_thread(pool.close, target)
+        except BatchError as exc:
+            return f"❌ {exc}"
+        key = "mcp_server.disconnected" if closed else "mcp_server.not_connected"
+        return _(key, target=target)
+
+    return server
+
+
+class BearerAuth:
+    """Middleware ASGI que exige ``Authorization: Bearer <token>`` en cada petición HTTP."""
+
+    def __init__(self, app: ASGIApp, token: str) -> None:
+        self._app = app
+        self._token = token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = dict(scope.get("headers") or ())
+            header = headers.get(b"authorization", b"").decode("latin-1")
+            scheme, _sep, supplied = header.partition(" ")
+            if scheme.lower() != "bearer" or not hmac.compare_digest(
+                supplied.strip(), self._token
+            ):
+                response = JSONResponse(
+                    {"error": _("server.errors.unauthorized")}, status_code=401
+                )
+                await response(scope, receive, send)
+                return
+        await self._app(scope, receive, send)
+
+
+def build_http_app(server: FastMCP, token: str) -> ASGIApp:
+    """Aplicación ``streamable-http`` de ``server`` protegida con ``token``."""
+
+    return BearerAuth(server.streamable_http_app(), token)
+
+
+def run_mcp_server(
+    transport: MCPServerTransport = "stdio",
+    *,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_MCP_PORT,
+    defaults: HostDefaults | None = None,
+) -> int:
+    """Atiende clientes MCP por ``stdio`` o HTTP (``streamable-http``) hasta que terminen."""
+
+    pool = SSHSessionPool.from_agent_config(defaults or HostDefaults())
+    server = build_mcp_server(pool, host=host, port=port)
+    logger.info("Servidor MCP iniciado (transporte=%s)", transport)
+    try:
+        if transport == "stdio":
+            server.run(transport)
+        else:
+            _serve_http(server, host, port)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.close_all()
+    return 0
+
+
+def _serve_http(server: FastMCP, host: str, port: int) -> None:
+    import uvicorn
+
+    token = os.environ.get(MCP_TOKEN_ENV_VAR) or secrets.token_urlsafe(24)
+    address = f"http://{host}:{port}{server.settings.streamable_http_path}"
+    print(_("server.listening", address=address), file=sys.stderr)
+    if not os.environ.get(MCP_TOKEN_ENV_VAR):
+        print(_("server.token", token=token, env=MCP_TOKEN_ENV_VAR), file=sys.stderr)
+    uvicorn.run(build_http_app(server, token), host=host, port=port, log_level="warning")
+
+
+__all__ = [
+    "DEFAULT_MCP_PORT",
+    "MCP_SERVER_NAME",
+    "MCP_TOKEN_ENV_VAR",
+    "BearerAuth",
+    "SSHSessionPool",
+    "ToolContext",
+    "build_http_app",
+    "build_mcp_server",
+    "run_mcp_server",
+]
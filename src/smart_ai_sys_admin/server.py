@@ -0,0 +1,539 @@
+"""Modo servidor: expone el agente y las sesiones SSH a clientes locales.
+
+Un proceso de larga vida mantiene un conjunto de sesiones; cada una tiene su
+conexión SSH y su :class:`~.agent.AgentRuntime` ya inicializado, de modo que
+los clientes no pagan el arranque, la carga de ``agent.conf`` ni el saludo SSH
+en cada petición. Varios clientes pueden usar la misma sesión: abrir una
+sesión hacia un destino que ya tiene una la reutiliza.
+
+La API es HTTP con cuerpos JSON y escucha en ``127.0.0.1`` o en un socket Unix:
+
+``GET /health``
+    Estado del servidor.
+``GET /sessions`` · ``POST /sessions`` · ``DELETE /sessions/<id>``
+    Lista, abre (``{"target": "usuario@host:puerto"}``) y cierra sesiones. La
+    clave y la contraseña salen siempre de ``--key``/``--password-env``.
+``POST /sessions/<id>/prompt``
+    Ejecuta un turno (``{"prompt": …, "new_conversation": false}``) y responde
+    en NDJSON: eventos ``text`` y ``tool`` a medida que llegan y un ``done`` o
+    ``error`` final con el uso de tokens y los tiempos.
+``POST /sessions/<id>/command``
+    Ejecuta un comando remoto directo (``{"command": …, "timeout": 60}``).
+``POST /sessions/<id>/cancel``
+    Cancela el turno en curso de la sesión.
+``GET /metrics``
+    Métricas del último turno y acumuladas de cada sesión, y estado de los grupos de hilos.
+
+Por TCP cada petición debe llevar ``Authorization: Bearer <token>``; el socket
+Unix se crea con permisos ``0600`` y no pide token.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import secrets
+import signal
+import socketserver
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from .agent import AgentRuntime, ModelClientCache, ToolPermissionManager
+from .agent.executors import KeyedLocks
+from .batch import BatchError, HostDefaults, HostTarget, target_from_entry
+from .connection import ConnectionError, SSHConnectionManager
+from .localization import _
+
+logger = logging.getLogger("smart_ai_sys_admin.server")
+
+DEFAULT_SERVE_HOST = "127.0.0.1"
+DEFAULT_SERVE_PORT = 8765
+DEFAULT_MAX_SESSIONS = 16
+DEFAULT_COMMAND_TIMEOUT = 60
+TOKEN_ENV_VAR = "SMART_AI_SYS_ADMIN_SERVE_TOKEN"
+
+
+class ServerError(Exception):
+    """Error de una petición; ``status`` es el código HTTP de la respuesta."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class ServeSession:
+    """Sesión compartida: una conexión SSH y un agente inicializado."""
+
+    session_id: str
+    target: HostTarget
+    connection_manager: SSHConnectionManager
+    runtime: AgentRuntime
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    turn_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.session_id,
+            "target": self.target.label,
+            "connected": self.connection_manager.is_connected,
+            "busy": self.runtime.busy,
+            "session": self.runtime.session_id,
+            "created_at": self.created_at,
+            "last_used": self.last_used,
+        }
+
+    def metrics(self) -> dict[str, Any]:
+        last, total = self.runtime.last_turn_metrics, self.runtime.session_metrics
+        executors = self.runtime.agent_summary().get("executors") or ()
+        return {
+            **self.summary(),
+            "last_turn": asdict(last) if last else None,
+            "totals": asdict(total) if total else None,
+            "executors": [asdict(stats) for stats in executors],
+        }
+
+    def close(self) -> None:
+        self.runtime.shutdown()
+        if self.connection_manager.is_connected:
+            try:
+                self.connection_manager.disconnect()
+            except ConnectionError as exc:
+                logger.debug("Error cerrando la sesión %s: %s", self.session_id, exc)
+
+
+def _int_field(value: Any, name: str, default: int) -> int:
+    """Entero no negativo de la petición; ``400`` si no lo es."""
+
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = -1
+    if number < 0 or isinstance(value, bool):
+        raise ServerError(HTTPStatus.BAD_REQUEST, _("server.errors.invalid_field", name=name))
+    return number
+
+
+RuntimeFactory = Callable[[SSHConnectionManager], AgentRuntime]
+
+
+class SessionPool:
+    """Sesiones abiertas del servidor, reutilizables por destino."""
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        runtime_factory: RuntimeFactory | None = None,
+        connection_factory: Callable[[], SSHConnectionManager] | None = None,
+    ) -> None:
+        self._max_sessions = max_sessions
+        self._sessions: dict[str, ServeSession] = {}
+        self._lock = threading.Lock()
+        # Aperturas en curso: ocupan plaza aunque la sesión aún no esté registrada.
+        self._pending = 0
+        self._opening = KeyedLocks()
+        # Un gestor de permisos común: son variables de entorno del proceso.
+        permissions = ToolPermissionManager(logger=logger)
+        # Y una caché de modelos común: las sesiones comparten el cliente del proveedor.
+        models = ModelClientCache()
+        self._runtime_factory = runtime_factory or (
+            lambda manager: AgentRuntime(
+                manager, permission_manager=permissions, model_cache=models
+            )
+        )
+        self._connection_factory = connection_factory or (
+            lambda: SSHConnectionManager(logging.getLogger("smart_ai_sys_admin.connection"))
+        )
+
+    def list(self) -> list[ServeSession]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def get(self, session_id: str) -> ServeSession:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise ServerError(
+                HTTPStatus.NOT_FOUND, _("server.errors.unknown_session", id=session_id)
+            )
+        session.last_used = time.time()
+        return session
+
+    def open(self, target: HostTarget, *, reuse: bool = True) -> tuple[ServeSession, bool]:
+        """Devuelve una sesión hacia ``target`` e indica si ya existía."""
+
+        # Las aperturas hacia un mismo destino se serializan para no duplicar sesiones.
+        with self._opening.hold(target.label):
+            with self._lock:
+                if reuse:
+                    for session in self._sessions.values():
+                        if session.target == target and session.connection_manager.is_connected:
+                            session.last_used = time.time()
+                            return session, True
+                if len(self._sessions) + self._pending >= self._max_sessions:
+                    raise ServerError(
+                        HTTPStatus.SERVICE_UNAVAILABLE,
+                        _("server.errors.pool_full", limit=self._max_sessions),
+                    )
+                self._pending += 1
+            try:
+                session = self._connect(target)
+                with self._lock:
+                    self._sessions[session.session_id] = session
+            finally:
+                with self._lock:
+                    self._pending -= 1
+        logger.info("Sesión %s abierta hacia %s", session.session_id, target.label)
+        return session, False
+
+    def _connect(self, target: HostTarget) -> ServeSession:
+        # La conexión y la carga del agente se hacen fuera del candado del pool.
+        manager = self._connection_factory()
+        try:
+            manager.connect(
+                target.host,
+                target.username,
+                password=target.password,
+                key_path=target.key_path,
+                port=target.port,
+            )
+        except ConnectionError as exc:
+            raise ServerError(HTTPStatus.BAD_GATEWAY, str(exc)) from exc
+        runtime = self._runtime_factory(manager)
+        runtime.initialize()
+        session = ServeSession(secrets.token_hex(4), target, manager, runtime)
+        if not runtime.ready:
+            session.close()
+            raise ServerError(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                runtime.error_message or _("batch.errors.agent_unavailable"),
+            )
+        return session
+
+    def close(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            raise ServerError(
+                HTTPStatus.NOT_FOUND, _("server.errors.unknown_session", id=session_id)
+            )
+        session.close()
+        logger.info("Sesión %s cerrada", session_id)
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: _AgentHTTPServer | _AgentUnixServer
+    server_version = "ShellSentinel"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - firma heredada
+        logger.debug("%s %s", self.command, format % args)
+
+    # -- Enrutado -------------------------------------------------------
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method: str) -> None:
+        app = self.server.app
+        try:
+            app.authorize(self.headers.get("Authorization"))
+            parts = [part for part in self.path.split("?", 1)[0].split("/") if part]
+            route = (method, *parts[:1], *(["*"] if len(parts) > 1 else []), *parts[2:])
+            if route == ("GET", "health"):
+                self._send_json(HTTPStatus.OK, app.health())
+            elif route == ("GET", "metrics"):
+                self._send_json(HTTPStatus.OK, app.metrics())
+            elif route == ("GET", "sessions"):
+                self._send_json(
+                    HTTPStatus.OK, {"sessions": [s.summary() for s in app.pool.list()]}
+                )
+            elif route == ("POST", "sessions"):
+                session, reused = app.open_session(self._read_json())
+                status = HTTPStatus.OK if reused else HTTPStatus.CREATED
+                self._send_json(status, {**session.summary(), "reused": reused})
+            elif route == ("DELETE", "sessions", "*"):
+                app.pool.close(parts[1])
+                self._send_json(HTTPStatus.OK, {"closed": parts[1]})
+            elif route == ("POST", "sessions", "*", "prompt"):
+                self._stream_prompt(app.pool.get(parts[1]), self._read_json())
+            elif route == ("POST", "sessions", "*", "command"):
+                payload = self._read_json()
+                self._send_json(HTTPStatus.OK, app.run_command(app.pool.get(parts[1]), payload))
+            elif route == ("POST", "sessions", "*", "cancel"):
+                cancelled = app.pool.get(parts[1]).runtime.cancel()
+                self._send_json(HTTPStatus.OK, {"cancelled": cancelled})
+            else:
+                raise ServerError(HTTPStatus.NOT_FOUND, _("server.errors.not_found"))
+        except ServerError as exc:
+            self._send_json(exc.status, {"error": str(exc)})
+        except Exception as exc:  # pragma: no cover - errores inesperados
+            logger.exception("Error atendiendo %s %s", method, self.path)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)})
+
+    # -- Utilidades -----------------------------------------------------
+
+    def _read_json(self) -> dict[str, Any]:
+        length = _int_field(self.headers.get("Content-Length"), "Content-Length", 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        try:
+            payload = json.loads(raw or b"{}")
+        except json.JSONDecodeError as exc:
+            raise ServerError(
+                HTTPStatus.BAD_REQUEST, _("server.errors.invalid_json", error=exc)
+            ) from exc
+        if not isinstance(payload, dict):
+            raise ServerError(HTTPStatus.BAD_REQUEST, _("server.errors.invalid_json", error=""))
+        return payload
+
+    def _send_json(self, status: HTTPStatus, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_prompt(self, session: ServeSession, payload: dict[str, Any]) -> None:
+        prompt = str(payload.get("prompt") or "").strip()
+        if not prompt:
+            raise ServerError(
+                HTTPStatus.BAD_REQUEST, _("server.errors.missing_field", name="prompt")
+            )
+        if not session.turn_lock.acquire(blocking=False):
+            raise ServerError(HTTPStatus.CONFLICT, _("server.errors.session_busy"))
+        try:
+            if payload.get("new_conversation"):
+                session.runtime.new_conversation()
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            asyncio.run(self._pump(session, prompt))
+        finally:
+            session.turn_lock.release()
+            session.last_used = time.time()
+
+    async def _pump(self, session: ServeSession, prompt: str) -> None:
+        runtime = session.runtime
+        started = time.perf_counter()
+        connected = True
+        async for event in runtime.stream(prompt):
+            record: dict[str, Any] = {"event": event.kind, "text": event.text}
+            if event.kind in {"done", "error"}:
+                metrics = runtime.last_turn_metrics
+                record.update(
+                    wall_seconds=round(time.perf_counter() - started, 3),
+                    usage=asdict(metrics) if metrics else None,
+                    session=runtime.session_id,
+                )
+            if not connected:
+                continue
+            try:
+                self.wfile.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.wfile.flush()
+            except OSError:
+                # El cliente se fue: cancelamos el turno y vaciamos el resto del stream.
+                connected = False
+                logger.info("Cliente desconectado; cancelando el turno de %s", session.session_id)
+                runtime.cancel()
+
+
+class _AgentHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], app: AgentServer) -> None:
+        self.app = app
+        super().__init__(address, _RequestHandler)
+
+
+class _AgentUnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, app: AgentServer) -> None:
+        self.app = app
+        super().__init__(path, _RequestHandler)
+
+    def get_request(self) -> tuple[Any, Any]:
+        # ``BaseHTTPRequestHandler`` espera una dirección con forma de tupla.
+        request, _address = super().get_request()
+        return request, ("unix", 0)
+
+
+class AgentServer:
+    """Servidor local del agente sobre TCP (``127.0.0.1``) o un socket Unix."""
+
+    def __init__(
+        self,
+        pool: SessionPool | None = None,
+        *,
+        token: str | None = None,
+        defaults: HostDefaults | None = None,
+    ) -> None:
+        self.pool = pool or SessionPool()
+        self.token = token
+        self.defaults = defaults or HostDefaults()
+        self._started = time.time()
+        self._server: socketserver.BaseServer | None = None
+
+    # -- Operaciones de la API -------------------------------------------
+
+    def authorize(self, header: str | None) -> None:
+        if self.token is None:
+            return
+        scheme, _sep, supplied = (header or "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.strip(), self.token):
+            raise ServerError(HTTPStatus.UNAUTHORIZED, _("server.errors.unauthorized"))
+
+    def health(self) -> dict[str, Any]:
+        return {
+            "ok": True,
+            "sessions": len(self.pool.list()),
+            "uptime_seconds": round(time.time() - self._started, 1),
+        }
+
+    def metrics(self) -> dict[str, Any]:
+        return {**self.health(), "sessions": [s.metrics() for s in self.pool.list()]}
+
+    def open_session(self, payload: dict[str, Any]) -> tuple[ServeSession, bool]:
+        # Del cliente solo se acepta el destino: la clave y la variable con la
+        # contraseña son las fijadas al arrancar, nunca rutas o variables elegidas
+        # por quien hace la petición.
+        entry = {
+            "host": payload.get("target"),
+            "user": payload.get("user"),
+            "port": payload.get("port"),
+        }
+        try:
+            target = target_from_entry(entry, self.defaults)
+        except BatchError as exc:
+            raise ServerError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+        return self.pool.open(target, reuse=bool(payload.get("reuse", True)))
+
+    def run_command(self, session: ServeSession, payload: dict[str, Any]) -> dict[str, Any]:
+        command = str(payload.get("command") or "").strip()
+        if not command:
+            raise ServerError(
+                HTTPStatus.BAD_REQUEST, _("server.errors.missing_field", name="command")
+            )
+        timeout = _int_field(payload.get("timeout"), "timeout", DEFAULT_COMMAND_TIMEOUT)
+        started = time.perf_counter()
+        try:
+            exit_status, stdout, stderr = session.connection_manager.run_command(
+                command, timeout=timeout
+            )
+        except ConnectionError as exc:
+            raise ServerError(HTTPStatus.BAD_GATEWAY, str(exc)) from exc
+        return {
+            "exit_status": exit_status,
+            "stdout": stdout,
+            "stderr": stderr,
+            "wall_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    # -- Ciclo de vida -----------------------------------------------------
+
+    def bind_tcp(self, host: str = DEFAULT_SERVE_HOST, port: int = DEFAULT_SERVE_PORT) -> str:
+        server = _AgentHTTPServer((host, port), self)
+        self._server = server
+        bound_host, bound_port = server.server_address[:2]
+        return f"http://{bound_host}:{bound_port}"
+
+    def bind_unix(self, path: Path) -> str:
+        if path.is_socket():
+            path.unlink()
+        # El socket nace ya con ``0600``: sin ventana en la que otros puedan conectarse.
+        previous = os.umask(0o177)
+        try:
+            server = _AgentUnixServer(str(path), self)
+        finally:
+            os.umask(previous)
+        self._server = server
+        return f"unix:{path}"
+
+    def serve_forever(self) -> None:
+        assert self._server is not None, "Llama antes a bind_tcp() o bind_unix()"
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self.pool.close_all()
+
+
+def serve(
+    *,
+    host: str = DEFAULT_SERVE_HOST,
+    port: int = DEFAULT_SERVE_PORT,
+    socket_path: Path | None = None,
+    max_sessions: int = DEFAULT_MAX_SESSIONS,
+    defaults: HostDefaults | None = None,
+) -> int:
+    """Arranca el servidor y atiende peticiones hasta recibir ``Ctrl+C``."""
+
+    token = None
+    if socket_path is None:
+        token = os.environ.get(TOKEN_ENV_VAR) or secrets.token_urlsafe(24)
+    app = AgentServer(SessionPool(max_sessions=max_sessions), token=token, defaults=defaults)
+    try:
+        address = app.bind_unix(socket_path) if socket_path else app.bind_tcp(host, port)
+    except OSError as exc:
+        print(_("server.bind_failed", error=exc), file=sys.stderr)
+        return 1
+    print(_("server.listening", address=address), file=sys.stderr)
+    if token and not os.environ.get(TOKEN_ENV_VAR):
+        print(_("server.token", token=token, env=TOKEN_ENV_VAR), file=sys.stderr)
+    thread = threading.Thread(target=app.serve_forever, name="agent-server", daemon=True)
+    thread.start()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_args: stop.set())
+    try:
+        while thread.is_alive() and not stop.wait(0.5):
+            pass
+        print(_("server.stopping"), file=sys.stderr)
+    except KeyboardInterrupt:
+        print(_("server.stopping"), file=sys.stderr)
+    finally:
+        app.shutdown()
+        if socket_path is not None and socket_path.exists():
+            socket_path.unlink()
+    return 0
+
+
+__all__ = [
+    "DEFAULT_MAX_SESSIONS",
+    "DEFAULT_SERVE_HOST",
+    "DEFAULT_SERVE_PORT",
+    "TOKEN_ENV_VAR",
+    "AgentServer",
+    "ServeSession",
+    "ServerError",
+    "SessionPool",
+    "serve",
+]
@@ -9,8 +9,10 @@ from pathlib import Path
 
 from textual.app import App, ComposeResult
 from textual.containers import Grid, Vertical
+from textual.widgets import ContentSwitcher, TabbedContent, TabPane
 
-from ..agent import AgentRuntime
+from ..agent import ToolPermissionManager
+from ..agent.reload import ConfigFileWatcher
 from ..config import CONFIG, AppConfig
 from ..connection import (
     ConnectionError,
@@ -19,43 +21,49 @@ from ..connection import (
 )
 from ..localization import _
 from ..plugins import PluginManager
-from .commands import CONNECT_ALIASES, EXIT_ALIASES, SlashCommandProcessor
+from .commands import (
+    CONNECT_ALIASES,
+    EXIT_ALIASES,
+    PRIMARY_RELOAD,
+    PRIMARY_TAB,
+    RELOAD_ALIASES,
+    RUN_ALIASES,
+    TAB_ALIASES,
+)
 from .dialogs import ExitConfirmationModal
-from .panels import CommandInput, ConnectionInfo, ConversationPanel
+from .panels import AgentStateLiteral, CommandInput, ConnectionInfo
+from .tabs import AgentTab
 from .welcome import WelcomeScreen
 
+# Cada cuántos segundos se comprueba ``agent.conf`` si ``agent.watch_config`` está activo.
+CONFIG_WATCH_INTERVAL = 2.0
+
 
 class SmartAISysAdminApp(App[None]):
     """Aplicación principal basada en Textual."""
 
     BINDINGS: list[tuple[str, str, str]] = []
 
-    def __init__(self, config: AppConfig = CONFIG) -> None:
+    def __init__(self, config: AppConfig = CONFIG, resume_session: str | None = None) -> None:
         super().__init__()
         self._config = config
-        self._conversation: ConversationPanel | None = None
         self._input: CommandInput | None = None
+        self._tabbed: TabbedContent | None = None
         self._connection_info: ConnectionInfo | None = None
         self._exit_dialog_config = self._config.ui.dialogs.exit
         # Usamos un nombre distinto para no interferir con `App._logger`,
         # que Textual emplea para su propio sistema de logging.
         self._app_logger = logging.getLogger("smart_ai_sys_admin.ui.app")
-        self._connection_manager = SSHConnectionManager(
-            logging.getLogger("smart_ai_sys_admin.connection")
-        )
-        self._agent_runtime = AgentRuntime(
-            self._connection_manager,
-            logging.getLogger("smart_ai_sys_admin.agent.runtime"),
-        )
-        self._command_processor = SlashCommandProcessor(
-            self._connection_manager,
-            self._agent_runtime,
-            self._config.ui.output_panel,
-            logging.getLogger("smart_ai_sys_admin.ui.commands"),
-        )
         self._plugin_manager = PluginManager(logging.getLogger("smart_ai_sys_admin.plugins"))
         self._plugin_manager.load()
-        self._command_processor.register_plugin_commands(list(self._plugin_manager.commands))
+        # Los permisos de las tools son variables de entorno: un gestor para todas las pestañas.
+        self._permission_manager = ToolPermissionManager(
+            logger=logging.getLogger("smart_ai_sys_admin.agent.runtime")
+        )
+        self._tabs: dict[str, AgentTab] = {}
+        self._tab_counter = 0
+        first = self._new_tab(resume_session=resume_session)
+        self._active_tab_id = first.pane_id
         output_cfg = self._config.ui.output_panel
         self._welcome_screen = WelcomeScreen(
             primary_color=output_cfg.border_style or "#FF8C00",
@@ -63,23 +71,24 @@ class SmartAISysAdminApp(App[None]):
             background=output_cfg.background or "black",
         )
         self._welcome_shown = False
+        self._config_watcher: ConfigFileWatcher | None = None
 
     def compose(self) -> ComposeResult:
+        first = self._tab
         input_section = Vertical(
             CommandInput(
                 self._config.ui.input_widget,
                 self._config.shortcuts.exit,
                 self._config.ui.history_limit,
-                self._command_processor,
+                first.commands,
             ),
             ConnectionInfo(self._config.ui.connection_panel),
             id="input-section",
         )
-        yield Grid(
-            ConversationPanel(self._config),
-            input_section,
-            id="main-layout",
-        )
+        with Grid(id="main-layout"):
+            with TabbedContent(id="agent-tabs"):
+                yield TabPane(first.label, first.conversation, id=first.pane_id)
+            yield input_section
 
     def on_mount(self) -> None:
         self.styles.background = self._config.ui.output_panel.background or "black"
@@ -89,7 +98,10 @@ class SmartAISysAdminApp(App[None]):
         layout.styles.height = "100%"
         layout.styles.width = "100%"
         layout.styles.row_gap = 1
-        self._conversation = self.query_one(ConversationPanel)
+        tabbed = self._tabbed = self.query_one(TabbedContent)
+        tabbed.styles.height = "100%"
+        tabbed.query_one(ContentSwitcher).styles.height = "1fr"
+        self._style_pane(tabbed.get_pane(self._active_tab_id))
         self._input = self.query_one(CommandInput)
         self._connection_info = self.query_one(ConnectionInfo)
         input_section = self.query_one("#input-section", Vertical)
@@ -98,57 +110,314 @@ class SmartAISysAdminApp(App[None]):
         input_section.styles.gap = 1
         exit_shortcut = self._config.shortcuts.exit
         self.bind(exit_shortcut.binding, "quit", description=exit_shortcut.description)
+        cancel_shortcut = self._config.shortcuts.cancel
+        self.bind(
+            cancel_shortcut.binding, "cancel_agent", description=cancel_shortcut.description
+        )
         self._warn_if_term_incompatible()
-        self._initialize_agent_runtime()
+        # La inicialización (configuración, cliente del modelo, transportes MCP)
+        # se solapa con la pantalla de bienvenida en lugar de bloquear la UI.
+        self._start_agent_runtime(self._tab)
         self._update_connection_info()
         self._show_welcome_screen()
 
+    @property
+    def _tab(self) -> AgentTab:
+        """Pestaña activa: recibe la entrada del operador y alimenta el footer."""
+
+        return self._tabs[self._active_tab_id]
+
+    def _new_tab(
+        self,
+        resume_session: str | None = None,
+        connection_manager: SSHConnectionManager | None = None,
+    ) -> AgentTab:
+        self._tab_counter += 1
+        tab = AgentTab(
+            self._tab_counter,
+            self._config,
+            plugin_commands=self._plugin_manager.commands,
+            permission_manager=self._permission_manager,
+            resume_session=resume_session,
+            connection_manager=connection_manager,
+        )
+        self._tabs[tab.pane_id] = tab
+        return tab
+
+    @staticmethod
+    def _style_pane(pane: TabPane) -> None:
+        pane.styles.height = "100%"
+        pane.styles.padding = 0
+
     async def on_command_input_submitted(self, message: CommandInput.Submitted) -> None:
         message.stop()
-        assert self._conversation is not None
         assert self._input is not None
+        tab = self._tab
+        conversation = tab.conversation
         trimmed = message.content.strip()
-        self._conversation.add_user_message(self._sanitize_user_message(trimmed))
+        conversation.add_user_message(self._sanitize_user_message(trimmed))
         if not trimmed:
-            self._conversation.add_agent_markdown(_("ui.app.input_required"))
+            conversation.add_agent_markdown(_("ui.app.input_required"))
             self._input.focus_editor()
             return
         tokens = trimmed.split()
         if tokens and tokens[0].lower() in EXIT_ALIASES:
             if len(tokens) > 1:
-                self._conversation.add_agent_markdown(
-                    _("ui.app.exit.no_args", command=tokens[0])
-                )
+                conversation.add_agent_markdown(_("ui.app.exit.no_args", command=tokens[0]))
                 self._input.focus_editor()
                 return
             self._handle_exit_request()
             return
+        command = tokens[0].lower() if tokens else ""
         try:
-            response = self._command_processor.process(message.content)
+            if command in TAB_ALIASES:
+                response: str | None = await self._command_tab(tab, tokens[1:])
+            elif command in RUN_ALIASES:
+                # La reproducción de runbooks hace E/S remota: fuera del bucle de la UI.
+                response = await asyncio.to_thread(tab.commands.process, message.content)
+            elif command in RELOAD_ALIASES:
+                response = await self._reload_agent(tab, message.content)
+            else:
+                response = tab.commands.process(message.content)
         except Exception as exc:  # pragma: no cover - protección ante errores inesperados.
             self._app_logger.exception("Error procesando la entrada del usuario")
             response = _("ui.app.unexpected_error", error=str(exc))
         if response is not None:
             if response:
-                self._conversation.add_agent_markdown(response)
-            self._update_connection_info()
+                conversation.add_agent_markdown(response)
+            self._update_connection_info(tab)
             self._input.focus_editor()
             return
 
+        if not tab.initializing and not tab.runtime.ready:
+            conversation.add_agent_markdown(
+                tab.runtime.error_message or _("ui.app.agent_unavailable")
+            )
+            self._input.focus_editor()
+            return
+        tab.pending_prompts.append(trimmed)
+        if tab.busy:
+            conversation.add_agent_markdown(
+                _("ui.app.prompt_queued", position=len(tab.pending_prompts))
+            )
+            self._input.focus_editor()
+            return
+        self._start_prompt_worker(tab)
+
+    def on_command_input_typing(self, message: CommandInput.Typing) -> None:
+        message.stop()
+        tab = self._tab
+        prefetcher = tab.runtime.prefetcher
+        if prefetcher is None or tab.turn_running:
+            return
+        # Antirrebote: la precarga arranca cuando el operador deja de teclear.
+        if tab.prefetch_timer is not None:
+            tab.prefetch_timer.stop()
+        tab.prefetch_timer = self.set_timer(
+            prefetcher.debounce_seconds, lambda: self._start_prefetch(tab)
+        )
+
+    def on_tabbed_content_tab_activated(self, event: TabbedContent.TabActivated) -> None:
+        pane_id = event.pane.id
+        if pane_id not in self._tabs:
+            return
+        self._active_tab_id = pane_id
+        tab = self._tab
+        if self._input:
+            self._input.bind_processor(tab.commands)
+            self._input.focus_editor()
         if self._connection_info:
-            self._connection_info.set_thinking(True)
-        self._app_logger.info("Invocando agente")
+            self._connection_info.set_agent_state(tab.agent_state)
+            self._connection_info.set_thinking(tab.turn_running)
+        self._update_connection_info(tab)
+
+    async def _command_tab(self, tab: AgentTab, args: list[str]) -> str:
+        """Gestiona las pestañas: ``new [destino]``, ``close``, ``list`` o ``<n>``."""
+
+        action = args[0].lower() if args else "list"
+        if action == "list" and len(args) <= 1:
+            lines = [_("ui.tabs.header", count=len(self._tabs))]
+            for other in self._tabs.values():
+                marker = "▶" if other is tab else "-"
+                state = _("ui.tabs.busy") if other.busy else _("ui.tabs.idle")
+                lines.append(f"{marker} **{other.number}** `{other.target}` · {state}")
+            return "\n".join(lines)
+        if action == "new" and len(args) <= 2:
+            return await self._open_tab(tab, args[1] if len(args) == 2 else None)
+        if action == "close" and len(args) == 1:
+            return await self._close_tab(tab)
+        if action.isdigit() and len(args) == 1:
+            target = self._tabs.get(f"tab-{action}")
+            if target is None:
+                return _("ui.tabs.unknown", number=action)
+            assert self._tabbed is not None
+            self._tabbed.active = target.pane_id
+            return ""
+        return _("ui.tabs.usage", command=PRIMARY_TAB)
+
+    async def _open_tab(self, source: AgentTab, target: str | None) -> str:
+        connection = None
+        if target:
+            try:
+                # Misma credencial que la pestaña actual, como en el reparto de runbooks.
+                connection = await asyncio.to_thread(
+                    source.connection_manager.open_sibling, target
+                )
+            except ConnectionError as exc:
+                self._app_logger.info("No se pudo abrir la pestaña para %s: %s", target, exc)
+                return _("ui.tabs.connect_failed", target=target, error=str(exc))
+        tab = self._new_tab(connection_manager=connection)
+        pane = TabPane(tab.label, tab.conversation, id=tab.pane_id)
+        assert self._tabbed is not None
+        await self._tabbed.add_pane(pane)
+        self._style_pane(pane)
+        self._tabbed.active = tab.pane_id
+        self._start_agent_runtime(tab)
+        self._app_logger.info("Pestaña %d abierta (%s)", tab.number, tab.target)
+        return _("ui.tabs.opened", number=tab.number, target=tab.target)
+
+    async def _close_tab(self, tab: AgentTab) -> str:
+        if len(self._tabs) == 1:
+            return _("ui.tabs.last")
+        if tab.busy:
+            return _("ui.tabs.close_busy")
+        if tab.prefetch_timer is not None:
+            tab.prefetch_timer.stop()
+        del self._tabs[tab.pane_id]
+        assert self._tabbed is not None
+        await self._tabbed.remove_pane(tab.pane_id)
+        await asyncio.to_thread(self._shutdown_tab, tab)
+        self._app_logger.info("Pestaña %d cerrada", tab.number)
+        self._tab.conversation.add_agent_markdown(_("ui.tabs.closed", number=tab.number))
+        return ""
+
+    def _start_prefetch(self, tab: AgentTab) -> None:
+        tab.prefetch_timer = None
+        prefetcher = tab.runtime.prefetcher
+        if prefetcher is None or tab.turn_running or not prefetcher.pending():
+            return
+        self.run_worker(
+            asyncio.to_thread(prefetcher.warm),
+            group=f"prefetch-{tab.number}",
+            exclusive=True,
+            exit_on_error=False,
+        )
+
+    async def _reload_agent(self, tab: AgentTab, command: str) -> str | None:
+        """Ejecuta ``/reload`` en un hilo; los prompts enviados entretanto esperan en cola."""
+
+        if tab.busy:
+            return _("ui.app.reload_busy")
+        tab.initializing = True
+        self._set_agent_state(tab, "starting")
         try:
-            agent_output = await asyncio.to_thread(self._invoke_agent, trimmed)
+            response = await asyncio.to_thread(tab.commands.process, command)
         finally:
-            if self._connection_info:
-                self._connection_info.set_thinking(False)
-            self._app_logger.info("Agente finalizó la invocación")
-        if not agent_output:
-            agent_output = self._config.ui.output_panel.placeholder_response_markdown
-        self._conversation.add_agent_markdown(agent_output)
-        self._update_connection_info()
-        self._input.focus_editor()
+            tab.initializing = False
+        self._set_agent_state(tab, "ready" if tab.runtime.ready else "unavailable")
+        if tab.pending_prompts and not tab.turn_running:
+            self._start_prompt_worker(tab)
+        return response
+
+    def _start_config_watcher(self, tab: AgentTab) -> None:
+        path = tab.runtime.config_path
+        if path is None or self._config_watcher is not None:
+            return
+        # Se sondea siempre para que activar ``watch_config`` con /reload no
+        # dispare una recarga por el propio guardado que lo activó.
+        self._config_watcher = ConfigFileWatcher(path)
+        self.set_interval(CONFIG_WATCH_INTERVAL, self._poll_config)
+
+    async def _poll_config(self) -> None:
+        watcher = self._config_watcher
+        if watcher is None:
+            return
+        if watcher.poll():
+            for tab in self._tabs.values():
+                tab.reload_pending = tab.runtime.watch_config
+        # Las pestañas ocupadas se recargan en cuanto quedan libres.
+        for tab in list(self._tabs.values()):
+            if not tab.reload_pending or tab.busy:
+                continue
+            tab.reload_pending = False
+            self._app_logger.info(
+                "Cambios en %s: recargando la configuración de la pestaña %d",
+                watcher.path,
+                tab.number,
+            )
+            response = await self._reload_agent(tab, PRIMARY_RELOAD)
+            if response:
+                tab.conversation.add_agent_markdown(response)
+            self._update_connection_info(tab)
+
+    def _start_prompt_worker(self, tab: AgentTab) -> None:
+        # Los turnos corren como worker para que el bucle de la app siga
+        # atendiendo teclas (cancelación, salida) mientras llega la respuesta.
+        # Cada pestaña tiene su propio grupo: sus turnos avanzan en paralelo.
+        tab.turn_running = True
+        self._update_connection_info(tab)
+        self.run_worker(self._drain_prompt_queue(tab), group=f"agent-turn-{tab.number}")
+
+    async def _drain_prompt_queue(self, tab: AgentTab) -> None:
+        try:
+            while tab.pending_prompts:
+                prompt = tab.pending_prompts.popleft()
+                if not tab.runtime.ready:
+                    tab.conversation.add_agent_markdown(
+                        tab.runtime.error_message or _("ui.app.agent_unavailable")
+                    )
+                    continue
+                await self._run_agent_turn(tab, prompt)
+        finally:
+            tab.turn_running = False
+            self._update_connection_info(tab)
+
+    async def _run_agent_turn(self, tab: AgentTab, prompt: str) -> None:
+        assert self._input is not None
+        conversation = tab.conversation
+        self._set_thinking(tab, True)
+        self._app_logger.info("Invocando agente (pestaña %d)", tab.number)
+        self._app_logger.debug("Prompt enviado al agente: %.120s", prompt)
+        agent_output = ""
+        conversation.begin_agent_stream()
+        try:
+            async for event in tab.runtime.stream(prompt):
+                if event.kind == "text":
+                    conversation.append_agent_stream(event.text)
+                elif event.kind == "tool" and event.text:
+                    conversation.add_stream_notice(_("ui.app.tool_running", tool=event.text))
+                else:
+                    agent_output = event.text
+        except Exception as exc:  # pragma: no cover - protección ante errores inesperados.
+            self._app_logger.exception("Error durante la invocación del agente")
+            agent_output = _("ui.app.unexpected_error", error=str(exc))
+        finally:
+            self._set_thinking(tab, False)
+            self._app_logger.info("Agente finalizó la invocación (pestaña %d)", tab.number)
+            if not agent_output:
+                agent_output = self._config.ui.output_panel.placeholder_response_markdown
+            conversation.end_agent_stream(agent_output)
+        self._update_connection_info(tab)
+        if tab is self._tab:
+            self._input.focus_editor()
+
+    def action_cancel_agent(self) -> None:
+        """Cancela el turno del agente en curso en la pestaña activa, si lo hay."""
+        tab = self._tab
+        discarded = len(tab.pending_prompts)
+        if not tab.turn_running:
+            # Mientras el agente arranca no hay turno que cancelar, pero los prompts
+            # encolados se descartan para que no se lancen al terminar la carga.
+            if tab.initializing and discarded:
+                tab.pending_prompts.clear()
+                tab.conversation.add_stream_notice(_("ui.app.queue_discarded", count=discarded))
+            return
+        tab.pending_prompts.clear()
+        if not tab.runtime.cancel():
+            return
+        tab.conversation.add_stream_notice(_("ui.app.cancelling"))
+        if discarded:
+            tab.conversation.add_stream_notice(_("ui.app.queue_discarded", count=discarded))
 
     def _sanitize_user_message(self, content: str) -> str:
         """Oculta contraseñas en comandos de conexión antes de mostrarlos en el chat."""
@@ -166,12 +435,10 @@ class SmartAISysAdminApp(App[None]):
         return " ".join(tokens)
 
     def _handle_exit_request(self) -> None:
-        assert self._conversation is not None
-        self._conversation.add_agent_markdown(self._exit_dialog_config.prompt_markdown)
+        self._tab.conversation.add_agent_markdown(self._exit_dialog_config.prompt_markdown)
         self._show_exit_confirmation()
 
     def _warn_if_term_incompatible(self) -> None:
-        assert self._conversation is not None
         term = os.environ.get("TERM", "")
         detected = term or self._config.terminal.unknown_label
         if term not in self._config.terminal.allowed_terms:
@@ -179,54 +446,91 @@ class SmartAISysAdminApp(App[None]):
                 f"{self._config.terminal.warning_icon} {self._config.terminal.warning_message}\n\n"
                 f"{self._config.terminal.detected_label}: `{detected}`"
             )
-            self._conversation.add_agent_markdown(warning_md)
+            self._tab.conversation.add_agent_markdown(warning_md)
+
+    def _update_connection_info(self, tab: AgentTab | None = None) -> None:
+        """Actualiza la etiqueta de ``tab`` y, si es la activa, el footer."""
 
-    def _update_connection_info(self) -> None:
-        if not self._connection_info:
+        tab = tab or self._tab
+        if not self._tabbed or not self._connection_info or tab.pane_id not in self._tabs:
+            return
+        self._tabbed.get_tab(tab.pane_id).label = tab.label
+        if tab is not self._tab:
             return
-        provider_summary = self._agent_runtime.provider_footer_summary()
         self._connection_info.refresh_status(
-            self._connection_manager.status_summary(), provider_summary
+            tab.connection_manager.status_summary(),
+            tab.runtime.provider_footer_summary(),
+            tab.runtime.metrics_footer_summary(),
         )
 
+    def _set_agent_state(self, tab: AgentTab, state: AgentStateLiteral) -> None:
+        tab.agent_state = state
+        if self._connection_info and tab is self._tab:
+            self._connection_info.set_agent_state(state)
+
+    def _set_thinking(self, tab: AgentTab, active: bool) -> None:
+        if self._connection_info and tab is self._tab:
+            self._connection_info.set_thinking(active)
+
     def _show_exit_confirmation(self) -> None:
         modal = ExitConfirmationModal(self._exit_dialog_config)
         self.push_screen(modal, self._on_exit_confirmed)
 
     def _on_exit_confirmed(self, confirmed: bool | None) -> None:
         if confirmed:
-            self._close_connection_safely()
-            self._shutdown_agent()
+            self._shutdown_tabs()
             self.exit()
         elif self._input:
             self._input.focus_editor()
 
     def action_quit(self) -> None:
-        """Intercepta la acción estándar de salida para cerrar la conexión activa."""
-        self._close_connection_safely()
-        self._shutdown_agent()
+        """Intercepta la acción estándar de salida para cerrar las conexiones activas."""
+        self._shutdown_tabs()
         super().action_quit()
 
-    def _close_connection_safely(self) -> None:
+    def _close_connection_safely(self, tab: AgentTab) -> None:
         try:
-            self._connection_manager.disconnect()
+            tab.connection_manager.disconnect()
         except NoActiveConnection:
-            self._update_connection_info()
             return
         except ConnectionError as exc:
             self._app_logger.warning(
                 "Error cerrando la conexión al salir: %s",
                 exc,
             )
+
+    def _start_agent_runtime(self, tab: AgentTab) -> None:
+        tab.initializing = True
+        self._set_agent_state(tab, "starting")
+        self.run_worker(self._initialize_agent_runtime(tab), group=f"agent-init-{tab.number}")
+
+    async def _initialize_agent_runtime(self, tab: AgentTab) -> None:
+        try:
+            await asyncio.to_thread(tab.runtime.initialize)
+        except Exception:  # pragma: no cover - protección ante errores inesperados.
+            self._app_logger.exception("Error inicializando el agente")
         finally:
-            self._update_connection_info()
+            tab.initializing = False
+        if tab.runtime.error_message:
+            tab.conversation.add_agent_markdown(tab.runtime.error_message)
+        self._rehydrate_conversation(tab)
+        self._start_config_watcher(tab)
+        self._set_agent_state(tab, "ready" if tab.runtime.ready else "unavailable")
+        self._update_connection_info(tab)
+        if tab.pending_prompts and not tab.turn_running:
+            self._start_prompt_worker(tab)
 
-    def _initialize_agent_runtime(self) -> None:
-        assert self._conversation is not None
-        self._agent_runtime.initialize()
-        if self._agent_runtime.error_message:
-            self._conversation.add_agent_markdown(self._agent_runtime.error_message)
-        self._update_connection_info()
+    def _rehydrate_conversation(self, tab: AgentTab) -> None:
+        """Muestra la cola de la sesión reanudada; el resto queda solo en disco."""
+        transcript = tab.runtime.resumed_transcript(self._config.ui.history_limit)
+        for role, text in transcript:
+            if role == "user":
+                tab.conversation.add_user_message(text)
+            else:
+                tab.conversation.add_agent_markdown(text)
+        notice = tab.runtime.session_notice
+        if notice:
+            tab.conversation.add_agent_markdown(notice)
 
     def _show_welcome_screen(self) -> None:
         if self._welcome_shown:
@@ -234,21 +538,18 @@ class SmartAISysAdminApp(App[None]):
         self.push_screen(self._welcome_screen)
         self._welcome_shown = True
 
-    def _invoke_agent(self, prompt: str) -> str:
-        if not self._agent_runtime.ready:
-            return (
-                self._agent_runtime.error_message
-                or _("ui.app.agent_unavailable")
-            )
-        self._app_logger.debug("Prompt enviado al agente: %.120s", prompt)
-        return self._agent_runtime.invoke(prompt)
+    def _shutdown_tab(self, tab: AgentTab) -> None:
+        self._close_connection_safely(tab)
+        tab.runtime.shutdown()
 
-    def _shutdown_agent(self) -> None:
-        self._agent_runtime.shutdown()
+    def _shutdown_tabs(self) -> None:
+        for tab in self._tabs.values():
+            self._shutdown_tab(tab)
+        self._update_connection_info()
 
 
-def run_app(config: AppConfig = CONFIG) -> None:
+def run_app(config: AppConfig = CONFIG, resume_session: str | None = None) -> None:
     """Ejecuta la aplicación TUI con la configuración suministrada."""
-    SmartAISysAdminApp(config=config).run()
+    SmartAISysAdminApp(config=config, resume_session=resume_session).run()
 
 __all__ = ["SmartAISysAdminApp", "run_app"]
@@ -15,6 +15,8 @@ from ..connection import (
     NoActiveConnection,
     SSHConnectionManager,
 )
+from ..agent.config import AgentConfigError
+from ..agent.runbooks import HostReport, RunbookError
 from ..localization import _
 from ..plugins.types import PluginSlashCommand
 
@@ -26,12 +28,24 @@ PRIMARY_DISCONNECT = "/disconnect"
 PRIMARY_HELP = "/help"
 PRIMARY_EXIT = "/exit"
 PRIMARY_STATUS = "/status"
+PRIMARY_RUNBOOK = "/runbook"
+PRIMARY_RUN = "/run"
+PRIMARY_RELOAD = "/reload"
+PRIMARY_TAB = "/tab"
 
 CONNECT_ALIASES = frozenset({PRIMARY_CONNECT, "/conectar", "/verbinden"})
 DISCONNECT_ALIASES = frozenset({PRIMARY_DISCONNECT, "/desconectar", "/trennen"})
 HELP_ALIASES = frozenset({PRIMARY_HELP, "/ayuda", "/hilfe"})
 EXIT_ALIASES = frozenset({PRIMARY_EXIT, "/salir", "/quit", "/beenden"})
 STATUS_ALIASES = frozenset({PRIMARY_STATUS, "/estado"})
+RUNBOOK_ALIASES = frozenset({PRIMARY_RUNBOOK, "/runbooks"})
+RUN_ALIASES = frozenset({PRIMARY_RUN, "/ejecutar", "/ausfuehren"})
+RELOAD_ALIASES = frozenset({PRIMARY_RELOAD, "/recargar", "/neuladen"})
+# Las pestañas las gestiona la aplicación, como la salida.
+TAB_ALIASES = frozenset({PRIMARY_TAB, "/tabs", "/pestana", "/reiter"})
+
+# Caracteres de salida de cada paso que se muestran al reproducir un runbook.
+RUNBOOK_OUTPUT_CHARS = 1500
 
 
 class SlashCommandProcessor:
@@ -58,6 +72,10 @@ class SlashCommandProcessor:
                 HELP_ALIASES,
                 EXIT_ALIASES,
                 STATUS_ALIASES,
+                RUNBOOK_ALIASES,
+                RUN_ALIASES,
+                RELOAD_ALIASES,
+                TAB_ALIASES,
             ]
             for alias in group
         )
@@ -109,6 +127,14 @@ class SlashCommandProcessor:
             return self._suggest_exit(command_raw, tokens)
         if command in STATUS_ALIASES:
             return self._suggest_status(command_raw, tokens)
+        if command in RUNBOOK_ALIASES:
+            return _("ui.input.suggestions.runbook", usage=self._runbook_usage())
+        if command in RUN_ALIASES:
+            return _("ui.input.suggestions.run", usage=self._run_usage())
+        if command in RELOAD_ALIASES:
+            return _("ui.input.suggestions.reload", command=command_raw)
+        if command in TAB_ALIASES:
+            return _("ui.input.suggestions.tab", usage=self._tab_usage())
         plugin = self._plugin_alias_index.get(command)
         if plugin is None:
             return None
@@ -146,6 +172,12 @@ class SlashCommandProcessor:
             handler = self._command_help
         elif command in STATUS_ALIASES:
             handler = self._command_status
+        elif command in RUNBOOK_ALIASES:
+            handler = self._command_runbook
+        elif command in RUN_ALIASES:
+            handler = self._command_run
+        elif command in RELOAD_ALIASES:
+            handler = self._command_reload
         else:
             plugin = self._plugin_alias_index.get(command)
             if plugin:
@@ -306,6 +338,12 @@ class SlashCommandProcessor:
             return self._help_usage()
         if target in EXIT_ALIASES:
             return self._exit_help()
+        if target in RUNBOOK_ALIASES or target in RUN_ALIASES:
+            return self._runbook_help()
+        if target in RELOAD_ALIASES:
+            return self._reload_help()
+        if target in TAB_ALIASES:
+            return _("ui.commands.tab.help", command=PRIMARY_TAB)
         plugin = self._plugin_alias_index.get(target)
         if plugin:
             if plugin.help_key:
@@ -330,6 +368,10 @@ class SlashCommandProcessor:
             disconnect_usage=self._disconnect_usage(),
             help_usage=self._help_usage(),
             status_usage=self._status_usage(),
+            runbook_usage=self._runbook_usage(),
+            run_usage=self._run_usage(),
+            reload_usage=PRIMARY_RELOAD,
+            tab_usage=self._tab_usage(),
             exit_command=PRIMARY_EXIT,
         )
         if not self._plugin_commands:
@@ -451,6 +493,22 @@ class SlashCommandProcessor:
     def _status_usage(self) -> str:
         return PRIMARY_STATUS
 
+    def _runbook_usage(self) -> str:
+        return _("ui.commands.runbook.usage", command=PRIMARY_RUNBOOK)
+
+    def _run_usage(self) -> str:
+        return _("ui.commands.run.usage", command=PRIMARY_RUN)
+
+    def _tab_usage(self) -> str:
+        return _("ui.tabs.usage_line", command=PRIMARY_TAB)
+
+    def _runbook_help(self) -> str:
+        return _(
+            "ui.commands.runbook.help",
+            runbook=PRIMARY_RUNBOOK,
+            run=PRIMARY_RUN,
+        )
+
     def _exit_help(self) -> str:
         return _(
             "ui.input.suggestions.exit.description",
@@ -502,6 +560,90 @@ class SlashCommandProcessor:
                 lines.append(
                     f"- {_('ui.commands.status.config_path')}: `{summary['config_path']}`"
                 )
+            routing = summary.get("model_routing")
+            if routing:
+                lines.append(
+                    "- "
+                    + _(
+                        "ui.commands.status.model_routing",
+                        fast=routing["fast"],
+                        strong=routing["strong"],
+                        fast_calls=routing["calls"].get("fast", 0),
+                        strong_calls=routing["calls"].get("strong", 0),
+                        last=routing["last"] or "-",
+                    )
+                )
+            if summary.get("failover"):
+                chain, last_provider = summary["failover"]
+                lines.append(
+                    "- "
+                    + _(
+                        "ui.commands.status.failover",
+                        chain=" → ".join(chain),
+                        last=last_provider or "-",
+                    )
+                )
+            if summary.get("session"):
+                lines.append(f"- {_('ui.commands.status.session')}: `{summary['session']}`")
+            for pool in summary.get("executors", ()):
+                lines.append(
+                    "- "
+                    + _(
+                        "ui.commands.status.pool",
+                        name=pool.name,
+                        active=pool.active,
+                        workers=pool.workers,
+                        queued=pool.queued,
+                        peak=pool.peak_queued,
+                        completed=pool.completed,
+                        rejected=pool.rejected,
+                    )
+                )
+            cache_stats = summary.get("prompt_cache")
+            if cache_stats is not None:
+                lines.append(
+                    "- "
+                    + _(
+                        "ui.commands.status.prompt_cache",
+                        hit=round(cache_stats.last.hit_ratio * 100),
+                        read=cache_stats.last.read,
+                        written=cache_stats.last.written,
+                        uncached=cache_stats.last.uncached,
+                        session_hit=round(cache_stats.session.hit_ratio * 100),
+                    )
+                )
+            turn_metrics = summary.get("metrics")
+            if turn_metrics is not None:
+                for label, metrics in (
+                    ("ui.commands.status.metrics_last", turn_metrics.last),
+                    ("ui.commands.status.metrics_session", turn_metrics.session),
+                ):
+                    lines.append(
+                        "- "
+                        + _(
+                            label,
+                            turns=metrics.turns,
+                            input=metrics.total_input_tokens,
+                            cached=metrics.cache_read_tokens,
+                            output=metrics.output_tokens,
+                            model_seconds=f"{metrics.model_seconds:.1f}",
+                            model_calls=metrics.model_calls,
+                            tool_seconds=f"{metrics.tool_seconds:.1f}",
+                            tool_calls=metrics.tool_calls,
+                            cost="n/a" if metrics.cost is None else f"${metrics.cost:.4f}",
+                        )
+                    )
+            host_cache = summary.get("prefetch")
+            if host_cache is not None:
+                lines.append(
+                    "- "
+                    + _(
+                        "ui.commands.status.prefetch",
+                        hits=host_cache.hits,
+                        misses=host_cache.misses,
+                        ttl=f"{host_cache.ttl_seconds:g}",
+                    )
+                )
             if summary.get("status"):
                 lines.append(f"- {summary['status']}")
             if summary.get("error"):
@@ -510,6 +652,143 @@ class SlashCommandProcessor:
                 )
         return "\n".join(lines)
 
+    @staticmethod
+    def _split_params(args: list[str]) -> tuple[list[str], dict[str, str]]:
+        positional: list[str] = []
+        params: dict[str, str] = {}
+        for arg in args:
+            key, sep, value = arg.partition("=")
+            if sep and key.isidentifier():
+                params[key] = value
+            else:
+                positional.append(arg)
+        return positional, params
+
+    def _command_runbook(self, args: list[str]) -> str:
+        store = self._agent_runtime.runbook_store if self._agent_runtime else None
+        if store is None:
+            return _("ui.commands.runbook.unavailable")
+        if not args:
+            return self._runbook_help()
+        action = args[0].lower()
+        positional, params = self._split_params(args[1:])
+        try:
+            if action == "list" and not positional:
+                names = store.names()
+                if not names:
+                    return _("ui.commands.runbook.empty")
+                return "\n".join(
+                    [_("ui.commands.runbook.list_header")] + [f"- `{name}`" for name in names]
+                )
+            if len(positional) != 1:
+                return self._format_help(
+                    _("ui.commands.runbook.missing_name"), self._runbook_help()
+                )
+            name = positional[0]
+            if action == "save":
+                runbook = self._agent_runtime.record_runbook(name, params)
+                return _(
+                    "ui.commands.runbook.saved",
+                    name=runbook.name,
+                    steps=len(runbook.steps),
+                    run=PRIMARY_RUN,
+                )
+            if action == "show" and not params:
+                runbook = store.load(name)
+                lines = [_("ui.commands.runbook.show_header", name=runbook.name)]
+                if runbook.description:
+                    lines.append(f"> {runbook.description}")
+                lines.extend(
+                    f"{index}. `{step.describe()}`"
+                    for index, step in enumerate(runbook.steps, start=1)
+                )
+                if runbook.params:
+                    lines.append(
+                        _(
+                            "ui.commands.runbook.params",
+                            params=", ".join(
+                                f"`{key}={value}`" for key, value in runbook.params.items()
+                            ),
+                        )
+                    )
+                return "\n".join(lines)
+            if action == "delete" and not params:
+                store.delete(name)
+                return _("ui.commands.runbook.deleted", name=name)
+        except (RunbookError, RuntimeError) as exc:
+            self._logger.info("%s %s falló: %s", PRIMARY_RUNBOOK, action, exc)
+            return f"❌ {exc}"
+        return self._format_help(
+            _("ui.commands.runbook.unknown_action", action=action), self._runbook_help()
+        )
+
+    def _command_run(self, args: list[str]) -> str:
+        runtime = self._agent_runtime
+        store = runtime.runbook_store if runtime else None
+        runner = runtime.runbook_runner if runtime else None
+        if store is None or runner is None:
+            return _("ui.commands.runbook.unavailable")
+        positional, params = self._split_params(args)
+        if not positional:
+            return self._format_help(_("ui.commands.runbook.missing_name"), self._runbook_help())
+        name, hosts = positional[0], positional[1:]
+        try:
+            runbook = store.load(name)
+            reports = runner.run(runbook, hosts, params)
+        except (RunbookError, ConnectionError) as exc:
+            self._logger.info("%s %s falló: %s", PRIMARY_RUN, name, exc)
+            return f"❌ {exc}"
+        ok = sum(1 for report in reports if report.ok)
+        lines = [_("ui.commands.run.header", name=name, ok=ok, total=len(reports))]
+        for report in reports:
+            lines.extend(self._format_host_report(report))
+        return "\n".join(lines)
+
+    def _format_host_report(self, report: HostReport) -> list[str]:
+        icon = "✅" if report.ok else "❌"
+        lines = ["", f"**{icon} {report.host}**"]
+        if report.error:
+            lines.append(_("ui.commands.run.connect_failed", error=report.error))
+            return lines
+        for index, step in enumerate(report.steps, start=1):
+            status = "✅" if step.ok else ("⚠️" if not step.step.check else "❌")
+            code = "" if step.exit_code is None else f" ({step.exit_code})"
+            lines.append(f"{index}. {status} `{step.step.describe()}`{code}")
+            output = step.output.strip()
+            if output:
+                if len(output) > RUNBOOK_OUTPUT_CHARS:
+                    output = "…" + output[-RUNBOOK_OUTPUT_CHARS:]
+                lines.append(f"```\n{output}\n```")
+        return lines
+
+    def _command_reload(self, args: list[str]) -> str:
+        if args:
+            return self._format_help(
+                _("ui.commands.reload.no_args", command=PRIMARY_RELOAD),
+                self._reload_help(),
+            )
+        if self._agent_runtime is None:
+            return _("ui.commands.reload.unavailable")
+        try:
+            changes = self._agent_runtime.reload()
+        except (AgentConfigError, RuntimeError) as exc:
+            self._logger.warning("%s falló: %s", PRIMARY_RELOAD, exc)
+            return _("ui.commands.reload.failed", error=str(exc))
+        if changes is None:
+            return _("ui.commands.reload.initialized")
+        if not changes:
+            return _("ui.commands.reload.unchanged")
+        components = [
+            f"mcp ({', '.join(changes.mcp_transports)})"
+            if name == "mcp" and changes.mcp_transports
+            else name
+            for name in changes.changed
+        ]
+        return _("ui.commands.reload.applied", components=", ".join(components))
+
+    def _reload_help(self) -> str:
+        return _("ui.commands.reload.help", command=PRIMARY_RELOAD)
+
     def _status_help(self) -> str:
         return _(
             "ui.commands.status.help",
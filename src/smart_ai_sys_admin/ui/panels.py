@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.text import Text
 from textual import events
 from textual.app import ComposeResult
-from textual.containers import Horizontal
+from textual.containers import Horizontal, VerticalScroll
 from textual.message import Message
 from textual.reactive import reactive
 from textual.widgets import RichLog, Static, TextArea
@@ -21,28 +21,51 @@ from .commands import SlashCommandProcessor
 if TYPE_CHECKING:  # pragma: no cover - solo para anotaciones estáticas.
     from ..config import ShortcutConfig
 
+AgentStateLiteral = Literal["starting", "ready", "unavailable"]
+
+# Intervalo mínimo entre redibujados del panel mientras llega la respuesta.
+STREAM_REFRESH_SECONDS = 0.05
+# Alto máximo de la respuesta en curso; el resto de la pantalla sigue mostrando el historial.
+STREAM_MAX_HEIGHT = "60%"
+
 
 class ConversationPanel(Static):
     """Panel encargado de renderizar la conversación en formato Markdown."""
 
-    def __init__(self, app_config: AppConfig) -> None:
-        super().__init__(id="conversation-panel")
+    def __init__(self, app_config: AppConfig, panel_id: str = "conversation-panel") -> None:
+        super().__init__(id=panel_id)
         self._ui = app_config.ui
         self._history: list[Panel] = []
         self._log: RichLog | None = None
+        # La respuesta en curso se pinta en su propio widget, debajo del historial,
+        # y solo pasa al registro cuando termina: así cada refresco no depende
+        # de la longitud de la conversación.
+        self._stream_view: Static | None = None
+        self._stream_box: VerticalScroll | None = None
+        self._streaming = False
+        self._stream_text = ""
+        self._stream_refresh_pending = False
 
     def compose(self) -> ComposeResult:
         self._log = RichLog(auto_scroll=True, markup=True, wrap=True, id="conversation-log")
         self._log.border_title = self._ui.output_panel.title
         self._log.border_style = self._ui.output_panel.border_style
         yield self._log
+        self._stream_view = Static(id="conversation-stream-view")
+        self._stream_box = VerticalScroll(self._stream_view, id="conversation-stream")
+        yield self._stream_box
 
     def on_mount(self) -> None:
-        assert self._log is not None
+        assert self._log is not None and self._stream_box is not None
         self.styles.height = "1fr"
         self.styles.width = "100%"
+        self._log.styles.height = "1fr"
+        self._stream_box.styles.height = "auto"
+        self._stream_box.styles.max_height = STREAM_MAX_HEIGHT
+        self._stream_box.display = False
         if self._ui.output_panel.background:
             self._log.styles.background = self._ui.output_panel.background
+            self._stream_box.styles.background = self._ui.output_panel.background
         self._register_panel(self._build_agent_panel(self._ui.output_panel.initial_markdown))
 
     def on_resize(self, event: events.Resize) -> None:  # type: ignore[override]
@@ -60,6 +83,57 @@ class ConversationPanel(Static):
         panel = self._build_agent_panel(markdown_text)
         self._register_panel(panel)
 
+    def begin_agent_stream(self) -> None:
+        """Muestra un panel del agente que se irá completando con cada fragmento."""
+
+        self._streaming = True
+        self._stream_text = ""
+        self._show_stream(self._build_agent_panel(_("ui.app.streaming_placeholder")))
+
+    def append_agent_stream(self, delta: str) -> None:
+        if not self._streaming or not delta:
+            return
+        self._stream_text += delta
+        self._schedule_stream_refresh()
+
+    def add_stream_notice(self, notice: str) -> None:
+        if not self._streaming:
+            return
+        separator = "\n\n" if self._stream_text and not self._stream_text.endswith("\n\n") else ""
+        self._stream_text += f"{separator}_{notice}_\n\n"
+        self._schedule_stream_refresh()
+
+    def end_agent_stream(self, markdown_text: str) -> None:
+        """Oculta el panel en curso y escribe la respuesta final en el historial."""
+
+        self._streaming = False
+        self._stream_text = ""
+        if self._stream_box is not None:
+            self._stream_box.display = False
+        if self._stream_view is not None:
+            self._stream_view.update("")
+        self._register_panel(self._build_agent_panel(markdown_text))
+
+    def _schedule_stream_refresh(self) -> None:
+        # Agrupamos los fragmentos para no redibujar el historial en cada token.
+        if self._stream_refresh_pending:
+            return
+        self._stream_refresh_pending = True
+        self.set_timer(STREAM_REFRESH_SECONDS, self._flush_stream)
+
+    def _flush_stream(self) -> None:
+        self._stream_refresh_pending = False
+        if not self._streaming:
+            return
+        self._show_stream(self._build_agent_panel(self._stream_text))
+
+    def _show_stream(self, panel: Panel) -> None:
+        if self._stream_view is None or self._stream_box is None:
+            return
+        self._stream_view.update(panel)
+        self._stream_box.display = True
+        self._stream_box.scroll_end(animate=False)
+
     def _build_panel(self, label_config: PanelConfig, body: Text | Markdown) -> Panel:
         panel = Panel(
             body,
@@ -79,16 +153,25 @@ class ConversationPanel(Static):
         self._history.append(panel)
         if len(self._history) > self._ui.history_limit:
             self._history = self._history[-self._ui.history_limit :]
-        self._refresh_log()
+            self._refresh_log()
+            return
+        # Sin recorte basta con añadir el panel nuevo al final del registro.
+        self._write_entry(panel)
+        assert self._log is not None
+        self._log.scroll_end(animate=False)
 
     def _refresh_log(self) -> None:
         assert self._log is not None
         self._log.clear()
         for entry in self._history:
-            width = self._log.size.width or None
-            self._log.write(entry, width=width, expand=True, shrink=False)
+            self._write_entry(entry)
         self._log.scroll_end(animate=False)
 
+    def _write_entry(self, entry: Panel) -> None:
+        assert self._log is not None
+        width = self._log.size.width or None
+        self._log.write(entry, width=width, expand=True, shrink=False)
+
 
 class _HistoryAwareTextArea(TextArea):
     """TextArea que delega algunas teclas al contenedor para lógica personalizada."""
@@ -114,6 +197,9 @@ class CommandInput(Static):
             self.set_sender(sender)
             self.content = content
 
+    class Typing(Message):
+        """El operador está escribiendo un prompt para el agente (no un comando)."""
+
     value = reactive("")
 
     def __init__(
@@ -167,6 +253,9 @@ class CommandInput(Static):
         self.value = event.text_area.text
         if not self._navigating_history:
             self._history_index = None
+            stripped = self.value.lstrip()
+            if stripped and not stripped.startswith("/"):
+                self.post_message(self.Typing())
         self._update_placeholder_hint()
 
     def _handle_editor_key(self, event: events.Key) -> bool:
@@ -220,6 +309,12 @@ class CommandInput(Static):
         self.post_message(self.Submitted(self, content))
         self._editor.load_text("")
 
+    def bind_processor(self, command_processor: SlashCommandProcessor) -> None:
+        """Usa el procesador de la pestaña activa para las sugerencias."""
+
+        self._command_processor = command_processor
+        self._update_placeholder_hint()
+
     def focus_editor(self) -> None:
         if self._editor:
             self._editor.focus()
@@ -291,6 +386,8 @@ class ConnectionInfo(Static):
         self._status_node: Static | None = None
         self._indicator_node: Static | None = None
         self._provider_message: str = ""
+        self._metrics_message: str = ""
+        self._agent_state: AgentStateLiteral | None = None
 
     def compose(self) -> ComposeResult:
         yield Horizontal(
@@ -321,15 +418,22 @@ class ConnectionInfo(Static):
 
         self.refresh_status(self._message)
 
-    def refresh_status(self, message: str, provider: str | None = None) -> None:
+    def refresh_status(
+        self, message: str, provider: str | None = None, metrics: str | None = None
+    ) -> None:
         self._message = message
         self._provider_message = provider or ""
+        self._metrics_message = metrics or ""
         self._render()
 
     def set_thinking(self, active: bool) -> None:
         self._thinking = active
         self._render()
 
+    def set_agent_state(self, state: AgentStateLiteral) -> None:
+        self._agent_state = state
+        self._render()
+
     def _render(self) -> None:
         if not self._status_node or not self._indicator_node:
             return
@@ -339,6 +443,9 @@ class ConnectionInfo(Static):
             status_text.append("  ·  ", style=self._panel_config.text_style)
         status_text.append(f"{self._panel_config.title}: ", style=self._panel_config.border_style)
         status_text.append(self._message, style=self._panel_config.text_style)
+        if self._metrics_message:
+            status_text.append("  ·  ", style=self._panel_config.text_style)
+            status_text.append(self._metrics_message, style=self._panel_config.text_style)
         if self._thinking:
             status_text.append(
                 f"  {_('connection.status.thinking')}",
@@ -346,4 +453,7 @@ class ConnectionInfo(Static):
             )
         self._status_node.update(status_text)
         if self._indicator_node:
-            self._indicator_node.update(Text("", style=self._panel_config.text_style))
+            indicator = (
+                _(f"connection.status.agent_{self._agent_state}") if self._agent_state else ""
+            )
+            self._indicator_node.update(Text(indicator, style=self._panel_config.text_style))
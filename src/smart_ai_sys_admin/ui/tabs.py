@@ -0,0 +1,80 @@
+"""Pestañas de trabajo: cada una con su conexión SSH, su agente y su conversación."""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from collections.abc import Iterable
+
+from textual.timer import Timer
+
+from ..agent import AgentRuntime, ToolPermissionManager
+from ..config import AppConfig
+from ..connection import SSHConnectionManager
+from ..localization import _
+from ..plugins.types import PluginSlashCommand
+from .commands import SlashCommandProcessor
+from .panels import AgentStateLiteral, ConversationPanel
+
+
+class AgentTab:
+    """Estado de una pestaña.
+
+    Los turnos de pestañas distintas corren en paralelo: cada una tiene su cola
+    de prompts y su propio :class:`AgentRuntime` ligado a su conexión.
+    """
+
+    def __init__(
+        self,
+        number: int,
+        config: AppConfig,
+        *,
+        plugin_commands: Iterable[PluginSlashCommand] = (),
+        permission_manager: ToolPermissionManager | None = None,
+        resume_session: str | None = None,
+        connection_manager: SSHConnectionManager | None = None,
+    ) -> None:
+        self.number = number
+        self.pane_id = f"tab-{number}"
+        self.connection_manager = connection_manager or SSHConnectionManager(
+            logging.getLogger("smart_ai_sys_admin.connection")
+        )
+        self.runtime = AgentRuntime(
+            self.connection_manager,
+            logging.getLogger("smart_ai_sys_admin.agent.runtime"),
+            resume_session=resume_session,
+            permission_manager=permission_manager,
+        )
+        self.commands = SlashCommandProcessor(
+            self.connection_manager,
+            self.runtime,
+            config.ui.output_panel,
+            logging.getLogger("smart_ai_sys_admin.ui.commands"),
+        )
+        self.commands.register_plugin_commands(list(plugin_commands))
+        self.conversation = ConversationPanel(config, panel_id=f"conversation-{number}")
+        self.pending_prompts: deque[str] = deque()
+        self.turn_running = False
+        self.initializing = False
+        self.reload_pending = False
+        self.agent_state: AgentStateLiteral = "starting"
+        self.prefetch_timer: Timer | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self.turn_running or self.initializing
+
+    @property
+    def target(self) -> str:
+        details = self.connection_manager.details
+        if details is None:
+            return _("ui.tabs.disconnected")
+        return f"{details.username}@{details.host}"
+
+    @property
+    def label(self) -> str:
+        marker = " ⏳" if self.turn_running else ""
+        return f"{self.number} · {self.target}{marker}"
+
+
+__all__ = ["AgentTab"]
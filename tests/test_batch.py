@@ -0,0 +1,159 @@
+"""Pruebas del modo batch sin interfaz."""
+
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from smart_ai_sys_admin.agent.metrics import TurnMetrics
+from smart_ai_sys_admin.batch import (
+    BatchError,
+    BatchRunner,
+    HostDefaults,
+    HostTarget,
+    load_inventory,
+    parse_target,
+)
+from smart_ai_sys_admin.connection import ConnectionError
+
+
+def test_inventory_formats_share_defaults(tmp_path):
+    defaults = HostDefaults(username="ops", key_path="/keys/id")
+    assert parse_target("root@db:2222", defaults) == HostTarget(
+        "db", "root", 2222, key_path="/keys/id"
+    )
+
+    text = tmp_path / "hosts.txt"
+    text.write_text("# web\nweb1\n\nadmin@web2:22\n", encoding="utf-8")
+    assert [host.label for host in load_inventory(text, defaults)] == [
+        "ops@web1:22",
+        "admin@web2:22",
+    ]
+
+    structured = tmp_path / "hosts.json"
+    structured.write_text(
+        json.dumps({"hosts": ["web1", {"host": "db", "user": "pg", "port": 2200}]}),
+        encoding="utf-8",
+    )
+    assert [host.label for host in load_inventory(structured, defaults)] == [
+        "ops@web1:22",
+        "pg@db:2200",
+    ]
+
+    with pytest.raises(BatchError):
+        parse_target("web1", HostDefaults(key_path="/keys/id"))
+
+
+class _FakeManager:
+    def connect(self, host, username, **_kwargs):
+        if host == "down":
+            raise ConnectionError("unreachable")
+
+    def disconnect(self):
+        pass
+
+
+class _FakeRuntime:
+    ready = True
+    error_message = None
+    session_id = "s1"
+
+    def __init__(self, _manager):
+        self.last_turn_metrics = None
+        self.kept_jobs: list[bool] = []
+        self._cancelled = threading.Event()
+
+    def initialize(self):
+        pass
+
+    def new_conversation(self, *, keep_jobs=True):
+        self.kept_jobs.append(keep_jobs)
+        self.last_turn_metrics = None
+        self._cancelled.clear()
+
+    def invoke(self, prompt, *, raise_errors=False):
+        if prompt == "boom":
+            raise RuntimeError("fallo")
+        if prompt == "hang":
+            self._cancelled.wait(5)
+            return ""
+        self.last_turn_metrics = TurnMetrics(turns=1, input_tokens=3, output_tokens=2)
+        return prompt.upper()
+
+    def cancel(self):
+        self._cancelled.set()
+        return True
+
+    def shutdown(self):
+        pass
+
+
+def _patch_manager(monkeypatch):
+    monkeypatch.setattr(
+        "smart_ai_sys_admin.batch.SSHConnectionManager", lambda _log: _FakeManager()
+    )
+
+
+def test_runner_emits_one_record_per_host_and_prompt(monkeypatch):
+    _patch_manager(monkeypatch)
+    hosts = [HostTarget("web", "ops", key_path="k"), HostTarget("down", "ops", key_path="k")]
+    emitted = []
+    runner = BatchRunner(hosts, ["uptime", "boom"], concurrency=2, runtime_factory=_FakeRuntime)
+    results = runner.run(emitted.append)
+
+    assert emitted == results and len(results) == 4
+    by_key = {(item.host, item.prompt): item for item in results}
+    ok = by_key[("web", "uptime")]
+    assert ok.status == "ok" and ok.output == "UPTIME" and ok.session == "s1"
+    assert ok.usage["input_tokens"] == 3 and "turns" not in ok.usage
+    assert by_key[("web", "boom")].status == "error"
+    assert {by_key[("down", p)].status for p in ("uptime", "boom")} == {"unreachable"}
+    assert json.loads(ok.to_json())["prompt_index"] == 0
+
+
+def test_failed_and_expired_jobs_are_reported(monkeypatch):
+    _patch_manager(monkeypatch)
+    runtimes = []
+
+    def factory(manager):
+        runtimes.append(_FakeRuntime(manager))
+        return runtimes[-1]
+
+    hosts = [HostTarget("web", "ops", key_path="k"), HostTarget("db", "ops", key_path="k")]
+    runner = BatchRunner(
+        hosts, ["boom", "hang"], concurrency=1, timeout_seconds=0.2, runtime_factory=factory
+    )
+    results = runner.run(lambda _result: None)
+
+    statuses = {(item.host, item.prompt): (item.status, item.error) for item in results}
+    assert statuses[("web", "boom")] == ("error", "fallo")
+    assert statuses[("db", "hang")][0] == "timeout"
+    # Cada host empieza sin los trabajos remotos del anterior.
+    assert runtimes[0].kept_jobs == [False, True, False, True]
+
+
+def test_hosts_of_a_worker_that_fails_to_start_go_to_the_others(monkeypatch):
+    _patch_manager(monkeypatch)
+    calls = []
+    lock = threading.Lock()
+
+    def factory(manager):
+        with lock:
+            calls.append(manager)
+            if len(calls) == 1:
+                raise RuntimeError("sin credenciales del proveedor")
+        return _FakeRuntime(manager)
+
+    hosts = [HostTarget(name, "ops", key_path="k") for name in ("web", "db", "cache")]
+    runner = BatchRunner(hosts, ["uptime"], concurrency=2, runtime_factory=factory)
+    results = runner.run(lambda _result: None)
+
+    assert sorted(item.host for item in results) == ["cache", "db", "web"]
+
+    def broken(_manager):
+        raise RuntimeError("sin credenciales del proveedor")
+
+    with pytest.raises(BatchError, match="sin credenciales"):
+        BatchRunner(hosts, ["uptime"], concurrency=2, runtime_factory=broken).run(print)
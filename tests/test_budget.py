@@ -0,0 +1,67 @@
+"""Pruebas para la estimación de tokens y el presupuesto de salida de tools."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from smart_ai_sys_admin.agent.budget import (
+    MIN_CALL_TOKENS,
+    ToolOutputBudget,
+    estimator_for,
+    model_family,
+)
+from smart_ai_sys_admin.agent.tools import _preview_length, _summarize_stream
+
+
+def test_model_family_detection():
+    assert model_family("us.anthropic.claude-sonnet-4-20250514-v1:0") == "claude"
+    assert model_family("gpt-4o") == "openai"
+    assert model_family("qwen-3-coder-480b") == "qwen"
+    assert model_family("desconocido") == "default"
+
+
+def test_estimator_is_cached_per_family():
+    assert estimator_for("gpt-4o") is estimator_for("gpt-4.1-mini")
+    assert estimator_for("gpt-4o") is not estimator_for("llama3.1")
+
+
+def test_dense_output_costs_more_than_prose_of_same_length():
+    estimator = estimator_for("gpt-4o")
+    prose = "the service restarted without errors and the disk is healthy " * 20
+    dense = ("a3f9c2e1/var/lib/docker/overlay2:0x7ffd;" * 40)[: len(prose)]
+
+    assert estimator.count(dense) > estimator.count(prose)
+
+
+def test_fit_keeps_head_and_tail_within_budget():
+    estimator = estimator_for("gpt-4o")
+    text = "\n".join(f"line {index} some text here" for index in range(500))
+
+    fitted = estimator.fit(text, 120)
+
+    assert estimator.count(fitted) <= 140
+    assert fitted.startswith("line 0 ")
+    assert fitted.rstrip().endswith("line 499 some text here")
+
+
+def test_budget_hook_clips_results_and_consumes_turn():
+    budget = ToolOutputBudget(estimator_for("gpt-4o"), turn_tokens=1000, per_call_tokens=400)
+    event = SimpleNamespace(
+        result={"content": [{"text": "word " * 2000}]},
+        tool_use={"name": "file_read"},
+    )
+
+    budget._on_after_tool_call(event)
+
+    assert budget.estimator.count(event.result["content"][0]["text"]) <= 400
+    assert 600 <= budget.remaining < 1000
+    budget.reset()
+    assert budget.remaining == 1000
+    assert budget.allowance() >= MIN_CALL_TOKENS
+
+
+def test_truncated_preview_respects_the_character_limit():
+    raw = "x" * 50_000
+    _header, preview = _summarize_stream("stdout", raw, 10_000, estimator_for("gpt-4o"), 100_000)
+
+    assert len(preview.split("\n", 1)[1]) == _preview_length(10_000)
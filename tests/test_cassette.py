@@ -0,0 +1,62 @@
+"""Pruebas del proveedor de cassettes (grabación y reproducción sin red)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from strands import Agent
+
+from smart_ai_sys_admin.agent.providers import CassetteModel
+from smart_ai_sys_admin.agent.tools import local_datetime
+
+
+def _collect(model, messages):
+    async def run():
+        return [event async for event in model.stream(messages)]
+
+    return asyncio.run(run())
+
+
+class _FakeProvider(CassetteModel):
+    """Proveedor "real" simulado: reproduce un guion fijo sin esperas."""
+
+    def __init__(self, path):
+        super().__init__(mode="replay", path=str(path), speed=0)
+
+
+def test_recorded_stream_replays_identically(tmp_path):
+    script = tmp_path / "script.jsonl"
+    script.write_text(json.dumps({"text": "hola mundo", "chunk_chars": 4}) + "\n")
+    cassette = tmp_path / "recorded.jsonl"
+    recorder = CassetteModel(_FakeProvider(script), mode="record", path=str(cassette))
+    messages = [{"role": "user", "content": [{"text": "hola"}]}]
+    recorded = _collect(recorder, messages)
+
+    replay = CassetteModel(mode="replay", path=str(cassette), speed=0)
+    assert _collect(replay, messages) == recorded
+    deltas = [e["contentBlockDelta"]["delta"]["text"] for e in recorded if "contentBlockDelta" in e]
+    assert deltas == ["hola", " mun", "do"]
+
+
+def test_scripted_tool_calls_drive_an_agent_offline(tmp_path):
+    cassette = tmp_path / "scripted.jsonl"
+    entries = [
+        {"tool_calls": [{"name": "local_datetime", "input": {}}]},
+        {"text": "Hecho."},
+    ]
+    cassette.write_text("\n".join(json.dumps(entry) for entry in entries) + "\n")
+    model = CassetteModel(mode="replay", path=str(cassette), speed=0)
+    agent = Agent(model=model, tools=[local_datetime], callback_handler=None)
+
+    result = agent("¿Qué hora es?")
+
+    assert str(result).strip() == "Hecho."
+    tool_results = [
+        block["toolResult"]
+        for message in agent.messages
+        for block in message["content"]
+        if "toolResult" in block
+    ]
+    assert tool_results and tool_results[0]["status"] == "success"
+    assert model.cursor == 2
@@ -0,0 +1,82 @@
+"""Pruebas de la compactación de resultados de herramientas antiguos."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from smart_ai_sys_admin.agent.budget import estimator_for
+from smart_ai_sys_admin.agent.compaction import SpillStore, ToolResultCompactionManager
+
+
+def _turn(index: int, output: str) -> list[dict]:
+    tool_id = f"t{index}"
+    return [
+        {"role": "user", "content": [{"text": f"revisa los logs {index}"}]},
+        {
+            "role": "assistant",
+            "content": [
+                {"text": f"Ejecuto journalctl ({index})."},
+                {"toolUse": {"toolUseId": tool_id, "name": "remote_ssh_command", "input": {}}},
+            ],
+        },
+        {
+            "role": "user",
+            "content": [
+                {
+                    "toolResult": {
+                        "toolUseId": tool_id,
+                        "status": "success",
+                        "content": [{"text": output}],
+                    }
+                }
+            ],
+        },
+        {"role": "assistant", "content": [{"text": f"Conclusión {index}."}]},
+    ]
+
+
+def _result_text(messages: list[dict], position: int) -> str:
+    return messages[position]["content"][0]["toolResult"]["content"][0]["text"]
+
+
+def test_old_large_results_are_stubbed_and_spilled(tmp_path):
+    output = "Exit code: 0\n" + "\n".join(f"linea de log número {n}" for n in range(400))
+    messages = [message for index in range(4) for message in _turn(index, output)]
+    spill = SpillStore(tmp_path / "spill")
+    manager = ToolResultCompactionManager(
+        estimator_for("gpt-4o"),
+        token_budget=5000,
+        preserve_recent_turns=1,
+        spill=spill,
+    )
+    agent = SimpleNamespace(messages=messages)
+
+    manager.apply_management(agent)
+
+    stub = _result_text(messages, 2)
+    assert "401" in stub and "Exit code: 0" in stub and "handle 1" in stub
+    assert spill.get(1) == output
+    # El turno más reciente y el texto del usuario y del asistente quedan intactos.
+    assert _result_text(messages, 14) == output
+    assert messages[1]["content"][0]["text"] == "Ejecuto journalctl (0)."
+    assert manager.estimate(messages) <= 5000
+    assert len(messages) == 16
+
+    # Un segundo pase no vuelve a compactar lo ya compactado.
+    handles = manager.compacted_results
+    manager.apply_management(agent)
+    assert manager.compacted_results == handles
+
+
+def test_spill_handles_continue_across_instances(tmp_path):
+    assert SpillStore(tmp_path).put("a") == 1
+    assert SpillStore(tmp_path).put("b") == 2
+    assert SpillStore(tmp_path).get(2) == "b"
+    assert SpillStore(tmp_path).get(9) is None
+
+
+def test_spill_stores_sharing_a_directory_never_reuse_handles(tmp_path):
+    first, second = SpillStore(tmp_path), SpillStore(tmp_path)
+    assert first.put("a") == 1 and second.put("b") == 2
+    assert first.put("c") == 3
+    assert [first.get(n) for n in (1, 2, 3)] == ["a", "b", "c"]
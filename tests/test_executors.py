@@ -0,0 +1,104 @@
+"""Pruebas de los grupos de hilos dedicados de las herramientas."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from smart_ai_sys_admin.agent.executors import KeyedLocks, PoolSaturated, ToolPool
+
+
+def test_pool_rejects_when_queue_is_full():
+    pool = ToolPool("ssh", workers=1, queue_limit=1)
+    release = threading.Event()
+
+    async def scenario() -> None:
+        blocked = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.1)
+        stats = pool.stats()
+        assert (stats.active, stats.queued) == (1, 1)
+        with pytest.raises(PoolSaturated):
+            await pool.run(lambda: None, queue_timeout=0.1)
+        release.set()
+        await asyncio.gather(*blocked)
+
+    asyncio.run(scenario())
+    stats = pool.stats()
+    assert stats.completed == 2 and stats.rejected == 1 and stats.queued == 0
+    pool.shutdown()
+
+
+def test_cancelled_wait_keeps_the_slot_until_the_worker_finishes():
+    pool = ToolPool("ssh", workers=1, queue_limit=0)
+    release = threading.Event()
+
+    async def scenario() -> None:
+        waiting = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        # El hilo sigue ocupado: no se admite otra llamada ni cuenta como terminada.
+        with pytest.raises(PoolSaturated):
+            await pool.run(lambda: None)
+        assert pool.stats().completed == 0
+
+    asyncio.run(scenario())
+    release.set()
+    for _attempt in range(50):
+        if pool.stats().completed:
+            break
+        time.sleep(0.02)
+    stats = pool.stats()
+    assert stats.completed == 1 and stats.active == 0 and stats.queued == 0
+    pool.shutdown()
+
+
+def test_pools_do_not_share_threads():
+    slow = ToolPool("sftp", workers=1, queue_limit=4)
+    fast = ToolPool("ssh", workers=1, queue_limit=4)
+    release = threading.Event()
+
+    async def scenario() -> str:
+        pending = asyncio.create_task(slow.run(release.wait))
+        await asyncio.sleep(0.05)
+        result = await asyncio.wait_for(fast.run(lambda: "ok"), timeout=1)
+        release.set()
+        await pending
+        return result
+
+    assert asyncio.run(scenario()) == "ok"
+    slow.shutdown()
+    fast.shutdown()
+
+
+def test_keyed_locks_serialize_only_same_key():
+    locks = KeyedLocks()
+    order: list[str] = []
+    inside = threading.Event()
+    release = threading.Event()
+
+    def writer(key: str, label: str) -> None:
+        with locks.hold(key):
+            order.append(f"{label}-start")
+            if label == "a":
+                inside.set()
+                release.wait(1)
+            order.append(f"{label}-end")
+
+    first = threading.Thread(target=writer, args=("/etc/app.conf", "a"))
+    first.start()
+    inside.wait(1)
+    other = threading.Thread(target=writer, args=("/tmp/other", "b"))
+    other.start()
+    other.join(1)
+    same = threading.Thread(target=writer, args=("/etc/app.conf", "c"))
+    same.start()
+    same.join(0.1)
+    assert "c-start" not in order and order[-1] == "b-end"
+    release.set()
+    first.join(1)
+    same.join(1)
+    assert order.index("a-end") < order.index("c-start")
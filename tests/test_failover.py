@@ -0,0 +1,72 @@
+"""Pruebas de la conmutación por error y las peticiones cubiertas entre proveedores."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from strands.types.exceptions import ModelThrottledException
+
+from smart_ai_sys_admin.agent.failover import FailoverModel
+
+
+class _FakeModel:
+    def __init__(self, text: str, delay: float = 0.0, error: Exception | None = None) -> None:
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.closed = False
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.calls += 1
+        try:
+            yield {"messageStart": {"role": "assistant"}}
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            yield {"contentBlockDelta": {"delta": {"text": self.text}}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+        finally:
+            self.closed = True
+
+
+async def _collect(model: FailoverModel) -> str:
+    text = []
+    async for event in model.stream([{"role": "user", "content": [{"text": "hola"}]}]):
+        if "contentBlockDelta" in event:
+            text.append(event["contentBlockDelta"]["delta"]["text"])
+    return "".join(text)
+
+
+def test_fails_over_on_throttling():
+    primary = _FakeModel("a", error=ModelThrottledException("slow down"))
+    secondary = _FakeModel("b")
+    model = FailoverModel([("bedrock", primary), ("openai", secondary)])
+
+    assert asyncio.run(_collect(model)) == "b"
+    assert model.last_provider == "openai"
+
+
+def test_hedged_request_keeps_the_first_responder():
+    primary = _FakeModel("a", delay=1.0)
+    secondary = _FakeModel("b", delay=0.05)
+    model = FailoverModel([("bedrock", primary), ("local", secondary)], hedge_after_ms=50)
+
+    assert asyncio.run(_collect(model)) == "b"
+    assert primary.calls == secondary.calls == 1
+    assert primary.closed
+
+
+def test_first_token_timeout_and_last_error():
+    primary = _FakeModel("a", delay=1.0)
+    model = FailoverModel([("bedrock", primary)], first_token_timeout_ms=50)
+    with pytest.raises(TimeoutError):
+        asyncio.run(_collect(model))
+
+    failing = FailoverModel(
+        [("bedrock", _FakeModel("a", error=RuntimeError("x"))),
+         ("openai", _FakeModel("b", error=ModelThrottledException("y")))]
+    )
+    with pytest.raises(ModelThrottledException):
+        asyncio.run(_collect(failing))
@@ -0,0 +1,91 @@
+"""Pruebas del gestor de trabajos remotos usando una shell local como host."""
+
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from smart_ai_sys_admin.agent.jobs import JobHostMismatch, RemoteJobManager, UnknownJob
+
+
+class _LocalShell:
+    """Sustituto mínimo de `SSHConnectionManager` que ejecuta en `sh` local."""
+
+    def __init__(self, home: str) -> None:
+        self.details = SimpleNamespace(host="localhost", port=22, username="ops")
+        self._env = {**os.environ, "HOME": home}
+
+    def run_command(self, command: str, timeout: int | None = None) -> tuple[int, str, str]:
+        completed = subprocess.run(
+            ["sh", "-c", command],
+            capture_output=True,
+            text=True,
+            errors="replace",
+            timeout=timeout,
+            env=self._env,
+        )
+        return completed.returncode, completed.stdout, completed.stderr
+
+
+def _wait_for(manager: RemoteJobManager, job_id: str, state: str) -> None:
+    for _attempt in range(50):
+        if manager.status(job_id).state == state:
+            return
+        time.sleep(0.1)
+    pytest.fail(f"el trabajo no llegó al estado {state}")
+
+
+def test_job_output_is_read_incrementally(tmp_path):
+    manager = RemoteJobManager(_LocalShell(str(tmp_path)), logging.getLogger("test"))
+    job = manager.start("printf 'uno\\ndos\\n'; echo fallo >&2; exit 3")
+    _wait_for(manager, job.job_id, "finished")
+
+    first = manager.read_output(job.job_id, max_bytes=4)
+    rest = manager.read_output(job.job_id)
+    empty = manager.read_output(job.job_id)
+
+    assert first.text == "uno\n" and first.pending
+    assert rest.text.startswith("dos\nfallo") and not rest.pending
+    assert empty.text == "" and empty.start == rest.end
+    assert rest.status.exit_code == 3
+
+
+def test_cancel_stops_running_job(tmp_path):
+    manager = RemoteJobManager(_LocalShell(str(tmp_path)), logging.getLogger("test"))
+    job = manager.start("sleep 30")
+    assert manager.status(job.job_id).state == "running"
+
+    manager.cancel(job.job_id)
+    _wait_for(manager, job.job_id, "cancelled")
+
+    with pytest.raises(UnknownJob):
+        manager.status("nope")
+
+
+def test_offsets_count_raw_bytes_of_non_utf8_output(tmp_path):
+    manager = RemoteJobManager(_LocalShell(str(tmp_path)), logging.getLogger("test"))
+    job = manager.start("printf 'a\\377\\376b\\n'")
+    _wait_for(manager, job.job_id, "finished")
+
+    chunk = manager.read_output(job.job_id)
+
+    assert chunk.end == 5 and not chunk.pending
+
+
+def test_jobs_are_refused_on_another_host(tmp_path):
+    shell = _LocalShell(str(tmp_path))
+    manager = RemoteJobManager(shell, logging.getLogger("test"))
+    job = manager.start("sleep 30")
+    shell.details = SimpleNamespace(host="db", port=22, username="ops")
+
+    assert manager.current_jobs == ()
+    with pytest.raises(JobHostMismatch):
+        manager.cancel(job.job_id)
+
+    shell.details = SimpleNamespace(host="localhost", port=22, username="ops")
+    manager.cancel(job.job_id)
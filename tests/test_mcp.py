@@ -0,0 +1,196 @@
+"""Pruebas de la activación paralela y perezosa de transportes MCP."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+
+from mcp.types import Tool
+from strands.tools.mcp import MCPAgentTool
+from strands.tools.registry import ToolRegistry
+from strands.types.collections import PaginatedList
+
+from smart_ai_sys_admin.agent.config import MCPConfig, MCPTransportConfig
+from smart_ai_sys_admin.agent.mcp import LazyMCPTool, MCPManager, MCPToolCatalog
+from smart_ai_sys_admin.agent.runtime import AgentRuntime
+from smart_ai_sys_admin.connection import SSHConnectionManager
+
+
+class _FakeClient:
+    def __init__(self, name: str, delay: float = 0.0) -> None:
+        self.name = name
+        self.delay = delay
+        self.started = False
+        self.stopped = False
+        self.calls: list[str] = []
+
+    def start(self) -> None:
+        time.sleep(self.delay)
+        self.started = True
+
+    def stop(self, *_args) -> None:
+        self.stopped = True
+
+    def list_tools_sync(self, pagination_token=None):
+        tool = Tool(name=f"{self.name}_tool", inputSchema={"type": "object"})
+        return PaginatedList([MCPAgentTool(tool, self)])
+
+    async def call_tool_async(self, tool_use_id, name, arguments, **_kwargs):
+        self.calls.append(name)
+        return {"toolUseId": tool_use_id, "status": "success", "content": [{"text": "ok"}]}
+
+
+def _manager(transports, clients, lazy=False):
+    config = MCPConfig(
+        enabled=True, load_server_tools=True, transports=tuple(transports), lazy_connect=lazy
+    )
+    manager = MCPManager(config, logging.getLogger("test.mcp"))
+    manager._create_client = lambda cfg: clients[cfg.identifier]()  # type: ignore[method-assign]
+    return manager
+
+
+def test_slow_transport_does_not_delay_the_others():
+    slow = _FakeClient("slow", delay=2.0)
+    transports = [
+        MCPTransportConfig("slow", "stdio", command="x", timeout_seconds=1),
+        MCPTransportConfig("fast", "stdio", command="x", timeout_seconds=5),
+    ]
+    manager = _manager(transports, {"slow": lambda: slow, "fast": lambda: _FakeClient("fast")})
+
+    started = time.monotonic()
+    tools = manager.activate()
+
+    assert time.monotonic() - started < 1.8
+    assert [tool.tool_name for tool in tools] == ["fast_tool"]
+    # El servidor lento se detiene en cuanto termina de arrancar.
+    deadline = time.monotonic() + 3
+    while not slow.stopped and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert slow.stopped
+    manager.close()
+
+
+def test_lazy_tools_connect_on_first_invocation():
+    created: list[_FakeClient] = []
+    lock = threading.Lock()
+
+    def factory() -> _FakeClient:
+        with lock:
+            created.append(_FakeClient("docs"))
+            return created[-1]
+
+    transports = [MCPTransportConfig("docs", "stdio", command="x")]
+    manager = _manager(transports, {"docs": factory}, lazy=True)
+    manager.activate()
+    manager.close()
+    assert len(created) == 1
+
+    tools = manager.activate()
+    assert len(created) == 1
+    assert isinstance(tools[0], LazyMCPTool)
+    assert tools[0].tool_spec["name"] == "docs_tool"
+
+    async def invoke() -> list:
+        use = {"toolUseId": "t1", "name": "docs_tool", "input": {}}
+        return [event async for event in tools[0].stream(use, {})]
+
+    asyncio.run(invoke())
+    asyncio.run(invoke())
+    assert len(created) == 2
+    assert created[-1].calls == ["docs_tool", "docs_tool"]
+    manager.close()
+    assert created[-1].stopped
+
+
+def test_catalog_persists_and_is_keyed_by_transport(tmp_path):
+    path = tmp_path / "mcp_tools.json"
+    transport = MCPTransportConfig("docs", "stdio", command="uvx", args=("docs@1",))
+    tools = [Tool(name="search", inputSchema={"type": "object"})]
+
+    assert MCPToolCatalog(path).put(transport, tools) is False
+    reloaded = MCPToolCatalog(path)
+    assert [tool.name for tool in reloaded.get(transport)] == ["search"]
+    assert reloaded.get(replace(transport, args=("docs@2",))) is None
+    assert reloaded.put(transport, tools) is False
+    assert reloaded.put(transport, [*tools, Tool(name="read", inputSchema={})]) is True
+
+
+def test_cached_transport_registers_immediately_and_revalidates(tmp_path):
+    transport = MCPTransportConfig("docs", "stdio", command="x")
+    catalog = MCPToolCatalog(tmp_path / "mcp_tools.json")
+    catalog.put(transport, [Tool(name="old_tool", inputSchema={"type": "object"})])
+    client = _FakeClient("docs", delay=0.5)
+    config = MCPConfig(enabled=True, load_server_tools=True, transports=(transport,))
+    changes: list[tuple[list[str], list[str]]] = []
+    manager = MCPManager(
+        config,
+        logging.getLogger("test.mcp"),
+        catalog,
+        on_catalog_change=lambda removed, live: changes.append(
+            (removed, [tool.tool_name for tool in live])
+        ),
+    )
+    manager._create_client = lambda cfg: client  # type: ignore[method-assign]
+
+    started = time.monotonic()
+    tools = manager.activate()
+    assert time.monotonic() - started < 0.4
+    assert [tool.tool_name for tool in tools] == ["old_tool"]
+
+    deadline = time.monotonic() + 3
+    while time.monotonic() < deadline:
+        if changes:
+            break
+        time.sleep(0.05)
+    else:
+        raise AssertionError("el catálogo no se revalidó")
+    assert changes == [(["old_tool"], ["docs_tool"])]
+    assert [tool.name for tool in MCPToolCatalog(catalog.path).get(transport)] == ["docs_tool"]
+    manager.close()
+
+
+def test_runtime_swaps_stale_proxies_before_the_next_turn():
+    runtime = AgentRuntime(SSHConnectionManager(logging.getLogger("test")))
+    manager = _manager([], {})
+    stale = LazyMCPTool(Tool(name="old_tool", inputSchema={"type": "object"}), "docs", None)
+    registry = ToolRegistry()
+    registry.register_tool(stale)
+    runtime._agent = SimpleNamespace(tool_registry=registry)
+    runtime._mcp_manager, runtime._mcp_tools = manager, [stale]
+    live = _FakeClient("docs").list_tools_sync()
+
+    runtime._queue_mcp_update(manager, ["old_tool"], list(live))
+    runtime._apply_mcp_updates()
+
+    assert list(registry.registry) == ["docs_tool"]
+    assert [tool.tool_name for tool in runtime._mcp_tools] == ["docs_tool"]
+
+
+def test_reconfigure_keeps_replaced_clients_until_commit():
+    created: list[_FakeClient] = []
+
+    def factory() -> _FakeClient:
+        created.append(_FakeClient("docs"))
+        return created[-1]
+
+    transport = MCPTransportConfig("docs", "stdio", command="x")
+    manager = _manager([transport], {"docs": factory})
+    manager.activate()
+    original = created[0]
+    changed = replace(manager._config, transports=(replace(transport, args=("v2",)),))
+
+    manager.reconfigure(changed)
+    assert not original.stopped
+    # Si el agente nuevo no se construye, el anterior recupera su cliente.
+    manager.rollback()
+    assert created[1].stopped and not original.stopped
+    assert manager._ensure_client("docs") is original
+
+    manager.reconfigure(changed)
+    manager.commit()
+    assert original.stopped and manager._ensure_client("docs") is created[2]
+    manager.close()
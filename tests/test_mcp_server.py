@@ -0,0 +1,91 @@
+"""Pruebas del servidor MCP con una conexión SSH simulada."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from starlette.testclient import TestClient
+
+from smart_ai_sys_admin.batch import HostDefaults
+from smart_ai_sys_admin.connection import SSHConnectionManager
+from smart_ai_sys_admin.mcp_server import SSHSessionPool, build_http_app, build_mcp_server
+
+
+class _FakeManager(SSHConnectionManager):
+    connects = 0
+
+    def __init__(self):
+        super().__init__(logging.getLogger("test"))
+        self.connected = False
+
+    @property
+    def is_connected(self):
+        return self.connected
+
+    def connect(self, host, username, **_kwargs):
+        _FakeManager.connects += 1
+        self.connected = True
+
+    def disconnect(self):
+        self.connected = False
+
+    def run_command(self, command, *, timeout=None, owner=None):
+        return 0, f"{command} ok\n", ""
+
+
+def _text(result) -> str:
+    content = result[0] if isinstance(result, tuple) else result
+    return content[0].text
+
+
+def test_tools_share_one_connection_per_target():
+    pool = SSHSessionPool(
+        HostDefaults(username="ops", key_path="k"),
+        structured_output=False,
+        connection_factory=_FakeManager,
+    )
+    server = build_mcp_server(pool)
+
+    async def scenario():
+        names = {tool.name for tool in await server.list_tools()}
+        assert {"remote_ssh_command", "remote_sftp_transfer", "remote_job_start"} <= names
+        first = await server.call_tool(
+            "remote_ssh_command", {"target": "web", "command": "uptime"}
+        )
+        await server.call_tool("remote_ssh_command", {"target": "ops@web:22", "command": "id"})
+        closed = await server.call_tool("ssh_disconnect", {"target": "web"})
+        return _text(first), _text(closed)
+
+    try:
+        output, closed = asyncio.run(scenario())
+    finally:
+        pool.close_all()
+    assert "uptime ok" in output
+    assert "ops@web" not in pool.sessions() and "web" in closed
+    assert _FakeManager.connects == 1
+
+
+def test_reconnect_keeps_the_jobs_of_the_target():
+    pool = SSHSessionPool(
+        HostDefaults(username="ops", key_path="k"),
+        structured_output=False,
+        connection_factory=_FakeManager,
+    )
+    try:
+        context = pool.get("web")
+        context.ssh_manager.connected = False
+        assert pool.get("web").remote_jobs is context.remote_jobs
+    finally:
+        pool.close_all()
+
+
+def test_streamable_http_requires_the_token():
+    pool = SSHSessionPool(HostDefaults(username="ops", key_path="k"), structured_output=False)
+    client = TestClient(build_http_app(build_mcp_server(pool), "secreto"))
+    try:
+        assert client.post("/mcp", json={}).status_code == 401
+        denied = client.post("/mcp", json={}, headers={"Authorization": "Bearer otro"})
+        assert denied.status_code == 401
+    finally:
+        pool.close_all()
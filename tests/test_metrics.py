@@ -0,0 +1,116 @@
+"""Pruebas de la contabilidad de tokens, tiempos y coste por turno."""
+
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from smart_ai_sys_admin.agent.config import ModelPrice
+from smart_ai_sys_admin.agent.metrics import TurnMetricsRecorder
+from smart_ai_sys_admin.agent.model_router import RoutedModel
+from smart_ai_sys_admin.agent.tool_router import ToolLayoutModel
+
+
+def _run_turn(recorder, agent, *, input_tokens, cached, output_tokens, tool_seconds):
+    event = SimpleNamespace(agent=agent)
+    metrics = agent.event_loop_metrics
+    recorder._on_before_invocation(event)
+    recorder._on_before_model_call(event)
+    recorder._on_after_model_call(event)
+    usage = metrics.accumulated_usage
+    metrics.accumulated_usage = {
+        "inputTokens": usage["inputTokens"] + input_tokens,
+        "outputTokens": usage["outputTokens"] + output_tokens,
+        "totalTokens": usage["totalTokens"] + input_tokens + output_tokens,
+        "cacheReadInputTokens": usage.get("cacheReadInputTokens", 0) + cached,
+    }
+    metrics.accumulated_metrics["latencyMs"] += 120
+    tool = metrics.tool_metrics.setdefault(
+        "remote_command", SimpleNamespace(call_count=0, total_time=0.0)
+    )
+    tool.call_count += 1
+    tool.total_time += tool_seconds
+    recorder._on_after_invocation(event)
+
+
+def test_turn_and_session_totals_with_cost_and_log(tmp_path):
+    metrics = SimpleNamespace(
+        accumulated_usage={"inputTokens": 0, "outputTokens": 0, "totalTokens": 0},
+        accumulated_metrics={"latencyMs": 0},
+        tool_metrics={},
+    )
+    agent = SimpleNamespace(event_loop_metrics=metrics)
+    log_file = tmp_path / "metrics.jsonl"
+    recorder = TurnMetricsRecorder(
+        model_id="m",
+        provider="openai",
+        prices={"m": ModelPrice(input=2.0, output=10.0, cache_read=0.5)},
+        log_file=log_file,
+    )
+    recorder.context = lambda: {"session": "s1"}
+
+    _run_turn(recorder, agent, input_tokens=1000, cached=0, output_tokens=100, tool_seconds=0.5)
+    _run_turn(recorder, agent, input_tokens=1000, cached=800, output_tokens=50, tool_seconds=1.5)
+
+    last = recorder.last
+    assert (last.input_tokens, last.cache_read_tokens, last.output_tokens) == (200, 800, 50)
+    assert (last.tool_calls, last.tool_seconds, last.provider_latency_ms) == (1, 1.5, 120)
+    assert last.model_calls == 1
+    assert last.cost == pytest.approx((200 * 2.0 + 800 * 0.5 + 50 * 10.0) / 1_000_000)
+    session = recorder.session
+    assert (session.turns, session.total_input_tokens, session.tool_calls) == (2, 2000, 2)
+    assert session.cost == pytest.approx(last.cost + (1000 * 2.0 + 100 * 10.0) / 1_000_000)
+
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [record["session"] for record in records] == ["s1", "s1"]
+    assert records[1]["cache_read_tokens"] == 800
+
+
+def test_cost_is_unknown_without_price():
+    metrics = SimpleNamespace(
+        accumulated_usage={"inputTokens": 0, "outputTokens": 0, "totalTokens": 0},
+        accumulated_metrics={"latencyMs": 0},
+        tool_metrics={},
+    )
+    recorder = TurnMetricsRecorder(model_id="llama", provider="local")
+    agent = SimpleNamespace(event_loop_metrics=metrics)
+    _run_turn(recorder, agent, input_tokens=10, cached=0, output_tokens=5, tool_seconds=0.0)
+    assert recorder.last.cost is None
+    assert recorder.session.cost is None
+
+
+def test_each_call_is_priced_with_the_model_that_served_it():
+    def leaf(model_id):
+        return SimpleNamespace(get_config=lambda: {"model_id": model_id})
+
+    routed = RoutedModel(("fast", leaf("small")), ("openai", leaf("big")), classifier=None)
+    metrics = SimpleNamespace(
+        accumulated_usage={"inputTokens": 0, "outputTokens": 0, "totalTokens": 0},
+        accumulated_metrics={"latencyMs": 0},
+        tool_metrics={},
+    )
+    agent = SimpleNamespace(event_loop_metrics=metrics, model=ToolLayoutModel(routed, None))
+    recorder = TurnMetricsRecorder(
+        model_id="big",
+        provider="openai",
+        prices={
+            "big": ModelPrice(input=10.0, output=30.0),
+            "small": ModelPrice(input=1.0, output=2.0),
+        },
+    )
+
+    recorder._on_before_invocation(SimpleNamespace(agent=agent))
+    for route, input_tokens, output_tokens in (("fast", 1000, 100), ("strong", 500, 50)):
+        routed.last_route = route
+        usage = {"inputTokens": input_tokens, "outputTokens": output_tokens}
+        stop = SimpleNamespace(message={"metadata": {"usage": usage}})
+        recorder._on_before_model_call(SimpleNamespace(agent=agent))
+        recorder._on_after_model_call(SimpleNamespace(agent=agent, stop_response=stop))
+    metrics.accumulated_usage = {"inputTokens": 1500, "outputTokens": 150, "totalTokens": 1650}
+    recorder._on_after_invocation(SimpleNamespace(agent=agent))
+
+    expected = (1000 * 1.0 + 100 * 2.0 + 500 * 10.0 + 50 * 30.0) / 1_000_000
+    assert recorder.last.cost == pytest.approx(expected)
+    assert recorder.last.model_calls == 2
@@ -0,0 +1,63 @@
+"""Pruebas del enrutado de llamadas entre el modelo rápido y el potente."""
+
+from __future__ import annotations
+
+import asyncio
+
+from smart_ai_sys_admin.agent.model_router import RoutedModel, TurnClassifier
+
+
+def _user(text: str) -> dict:
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def _tool_step(status: str) -> list[dict]:
+    use = {"toolUseId": "t1", "name": "remote_ssh_command", "input": {}}
+    result = {"toolUseId": "t1", "status": status, "content": [{"text": "..."}]}
+    return [
+        {"role": "assistant", "content": [{"toolUse": use}]},
+        {"role": "user", "content": [{"toolResult": result}]},
+    ]
+
+
+def test_prompts_are_classified_by_keywords_and_shape():
+    classifier = TurnClassifier(strong_keywords=("diagnos", "Migración"))
+    assert classifier.classify([_user("muestra el uso de disco de /var")]) == "fast"
+    assert classifier.classify([_user("Resume esta salida")]) == "fast"
+    assert classifier.classify([_user("Diagnostica por qué nginx devuelve 502")]) == "strong"
+    assert classifier.classify([_user("prepara la migración a PostgreSQL 16")]) == "strong"
+    assert classifier.classify([_user("x" * 500)]) == "strong"
+
+
+def test_tool_loop_escalates_on_errors_and_long_loops():
+    classifier = TurnClassifier(escalate_after_steps=3)
+    prompt = [_user("lista los servicios activos")]
+    assert classifier.classify(prompt + _tool_step("success")) == "fast"
+    assert classifier.classify(prompt + _tool_step("error")) == "strong"
+    assert classifier.classify(prompt + _tool_step("success") * 3) == "strong"
+    # Un prompt nuevo reinicia la clasificación aunque el turno anterior escalara.
+    history = prompt + _tool_step("error") + [_user("y la memoria libre?")]
+    assert classifier.classify(history) == "fast"
+
+
+class _FakeModel:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        yield {"contentBlockDelta": {"delta": {"text": self.name}}}
+
+
+def test_routed_model_dispatches_and_counts():
+    model = RoutedModel(
+        ("cerebras", _FakeModel("fast")), ("bedrock", _FakeModel("strong")), TurnClassifier()
+    )
+
+    async def run(text: str) -> str:
+        events = [event async for event in model.stream([_user(text)])]
+        return events[0]["contentBlockDelta"]["delta"]["text"]
+
+    assert asyncio.run(run("uptime")) == "fast"
+    assert asyncio.run(run("planifica la actualización del clúster")) == "strong"
+    assert model.calls == {"fast": 1, "strong": 1}
+    assert model.last_route == "strong"
@@ -0,0 +1,117 @@
+"""Pruebas para los analizadores estructurados de salidas de comandos."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+
+from smart_ai_sys_admin.agent.parsers import default_parser_registry
+from smart_ai_sys_admin.agent.tools import remote_ssh_command
+from smart_ai_sys_admin.connection import ConnectionDetails, SSHConnectionManager
+
+PS_AUX = """\
+USER         PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND
+root           1  0.0  0.1 167744 11520 ?        Ss   Jan01   0:09 /sbin/init splash
+www-data     812  1.5  2.3 204800 98304 ?        S    Jan01  12:01 nginx: worker process
+"""
+
+DF_H = """\
+Filesystem      Size  Used Avail Use% Mounted on
+/dev/sda1        50G   20G   28G  42% /
+tmpfs           3.9G     0  3.9G   0% /dev/shm
+/dev/loop0       64M   64M     0 100% /snap/core20/1
+"""
+
+
+def test_plain_ps_is_condensed_to_relevant_columns():
+    plan = default_parser_registry().match("ps aux")
+
+    assert plan is not None and not plan.rewritten
+    table = plan.parse(PS_AUX)
+    header, first, second = table.splitlines()
+    assert header.split("\t") == ["PID", "USER", "%CPU", "%MEM", "RSS", "STAT", "COMMAND"]
+    assert first.split("\t")[-1] == "/sbin/init splash"
+    assert "nginx: worker process" in second
+
+
+def test_df_drops_pseudo_filesystems():
+    table = default_parser_registry().match("df -h").parse(DF_H)
+
+    assert "/dev/sda1\t50G" in table
+    assert "tmpfs" not in table.split("#")[0]
+    assert table.endswith("# 2 pseudo/loop filesystems omitted")
+
+
+def test_ip_and_lsblk_are_rewritten_to_json_mode():
+    registry = default_parser_registry()
+
+    ip_plan = registry.match("sudo ip addr show")
+    lsblk_plan = registry.match("lsblk")
+
+    assert ip_plan.command == "sudo ip -j addr show"
+    assert lsblk_plan.command == "lsblk -J"
+    payload = [
+        {
+            "ifname": "eth0",
+            "operstate": "UP",
+            "address": "52:54:00:12:34:56",
+            "addr_info": [{"local": "10.0.0.5", "prefixlen": 24}],
+        }
+    ]
+    assert ip_plan.parse(json.dumps(payload)).splitlines()[1] == (
+        "eth0\tUP\t52:54:00:12:34:56\t10.0.0.5/24"
+    )
+
+
+def test_pipelines_and_mutating_commands_are_ignored():
+    registry = default_parser_registry()
+
+    assert registry.match("ps aux | grep nginx") is None
+    assert registry.match("ip route add default via 10.0.0.1") is None
+    assert registry.match("systemctl restart nginx") is None
+    assert registry.match("uptime") is None
+
+
+class _OldHost(SSHConnectionManager):
+    """Host con iproute2 sin ``-j``."""
+
+    def __init__(self) -> None:
+        super().__init__(logging.getLogger("test"))
+        self.executed: list[str] = []
+
+    @property
+    def is_connected(self) -> bool:
+        return True
+
+    @property
+    def details(self) -> ConnectionDetails:
+        return ConnectionDetails("old", 22, "admin", "key")
+
+    def run_command(self, command, *, timeout=None, owner=None):
+        self.executed.append(command)
+        if "10.9.9.9" in command:
+            return 2, "", "RTNETLINK answers: Network is unreachable\n"
+        if " -j " in command:
+            return 255, "", 'Option "-j" is unknown, try "ip -help".\n'
+        return 0, "eth0 UP\n", ""
+
+
+def test_json_fallback_only_on_unsupported_flag_and_is_remembered_per_host():
+    registry = default_parser_registry()
+    manager = _OldHost()
+    agent = SimpleNamespace(ssh_manager=manager, remote_command_parsers=registry)
+
+    def call(command: str) -> str:
+        return asyncio.run(remote_ssh_command(command=command, agent=agent))
+
+    call("ip addr show")
+    call("ip addr show")
+    assert manager.executed == ["ip -j addr show", "ip addr show", "ip addr show"]
+    assert registry.match("ip addr show", host="admin@other:22").rewritten
+
+    manager.executed.clear()
+    agent.remote_command_parsers = default_parser_registry()
+    call("ip route get 10.9.9.9")
+    assert manager.executed == ["ip -j route get 10.9.9.9"]
@@ -48,3 +48,17 @@ def test_permission_manager_restore_returns_previous_values(monkeypatch: pytest.
         assert os.environ.get(key) is None
     assert manager.active is False
 
+
+def test_shared_manager_keeps_flags_until_last_holder_releases(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("BYPASS_TOOL_CONSENT", raising=False)
+    manager = ToolPermissionManager()
+    first, second = object(), object()
+
+    manager.acquire(first)
+    manager.acquire(second)
+    manager.release(first)
+    assert os.environ.get("BYPASS_TOOL_CONSENT") == "true"
+
+    manager.release(second)
+    assert os.environ.get("BYPASS_TOOL_CONSENT") is None
+    assert manager.active is False
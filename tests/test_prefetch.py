@@ -0,0 +1,88 @@
+"""Pruebas de la precarga especulativa de datos del host."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from smart_ai_sys_admin.agent.prefetch import HostCache, HostPrefetcher
+from smart_ai_sys_admin.agent.tools import remote_ssh_command
+from smart_ai_sys_admin.connection import ConnectionDetails, SSHConnectionManager
+
+
+class _FakeManager(SSHConnectionManager):
+    def __init__(self) -> None:
+        super().__init__(logging.getLogger("test"))
+        self.executed: list[str] = []
+
+    @property
+    def is_connected(self) -> bool:
+        return True
+
+    @property
+    def details(self) -> ConnectionDetails:
+        return ConnectionDetails("web1", 22, "admin", "key")
+
+    def run_command(self, command, *, timeout=None, owner=None):
+        self.executed.append(command)
+        return 0, f"salida de {command}", ""
+
+
+def test_cache_expires_and_invalidation_discards_inflight_results():
+    now = [0.0]
+    cache = HostCache(ttl_seconds=10, clock=lambda: now[0])
+    generation = cache.generation("h")
+    cache.put("h", "df  -h", (0, "out", ""), generation)
+    assert cache.get("h", "df -h").stdout == "out"
+    now[0] = 11
+    assert cache.get("h", "df -h") is None
+
+    generation = cache.generation("h")
+    cache.invalidate("h")
+    assert not cache.put("h", "df -h", (0, "out", ""), generation)
+    assert cache.get("h", "df -h") is None
+
+
+def test_tool_serves_prefetched_commands_until_something_else_runs():
+    manager = _FakeManager()
+    prefetcher = HostPrefetcher(manager, HostCache(ttl_seconds=60), ("uptime", "df -h"))
+    assert prefetcher.pending()
+    assert prefetcher.warm() == 2
+    assert not prefetcher.pending()
+    assert prefetcher.warm() == 0
+    manager.executed.clear()
+
+    agent = SimpleNamespace(ssh_manager=manager, host_cache=prefetcher.cache)
+
+    def call(command: str) -> str:
+        return asyncio.run(remote_ssh_command(command=command, agent=agent))
+
+    assert "salida de uptime" in call("uptime")
+    assert manager.executed == []
+    # Un comando real invalida la precarga: el siguiente ``df -h`` va a la red.
+    call("systemctl restart nginx")
+    call("df -h")
+    assert manager.executed == ["systemctl restart nginx", "df -h"]
+    assert prefetcher.cache.hits == 1
+
+
+def test_warm_stops_when_the_connection_moves_to_another_host():
+    class _Switching(_FakeManager):
+        host = "web1"
+
+        @property
+        def details(self) -> ConnectionDetails:
+            return ConnectionDetails(self.host, 22, "admin", "key")
+
+        def run_command(self, command, *, timeout=None):
+            # El operador hace `/connect db1` mientras se ejecuta la precarga.
+            self.host = "db1"
+            return super().run_command(command, timeout=timeout)
+
+    manager = _Switching()
+    prefetcher = HostPrefetcher(manager, HostCache(ttl_seconds=60), ("uptime", "df -h"))
+
+    assert prefetcher.warm() == 0
+    assert manager.executed == ["uptime"]
+    assert prefetcher.cache.get("admin@web1:22", "uptime") is None
@@ -0,0 +1,42 @@
+"""Pruebas de la caché de prompts y sus contadores."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from smart_ai_sys_admin.agent.prompt_cache import CacheUsage, PromptCacheStats
+
+
+def test_cache_usage_handles_both_input_conventions():
+    # Bedrock: inputTokens excluye lo servido desde caché.
+    bedrock = CacheUsage.from_usage(
+        {"inputTokens": 100, "outputTokens": 50, "totalTokens": 1150,
+         "cacheReadInputTokens": 900, "cacheWriteInputTokens": 100}
+    )
+    assert (bedrock.read, bedrock.written, bedrock.uncached) == (900, 100, 100)
+    # OpenAI: inputTokens ya incluye los tokens cacheados.
+    openai = CacheUsage.from_usage(
+        {"inputTokens": 1000, "outputTokens": 50, "totalTokens": 1050,
+         "cacheReadInputTokens": 800}
+    )
+    assert (openai.read, openai.uncached) == (800, 200)
+    assert openai.hit_ratio == 0.8
+
+
+def test_stats_report_per_turn_deltas():
+    metrics = SimpleNamespace(accumulated_usage={})
+    agent = SimpleNamespace(event_loop_metrics=metrics)
+    event = SimpleNamespace(agent=agent)
+    stats = PromptCacheStats()
+    for read in (0, 900):
+        stats._on_before_invocation(event)
+        usage = metrics.accumulated_usage
+        metrics.accumulated_usage = {
+            "inputTokens": usage.get("inputTokens", 0) + 1000,
+            "outputTokens": 0,
+            "totalTokens": usage.get("totalTokens", 0) + 1000,
+            "cacheReadInputTokens": usage.get("cacheReadInputTokens", 0) + read,
+        }
+        stats._on_after_invocation(event)
+    assert stats.last == CacheUsage(read=900, written=0, uncached=100)
+    assert stats.session == CacheUsage(read=900, written=0, uncached=1100)
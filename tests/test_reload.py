@@ -0,0 +1,80 @@
+"""Pruebas de la recarga en caliente de ``agent.conf``."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+
+import pytest
+
+from smart_ai_sys_admin.agent.config import AgentConfigError, load_agent_config
+from smart_ai_sys_admin.agent.reload import ConfigFileWatcher, diff_configs
+from smart_ai_sys_admin.agent.runtime import AgentRuntime
+from smart_ai_sys_admin.connection import SSHConnectionManager
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "conf" / "agent.conf.example"
+
+
+def _write(path: Path, edit=None) -> dict:
+    data = json.loads(EXAMPLE.read_text(encoding="utf-8"))
+    data["sessions"]["enabled"] = False
+    data["metrics"]["log_file"] = None
+    if edit:
+        edit(data)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return data
+
+
+def test_diff_reports_only_the_components_that_changed(tmp_path):
+    path = tmp_path / "agent.conf"
+    _write(path)
+    old = load_agent_config(path)
+    assert not diff_configs(old, load_agent_config(path))
+
+    def edit(data):
+        data["agent"]["conversation"]["window_size"] = 12
+        data["tools"]["executors"]["ssh"] = 8
+
+    _write(path, edit)
+    changes = diff_configs(old, load_agent_config(path))
+    assert changes.changed == ("conversation", "tools", "executors")
+    assert not changes.model
+
+    watcher = ConfigFileWatcher(path)
+    assert not watcher.poll()
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert watcher.poll()
+    assert not watcher.poll()
+
+
+def test_reload_keeps_history_and_unchanged_components(tmp_path, monkeypatch):
+    path = tmp_path / "agent.conf"
+    _write(path)
+    monkeypatch.setenv("SMART_AI_SYS_ADMIN_AGENT_CONFIG_FILE", str(path))
+    monkeypatch.setenv("CEREBRAS_API_KEY", "test")
+    runtime = AgentRuntime(SSHConnectionManager(logging.getLogger("test")))
+    runtime.initialize()
+    assert runtime.ready, runtime.error_message
+    try:
+        agent = runtime._agent
+        agent.messages.append({"role": "user", "content": [{"text": "hola"}]})
+        model = agent.model.model
+
+        _write(path, lambda data: data["agent"]["conversation"].update(window_size=12))
+        changes = runtime.reload()
+        assert changes.changed == ("conversation",)
+        assert runtime._agent is not agent
+        assert runtime._agent.model.model is model
+        assert runtime._agent.messages == [{"role": "user", "content": [{"text": "hola"}]}]
+
+        # Una configuración inválida no se aplica: el agente actual sigue activo.
+        current = runtime._agent
+        path.write_text("{", encoding="utf-8")
+        with pytest.raises(AgentConfigError):
+            runtime.reload()
+        assert runtime.ready and runtime._agent is current
+    finally:
+        runtime.shutdown()
@@ -0,0 +1,179 @@
+"""Pruebas de la grabación y reproducción de runbooks."""
+
+from __future__ import annotations
+
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from smart_ai_sys_admin.agent.prefetch import HostCache
+from smart_ai_sys_admin.agent.runbooks import (
+    RunbookError,
+    RunbookRunner,
+    RunbookStore,
+    extract_steps,
+    new_runbook,
+)
+from smart_ai_sys_admin.connection import (
+    ConnectionDetails,
+    ConnectionError,
+    SSHConnectionManager,
+)
+from smart_ai_sys_admin.localization import _
+
+
+def _call(tool_id: str, name: str, arguments: dict, result: str, status: str = "success"):
+    return [
+        {
+            "role": "assistant",
+            "content": [{"toolUse": {"toolUseId": tool_id, "name": name, "input": arguments}}],
+        },
+        {
+            "role": "user",
+            "content": [
+                {
+                    "toolResult": {
+                        "toolUseId": tool_id,
+                        "status": status,
+                        "content": [{"text": result}],
+                    }
+                }
+            ],
+        },
+    ]
+
+
+def _exit(code: int) -> str:
+    return _("agent.tools.summary.exit_code", code=code) + "\n\nstdout"
+
+
+def _history() -> list[dict]:
+    return [
+        {"role": "user", "content": [{"text": "prompt anterior"}]},
+        *_call("old", "remote_ssh_command", {"command": "uptime"}, _exit(0)),
+        {"role": "user", "content": [{"text": "rota los logs y revisa el disco"}]},
+        *_call("a", "remote_ssh_command", {"command": "logrotate -f /etc/logrotate.d/nginx"},
+               _exit(0)),
+        *_call("b", "remote_ssh_command", {"command": "ls /nope"}, _exit(2)),
+        *_call("c", "remote_ssh_command", {"command": "df -h"}, _("agent.tools.ssh_inactive")),
+        *_call("d", "remote_ssh_command", {"command": "reboot"}, "denied", status="error"),
+        *_call(
+            "e",
+            "remote_sftp_transfer",
+            {"action": "get", "local_path": "/tmp/nginx.conf",
+             "remote_path": "/etc/nginx/nginx.conf"},
+            "✅ ok",
+        ),
+        {"role": "assistant", "content": [{"text": "Hecho."}]},
+    ]
+
+
+def test_extracts_successful_steps_of_the_last_turn(tmp_path):
+    steps = extract_steps(_history())
+    assert [step.describe() for step in steps] == [
+        "$ logrotate -f /etc/logrotate.d/nginx",
+        "$ ls /nope",
+        "download /tmp/nginx.conf ← /etc/nginx/nginx.conf",
+    ]
+    assert [step.check for step in steps] == [True, False, True]
+
+    store = RunbookStore(tmp_path)
+    store.save(new_runbook("rotate-nginx", steps, {"service": "nginx"}, "rota los logs"))
+    runbook = store.load("rotate-nginx")
+    assert runbook.steps[0].command == "logrotate -f /etc/logrotate.d/{{service}}"
+    assert store.names() == ["rotate-nginx"]
+    resolved = runbook.resolve("web1", {"service": "apache2"})
+    assert resolved[0].command == "logrotate -f /etc/logrotate.d/apache2"
+    with pytest.raises(RunbookError):
+        runbook.resolve("web1", {"unknown": "x"})
+    with pytest.raises(RunbookError):
+        store.load("../etc/passwd")
+
+
+class _FakeManager:
+    def __init__(self, host: str, failing: set[str] = frozenset()) -> None:
+        self.details = SimpleNamespace(host=host, port=22, username="ops")
+        self.failing = failing
+        self.commands: list[str] = []
+        self.siblings: dict[str, _FakeManager] = {}
+        self.closed = False
+
+    def open_sibling(self, target: str) -> _FakeManager:
+        self.siblings[target] = _FakeManager(target, self.failing)
+        return self.siblings[target]
+
+    def run_command(self, command: str, *, timeout=None):
+        self.commands.append(command)
+        return (1, "", "boom") if command in self.failing else (0, f"{command} ok", "")
+
+    def disconnect(self) -> None:
+        self.closed = True
+
+
+def test_runner_replays_and_fans_out_without_the_model():
+    steps = extract_steps(
+        [
+            {"role": "user", "content": [{"text": "limpia"}]},
+            *_call("a", "remote_ssh_command", {"command": "rm -rf /tmp/cache-web1"}, _exit(0)),
+            *_call("b", "remote_ssh_command", {"command": "df -h /"}, _exit(0)),
+        ]
+    )
+    runbook = new_runbook("clean", steps, {})
+    manager = _FakeManager("web1", failing={"rm -rf /tmp/cache-db1"})
+    runner = RunbookRunner(manager, default_timeout=60)
+
+    [report] = runner.run(runbook)
+    assert report.ok and manager.commands == ["rm -rf /tmp/cache-web1", "df -h /"]
+
+    templated = new_runbook("clean", steps, {"target": "web1"})
+    reports = runner.run(templated, ["web2", "db1"], {})
+    assert [report.host for report in reports] == ["web2", "db1"]
+    assert manager.siblings["web2"].commands == ["rm -rf /tmp/cache-web1", "df -h /"]
+    # Un paso comprobado que falla detiene la reproducción en ese host.
+    reports = runner.run(templated, ["db1"], {"target": "db1"})
+    assert not reports[0].ok
+    assert manager.siblings["db1"].commands == ["rm -rf /tmp/cache-db1"]
+    assert manager.siblings["db1"].closed
+
+
+def test_replayed_steps_invalidate_the_prefetched_host_data():
+    steps = extract_steps(
+        [
+            {"role": "user", "content": [{"text": "reinicia"}]},
+            *_call("a", "remote_ssh_command", {"command": "systemctl restart nginx"}, _exit(0)),
+        ]
+    )
+    cache = HostCache(ttl_seconds=60)
+    cache.put("ops@web1:22", "systemctl --failed", (0, "0 units", ""))
+    runner = RunbookRunner(_FakeManager("web1"), default_timeout=60, host_cache=cache)
+
+    runner.run(new_runbook("restart", steps, {}))
+
+    assert cache.get("ops@web1:22", "systemctl --failed") is None
+
+
+def test_siblings_never_receive_the_password_of_another_host(monkeypatch):
+    calls: list[tuple] = []
+    monkeypatch.setattr(
+        SSHConnectionManager,
+        "connect",
+        lambda self, host, username, **kwargs: calls.append((host, username, kwargs)),
+    )
+    manager = SSHConnectionManager(logging.getLogger("test"))
+    active = SimpleNamespace(is_active=lambda: True)
+    manager._ssh_client = SimpleNamespace(get_transport=lambda: active)
+    manager._details = ConnectionDetails(
+        host="web", port=22, username="ops", auth_method="password"
+    )
+    manager._secret = ("s3cret", None)
+
+    with pytest.raises(ConnectionError):
+        manager.open_sibling("db")
+    manager.open_sibling("root@web:2222")
+    manager._secret = (None, "~/.ssh/id_ed25519")
+    manager.open_sibling("db")
+
+    assert [call[0] for call in calls] == ["web", "db"]
+    assert calls[0][2]["password"] == "s3cret" and calls[0][2]["port"] == 2222
+    assert calls[1][2] == {"password": None, "key_path": "~/.ssh/id_ed25519", "port": 22}
@@ -0,0 +1,150 @@
+"""Pruebas del modo servidor con un agente y una conexión simulados."""
+
+from __future__ import annotations
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from smart_ai_sys_admin.agent.factory import ModelClientCache
+from smart_ai_sys_admin.agent.metrics import TurnMetrics
+from smart_ai_sys_admin.agent.runtime import AgentStreamEvent
+from smart_ai_sys_admin.batch import HostDefaults, HostTarget
+from smart_ai_sys_admin.server import AgentServer, ServerError, SessionPool
+
+
+class _FakeManager:
+    is_connected = False
+    credentials: list[dict] = []
+
+    def connect(self, host, username, **kwargs):
+        _FakeManager.credentials.append(kwargs)
+        self.is_connected = True
+
+    def disconnect(self):
+        self.is_connected = False
+
+    def run_command(self, command, *, timeout=None):
+        return 0, f"ran {command}\n", ""
+
+
+class _FakeRuntime:
+    ready = True
+    busy = False
+    error_message = None
+    session_id = "s1"
+    session_metrics = None
+
+    def __init__(self, _manager):
+        self.last_turn_metrics = None
+
+    def initialize(self):
+        pass
+
+    async def stream(self, prompt):
+        yield AgentStreamEvent("text", "ho")
+        self.last_turn_metrics = TurnMetrics(turns=1, input_tokens=5, output_tokens=1)
+        yield AgentStreamEvent("done", f"hola {prompt}")
+
+    def agent_summary(self):
+        return {}
+
+    def cancel(self):
+        return False
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def server():
+    pool = SessionPool(runtime_factory=_FakeRuntime, connection_factory=_FakeManager)
+    app = AgentServer(pool, token="secreto", defaults=HostDefaults(key_path="k"))
+    url = app.bind_tcp("127.0.0.1", 0)
+    thread = threading.Thread(target=app.serve_forever, daemon=True)
+    thread.start()
+    yield url
+    app.shutdown()
+
+
+def _request(url, method="GET", payload=None, token="secreto"):
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method)
+    request.add_header("Authorization", f"Bearer {token}")
+    with urllib.request.urlopen(request) as response:
+        return response.status, response.read().decode()
+
+
+def test_sessions_are_shared_and_prompts_stream_ndjson(server):
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _request(f"{server}/health", token="otro")
+    assert excinfo.value.code == 401
+
+    payload = {"target": "ops@web", "key": "/etc/otra", "password_env": "HOME"}
+    status, body = _request(f"{server}/sessions", "POST", payload)
+    created = json.loads(body)
+    assert status == 201 and created["target"] == "ops@web:22" and not created["reused"]
+    # Las credenciales del cliente se ignoran: valen las fijadas al arrancar.
+    assert _FakeManager.credentials[-1]["key_path"] == "k"
+    assert _FakeManager.credentials[-1]["password"] is None
+    status, body = _request(f"{server}/sessions", "POST", {"target": "ops@web"})
+    assert status == 200 and json.loads(body)["id"] == created["id"]
+
+    base = f"{server}/sessions/{created['id']}"
+    _status, body = _request(f"{base}/prompt", "POST", {"prompt": "mundo"})
+    events = [json.loads(line) for line in body.splitlines()]
+    assert [event["event"] for event in events] == ["text", "done"]
+    assert events[-1]["text"] == "hola mundo" and events[-1]["usage"]["input_tokens"] == 5
+
+    _status, body = _request(f"{base}/command", "POST", {"command": "uptime"})
+    assert json.loads(body)["stdout"] == "ran uptime\n"
+
+    _status, body = _request(f"{server}/metrics")
+    assert json.loads(body)["sessions"][0]["last_turn"]["output_tokens"] == 1
+
+    _request(base, "DELETE")
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _request(f"{base}/prompt", "POST", {"prompt": "x"})
+    assert excinfo.value.code == 404
+
+
+def test_concurrent_opens_share_one_session_and_respect_the_limit():
+    pool = SessionPool(
+        max_sessions=1, runtime_factory=_FakeRuntime, connection_factory=_FakeManager
+    )
+    target = HostTarget("web", "ops")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.open(target))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(pool.list()) == 1 and len({session.session_id for session, _ in results}) == 1
+    with pytest.raises(ServerError) as excinfo:
+        pool.open(HostTarget("db", "ops"))
+    assert excinfo.value.status == 503
+    pool.close_all()
+
+
+def test_invalid_numbers_are_bad_requests(server):
+    _status, body = _request(f"{server}/sessions", "POST", {"target": "ops@web"})
+    base = f"{server}/sessions/{json.loads(body)['id']}"
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _request(f"{base}/command", "POST", {"command": "uptime", "timeout": "pronto"})
+    assert excinfo.value.code == 400
+
+
+def test_model_cache_builds_each_provider_client_once():
+    cache = ModelClientCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return object()
+
+    first = cache.get("bedrock", build)
+    assert cache.get("bedrock", build) is first and len(calls) == 1
+    assert cache.get("openai", build) is not first and len(calls) == 2
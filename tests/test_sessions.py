@@ -0,0 +1,77 @@
+"""Pruebas del almacén persistente de conversaciones."""
+
+from __future__ import annotations
+
+import pytest
+
+from smart_ai_sys_admin.agent.sessions import (
+    LATEST_SESSION,
+    SessionRecorder,
+    SessionStore,
+    SessionStoreError,
+)
+
+
+def _user(text: str) -> dict:
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def _tool_round(index: int) -> list[dict]:
+    use = {"toolUseId": f"t{index}", "name": "remote_command", "input": {"command": "uptime"}}
+    result = {"toolUseId": f"t{index}", "status": "success", "content": [{"text": "up"}]}
+    return [
+        {"role": "assistant", "content": [{"toolUse": use}]},
+        {"role": "user", "content": [{"toolResult": result}]},
+        {"role": "assistant", "content": [{"text": f"respuesta {index}"}]},
+    ]
+
+
+def test_tail_starts_at_user_prompt_across_segments(tmp_path):
+    store = SessionStore(tmp_path, segment_records=3)
+    recorder = SessionRecorder(store, metadata={"provider": "ollama"})
+    for index in range(4):
+        recorder.record(_user(f"pregunta {index}"))
+        for message in _tool_round(index):
+            recorder.record(message)
+    recorder.close()
+
+    session = store.open(LATEST_SESSION)
+    assert session.session_id == recorder.session_id
+    assert session.message_count == 16
+    assert len(list(session.path.glob("segment-*.jsonl"))) == 6
+
+    tail = session.tail_messages(6)
+    assert tail[0] == _user("pregunta 3")
+    assert len(tail) == 4
+    assert tail[1]["content"][0]["toolUse"]["toolUseId"] == "t3"
+
+    [info] = store.list()
+    assert info.title == "pregunta 0"
+    assert info.messages == 16
+
+
+def test_truncated_line_is_ignored_and_appends_continue(tmp_path):
+    store = SessionStore(tmp_path)
+    session = store.create()
+    session.append_message(_user("hola"))
+    session.close()
+    segment = session.path / "segment-000001.jsonl"
+    with segment.open("a", encoding="utf-8") as handle:
+        handle.write('{"kind": "message", "mess')
+
+    reopened = store.open(session.session_id)
+    assert reopened.message_count == 1
+    reopened.append_message({"role": "assistant", "content": [{"text": "adiós"}]})
+    texts = [message["content"][0]["text"] for message in reopened.tail_messages(10)]
+    assert texts == ["hola", "adiós"]
+
+
+def test_recorder_creates_session_lazily_and_open_rejects_unknown_ids(tmp_path):
+    store = SessionStore(tmp_path / "sessions")
+    recorder = SessionRecorder(store)
+    recorder.close()
+    assert store.list() == []
+    with pytest.raises(SessionStoreError):
+        store.open(LATEST_SESSION)
+    with pytest.raises(SessionStoreError):
+        store.open("../etc")
@@ -0,0 +1,111 @@
+"""Pruebas del streaming del agente: filtrado de razonamiento y cancelación."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from textual.app import App
+
+from smart_ai_sys_admin.agent.runtime import AgentRuntime, _ThinkingFilter
+from smart_ai_sys_admin.config import CONFIG
+from smart_ai_sys_admin.connection import SSHConnectionManager
+from smart_ai_sys_admin.ui.panels import STREAM_REFRESH_SECONDS, ConversationPanel
+
+
+def test_thinking_filter_handles_tags_split_across_chunks():
+    stream = _ThinkingFilter(enabled=True)
+    chunks = ["Hola <thi", "nk>razonamiento", " interno</th", "ink> mundo", " <", "b>"]
+
+    visible = "".join(stream.feed(chunk) for chunk in chunks)
+
+    assert visible == "Hola  mundo <b>"
+
+
+def test_thinking_filter_disabled_passes_text_through():
+    stream = _ThinkingFilter(enabled=False)
+    assert stream.feed("<think>x</think>y") == "<think>x</think>y"
+
+
+def test_cancelled_turn_closes_dangling_tool_uses():
+    runtime = AgentRuntime(SSHConnectionManager(logging.getLogger("test")))
+    runtime._agent = SimpleNamespace(
+        messages=[
+            {"role": "user", "content": [{"text": "revisa el disco"}]},
+            {
+                "role": "assistant",
+                "content": [
+                    {"toolUse": {"toolUseId": "t1", "name": "remote_ssh_command", "input": {}}}
+                ],
+            },
+        ]
+    )
+
+    runtime._repair_dangling_tool_uses()
+
+    closing = runtime._agent.messages[-1]
+    assert closing["role"] == "user"
+    assert closing["content"][0]["toolResult"]["toolUseId"] == "t1"
+    assert closing["content"][0]["toolResult"]["status"] == "error"
+
+
+def test_stream_renders_apart_and_reaches_the_log_once():
+    class _PanelApp(App):
+        def compose(self):
+            yield ConversationPanel(CONFIG)
+
+    async def scenario() -> None:
+        app = _PanelApp()
+        async with app.run_test() as pilot:
+            panel = app.query_one(ConversationPanel)
+            log = panel._log
+            history = len(panel._history)
+            writes: list[object] = []
+            original_write = log.write
+
+            def write(entry, **kwargs):
+                writes.append(entry)
+                return original_write(entry, **kwargs)
+
+            log.write = write
+
+            panel.begin_agent_stream()
+            panel.append_agent_stream("Reviso ")
+            panel.append_agent_stream("el disco")
+            panel.add_stream_notice("ejecutando df")
+            await pilot.pause(STREAM_REFRESH_SECONDS * 3)
+
+            assert panel._stream_box.display
+            assert "el disco" in panel._stream_text and "ejecutando df" in panel._stream_text
+            assert len(panel._history) == history and not writes
+
+            panel.end_agent_stream("Disco al 40 %")
+            await pilot.pause()
+
+            assert not panel._stream_box.display
+            assert len(panel._history) == history + 1
+            assert writes == [panel._history[-1]]
+            panel.append_agent_stream("tarde")
+            assert panel._stream_text == ""
+
+    asyncio.run(scenario())
+
+
+def test_cancel_only_interrupts_the_commands_of_the_owner():
+    class _Channel:
+        closed = False
+
+        def get_transport(self):
+            return None
+
+        def close(self):
+            self.closed = True
+
+    manager = SSHConnectionManager(logging.getLogger("test"))
+    agent, turn_channel, prefetch_channel = object(), _Channel(), _Channel()
+    manager._channels = {turn_channel: agent, prefetch_channel: None}
+
+    assert manager.cancel_running_commands(agent) == 1
+    assert turn_channel.closed and not prefetch_channel.closed
+    assert manager._cancelled_channels == {turn_channel}
@@ -0,0 +1,77 @@
+"""Pruebas de la selección de herramientas por relevancia."""
+
+from __future__ import annotations
+
+from smart_ai_sys_admin.agent.tool_router import ToolRouter, tokenize
+from smart_ai_sys_admin.agent.tools import builtin_tool_names
+
+
+def _spec(name: str, description: str) -> dict:
+    return {"name": name, "description": description, "inputSchema": {"json": {}}}
+
+
+SPECS = [
+    _spec("remote_ssh_command", "Ejecuta un comando en el servidor remoto."),
+    _spec("remote_sftp_transfer", "Transfiere ficheros por SFTP."),
+    _spec("search_documentation", "Search AWS documentation pages."),
+    _spec("read_documentation", "Read an AWS documentation page as markdown."),
+    _spec("scrape_url", "Scrape a web page with firecrawl."),
+    _spec("query_metrics", "Query Prometheus metrics with PromQL."),
+    _spec("list_buckets", "List S3 buckets in the account."),
+]
+
+
+def _user(text: str) -> dict:
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def test_tokenize_folds_accents_case_and_plurals():
+    assert tokenize("Configuración de Buckets listBuckets") == [
+        "configuracion", "bucket", "list", "bucket"
+    ]
+
+
+def test_router_keeps_core_tools_and_ranks_by_relevance():
+    router = ToolRouter(top_k=1, history_messages=2, core_tools=["remote_ssh_command"])
+    selected = router.select([_user("lista los buckets de S3")], SPECS)
+    assert [spec["name"] for spec in selected] == ["remote_ssh_command", "list_buckets"]
+    assert router.last_total == len(SPECS)
+
+
+def test_router_pins_tools_used_in_current_turn():
+    router = ToolRouter(top_k=1, history_messages=0, core_tools=[])
+    messages = [
+        _user("busca en la documentation de AWS"),
+        {
+            "role": "assistant",
+            "content": [{"toolUse": {"toolUseId": "1", "name": "scrape_url", "input": {}}}],
+        },
+        {"role": "user", "content": [{"toolResult": {"toolUseId": "1", "content": []}}]},
+    ]
+    names = [spec["name"] for spec in router.select(messages, SPECS)]
+    assert "scrape_url" in names
+    assert any(name.endswith("documentation") for name in names)
+    assert len(names) == 2
+
+
+def test_selection_is_stable_within_a_turn():
+    router = ToolRouter(top_k=1, history_messages=0, core_tools=[])
+    prompt = _user("consulta las metrics de prometheus")
+    first = router.select([prompt], SPECS)
+    follow_up = [
+        prompt,
+        {"role": "assistant", "content": [{"text": "Ahora reviso los buckets de S3."}]},
+    ]
+    assert router.select(follow_up, SPECS) == first
+    assert router.select([*follow_up, _user("lista los buckets")], SPECS) != first
+
+
+def test_builtin_tools_are_never_routed_away():
+    core = builtin_tool_names("remote_ssh_command")
+    assert {"shell", "file_read", "remote_job_status", "recall_tool_output"} <= set(core)
+    specs = [_spec(name, "Herramienta propia.") for name in core] + SPECS[2:]
+    router = ToolRouter(top_k=1, history_messages=2, core_tools=core)
+
+    selected = router.select([_user("¿cómo va el backup que lancé?")], specs)
+
+    assert {spec["name"] for spec in selected} == set(core)
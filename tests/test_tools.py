@@ -0,0 +1,16 @@
+"""Pruebas del registro de herramientas del agente."""
+
+from __future__ import annotations
+
+from smart_ai_sys_admin.agent.tools import remote_ssh_command, resolve_tools
+
+
+def test_renaming_the_remote_command_does_not_touch_the_module_tool():
+    renamed = resolve_tools(remote_command_name="ssh_exec")
+    default = resolve_tools()
+
+    names = [tool.tool_name for tool in renamed if hasattr(tool, "tool_name")]
+    assert "ssh_exec" in names and "remote_ssh_command" not in names
+    assert remote_ssh_command in default
+    assert remote_ssh_command.tool_name == "remote_ssh_command"
+    assert remote_ssh_command.tool_spec["name"] == "remote_ssh_command"
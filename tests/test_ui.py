@@ -0,0 +1,139 @@
+"""Pruebas de la interfaz Textual en modo headless."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from smart_ai_sys_admin.ui.app import SmartAISysAdminApp
+from smart_ai_sys_admin.ui.panels import CommandInput
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "conf" / "agent.conf.example"
+
+
+@pytest.fixture
+def agent_conf(tmp_path, monkeypatch):
+    data = json.loads(EXAMPLE.read_text(encoding="utf-8"))
+    data["sessions"]["enabled"] = False
+    data["metrics"]["log_file"] = None
+    path = tmp_path / "agent.conf"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    monkeypatch.setenv("SMART_AI_SYS_ADMIN_AGENT_CONFIG_FILE", str(path))
+    monkeypatch.setenv("CEREBRAS_API_KEY", "test")
+    return path
+
+
+async def _settle(pilot, app) -> None:
+    """Espera a que todas las pestañas terminen de cargar el agente."""
+
+    for _attempt in range(100):
+        await pilot.pause()
+        if not any(tab.initializing for tab in app._tabs.values()):
+            return
+    pytest.fail("el agente no terminó de inicializarse")
+
+
+async def _submit(pilot, app, content: str) -> None:
+    await app.on_command_input_submitted(CommandInput.Submitted(app._input, content))
+    await pilot.pause()
+
+
+def test_cancel_while_initializing_discards_queued_prompts(agent_conf):
+    async def scenario() -> None:
+        app = SmartAISysAdminApp()
+        async with app.run_test() as pilot:
+            await _settle(pilot, app)
+            tab = app._tab
+            tab.initializing = True
+            tab.pending_prompts.extend(["uno", "dos"])
+
+            app.action_cancel_agent()
+
+            assert not tab.pending_prompts
+            tab.initializing = False
+
+    asyncio.run(scenario())
+
+
+def test_tab_new_and_close(agent_conf):
+    async def scenario() -> None:
+        app = SmartAISysAdminApp()
+        async with app.run_test() as pilot:
+            await _settle(pilot, app)
+            first = app._tab
+
+            await _submit(pilot, app, "/tab new")
+            await _settle(pilot, app)
+            assert list(app._tabs) == ["tab-1", "tab-2"]
+            assert app._active_tab_id == "tab-2"
+            assert app._tab.runtime is not first.runtime
+
+            await _submit(pilot, app, "/tab close")
+            assert list(app._tabs) == ["tab-1"]
+            assert app._tab is first
+
+            await _submit(pilot, app, "/tab close")
+            assert list(app._tabs) == ["tab-1"]
+
+    asyncio.run(scenario())
+
+
+def test_prompts_queue_on_their_own_tab(agent_conf):
+    async def scenario() -> None:
+        app = SmartAISysAdminApp()
+        async with app.run_test() as pilot:
+            await _settle(pilot, app)
+            first = app._tab
+            await _submit(pilot, app, "/tab new")
+            await _settle(pilot, app)
+            second = app._tab
+            second.turn_running = True
+
+            await _submit(pilot, app, "revisa el disco")
+
+            assert list(second.pending_prompts) == ["revisa el disco"]
+            assert not first.pending_prompts and not first.busy
+            second.pending_prompts.clear()
+            second.turn_running = False
+
+    asyncio.run(scenario())
+
+
+def test_config_change_reloads_busy_tabs_once_idle(agent_conf):
+    data = json.loads(agent_conf.read_text(encoding="utf-8"))
+    data["agent"]["watch_config"] = True
+    agent_conf.write_text(json.dumps(data), encoding="utf-8")
+
+    async def scenario() -> None:
+        app = SmartAISysAdminApp()
+        async with app.run_test() as pilot:
+            await _settle(pilot, app)
+            first = app._tab
+            await _submit(pilot, app, "/tab new")
+            await _settle(pilot, app)
+            second = app._tab
+            reloaded: list[int] = []
+
+            async def reload(tab, _command):
+                reloaded.append(tab.number)
+                return None
+
+            changes = iter([True, False])
+            app._config_watcher = SimpleNamespace(path=agent_conf, poll=lambda: next(changes))
+            app._reload_agent = reload
+            second.turn_running = True
+
+            await app._poll_config()
+            assert reloaded == [first.number]
+            assert second.reload_pending and not first.reload_pending
+
+            second.turn_running = False
+            await app._poll_config()
+            assert reloaded == [first.number, second.number]
+            assert not second.reload_pending
+
+    asyncio.run(scenario())